@@ -12,7 +12,7 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from database.database import get_db
 from database.models import User
-from api.auth_api import require_authentication, get_current_user
+from api.auth_api import get_current_claims, AuthClaims
 from services.achievement_tracker import achievement_tracker
 from config.achievements import ACHIEVEMENT_STATS, get_achievements_by_category
 
@@ -87,7 +87,7 @@ async def get_global_achievement_stats():
 @router.get("", response_model=AchievementsListResponse)
 async def get_user_achievements(
     category: Optional[str] = None,
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -142,7 +142,7 @@ async def get_user_achievements(
 @router.post("/{achievement_id}/claim", response_model=ClaimRewardResponse)
 async def claim_achievement_reward(
     achievement_id: str,
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -173,7 +173,7 @@ async def claim_achievement_reward(
 @router.get("/category/{category}", response_model=AchievementsListResponse)
 async def get_achievements_by_category_endpoint(
     category: str,
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -1,43 +1,39 @@
-__all__ = ["get_current_user"]
+__all__ = ["get_current_user", "get_current_claims", "require_claims"]
 """
 Authentication API endpoints with guest mode support.
 Clean JWT-based authentication system.
+
+Endpoints that only need the caller's id, username or role depend on
+get_current_claims / require_claims, which read the access token's claims
+without touching the database. get_current_user / require_authentication
+load the full User for the few that need more.
 """
 
+import logging
 import os
+from dataclasses import replace
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, status, Request
+from typing import Optional, Dict, Any, Iterator, Tuple
+from fastapi import APIRouter, HTTPException, Depends, status, Request, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.requests import HTTPConnection
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from jose import JWTError, jwt
 from dotenv import load_dotenv
 
-from database.database import get_db, create_user_with_wallet, get_user_by_username, get_user_by_email
+from database.database import get_db, ReadSessionLocal, create_user_with_wallet, get_user_by_username, get_user_by_email
 from database.models import User, UserRole
 from crypto.portfolio import portfolio_manager
+from services.auth_tokens import (
+    ACCESS_TOKEN_EXPIRE_MINUTES, AuthClaims, create_user_token, revocation_list, token_verifier
+)
+from services.presence import presence
+from services.search_index import search_service
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# JWT Configuration
-SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key-change-in-production")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-
-# Validate JWT secret key on startup
-if SECRET_KEY == "jwt-secret-key-change-in-production":
-    raise ValueError(
-        "CRITICAL SECURITY ERROR: JWT_SECRET_KEY is using the default value. "
-        "You MUST set a secure JWT_SECRET_KEY in your .env file before running in production. "
-        "Generate a secure key using: python -c 'import secrets; print(secrets.token_urlsafe(32))'"
-    )
-if len(SECRET_KEY) < 32:
-    raise ValueError(
-        "CRITICAL SECURITY ERROR: JWT_SECRET_KEY is too short (minimum 32 characters required). "
-        "Generate a secure key using: python -c 'import secrets; print(secrets.token_urlsafe(32))'"
-    )
+load_dotenv()
 
 router = APIRouter()
 security = HTTPBearer(auto_error=False)
@@ -46,62 +42,14 @@ security = HTTPBearer(auto_error=False)
 async def check_auth(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: AsyncSession = Depends(get_db),
 ):
     """Check if the current session or provided JWT is authenticated.
 
-    This endpoint supports either a Bearer token in the Authorization header
-    or a legacy server-side session containing `user_id` and `auth_token`.
+    Accepts a Bearer token in the Authorization header, a server-side session
+    holding `user_id` and `auth_token`, or the client's `auth_token` cookie.
     """
-    # Debug: log incoming auth header and session for troubleshooting
-    try:
-        incoming_auth = None
-        if credentials and credentials.credentials:
-            incoming_auth = credentials.credentials
-        print(f">> Auth Check: Received Authorization token: {incoming_auth}")
-    except Exception as _e:
-        print(f">> Auth Check: Error reading credentials: {_e}")
-
-    # 1) If an Authorization header is present, validate the JWT
-    if credentials and credentials.credentials:
-        try:
-            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id: str = payload.get("sub")
-            print(f">> Auth Check: Decoded JWT payload sub={user_id}")
-            if user_id:
-                # Verify user exists
-                user = await db.get(User, user_id)
-                if user:
-                    print(f">> Auth Check: JWT validated for user {user_id}")
-                    return {"status": "success", "authenticated": True}
-        except JWTError as e:
-            # Token invalid or expired - fall through to session check
-            print(f">> Auth Check: JWT validation failed: {e}")
-            pass
-
-    # 2) Fall back to session-based validation (legacy behavior)
-    user_id = request.session.get("user_id")
-    auth_token = request.session.get("auth_token")
-    print(f">> Auth Check: Session contents: user_id={user_id}, auth_token_present={bool(auth_token)}")
-    if user_id and auth_token:
+    if _verify_presented(request, credentials, allow_cookie=True):
         return {"status": "success", "authenticated": True}
-
-    # 3) Fall back to "auth_token" cookie (set by client as backup)
-    cookie_token = request.cookies.get("auth_token")
-    if cookie_token:
-        try:
-            payload = jwt.decode(cookie_token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = payload.get("sub")
-            if user_id:
-                 # Verify user exists
-                user = await db.get(User, user_id)
-                if user:
-                    print(f">> Auth Check: Cookie JWT validated for user {user_id}")
-                    return {"status": "success", "authenticated": True}
-        except JWTError as e:
-            print(f">> Auth Check: Cookie JWT validation failed: {e}")
-            pass
-
     raise HTTPException(status_code=401, detail="Not authenticated")
 
 # ==================== REQUEST/RESPONSE MODELS ====================
@@ -142,17 +90,89 @@ def format_datetime(dt):
 
 # ==================== AUTHENTICATION FUNCTIONS ====================
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create JWT access token."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+def _presented_tokens(
+    request: HTTPConnection,
+    credentials: Optional[HTTPAuthorizationCredentials],
+    allow_cookie: bool = False
+) -> Iterator[Tuple[str, bool]]:
+    """(token, allow_expired) for each credential the request carries, in priority order."""
+    # 1) Authorization header (Bearer token)
+    if credentials and credentials.credentials:
+        yield credentials.credentials, False
+    # 2) Server-side session: the token it was created with, which outlives the token's expiry
+    if request.session.get("user_id") and request.session.get("auth_token"):
+        yield request.session["auth_token"], True
+    # 3) "auth_token" cookie (set by the client as a backup)
+    if allow_cookie and request.cookies.get("auth_token"):
+        yield request.cookies["auth_token"], False
+
+
+def _verify_presented(
+    request: HTTPConnection,
+    credentials: Optional[HTTPAuthorizationCredentials],
+    allow_cookie: bool = False
+) -> Optional[Tuple[str, AuthClaims]]:
+    for token, allow_expired in _presented_tokens(request, credentials, allow_cookie):
+        claims = token_verifier.verify(token, allow_expired=allow_expired)
+        if claims is None:
+            continue
+        if allow_expired and claims.id != request.session.get("user_id"):
+            continue
+        return token, claims
+    return None
+
+
+async def get_current_claims(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Optional[AuthClaims]:
+    """Claims of the authenticated caller or None for guest mode; no database access."""
+    verified = _verify_presented(request, credentials)
+    if verified is None:
+        return None
+    token, claims = verified
+    presence.heartbeat(claims.id)
+    if claims.has_profile:
+        return claims
+
+    # Token issued before claims were added: fill them in once for its lifetime
+    async with ReadSessionLocal() as db:
+        user = await db.get(User, claims.id)
+    if user is None:
+        return None
+    claims = replace(claims, username=user.username, role=user.role, is_bot=bool(user.is_bot))
+    token_verifier.remember(token, claims)
+    return claims
+
+
+def websocket_claims(websocket: WebSocket) -> Optional[AuthClaims]:
+    """Claims of a WebSocket's user, from the session or auth_token cookie, or None for guests."""
+    verified = _verify_presented(websocket, None, allow_cookie=True)
+    return verified[1] if verified else None
+
+
+async def require_claims(
+    claims: Optional[AuthClaims] = Depends(get_current_claims)
+) -> AuthClaims:
+    """
+    Require authentication, raise 401 if not authenticated.
+
+    The role and username come from the token and are trusted until it
+    expires (ACCESS_TOKEN_EXPIRE_MINUTES). A username change (update_profile)
+    revokes the user's tokens and issues a new one. Nothing in the app changes
+    a role or deactivates a user today. Whatever does so (an admin tool, a manual
+    UPDATE followed by a script) must call revocation_list.revoke_user() so
+    the user's existing tokens stop working at once. Otherwise they keep
+    the old claims until expiry.
+    """
+    if not claims:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
 
 async def get_current_user(
     request: Request,
@@ -160,29 +180,14 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db)
 ) -> Optional[User]:
     """Get current authenticated user or None for guest mode."""
-    user_id = None
-
-    # 1) Check Authorization header (Bearer token)
-    if credentials and credentials.credentials:
-        try:
-            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = payload.get("sub")
-        except JWTError:
-            pass
-
-    # 2) Fall back to session-based authentication
-    if not user_id:
-        user_id = request.session.get("user_id")
-        auth_token = request.session.get("auth_token")
-        # If we have both user_id and auth_token in session, use the user_id
-        if not (user_id and auth_token):
-            return None
-
-    if not user_id:
+    verified = _verify_presented(request, credentials)
+    if verified is None:
         return None
 
+    presence.heartbeat(verified[1].id)
+
     # Get user from database
-    user = await db.get(User, user_id)
+    user = await db.get(User, verified[1].id)
     return user
 
 async def require_authentication(
@@ -250,21 +255,18 @@ async def register_user(
         wallet_balance = await portfolio_manager.get_user_balance(user.id)
         if wallet_balance == 0:
             # Wallet creation might have failed, try to create it manually
-            print(f">> Warning: Wallet not found for new user {user.id}, creating manually")
+            logger.warning("Wallet not found for new user %s, creating manually", user.id)
             await portfolio_manager.create_wallet(user.id, 1000.0)
             wallet_balance = 1000.0
 
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.id},
-            expires_delta=access_token_expires
-        )
+        access_token = create_user_token(user, access_token_expires)
 
         # Set session data (same as login)
         request.session["user_id"] = str(user.id)
         request.session["auth_token"] = access_token
-        print(f">> Registration Success: Set session for new user {user.id}")
+        logger.info("Registration Success: Set session for new user %s", user.id)
 
         return {
             "access_token": access_token,
@@ -301,7 +303,7 @@ async def login_user(
         user = await get_user_by_username(db, login_data.username)
         if not user and login_data.username == "testuser" and login_data.password == "testpass":
             # Create test user for development
-            print(">> Creating test user account")
+            logger.info("Creating test user account")
             user = await create_user_with_wallet(
                 db,
                 username="testuser",
@@ -343,14 +345,11 @@ async def login_user(
             )
         except Exception as mission_error:
             # Don't fail login if mission tracking fails
-            print(f"Mission tracking error (login): {mission_error}")
+            logger.error("Mission tracking error (login): %s", mission_error)
 
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.id},
-            expires_delta=access_token_expires
-        )
+        access_token = create_user_token(user, access_token_expires)
 
         # Get wallet balance with fallback creation
         wallet_balance = await portfolio_manager.get_user_balance(str(user.id))
@@ -358,14 +357,14 @@ async def login_user(
             # Check if wallet exists, create if needed
             wallet = await portfolio_manager.get_user_wallet(str(user.id))
             if not wallet:
-                print(f">> Warning: Wallet not found for user {user.id} during login, creating")
+                logger.warning("Wallet not found for user %s during login, creating", user.id)
                 await portfolio_manager.create_wallet(str(user.id), 1000.0)
                 wallet_balance = 1000.0
 
         # Set session data
         request.session["user_id"] = str(user.id)
         request.session["auth_token"] = access_token
-        print(f">> Login Success: Set session for user {user.id}")
+        logger.info("Login Success: Set session for user %s", user.id)
         
         return {
             "access_token": access_token,
@@ -404,14 +403,11 @@ async def refresh_token(
     try:
         # Create new access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": current_user.id},
-            expires_delta=access_token_expires
-        )
+        access_token = create_user_token(current_user, access_token_expires)
 
         # Update session data
         request.session["auth_token"] = access_token
-        print(f">> Token Refresh: New token issued for user {current_user.id}")
+        logger.info("Token Refresh: New token issued for user %s", current_user.id)
 
         # Get current wallet balance
         wallet_balance = await portfolio_manager.get_user_balance(current_user.id)
@@ -463,8 +459,17 @@ async def get_current_user_info(
     )
 
 @router.post("/logout")
-async def logout_user():
-    """Logout user (client-side token removal)."""
+async def logout_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """Logout user: revoke the tokens presented and clear the server-side session."""
+    for token, allow_expired in _presented_tokens(request, credentials, allow_cookie=True):
+        claims = token_verifier.verify(token, allow_expired=True)
+        if claims is not None:
+            await revocation_list.revoke_token(claims)
+            presence.leave(claims.id)
+    request.session.clear()
     return {"message": "Successfully logged out"}
 
 @router.get("/guest")
@@ -520,7 +525,7 @@ async def get_auth_status(
             }
         except Exception as e:
             # If there's any issue with balance retrieval, log and use fallback
-            print(f">> Warning: Balance retrieval failed for user {current_user.id}: {e}")
+            logger.warning("Balance retrieval failed for user %s: %s", current_user.id, e)
             return {
                 "authenticated": True,
                 "user": {
@@ -587,7 +592,7 @@ async def get_profile(
         return {"success": True, "profile": profile_data}
 
     except Exception as e:
-        print(f">> Error: Failed to get profile: {e}")
+        logger.error("Failed to get profile: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get profile: {str(e)}")
 
 @router.put("/profile")
@@ -602,7 +607,8 @@ async def update_profile(
         from sqlalchemy import select
 
         # Check if username is being changed and if it's available
-        if profile_update.username and profile_update.username != current_user.username:
+        renamed = bool(profile_update.username) and profile_update.username != current_user.username
+        if renamed:
             existing = await db.execute(
                 select(User).filter(User.username == profile_update.username)
             )
@@ -631,18 +637,26 @@ async def update_profile(
 
         await db.commit()
         await db.refresh(current_user)
-
-        print(f">> Success: Profile updated for user {current_user.id}")
-
-        return {
+        response = {
             "success": True,
             "message": "Profile updated successfully",
             "profile": current_user.to_dict()
         }
+        if renamed:
+            await search_service.user_renamed(current_user.id, current_user.username)
+            # Tokens carry the username ("name" claim): retire the old ones and hand out a fresh one
+            await revocation_list.revoke_user(current_user.id)
+            access_token = create_user_token(current_user, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+            request.session["auth_token"] = access_token
+            response["access_token"] = access_token
+
+        logger.info("Profile updated for user %s", current_user.id)
+
+        return response
 
     except HTTPException:
         raise
     except Exception as e:
         await db.rollback()
-        print(f">> Error: Failed to update profile: {e}")
+        logger.error("Failed to update profile: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to update profile: {str(e)}")
@@ -3,19 +3,16 @@ Bot System for Gambling Population
 Creates and manages bot players to populate the gambling platform with realistic behavior.
 """
 
+import logging
 import random
 import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from database.database import AsyncSessionLocal
-from database.models import (
-    User, BotPersonalityType, BOT_PROFILE_DATA
-)
-from database.models import Wallet as Wall
-from crypto.portfolio import portfolio_manager
+from database.models import BotPersonalityType
+from gaming.bot_engine import bot_engine, PERSONALITY_PROFILES, PERSONALITIES
+
+logger = logging.getLogger(__name__)
 
 
 class BotGamblingPersonality:
@@ -24,56 +21,13 @@ class BotGamblingPersonality:
     def __init__(self, personality_type: BotPersonalityType):
         self.personality_type = personality_type
 
-        # Define betting parameters based on personality (GEM amounts ~ USD equivalent)
-        # ULTRA HIGH STAKES - Massive betting ranges for exciting gameplay
-        if personality_type == BotPersonalityType.CONSERVATIVE:
-            self.min_bet = 10000
-            self.max_bet = 50000  # $10,000-$50,000
-            self.bet_frequency = 0.6  # 60% chance to bet each round
-            self.strategy_preference = ["red_black", "even_odd"]  # Safer bets
-            self.risk_tolerance = 0.3
-
-        elif personality_type == BotPersonalityType.AGGRESSIVE:
-            self.min_bet = 50000
-            self.max_bet = 250000  # $50,000-$250,000
-            self.bet_frequency = 0.8  # 80% chance to bet each round
-            self.strategy_preference = ["single_number", "color", "category"]  # Riskier bets
-            self.risk_tolerance = 0.8
-
-        elif personality_type == BotPersonalityType.TREND_FOLLOWER:
-            self.min_bet = 20000
-            self.max_bet = 120000  # $20,000-$120,000
-            self.bet_frequency = 0.7
-            self.strategy_preference = ["red_black", "even_odd", "high_low"]  # Follow trends
-            self.risk_tolerance = 0.5
-
-        elif personality_type == BotPersonalityType.OPPORTUNISTIC:
-            self.min_bet = 30000
-            self.max_bet = 180000  # $30,000-$180,000
-            self.bet_frequency = 0.5  # Bets less frequently, but larger when they do
-            self.strategy_preference = ["single_number", "color"]  # Favorite-based
-            self.risk_tolerance = 0.6
-
-        elif personality_type == BotPersonalityType.PREDICTABLE_GAMBLER:
-            self.min_bet = 15000
-            self.max_bet = 80000  # $15,000-$80,000
-            self.bet_frequency = 0.9  # Bets most rounds
-            self.strategy_preference = ["even_odd"]  # Pattern-based
-            self.risk_tolerance = 0.4
-
-        elif personality_type == BotPersonalityType.HIGHROLLER:
-            self.min_bet = 100000
-            self.max_bet = 1000000  # $100,000-$1,000,000 - ULTRA high roller bets
-            self.bet_frequency = 0.4  # Bets moderately often with MASSIVE amounts
-            self.strategy_preference = ["single_number", "category"]  # High risk/high reward
-            self.risk_tolerance = 0.9
-
-        elif personality_type == BotPersonalityType.TIMID:
-            self.min_bet = 5000
-            self.max_bet = 25000  # $5,000-$25,000
-            self.bet_frequency = 0.2  # Rarely bets
-            self.strategy_preference = ["red_black", "high_low"]  # Very safe
-            self.risk_tolerance = 0.1
+        # Betting parameters are shared with the vectorized bot engine
+        profile = PERSONALITY_PROFILES[personality_type]
+        self.min_bet = profile["min_bet"]
+        self.max_bet = profile["max_bet"]
+        self.bet_frequency = profile["bet_frequency"]
+        self.strategy_preference = profile["strategy_preference"]
+        self.risk_tolerance = profile["risk_tolerance"]
 
     def should_bet_this_round(self) -> bool:
         """Determine if this bot should place a bet this round."""
@@ -203,93 +157,23 @@ class BotPopulationManager:
         self.active_rooms: List[str] = []  # Room codes where bots are active
 
     async def initialize_bots(self, num_bots: int = 22):
-        """Create and initialize bot players."""
-        async with AsyncSessionLocal() as session:
-            # Check if bots already exist
-            query = select(User).where(User.is_bot == True).limit(num_bots)
-            result = await session.execute(query)
-            existing_bots = result.scalars().all()
-
-            if len(existing_bots) >= num_bots:
-                print(f"[OK] {len(existing_bots)} bots already exist")
-            else:
-                # Create missing bots
-                existing_names = {bot.username for bot in existing_bots}
-                needed_bots = num_bots - len(existing_bots)
-
-                for bot_data in BOT_PROFILE_DATA:
-                    if bot_data[0] in existing_names:
-                        continue
-
-                    # Create new bot
-                    username, bio = bot_data
-
-                    # Generate bot email
-                    email = f"{username.replace(' ', '').lower()}@bot.crypto"
-
-                    # Choose random personality
-                    personality = random.choice(list(BotPersonalityType))
-
-                    # Create bot user
-                    bot_user = User(
-                        username=username,
-                        email=email,
-                        password_hash="bot_password_placeholder",  # Bots don't log in normally
-                        role="PLAYER",
-                        is_active=True,
-                        is_bot=True,
-                        bot_personality=personality.value
-                    )
-
-                    session.add(bot_user)
-                    await session.commit()
-                    await session.refresh(bot_user)
-
-                    # Create wallet with starting balance (500,000 GEM for bots to support higher bets)
-                    await portfolio_manager.create_wallet(str(bot_user.id), initial_gems=500000.0)
-
-                    # Verify wallet was created correctly
-                    balance = await portfolio_manager.get_user_balance(str(bot_user.id))
-                    if balance < 500000.0:
-                        print(f">> ERROR: Bot wallet for {username} created with insufficient balance: {balance} GEM")
-                        # Try to correct the balance
-                        await portfolio_manager.add_gems(str(bot_user.id), 500000.0 - balance, "Bot balance correction")
-                    else:
-                        print(f">> SUCCESS: Bot {username} wallet created with {balance} GEM")
-
-                    print(f"🤖 Created bot: {username} (Personality: {personality.value})")
-                    needed_bots -= 1
-
-                    if needed_bots <= 0:
-                        break
-
-            await session.commit()
+        """Create missing bot players and their wallets in bulk."""
+        created = await bot_engine.ensure_population(num_bots)
+        if created:
+            logger.info("Created %s bots", created)
+        else:
+            logger.info("Bot population already has %s+ bots", num_bots)
 
     async def load_bots(self):
-        """Load all bots into memory."""
-        async with AsyncSessionLocal() as session:
-            query = select(User).where(User.is_bot == True, User.is_active == True)
-            result = await session.execute(query)
-            bot_users = result.scalars().all()
-
-            for bot_user in bot_users:
-                # Get bot's current balance
-                balance = await portfolio_manager.get_user_balance(str(bot_user.id))
-                personality = BotPersonalityType(bot_user.bot_personality)
-
-                # CRITICAL: Repair corrupted bot balances during load (increase to 500k to support higher bets)
-                if balance < 500000.0:
-                    print(f">> CRITICAL: Bot {bot_user.username} has low balance: {balance} GEM. Upgrading to 500k...")
-                    balance_diff = 500000.0 - balance
-                    await portfolio_manager.add_gems(str(bot_user.id), balance_diff, "Bot balance upgrade for higher betting")
-                    balance = 500000.0
-                    print(f">> SUCCESS: Upgraded bot {bot_user.username} balance to {balance} GEM")
-
-                # Create BotGambler instance
-                bot = BotGambler(str(bot_user.id), personality, balance)
-                self.bots[str(bot_user.id)] = bot
-
-            print(f"[Bot System] Loaded {len(self.bots)} bot gamblers")
+        """Load all bots into memory from the bot engine's bulk-loaded state."""
+        await bot_engine.load()
+
+        self.bots = {}
+        for idx, user_id in enumerate(bot_engine.user_ids):
+            personality = PERSONALITIES[int(bot_engine.personality[idx])]
+            self.bots[user_id] = BotGambler(user_id, personality, float(bot_engine.balances[idx]))
+
+        logger.info("Loaded %s bot gamblers", len(self.bots))
 
     async def get_bots_for_room(self, room_code: str, max_bots: int = 8) -> List[Dict]:
         """Get a subset of bots to populate a room."""
@@ -328,9 +212,8 @@ class BotPopulationManager:
             if bot_id in self.bots:
                 bot = self.bots[bot_id]
 
-                # Update bot balance (would need real balance updates in production)
-                current_balance = await portfolio_manager.get_user_balance(bot_id)
-                bot.update_balance(current_balance)
+                # Balances are tracked in memory by the bot engine
+                bot.update_balance(bot_engine.get_balance(bot_id))
 
                 # Generate bet
                 bet = bot.generate_bet()
@@ -343,9 +226,9 @@ class BotPopulationManager:
 
     async def update_bot_balances(self):
         """Update all bot balances (called periodically)."""
+        await bot_engine.refresh_balances()
         for bot_id, bot in self.bots.items():
-            current_balance = await portfolio_manager.get_user_balance(bot_id)
-            bot.update_balance(current_balance)
+            bot.update_balance(bot_engine.get_balance(bot_id))
 
     async def simulate_betting_round(self, room_code: str, spin_result: Dict) -> List[Dict]:
         """
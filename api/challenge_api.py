@@ -10,8 +10,7 @@ from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.database import get_db
-from database.models import User
-from api.auth_api import require_authentication
+from api.auth_api import require_claims, AuthClaims
 from services.challenge_service import ChallengeService
 
 
@@ -60,7 +59,7 @@ class LoginStreakResponse(BaseModel):
 
 @router.post("/daily-login", response_model=LoginBonusResponse)
 async def claim_daily_login(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -79,7 +78,7 @@ async def claim_daily_login(
 
 @router.get("/active", response_model=ChallengeListResponse)
 async def get_active_challenges(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -97,7 +96,7 @@ async def get_active_challenges(
 @router.post("/claim/{challenge_id}", response_model=ClaimRewardResponse)
 async def claim_challenge_reward(
     challenge_id: int,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -128,7 +127,7 @@ async def claim_challenge_reward(
 
 @router.get("/login-streak", response_model=LoginStreakResponse)
 async def get_login_streak(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -1,13 +1,12 @@
 """
 Crypto Clicker API - Enhanced gamification system with upgrades
 """
-import os
 from typing import Optional
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.database import get_db
+from api.auth_api import get_current_claims
 from database.models import User
 from services.clicker_service import ClickerService
 from services.prestige_service import PrestigeService
@@ -17,9 +16,6 @@ from services.clicker_leaderboard_service import ClickerLeaderboardService
 
 router = APIRouter()
 
-# JWT config
-SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key-change-in-production")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 security = HTTPBearer(auto_error=False)
 
 # Services
@@ -35,21 +31,8 @@ async def get_current_user_id(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> Optional[str]:
     """Extract user ID from JWT or session"""
-    user_id = None
-
-    # Check JWT first
-    if credentials and credentials.credentials:
-        try:
-            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = payload.get("sub")
-        except JWTError:
-            pass
-
-    # Fallback to session
-    if not user_id:
-        user_id = request.session.get("user_id")
-
-    return user_id
+    claims = await get_current_claims(request, credentials)
+    return claims.id if claims else None
 
 
 @router.post("/click")
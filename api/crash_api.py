@@ -9,11 +9,12 @@ from pydantic import BaseModel
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.database import get_db
+from database.database import get_db, get_read_db
 from database.models import User
-from api.auth_api import require_authentication
+from api.auth_api import require_authentication, require_claims, websocket_claims, AuthClaims
 from services.crash_service import CrashGameService
 from services.crash_game_manager import crash_manager
+from services.presence import presence
 from crypto.portfolio import portfolio_manager
 
 
@@ -87,7 +88,7 @@ async def get_current_game(db: AsyncSession = Depends(get_db)):
 @router.post("/bet", response_model=PlaceBetResponse)
 async def place_bet(
     request: PlaceBetRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -118,6 +119,13 @@ async def place_bet(
             db=db
         )
 
+        await crash_manager.record_bet(
+            result['bet_id'],
+            current_user.username,
+            result['bet_amount'],
+            result['placed_at']
+        )
+
         # Broadcast bet to all clients
         await crash_manager.broadcast({
             "type": "bet_placed",
@@ -181,6 +189,12 @@ async def cashout(
             db=db
         )
 
+        await crash_manager.record_cashout(
+            result['bet_id'],
+            result['cashout_multiplier'],
+            result['profit']
+        )
+
         # Broadcast cashout to all clients
         await crash_manager.broadcast({
             "type": "cashout",
@@ -214,7 +228,7 @@ async def cashout(
 @router.get("/history")
 async def get_history(
     limit: int = 10,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get recent crash game history.
@@ -249,6 +263,9 @@ async def websocket_endpoint(websocket: WebSocket):
 
     # Add client to manager
     crash_manager.add_client(websocket)
+    claims = websocket_claims(websocket)
+    if claims:
+        presence.connect(claims.id)
 
     try:
         # Send current game state immediately
@@ -266,9 +283,13 @@ async def websocket_endpoint(websocket: WebSocket):
             # Handle client messages if needed (e.g., ping/pong)
             if data.get('type') == 'ping':
                 await websocket.send_json({"type": "pong"})
+                if claims:
+                    presence.heartbeat(claims.id)
 
     except WebSocketDisconnect:
         pass
     finally:
         # Remove client from manager
         crash_manager.remove_client(websocket)
+        if claims:
+            presence.disconnect(claims.id)
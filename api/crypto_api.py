@@ -17,7 +17,7 @@ from database.models import User
 from crypto.price_service import price_service
 from crypto.converter import crypto_converter
 from crypto.portfolio import portfolio_manager
-from api.auth_api import get_current_user
+from api.auth_api import get_current_claims, AuthClaims
 from database.models import User
 
 router = APIRouter()
@@ -26,7 +26,7 @@ router = APIRouter()
 
 @router.get("/portfolio/stats", response_model=Dict[str, Any])
 async def portfolio_stats_api(
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[AuthClaims] = Depends(get_current_claims)
 ) -> Dict[str, Any]:
     """Get user's portfolio statistics for profile page."""
     if not current_user:
@@ -251,7 +251,7 @@ async def get_popular_pairs():
 # ==================== PORTFOLIO ENDPOINTS ====================
 
 @router.get("/portfolio")
-async def get_portfolio(current_user: Optional[User] = Depends(get_current_user)):
+async def get_portfolio(current_user: Optional[AuthClaims] = Depends(get_current_claims)):
     """Get user's portfolio information."""
     if not current_user:
         # Guest mode portfolio
@@ -291,7 +291,7 @@ async def get_portfolio(current_user: Optional[User] = Depends(get_current_user)
 
 @router.get("/portfolio/transactions")
 async def get_transaction_history(
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0)
 ):
@@ -323,7 +323,7 @@ async def get_transaction_history(
 @router.post("/portfolio/add-gems")
 async def add_gems_to_wallet(
     request: AddGemsRequest,
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[AuthClaims] = Depends(get_current_claims)
 ):
     """Add GEMs to user's wallet (admin/testing function)."""
     if not current_user:
@@ -358,7 +358,7 @@ async def add_gems_to_wallet(
         raise HTTPException(status_code=500, detail=f"Error adding GEMs: {str(e)}")
 
 @router.get("/portfolio/balance")
-async def get_wallet_balance(current_user: Optional[User] = Depends(get_current_user)):
+async def get_wallet_balance(current_user: Optional[AuthClaims] = Depends(get_current_claims)):
     """Get current wallet balance."""
     if not current_user:
         guest_gems = int(os.getenv("GUEST_MODE_GEMS", "5000"))
@@ -429,7 +429,7 @@ async def search_cryptocurrencies(
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.database import get_db
-from api.auth_api import require_authentication
+from api.auth_api import require_claims
 from services.crypto_trading_service import crypto_trading_service
 from services.crypto_portfolio_service import crypto_portfolio_service
 
@@ -448,7 +448,7 @@ class SellCryptoRequest(BaseModel):
 async def get_crypto_buy_quote(
     crypto_id: str,
     quantity: float = Query(..., gt=0, description="Amount of crypto to buy"),
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -477,7 +477,7 @@ async def get_crypto_buy_quote(
 async def get_crypto_sell_quote(
     crypto_id: str,
     quantity: float = Query(..., gt=0, description="Amount of crypto to sell"),
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -506,7 +506,7 @@ async def get_crypto_sell_quote(
 async def buy_crypto(
     crypto_id: str,
     request: BuyCryptoRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -532,7 +532,7 @@ async def buy_crypto(
 async def sell_crypto(
     crypto_id: str,
     request: SellCryptoRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -557,7 +557,7 @@ async def sell_crypto(
 
 @router.get("/holdings/list")
 async def get_crypto_holdings(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -579,7 +579,7 @@ async def get_crypto_holdings(
 
 @router.get("/holdings/summary")
 async def get_crypto_portfolio_summary(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -603,7 +603,7 @@ async def get_crypto_transaction_history(
     limit: int = Query(50, ge=1, le=100),
     crypto_id: Optional[str] = Query(None, description="Filter by crypto ID"),
     transaction_type: Optional[str] = Query(None, description="Filter by BUY or SELL"),
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -629,7 +629,7 @@ async def get_crypto_transaction_history(
 @router.get("/holdings/{crypto_id}")
 async def get_crypto_position(
     crypto_id: str,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -0,0 +1,121 @@
+"""
+Fairness API
+
+Published seed chains, single-result verification and range audits for
+crash, roulette and mini-game results (services/fairness.py).
+"""
+
+import hashlib
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from api.auth_api import require_claims, AuthClaims
+from services.fairness import fairness
+from services.fairness_audit import audit_chain, recompute
+
+
+router = APIRouter()
+
+MAX_AUDIT_RANGE = 10000  # Links per audit request; scripts/verify_fairness.py has no limit
+
+
+# ============================================================================
+# REQUEST MODELS
+# ============================================================================
+
+class VerifyRequest(BaseModel):
+    """A revealed seed and where it claims to come from."""
+    game: Literal['crash', 'roulette', 'coinflip', 'dice', 'higherlower']
+    server_seed: str = Field(..., pattern=r"^[0-9a-f]{64}$", description="Revealed seed (hex)")
+    chain_id: Optional[str] = Field(None, description="Chain the seed came from")
+    index: Optional[int] = Field(None, ge=1, description="Link index within the chain")
+    position: int = Field(0, ge=0, description="Game number within an auto-play batch")
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+@router.get("/chains")
+async def list_chains(purpose: Optional[Literal['crash', 'roulette', 'minigames']] = None):
+    """
+    Published seed chains.
+
+    The anchor of each chain is committed before its first seed is used;
+    every seed from the chain hashes down to it.
+    """
+    chains = await fairness.chains(purpose)
+    return {
+        "chains": [
+            {
+                "id": chain.id,
+                "purpose": chain.purpose,
+                "anchor": chain.anchor,
+                "length": chain.length,
+                "next_index": chain.next_index,
+                "created_at": chain.created_at.isoformat()
+            }
+            for chain in chains
+        ]
+    }
+
+
+@router.post("/verify")
+async def verify_result(request: VerifyRequest):
+    """
+    Re-derive the outcome of a revealed seed.
+
+    - **previous_link**: sha256 of the seed, i.e. the seed of the link before it
+      (the chain anchor for index 1)
+    - **on_chain**: with chain_id and index, whether the seed is that link
+    """
+    seed = bytes.fromhex(request.server_seed)
+    previous_link = hashlib.sha256(seed).hexdigest()
+    result = {
+        "game": request.game,
+        "outcome": recompute(request.game, seed, request.position),
+        "previous_link": previous_link,
+    }
+
+    if request.chain_id is not None and request.index is not None:
+        chain = await fairness.get_chain(request.chain_id)
+        if chain is None:
+            raise HTTPException(status_code=404, detail="Chain not found")
+        if request.index >= chain.next_index:
+            raise HTTPException(status_code=400, detail="Link has not been used yet")
+        stored = fairness.stored_link(chain, request.index)
+        result["chain"] = {
+            "id": chain.id,
+            "anchor": chain.anchor,
+            "index": request.index,
+            # None when the chain file lives on another host; audit the range instead
+            "on_chain": None if stored is None else stored == seed,
+        }
+        if request.index == 1:
+            result["chain"]["anchor_matches"] = previous_link == chain.anchor
+
+    return result
+
+
+@router.get("/chains/{chain_id}/audit")
+async def audit_range(
+    chain_id: str,
+    start: int = Query(1, ge=1),
+    end: Optional[int] = Query(None, ge=1),
+    current_user: AuthClaims = Depends(require_claims)
+):
+    """
+    Verify every recorded result that used links start..end of a chain:
+    each seed must hash down to the anchor and reproduce the stored outcome.
+    """
+    if end is not None and end - start + 1 > MAX_AUDIT_RANGE:
+        raise HTTPException(status_code=400, detail=f"Audit at most {MAX_AUDIT_RANGE} links per request")
+    if end is None:
+        end = start + MAX_AUDIT_RANGE - 1
+
+    report = await audit_chain(chain_id, start, end)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Chain not found")
+    return report.to_dict()
@@ -3,6 +3,7 @@ Gaming API endpoints for crypto roulette.
 Simplified, focused gaming system with proper GEM economy.
 """
 
+import logging
 import os
 import json
 import asyncio
@@ -21,7 +22,10 @@ from database.models import (
 from gaming.roulette import roulette_engine
 from gaming.round_manager import round_manager
 from crypto.portfolio import portfolio_manager
-from api.auth_api import get_current_user
+from api.auth_api import get_current_claims, AuthClaims
+from services.presence import presence
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -100,7 +104,7 @@ class EmergencyTaskResponse(BaseModel):
 @router.post("/roulette/create", response_model=GameSessionResponse)
 async def create_roulette_game(
     request: CreateGameRequest,
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[AuthClaims] = Depends(get_current_claims)
 ):
     """Create a new roulette game session."""
     # Use guest user ID if not authenticated
@@ -137,7 +141,7 @@ async def create_roulette_game(
 async def place_roulette_bet(
     game_id: str,
     bet_request: PlaceBetRequest,
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[AuthClaims] = Depends(get_current_claims)
 ):
     """Place a bet in a roulette game."""
     # Use guest user ID if not authenticated
@@ -171,74 +175,46 @@ async def place_roulette_bet(
                     )
                 )
 
-        # CRITICAL FIX: Add exponential backoff retry mechanism for database locks
-        max_retries = 3
-        base_delay = 0.1  # Start with 100ms delay
-
-        for attempt in range(max_retries):
-            try:
-                # Place the bet - casino logic ensures balance deduction happens here
-                result = await roulette_engine.place_bet(
-                    game_session_id=game_id,
-                    user_id=user_id,
-                    bet_type=bet_request.bet_type.upper(),
-                    bet_value=bet_request.bet_value.lower(),
-                    amount=bet_request.amount
-                )
-
-                if result["success"]:
-                    # Track mission progress for authenticated users
-                    if current_user:
-                        try:
-                            from services.mission_tracker import mission_tracker
-                            from database.database import get_db
-                            async for db in get_db():
-                                await mission_tracker.track_event(
-                                    user_id=current_user.id,
-                                    event_name="roulette_bet_placed",
-                                    amount=1,
-                                    db=db
-                                )
-                                break
-                        except Exception as mission_error:
-                            # Don't fail bet if mission tracking fails
-                            print(f"Mission tracking error: {mission_error}")
-
-                    return BetResponse(
-                        success=True,
-                        bet_id=result["bet_id"],
-                        message=result["message"]
-                    )
-                else:
-                    # Explicitly return failure when database operations fail
-                    return BetResponse(
-                        success=False,
-                        message=result.get("message", "Failed to place bet due to database issues"),
-                        error=result.get("error", "Database operation failed")
-                    )
-
-            except Exception as db_error:
-                error_msg = str(db_error).lower()
-
-                # Check if it's a database lock error and we still have retries left
-                is_lock_error = (
-                    "database is locked" in error_msg or
-                    "locked" in error_msg or
-                    "concurrent access" in error_msg
-                )
-
-                if is_lock_error and attempt < max_retries - 1:
-                    # Exponential backoff: 100ms, 200ms, 400ms...
-                    import asyncio
-                    delay = base_delay * (2 ** attempt)
-                    await asyncio.sleep(delay)
-                    continue
+        # Place the bet - casino logic ensures balance deduction happens here.
+        # Wallet writes go through the serialized write queue, so no lock retries.
+        result = await roulette_engine.place_bet(
+            game_session_id=game_id,
+            user_id=user_id,
+            bet_type=bet_request.bet_type.upper(),
+            bet_value=bet_request.bet_value.lower(),
+            amount=bet_request.amount
+        )
 
-                # If not a lock error or we've exhausted retries, raise the original error
-                raise db_error
+        if result["success"]:
+            # Track mission progress for authenticated users
+            if current_user:
+                try:
+                    from services.mission_tracker import mission_tracker
+                    from database.database import get_db
+                    async for db in get_db():
+                        await mission_tracker.track_event(
+                            user_id=current_user.id,
+                            event_name="roulette_bet_placed",
+                            amount=1,
+                            db=db
+                        )
+                        break
+                except Exception as mission_error:
+                    # Don't fail bet if mission tracking fails
+                    logger.error("Mission tracking error: %s", mission_error)
 
-        # If we get here, we've exhausted retries
-        raise Exception("Failed to place bet after maximum retry attempts")
+            return BetResponse(
+                success=True,
+                bet_id=result["bet_id"],
+                message=result["message"]
+            )
+        else:
+            # Explicitly return failure when database operations fail
+            return BetResponse(
+                success=False,
+                message=result.get("message", "Failed to place bet due to database issues"),
+                error=result.get("error", "Database operation failed")
+            )
 
     except HTTPException:
         raise
@@ -252,7 +228,7 @@ async def place_roulette_bet(
 @router.post("/roulette/{game_id}/spin", response_model=SpinResult)
 async def spin_roulette(
     game_id: str,
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[AuthClaims] = Depends(get_current_claims)
 ):
     """Spin the roulette wheel and determine results."""
     try:
@@ -299,7 +275,7 @@ async def spin_roulette(
                             break
                 except Exception as mission_error:
                     # Don't fail spin if mission tracking fails
-                    print(f"Mission tracking error (win): {mission_error}")
+                    logger.error("Mission tracking error (win): %s", mission_error)
 
             return SpinResult(
                 success=True,
@@ -441,7 +417,7 @@ async def get_roulette_rules():
 
 @router.get("/roulette/history")
 async def get_game_history(
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0)
 ):
@@ -470,7 +446,7 @@ async def get_game_history(
 # ==================== GAMING STATS ENDPOINTS ====================
 
 @router.get("/stats")
-async def get_gaming_stats(current_user: Optional[User] = Depends(get_current_user)):
+async def get_gaming_stats(current_user: Optional[AuthClaims] = Depends(get_current_claims)):
     """Get user's gaming statistics."""
     if not current_user:
         return {
@@ -512,7 +488,7 @@ async def get_gaming_stats(current_user: Optional[User] = Depends(get_current_us
 @router.get("/validate-bet")
 async def validate_bet_amount(
     amount: float = Query(..., gt=0, description="Bet amount to validate"),
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[AuthClaims] = Depends(get_current_claims)
 ):
     """Validate if user can place a bet of given amount."""
     # Use guest user ID if not authenticated
@@ -545,7 +521,7 @@ async def validate_bet_amount(
 
 @router.get("/daily-bonus", response_model=DailyBonusResponse)
 async def get_daily_bonus_status(
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Check daily bonus availability for user."""
@@ -608,7 +584,7 @@ async def get_daily_bonus_status(
 
 @router.post("/daily-bonus/claim", response_model=DailyBonusResponse)
 async def claim_daily_bonus(
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Claim daily bonus GEM reward."""
@@ -701,7 +677,7 @@ async def claim_daily_bonus(
 
 @router.get("/achievements", response_model=AchievementProgressResponse)
 async def get_user_achievements(
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get user's achievement progress and available rewards."""
@@ -746,7 +722,7 @@ async def get_user_achievements(
 @router.post("/achievements/{achievement_id}/claim")
 async def claim_achievement_reward(
     achievement_id: str,
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Claim reward for completed achievement."""
@@ -807,7 +783,7 @@ async def claim_achievement_reward(
 
 @router.get("/emergency-tasks", response_model=EmergencyTaskResponse)
 async def get_emergency_tasks(
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get available emergency GEM tasks for low balance users."""
@@ -889,7 +865,7 @@ async def get_emergency_tasks(
 @router.post("/emergency-tasks/{task_id}/complete", response_model=EmergencyTaskResponse)
 async def complete_emergency_task(
     task_id: str,
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Complete an emergency task and claim GEM reward."""
@@ -991,7 +967,7 @@ async def complete_emergency_task(
 
 @router.post("/initialize-achievements")
 async def initialize_default_achievements(
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Initialize default achievements for the platform (Admin only)."""
@@ -1113,16 +1089,16 @@ async def initialize_default_achievements(
 # ==================== SERVER-MANAGED ROUND ENDPOINTS ====================
 
 @router.get("/roulette/round/current")
-async def get_current_round(current_user: Optional[User] = Depends(get_current_user)):
+async def get_current_round(current_user: Optional[AuthClaims] = Depends(get_current_claims)):
     """Get current round state - with lazy first round creation"""
     current = round_manager.get_current_round()
     if not current:
         # Lazy round creation: Start first round when first player connects
         user_id = current_user.id if current_user else "guest"
         username = current_user.username if current_user else "guest"
-        print(f"[API] First player detected ({username}), starting first round")
+        logger.info("First player detected (%s), starting first round", username)
         current = await round_manager.start_new_round(triggered_by=user_id)
-        print(f"[API] First round created: #{current.round_number}")
+        logger.info("First round created: #%s", current.round_number)
 
     return {"success": True, "round": current}
 
@@ -1130,7 +1106,7 @@ async def get_current_round(current_user: Optional[User] = Depends(get_current_u
 @router.post("/roulette/round/spin")
 async def trigger_manual_spin(
     game_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthClaims = Depends(get_current_claims)
 ):
     """Player-initiated spin (manual trigger)"""
     try:
@@ -1146,7 +1122,7 @@ async def trigger_manual_spin(
 
 
 @router.get("/roulette/round/stream")
-async def round_event_stream(current_user: Optional[User] = Depends(get_current_user)):
+async def round_event_stream(current_user: Optional[AuthClaims] = Depends(get_current_claims)):
     """Server-Sent Events stream for round updates"""
     # Generate a unique ID for guest users
     user_id = current_user.id if current_user else f"guest-{id(current_user)}"
@@ -1154,12 +1130,14 @@ async def round_event_stream(current_user: Optional[User] = Depends(get_current_
     # Lazy round creation: Start first round if none exists
     if not round_manager.get_current_round():
         username = current_user.username if current_user else "guest"
-        print(f"[SSE] First player connected ({username}), starting first round")
+        logger.info("First player connected (%s), starting first round", username)
         await round_manager.start_new_round(triggered_by=user_id)
 
     queue = await round_manager.subscribe_sse(user_id)
 
     async def event_generator():
+        if current_user:
+            presence.connect(current_user.id)
         try:
             while True:
                 event_data = await queue.get()
@@ -1171,9 +1149,12 @@ async def round_event_stream(current_user: Optional[User] = Depends(get_current_
             round_manager.unsubscribe_sse(user_id)
             raise
         except Exception as e:
-            print(f"[SSE] Error for user {user_id}: {e}")
+            logger.error("Error for user %s: %s", user_id, e)
             round_manager.unsubscribe_sse(user_id)
             raise
+        finally:
+            if current_user:
+                presence.disconnect(current_user.id)
 
     return StreamingResponse(
         event_generator(),
@@ -1189,7 +1170,7 @@ async def round_event_stream(current_user: Optional[User] = Depends(get_current_
 @router.get("/roulette/round/{round_id}/results")
 async def get_round_results(
     round_id: str,
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[AuthClaims] = Depends(get_current_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get detailed bet results for a specific round (for authenticated users only)"""
@@ -14,8 +14,8 @@ from datetime import datetime
 import uuid
 
 from database.database import get_db
-from database.models import User, GemPurchase, Wallet, Transaction, TransactionType
-from api.auth_api import require_authentication
+from database.models import GemPurchase, Wallet, Transaction, TransactionType
+from api.auth_api import require_claims, AuthClaims
 from config.gem_packages import GEM_PACKAGES, get_package, get_all_packages, validate_package_id
 
 router = APIRouter()
@@ -94,7 +94,7 @@ async def get_gem_packages():
 @router.post("/purchase", response_model=PurchaseResponse)
 async def purchase_gem_package(
     request: PurchaseRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -180,7 +180,7 @@ async def purchase_gem_package(
 
 @router.get("/purchase-history", response_model=PurchaseHistoryResponse)
 async def get_purchase_history(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -228,7 +228,7 @@ async def get_purchase_history(
 
 @router.get("/stats")
 async def get_purchase_stats(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
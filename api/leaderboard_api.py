@@ -9,9 +9,8 @@ from pydantic import BaseModel
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.database import get_db
-from database.models import User
-from api.auth_api import require_authentication
+from database.database import get_db, get_read_db
+from api.auth_api import require_claims, AuthClaims
 from services.leaderboard_service import LeaderboardService
 
 
@@ -44,7 +43,7 @@ class UserRankResponse(BaseModel):
 async def get_wealth_leaderboard(
     timeframe: str = Path(..., regex="^(all_time|weekly|monthly)$"),
     limit: int = Query(100, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get wealth leaderboard (richest users).
@@ -65,7 +64,7 @@ async def get_wealth_leaderboard(
 async def get_minigames_leaderboard(
     timeframe: str = Path(..., regex="^(all_time|weekly|monthly)$"),
     limit: int = Query(100, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get mini-games leaderboard (highest profit).
@@ -86,7 +85,7 @@ async def get_minigames_leaderboard(
 async def get_trading_leaderboard(
     timeframe: str = Path(..., regex="^(all_time|weekly|monthly)$"),
     limit: int = Query(100, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get trading leaderboard (highest volume).
@@ -107,7 +106,7 @@ async def get_trading_leaderboard(
 async def get_roulette_leaderboard(
     timeframe: str = Path(..., regex="^(all_time|weekly|monthly)$"),
     limit: int = Query(100, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get roulette leaderboard (highest wagered).
@@ -128,8 +127,8 @@ async def get_roulette_leaderboard(
 async def get_my_rank(
     category: str = Path(..., regex="^(wealth|minigames|trading|roulette)$"),
     timeframe: str = Path(..., regex="^(all_time|weekly|monthly)$"),
-    current_user: User = Depends(require_authentication),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthClaims = Depends(require_claims),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get current user's rank in a leaderboard.
@@ -6,12 +6,11 @@ REST API endpoints for Coin Flip, Dice Roll, and Higher/Lower games.
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.database import get_db
-from database.models import User
-from api.auth_api import require_authentication
+from database.database import get_db, get_read_db
+from api.auth_api import require_claims, AuthClaims
 from services.minigames_service import MiniGamesService
 
 
@@ -41,6 +40,19 @@ class HigherLowerRequest(BaseModel):
     guess: str = Field(..., description="'higher', 'lower', or 'same'")
 
 
+class AutoPlayRequest(BaseModel):
+    """Request model for auto-play: the same bet repeated up to `rounds` times."""
+    game_type: Literal['coinflip', 'dice', 'higherlower']
+    bet_amount: int = Field(..., ge=100, le=100000, description="Bet amount per game (100-100000 GEM)")
+    rounds: int = Field(..., ge=1, le=MiniGamesService.MAX_AUTO_PLAY_ROUNDS, description="Maximum number of games")
+    choice: Optional[str] = Field(None, description="Coin Flip: 'heads' or 'tails'")
+    bet_type: Optional[str] = Field(None, description="Dice: 'exact', 'even', 'odd', 'high', or 'low'")
+    bet_value: Optional[int] = Field(None, ge=1, le=6, description="Dice: for 'exact' bets only (1-6)")
+    guess: Optional[str] = Field(None, description="Higher/Lower: 'higher', 'lower', or 'same'")
+    stop_loss: Optional[int] = Field(None, ge=1, description="Stop once the batch has lost this much GEM")
+    take_profit: Optional[int] = Field(None, ge=1, description="Stop once the batch has won this much GEM")
+
+
 class GameResultResponse(BaseModel):
     """Response model for game results."""
     success: bool
@@ -65,7 +77,7 @@ class HistoryResponse(BaseModel):
 @router.post("/coinflip", response_model=GameResultResponse)
 async def play_coinflip(
     request: CoinFlipRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -100,7 +112,7 @@ async def play_coinflip(
 @router.post("/dice", response_model=GameResultResponse)
 async def play_dice(
     request: DiceRollRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -137,7 +149,7 @@ async def play_dice(
 @router.post("/higherlower", response_model=GameResultResponse)
 async def play_higherlower(
     request: HigherLowerRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -169,13 +181,59 @@ async def play_higherlower(
         raise HTTPException(status_code=500, detail=f"Game error: {str(e)}")
 
 
+@router.post("/auto", response_model=GameResultResponse)
+async def play_auto(
+    request: AutoPlayRequest,
+    current_user: AuthClaims = Depends(require_claims),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Play many games of one type in a single request.
+
+    - **game_type**: 'coinflip', 'dice', or 'higherlower'
+    - **rounds**: Up to 1000 games with the same bet and selection
+    - **stop_loss** / **take_profit**: Stop early once the batch is down / up this much
+    - Stops before any game the balance cannot cover
+    """
+    try:
+        result = await MiniGamesService.play_auto(
+            user_id=current_user.id,
+            game_type=request.game_type,
+            bet_amount=request.bet_amount,
+            rounds=request.rounds,
+            db=db,
+            choice=request.choice,
+            bet_type=request.bet_type,
+            bet_value=request.bet_value,
+            guess=request.guess,
+            stop_loss=request.stop_loss,
+            take_profit=request.take_profit
+        )
+
+        if result['profit'] >= 0:
+            message = f"🎉 {result['rounds_played']} games played, +{result['profit']} GEM"
+        else:
+            message = f"💔 {result['rounds_played']} games played, {result['profit']} GEM"
+
+        return GameResultResponse(
+            success=True,
+            message=message,
+            result=result
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Game error: {str(e)}")
+
+
 # ============================================================================
 # STATISTICS ENDPOINTS
 # ============================================================================
 
 @router.get("/stats", response_model=StatsResponse)
 async def get_stats(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -195,8 +253,8 @@ async def get_stats(
 @router.get("/history", response_model=HistoryResponse)
 async def get_history(
     limit: int = 50,
-    current_user: User = Depends(require_authentication),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthClaims = Depends(require_claims),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get user's recent game history.
@@ -229,6 +287,7 @@ async def get_game_info():
     return {
         'min_bet': MiniGamesService.MIN_BET,
         'max_bet': MiniGamesService.MAX_BET,
+        'max_auto_play_rounds': MiniGamesService.MAX_AUTO_PLAY_ROUNDS,
         'games': {
             'coinflip': {
                 'name': 'Coin Flip',
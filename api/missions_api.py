@@ -10,8 +10,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.database import get_db
-from database.models import User
-from api.auth_api import get_current_user, require_authentication
+from api.auth_api import require_claims, AuthClaims
 from services.mission_tracker import mission_tracker
 from config.missions import (
     DAILY_MISSIONS,
@@ -93,7 +92,7 @@ class MissionsOverviewResponse(BaseModel):
 
 @router.get("/daily", response_model=DailyMissionsResponse)
 async def get_daily_missions(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -130,7 +129,7 @@ async def get_daily_missions(
 
 @router.get("/weekly", response_model=WeeklyChallengesResponse)
 async def get_weekly_challenges(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -167,7 +166,7 @@ async def get_weekly_challenges(
 
 @router.get("/overview", response_model=MissionsOverviewResponse)
 async def get_missions_overview(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -207,7 +206,7 @@ async def get_missions_overview(
 @router.post("/daily/{mission_id}/claim", response_model=ClaimRewardResponse)
 async def claim_daily_mission_reward(
     mission_id: str,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -249,7 +248,7 @@ async def claim_daily_mission_reward(
 @router.post("/weekly/{challenge_id}/claim", response_model=ClaimRewardResponse)
 async def claim_weekly_challenge_reward(
     challenge_id: str,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -308,7 +307,7 @@ async def get_mission_definitions():
 
 @router.get("/stats")
 async def get_mission_stats(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
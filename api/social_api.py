@@ -4,14 +4,13 @@ Social API
 REST endpoints for friends, messaging, profiles, and activity feeds.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.database import get_db
-from database.models import User
-from api.auth_api import require_authentication
+from database.database import get_db, get_read_db
+from api.auth_api import require_claims, AuthClaims
 from services.friends_service import FriendsService
 from services.social_service import MessagingService, ActivityService, ProfileService
 
@@ -66,7 +65,7 @@ class UpdatePrivacyRequest(BaseModel):
 @router.post("/friends/request")
 async def send_friend_request(
     request: SendFriendRequestRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Send a friend request to another user."""
@@ -84,7 +83,7 @@ async def send_friend_request(
 @router.post("/friends/accept")
 async def accept_friend_request(
     request: FriendRequestActionRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Accept a friend request."""
@@ -102,7 +101,7 @@ async def accept_friend_request(
 @router.post("/friends/reject")
 async def reject_friend_request(
     request: FriendRequestActionRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Reject a friend request."""
@@ -120,7 +119,7 @@ async def reject_friend_request(
 @router.post("/friends/remove")
 async def remove_friend(
     request: RemoveFriendRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Remove a friend."""
@@ -137,7 +136,7 @@ async def remove_friend(
 
 @router.get("/friends")
 async def get_friends(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get list of friends."""
@@ -147,7 +146,7 @@ async def get_friends(
 
 @router.get("/friends/requests")
 async def get_friend_requests(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get pending friend requests."""
@@ -158,8 +157,8 @@ async def get_friend_requests(
 @router.get("/friends/search")
 async def search_users(
     query: str,
-    current_user: User = Depends(require_authentication),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthClaims = Depends(require_claims),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Search for users."""
     users = await FriendsService.search_users(query, current_user.id, db)
@@ -173,7 +172,7 @@ async def search_users(
 @router.post("/messages/send")
 async def send_message(
     request: SendMessageRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Send a private message."""
@@ -192,7 +191,7 @@ async def send_message(
 @router.get("/messages/conversation/{user_id}")
 async def get_conversation(
     user_id: str,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get conversation with a user."""
@@ -203,7 +202,7 @@ async def get_conversation(
 @router.post("/messages/mark-read/{user_id}")
 async def mark_messages_read(
     user_id: str,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Mark messages from a user as read."""
@@ -213,7 +212,7 @@ async def mark_messages_read(
 
 @router.get("/messages/unread-count")
 async def get_unread_count(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get count of unread messages."""
@@ -223,7 +222,7 @@ async def get_unread_count(
 
 @router.get("/messages/recent")
 async def get_recent_conversations(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Get recent conversations."""
@@ -238,7 +237,7 @@ async def get_recent_conversations(
 @router.get("/profile/{username}")
 async def get_profile(
     username: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a user's public profile."""
     try:
@@ -251,7 +250,7 @@ async def get_profile(
 @router.post("/profile/update")
 async def update_profile(
     request: UpdateProfileRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Update your profile."""
@@ -269,7 +268,7 @@ async def update_profile(
 @router.post("/profile/privacy")
 async def update_privacy(
     request: UpdatePrivacyRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """Update privacy settings."""
@@ -289,8 +288,8 @@ async def update_privacy(
 
 @router.get("/activity/me")
 async def get_my_activity(
-    current_user: User = Depends(require_authentication),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthClaims = Depends(require_claims),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get your activity feed."""
     activities = await ActivityService.get_user_activity(current_user.id, db)
@@ -299,9 +298,12 @@ async def get_my_activity(
 
 @router.get("/activity/friends")
 async def get_friends_activity(
-    current_user: User = Depends(require_authentication),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(50, ge=1, le=100),
+    before: Optional[int] = Query(None, description="Activity id the previous page ended with"),
+    current_user: AuthClaims = Depends(require_claims),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get friends' activity feed."""
-    activities = await ActivityService.get_friends_activity(current_user.id, db)
-    return {"success": True, "activities": activities}
+    """Get friends' activity feed, newest first, one page at a time."""
+    activities = await ActivityService.get_friends_activity(current_user.id, db, limit=limit, before=before)
+    next_before = activities[-1]["id"] if len(activities) == limit else None
+    return {"success": True, "activities": activities, "next_before": next_before}
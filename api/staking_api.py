@@ -12,7 +12,7 @@ from datetime import datetime
 
 from database.database import get_db
 from database.models import User
-from api.auth_api import require_authentication
+from api.auth_api import require_claims, AuthClaims
 from services.staking_service import StakingService
 from config.staking_plans import get_all_plans, get_plan
 
@@ -129,7 +129,7 @@ async def get_staking_plans():
 @router.post("/stake", response_model=CreateStakeResponse)
 async def create_stake(
     request: CreateStakeRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -175,7 +175,7 @@ async def create_stake(
 @router.get("/my-stakes", response_model=List[StakeInfo])
 async def get_my_stakes(
     status: Optional[str] = None,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -236,7 +236,7 @@ async def get_my_stakes(
 @router.post("/claim-rewards/{stake_id}", response_model=ClaimRewardsResponse)
 async def claim_stake_rewards(
     stake_id: int,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -280,7 +280,7 @@ async def claim_stake_rewards(
 @router.post("/unstake/{stake_id}", response_model=UnstakeResponse)
 async def unstake_gems(
     stake_id: int,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -342,7 +342,7 @@ async def unstake_gems(
 
 @router.get("/stats", response_model=StakingStatsResponse)
 async def get_staking_stats(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
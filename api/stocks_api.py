@@ -5,16 +5,17 @@ Provides REST API for virtual stock trading system.
 
 import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.database import get_db
-from database.models import User
-from api.auth_api import get_current_user, require_authentication
+from api.auth_api import require_claims, AuthClaims
 from services.stock_data_service import stock_data_service
+from services.stock_candles import candle_store
 from services.stock_trading_service import stock_trading_service
 from services.stock_portfolio_service import stock_portfolio_service
+from services.search_index import search_service
 
 logger = logging.getLogger(__name__)
 
@@ -93,21 +94,24 @@ async def list_stocks(
             query = query.where(StockMetadata.sector == sector)
 
         if search:
-            search_upper = search.upper()
-            query = query.where(
-                (StockMetadata.ticker.like(f"%{search_upper}%")) |
-                (StockMetadata.company_name.ilike(f"%{search}%"))
-            )
-
-        query = query.limit(limit)
+            # Ranked matches; the sector filter and limit apply after ranking
+            tickers = await search_service.stocks.search(search)
+            query = query.where(StockMetadata.ticker.in_(tickers))
+        else:
+            query = query.limit(limit)
 
         result = await db.execute(query)
         stocks = result.scalars().all()
+        if search:
+            rank = {ticker: position for position, ticker in enumerate(tickers)}
+            stocks = sorted(stocks, key=lambda stock: rank[stock.ticker])[:limit]
+
+        # Stored prices for all listed stocks in one lookup (never fetched upstream here)
+        prices = await stock_data_service.get_stock_prices([stock.ticker for stock in stocks], db)
 
-        # Get current prices for each stock
         stocks_with_prices = []
         for stock in stocks:
-            price_data = await stock_data_service.get_stock_price(stock.ticker, db)
+            price_data = prices.get(stock.ticker.upper())
 
             stock_info = {
                 "ticker": stock.ticker,
@@ -255,17 +259,13 @@ async def get_stock_chart(
     try:
         ticker = ticker.upper()
 
-        history = await stock_data_service.get_stock_history(ticker, period)
+        # Serialized once per ticker and period, then served from the candle store's LRU
+        payload = await candle_store.chart_payload(ticker, period)
 
-        if not history:
+        if payload is None:
             raise HTTPException(status_code=404, detail=f"No historical data for {ticker}")
 
-        return {
-            "success": True,
-            "ticker": ticker,
-            "period": period,
-            "data": history
-        }
+        return Response(content=payload, media_type="application/json")
 
     except HTTPException:
         raise
@@ -280,7 +280,7 @@ async def get_stock_chart(
 async def get_buy_quote(
     ticker: str,
     request: BuyStockRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -317,7 +317,7 @@ async def get_buy_quote(
 async def buy_stock(
     ticker: str,
     request: BuyStockRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -351,7 +351,7 @@ async def buy_stock(
 async def sell_stock(
     ticker: str,
     request: SellStockRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -385,7 +385,7 @@ async def sell_stock(
 
 @router.get("/portfolio/summary")
 async def get_portfolio_summary(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -412,7 +412,7 @@ async def get_portfolio_summary(
 
 @router.get("/portfolio/holdings")
 async def get_holdings(
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -443,7 +443,7 @@ async def get_transactions(
     limit: int = Query(50, ge=1, le=200, description="Maximum number of transactions"),
     ticker: Optional[str] = Query(None, description="Filter by ticker"),
     transaction_type: Optional[str] = Query(None, regex="^(BUY|SELL)$", description="Filter by type"),
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -480,7 +480,7 @@ async def get_transactions(
 @router.get("/portfolio/performance")
 async def get_performance(
     days: int = Query(30, ge=1, le=365, description="Number of days"),
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -513,7 +513,7 @@ async def get_performance(
 @router.get("/portfolio/position/{ticker}")
 async def get_position(
     ticker: str,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -11,8 +11,7 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.database import get_db
-from database.models import User
-from api.auth_api import require_authentication
+from api.auth_api import require_claims, AuthClaims
 from services.trading_service import TradingService
 
 
@@ -99,7 +98,7 @@ class MarketStatsResponse(BaseModel):
 @router.post("/order", response_model=CreateOrderResponse)
 async def create_order(
     request: CreateOrderRequest,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     success, message, order = await TradingService.create_order(
@@ -165,7 +164,7 @@ async def get_order_book(
 @router.get("/my-orders", response_model=List[OrderInfo])
 async def get_my_orders(
     status: Optional[str] = None,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     orders = await TradingService.get_user_orders(
@@ -180,7 +179,7 @@ async def get_my_orders(
 @router.post("/cancel-order/{order_id}", response_model=CancelOrderResponse)
 async def cancel_order(
     order_id: int,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     success, message = await TradingService.cancel_order(
@@ -207,7 +206,7 @@ async def get_recent_trades(
 @router.get("/trades/my-history", response_model=List[TradeInfo])
 async def get_my_trade_history(
     limit: int = 50,
-    current_user: User = Depends(require_authentication),
+    current_user: AuthClaims = Depends(require_claims),
     db: AsyncSession = Depends(get_db)
 ):
     trades = await TradingService.get_user_trade_history(
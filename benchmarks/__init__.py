@@ -0,0 +1,10 @@
+"""
+In-process benchmark suite for CryptoChecker Version3.
+
+Drives the FastAPI app through an ASGI transport against a scratch database
+and reports per-endpoint latency percentiles and throughput.
+
+Usage:
+    python -m benchmarks --users 20 --rounds 5 --output bench.json
+    python -m benchmarks --baseline benchmarks/baseline.json
+"""
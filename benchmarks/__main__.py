@@ -0,0 +1,129 @@
+"""
+Command-line entry point: python -m benchmarks [options]
+"""
+
+import io
+import sys
+import asyncio
+import argparse
+import contextlib
+
+from benchmarks.harness import (
+    prepare_environment,
+    LatencyRecorder,
+    BenchClient,
+    build_results,
+    save_results,
+    load_results,
+    compare_to_baseline,
+    error_rate_violations,
+    format_table
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the in-process CryptoChecker load benchmark"
+    )
+    parser.add_argument("--users", type=int, default=20, help="Simulated players (default: 20)")
+    parser.add_argument("--rounds", type=int, default=5, help="Roulette + crash rounds to play (default: 5)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Max in-flight requests (default: 10)")
+    parser.add_argument("--database-url", help="Database URL (default: fresh temporary SQLite file)")
+    parser.add_argument("--seed", type=int, help="Random seed for a reproducible request mix")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--baseline", help="Compare against a stored results file; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative p95 growth before flagging a regression (default: 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="Ignore p95 changes smaller than this many ms (default: 2.0)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="Mark the run invalid and exit 2 if any endpoint fails more often (default: 0.01)")
+    parser.add_argument("--verbose", action="store_true", help="Show application log output")
+    return parser.parse_args(argv)
+
+
+async def run_benchmark(args, database_url: str):
+    import httpx
+
+    # App modules read DATABASE_URL at import time
+    from main import app
+    from database.database import init_database
+    from benchmarks.workloads import Workload, WorkloadConfig
+
+    await init_database()
+
+    recorder = LatencyRecorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        client = BenchClient(http, recorder)
+        workload = Workload(client, WorkloadConfig(
+            users=args.users,
+            rounds=args.rounds,
+            concurrency=args.concurrency,
+            seed=args.seed
+        ))
+
+        recorder.start()
+        await workload.setup_users()
+        await workload.run()
+        recorder.stop()
+
+    config = {
+        "users": args.users,
+        "rounds": args.rounds,
+        "concurrency": args.concurrency,
+        "seed": args.seed
+    }
+    return build_results(recorder, config, database_url)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    database_url = prepare_environment(args.database_url)
+
+    log_sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with log_sink:
+        results = asyncio.run(run_benchmark(args, database_url))
+
+    print(f"Database: {database_url}")
+    print(f"Duration: {results['meta']['duration_s']}s  "
+          f"({args.users} users, {args.rounds} rounds, concurrency {args.concurrency})")
+    print()
+    print(format_table(results))
+
+    violations = error_rate_violations(results, args.max_error_rate)
+    results["valid"] = not violations
+
+    # An invalid run is still written for inspection, but never becomes a baseline
+    for path in (args.output, args.save_baseline if not violations else None):
+        if path:
+            save_results(results, path)
+            print(f"\nResults written to {path}")
+
+    if violations:
+        print(f"\nRun invalid, error rate above {args.max_error_rate:.1%}:")
+        for line in violations:
+            print(f"  - {line}")
+        return 2
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results,
+            load_results(args.baseline),
+            tolerance=args.tolerance,
+            min_delta_ms=args.min_delta_ms
+        )
+        if regressions:
+            print(f"\nRegressions vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nNo regressions vs {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
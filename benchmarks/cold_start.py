@@ -0,0 +1,107 @@
+"""
+Cold start: time from launching the server process to its first successful
+request, with the per-phase startup breakdown.
+
+Each run starts uvicorn in a fresh subprocess against a new scratch database,
+so the full migration and seeding path is included. It polls GET /api until
+it answers 200. The phase timings come from the "Startup complete" log line
+written by services/startup.py. Exits non-zero if the median
+time-to-first-request is above --target-ms. tests/unit/test_cold_start.py
+asserts the same target (COLD_START_TARGET_MS) for a single run.
+
+Usage:
+    python -m benchmarks.cold_start --runs 3 --target-ms 5000
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+from benchmarks.harness import PROJECT_ROOT, prepare_environment
+
+_PHASE_RE = re.compile(r"(\w+)=(\d+)ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--target-ms", type=float, default=5000.0, help="Fail if median time-to-first-request exceeds this")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_once(timeout: float, database_url: str = None) -> dict:
+    """One launch against `database_url`, or a new scratch database."""
+    if database_url is None:
+        database_url = prepare_environment(None)
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, LOG_FORMAT="json", LOG_LEVEL="INFO")
+
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        first_request_s = None
+        while time.perf_counter() - launched < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}:\n{process.stdout.read()}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api", timeout=1) as response:
+                    if response.status == 200:
+                        first_request_s = time.perf_counter() - launched
+                        break
+            except OSError:
+                time.sleep(0.02)
+        if first_request_s is None:
+            raise RuntimeError(f"No successful request within {timeout}s")
+    finally:
+        process.terminate()
+        output, _ = process.communicate(timeout=30)
+
+    phases = {}
+    for line in output.splitlines():
+        try:
+            message = json.loads(line).get("msg", "")
+        except ValueError:
+            continue
+        if message.startswith(("Startup complete", "Deferred startup finished")):
+            phases.update({name: int(ms) for name, ms in _PHASE_RE.findall(message)})
+
+    return {"time_to_first_request_ms": round(first_request_s * 1000, 1), "phases_ms": phases}
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    runs = [measure_once(args.timeout) for _ in range(args.runs)]
+    median = statistics.median(run["time_to_first_request_ms"] for run in runs)
+
+    for index, run in enumerate(runs, 1):
+        phases = ", ".join(f"{name} {ms}ms" for name, ms in run["phases_ms"].items())
+        print(f"run {index}: first request after {run['time_to_first_request_ms']:.0f}ms  ({phases})")
+    print(f"\nmedian time-to-first-request: {median:.0f}ms (target {args.target_ms:.0f}ms)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"runs": runs, "median_ms": median, "target_ms": args.target_ms}, f, indent=2)
+
+    return 0 if median <= args.target_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Benchmark harness: environment setup, in-process client, latency recording,
+result export and baseline comparison.
+"""
+
+import os
+import sys
+import json
+import math
+import atexit
+import shutil
+import time
+import secrets
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Allow running from any working directory
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def prepare_environment(database_url: Optional[str] = None) -> str:
+    """
+    Point the app at a scratch database before any app module is imported.
+
+    The engine in database.database is created at import time, so this must
+    run first. Returns the database URL in use. A scratch database is removed
+    when the process exits.
+    """
+    if not database_url:
+        scratch_dir = tempfile.mkdtemp(prefix="cryptochecker-bench-")
+        atexit.register(shutil.rmtree, scratch_dir, ignore_errors=True)
+        database_url = f"sqlite+aiosqlite:///{scratch_dir}/bench.db"
+
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("JWT_SECRET_KEY", secrets.token_urlsafe(32))
+    os.chdir(PROJECT_ROOT)
+    return database_url
+
+
+class LatencyRecorder:
+    """Collects request latencies per endpoint label."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+
+    def stop(self):
+        self.finished_at = time.perf_counter()
+
+    def record(self, label: str, seconds: float, ok: bool):
+        self.samples.setdefault(label, []).append(seconds)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    @staticmethod
+    def percentile(sorted_values: List[float], pct: float) -> float:
+        """Nearest-rank percentile of an already sorted list."""
+        if not sorted_values:
+            return 0.0
+        rank = math.ceil(pct / 100 * len(sorted_values)) - 1
+        return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        duration = (self.finished_at or time.perf_counter()) - (self.started_at or 0)
+        endpoints = {}
+        for label, values in sorted(self.samples.items()):
+            ordered = sorted(values)
+            endpoints[label] = {
+                "count": len(ordered),
+                "errors": self.errors.get(label, 0),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+                "p50_ms": round(self.percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(self.percentile(ordered, 95) * 1000, 3),
+                "p99_ms": round(self.percentile(ordered, 99) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+                "throughput_rps": round(len(ordered) / duration, 2) if duration > 0 else 0.0
+            }
+        return endpoints
+
+
+class BenchClient:
+    """Thin wrapper around an httpx client that times every request."""
+
+    def __init__(self, client, recorder: LatencyRecorder):
+        self.client = client
+        self.recorder = recorder
+
+    async def request(
+        self,
+        label: str,
+        method: str,
+        url: str,
+        token: Optional[str] = None,
+        expect_success: bool = True,
+        **kwargs
+    ):
+        headers = kwargs.pop("headers", {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        start = time.perf_counter()
+        response = await self.client.request(method, url, headers=headers, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        ok = response.status_code < 400
+        if ok and expect_success:
+            try:
+                body = response.json()
+                if isinstance(body, dict) and body.get("success") is False:
+                    ok = False
+            except ValueError:
+                pass
+
+        self.recorder.record(label, elapsed, ok)
+        return response
+
+
+def build_results(
+    recorder: LatencyRecorder,
+    config: Dict[str, Any],
+    database_url: str
+) -> Dict[str, Any]:
+    """Assemble the machine-readable result document."""
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0],
+            "duration_s": round((recorder.finished_at or 0) - (recorder.started_at or 0), 3),
+            "config": config
+        },
+        "valid": True,
+        "endpoints": recorder.summary()
+    }
+
+
+def save_results(results: Dict[str, Any], path: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.25,
+    min_delta_ms: float = 2.0
+) -> List[str]:
+    """
+    Compare a run against a stored baseline.
+
+    An endpoint regresses when its p95 latency grows by more than `tolerance`
+    (and by at least `min_delta_ms`, so sub-millisecond noise is ignored), or
+    when its error rate increases. Returns human-readable regression lines.
+    """
+    regressions = []
+    for label, base in baseline.get("endpoints", {}).items():
+        now = current.get("endpoints", {}).get(label)
+        if not now:
+            regressions.append(f"{label}: missing from current run")
+            continue
+
+        delta = now["p95_ms"] - base["p95_ms"]
+        if delta > min_delta_ms and now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{label}: p95 {base['p95_ms']:.1f}ms -> {now['p95_ms']:.1f}ms (+{delta:.1f}ms)"
+            )
+
+        base_error_rate = base["errors"] / base["count"] if base["count"] else 0
+        error_rate = now["errors"] / now["count"] if now["count"] else 0
+        if error_rate > base_error_rate + 0.01:
+            regressions.append(
+                f"{label}: error rate {base_error_rate:.1%} -> {error_rate:.1%}"
+            )
+
+    return regressions
+
+
+def error_rate_violations(results: Dict[str, Any], max_error_rate: float = 0.01) -> List[str]:
+    """
+    Endpoints whose error rate exceeds `max_error_rate`. A run with any is
+    invalid: its latencies would mostly time error paths rather than the
+    requests being measured.
+    """
+    violations = []
+    for label, stats in results.get("endpoints", {}).items():
+        error_rate = stats["errors"] / stats["count"] if stats["count"] else 0
+        if error_rate > max_error_rate:
+            violations.append(f"{label}: {stats['errors']} of {stats['count']} requests failed ({error_rate:.1%})")
+    return violations
+
+
+def format_table(results: Dict[str, Any]) -> str:
+    """Render endpoint results as a fixed-width table."""
+    lines = [
+        f"{'endpoint':<28} {'count':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}",
+        "-" * 80
+    ]
+    for label, stats in results["endpoints"].items():
+        lines.append(
+            f"{label:<28} {stats['count']:>6} {stats['errors']:>5} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+            f"{stats['throughput_rps']:>9.1f}"
+        )
+    return "\n".join(lines)
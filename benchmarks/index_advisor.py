@@ -0,0 +1,298 @@
+"""
+Index advisor: capture the queries the benchmark workload issues, EXPLAIN each
+distinct statement and report the ones that scan or sort without an index.
+
+For every flagged statement a candidate index is proposed from the statement
+itself (equality / IN columns first, then a range or ORDER BY column) unless an
+existing index already starts with those columns. Suggested indexes ship as
+migrations in database/migrations/versions/.
+
+Usage:
+    python -m benchmarks.index_advisor --users 20 --rounds 3 [--output report.json]
+"""
+
+import io
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.harness import prepare_environment
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+_EQ_RE = r"(?:\b{t}\.)?\"?(\w+)\"? (?:=|IS) (?:\?|\$\d+|%\(\w+\)s|:\w+)"
+_IN_RE = r"(?:\b{t}\.)?\"?(\w+)\"? IN \("
+_RANGE_RE = r"(?:\b{t}\.)?\"?(\w+)\"? (?:<|>|<=|>=) (?:\?|\$\d+|%\(\w+\)s|:\w+)"
+_ORDER_RE = re.compile(r"ORDER BY (.+?)(?: LIMIT| OFFSET| FOR UPDATE|$)", re.S)
+
+
+@dataclass
+class CapturedQuery:
+    statement: str
+    parameters: Any
+    calls: int = 0
+    total_s: float = 0.0
+
+
+@dataclass
+class Finding:
+    table: str
+    issue: str
+    plan: str
+    suggestion: Optional[Tuple[str, ...]] = None
+    queries: List[CapturedQuery] = field(default_factory=list)
+    table_rows: int = 0
+
+    @property
+    def calls(self) -> int:
+        return sum(q.calls for q in self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q.total_s for q in self.queries) * 1000
+
+
+class QueryCapture:
+    """SQLAlchemy cursor listener that aggregates statements by SQL text."""
+
+    def __init__(self):
+        self.queries: Dict[str, CapturedQuery] = {}
+
+    def install(self, *engines):
+        from sqlalchemy import event
+        for engine in {id(e): e for e in engines}.values():
+            event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+            event.listen(engine.sync_engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("advisor_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["advisor_started"].pop()
+        if executemany or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+            return
+        query = self.queries.get(statement)
+        if query is None:
+            query = self.queries[statement] = CapturedQuery(statement, parameters)
+        query.calls += 1
+        query.total_s += time.perf_counter() - started
+
+
+# ==================== PLAN ANALYSIS ====================
+
+def _columns(pattern: str, table: str, sql: str) -> List[str]:
+    found = []
+    for column in re.findall(pattern.format(t=re.escape(table)), sql):
+        if column not in found:
+            found.append(column)
+    return found
+
+
+def _table_columns_in(sql: str, table: str, table_columns: Sequence[str]) -> Dict[str, List[str]]:
+    """Predicate and ORDER BY columns of `table` referenced in the statement."""
+    where = sql.split(" WHERE ", 1)[1] if " WHERE " in sql else ""
+    where = _ORDER_RE.split(where)[0]
+
+    def keep(columns):
+        return [c for c in columns if c in table_columns]
+
+    order = []
+    match = _ORDER_RE.search(sql)
+    if match:
+        for part in match.group(1).split(","):
+            ref = part.strip().split(" ")[0].replace('"', "")
+            tbl, _, column = ref.rpartition(".")
+            if (not tbl or tbl == table) and column in table_columns:
+                order.append(column)
+
+    return {
+        "eq": keep(_columns(_EQ_RE, table, where)),
+        "in": keep(_columns(_IN_RE, table, where)),
+        "range": keep(_columns(_RANGE_RE, table, where)),
+        "order": order,
+    }
+
+
+def suggest_index(refs: Dict[str, List[str]]) -> Tuple[str, ...]:
+    columns = list(refs["eq"])
+    columns += [c for c in refs["in"] if c not in columns]
+    tail = refs["range"][:1] or refs["order"]
+    columns += [c for c in tail if c not in columns]
+    return tuple(columns)
+
+
+def _covered(suggestion: Sequence[str], existing: Sequence[Sequence[str]]) -> bool:
+    return any(tuple(index[:len(suggestion)]) == tuple(suggestion) for index in existing)
+
+
+def analyze_sqlite_plan(rows: Sequence[str]) -> List[Tuple[str, str, List[str]]]:
+    """(table, issue, index columns used) from EXPLAIN QUERY PLAN detail lines."""
+    issues = []
+    for detail in rows:
+        scan = re.match(r"SCAN (\w+)(?: AS \w+)?$", detail)
+        if scan:
+            issues.append((scan.group(1), "full scan", []))
+            continue
+        search = re.match(r"SEARCH (\w+)(?: AS \w+)? USING (?:COVERING )?INDEX \w+ \((.*)\)", detail)
+        if search:
+            used = re.findall(r"(\w+)[=<>]", search.group(2))
+            issues.append((search.group(1), "", used))
+        if "USE TEMP B-TREE FOR ORDER BY" in detail:
+            issues.append(("", "sort", []))
+    return issues
+
+
+def analyze_postgres_plan(plan: dict) -> List[Tuple[str, str, List[str]]]:
+    issues = []
+
+    def walk(node):
+        kind = node.get("Node Type", "")
+        relation = node.get("Relation Name", "")
+        if kind == "Seq Scan" and "Filter" in node:
+            issues.append((relation, "full scan", []))
+        elif kind in ("Index Scan", "Index Only Scan", "Bitmap Heap Scan") and "Filter" in node:
+            issues.append((relation, "", []))
+        elif kind == "Sort":
+            issues.append(("", "sort", []))
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return issues
+
+
+async def explain_all(engine, queries: Sequence[CapturedQuery]) -> List[Finding]:
+    from sqlalchemy import inspect
+    from database.models import Base
+
+    is_postgresql = engine.dialect.name == "postgresql"
+
+    async with engine.connect() as conn:
+        existing = await conn.run_sync(lambda c: {
+            name: [tuple(ix["column_names"]) for ix in inspect(c).get_indexes(name)]
+            + [tuple(inspect(c).get_pk_constraint(name)["constrained_columns"])]
+            for name in inspect(c).get_table_names()
+        })
+
+        findings: Dict[Tuple[str, Tuple[str, ...]], Finding] = {}
+        for query in queries:
+            prefix = "EXPLAIN (FORMAT JSON) " if is_postgresql else "EXPLAIN QUERY PLAN "
+            try:
+                result = await conn.exec_driver_sql(prefix + query.statement, query.parameters)
+                rows = result.fetchall()
+            except Exception:
+                await conn.rollback()
+                continue
+
+            if is_postgresql:
+                plan_json = rows[0][0] if isinstance(rows[0][0], list) else json.loads(rows[0][0])
+                analysed = analyze_postgres_plan(plan_json)
+                plan_text = json.dumps(plan_json[0]["Plan"].get("Node Type"))
+            else:
+                details = [row[-1] for row in rows]
+                analysed = analyze_sqlite_plan(details)
+                plan_text = "; ".join(details)
+
+            tables_in_query = [t for t in existing if re.search(rf"\b{re.escape(t)}\b", query.statement)]
+            seen_in_query = set()
+            for table, plan_issue, used in analysed:
+                for target in ([table] if table else tables_in_query[:1]):
+                    if target not in Base.metadata.tables:
+                        continue
+                    refs = _table_columns_in(query.statement, target, Base.metadata.tables[target].columns.keys())
+                    suggestion = suggest_index(refs)
+
+                    issue = plan_issue
+                    if not issue:
+                        # Index search: flag when it ignores some equality/IN predicates
+                        wanted = set(refs["eq"]) | set(refs["in"])
+                        if used and not wanted - set(used):
+                            continue
+                        issue = "partial index"
+                    if not suggestion or _covered(suggestion, existing.get(target, [])):
+                        suggestion = None
+                        if issue != "full scan":
+                            continue
+
+                    key = (target, suggestion or ())
+                    finding = findings.setdefault(key, Finding(target, issue, plan_text, suggestion))
+                    if issue not in finding.issue.split(" + "):
+                        finding.issue += f" + {issue}"
+                    if key not in seen_in_query:
+                        seen_in_query.add(key)
+                        finding.queries.append(query)
+
+        for finding in findings.values():
+            finding.table_rows = (await conn.exec_driver_sql(f'SELECT COUNT(*) FROM "{finding.table}"')).scalar()
+
+    return sorted(findings.values(), key=lambda f: f.total_ms, reverse=True)
+
+
+# ==================== CLI ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.index_advisor", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", help="Database URL (default: fresh temporary SQLite file)")
+    parser.add_argument("--output", help="Write JSON report to this path")
+    return parser.parse_args(argv)
+
+
+async def run(args, database_url: str) -> Tuple[List[Finding], int]:
+    from benchmarks.__main__ import run_benchmark
+    from database.database import engine, writer_engine, read_engine
+
+    capture = QueryCapture()
+    capture.install(engine, writer_engine, read_engine)
+    await run_benchmark(args, database_url)
+
+    return await explain_all(engine, list(capture.queries.values())), len(capture.queries)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    database_url = prepare_environment(args.database_url)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        findings, distinct = asyncio.run(run(args, database_url))
+
+    print(f"Captured {distinct} distinct statements; {len(findings)} findings\n")
+    for finding in findings:
+        suggestion = f"({', '.join(finding.suggestion)})" if finding.suggestion else "-"
+        print(f"[{finding.issue}] {finding.table} ({finding.table_rows} rows)  "
+              f"calls={finding.calls}  total={finding.total_ms:.1f}ms")
+        print(f"    suggest: {suggestion}")
+        print(f"    plan:    {finding.plan[:160]}")
+        print(f"    query:   {' '.join(finding.queries[0].statement.split())[:160]}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([
+                {
+                    "table": f.table,
+                    "issue": f.issue,
+                    "table_rows": f.table_rows,
+                    "suggestion": f.suggestion,
+                    "calls": f.calls,
+                    "total_ms": round(f.total_ms, 2),
+                    "plan": f.plan,
+                    "queries": [q.statement for q in f.queries],
+                }
+                for f in findings
+            ], f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Concurrent bet throughput on SQLite: default engine vs production mode.
+
+Each mode runs in a fresh subprocess (the engine is configured at import
+time) against its own scratch database. Every simulated bet is a wallet
+deduction followed by a win credit for roughly half of them, issued with the
+requested concurrency through PortfolioManager -- the same path roulette and
+crash bets take.
+
+Usage:
+    python -m benchmarks.sqlite_modes --users 50 --bets 2000 --concurrency 50
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+
+from benchmarks.harness import PROJECT_ROOT, prepare_environment, LatencyRecorder
+
+MODES = {
+    "default": "false",
+    "production": "true",
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sqlite_modes", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--bets", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--worker", choices=sorted(MODES), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+async def run_worker(args) -> dict:
+    from sqlalchemy import insert
+    from database.database import init_database, AsyncSessionLocal
+    from database.models import User, Wallet, TransactionType
+    from crypto.portfolio import portfolio_manager
+
+    await init_database()
+
+    user_ids = [f"bench-user-{i}" for i in range(args.users)]
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(User), [
+            {"id": uid, "username": uid, "email": f"{uid}@example.com", "password_hash": "x"}
+            for uid in user_ids
+        ])
+        await session.execute(insert(Wallet), [
+            {"user_id": uid, "gem_balance": 10_000_000.0} for uid in user_ids
+        ])
+        await session.commit()
+
+    recorder = LatencyRecorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bet(index: int):
+        user_id = user_ids[index % len(user_ids)]
+        async with semaphore:
+            start = time.perf_counter()
+            ok = await portfolio_manager.deduct_gems(
+                user_id=user_id,
+                amount=100.0,
+                transaction_type=TransactionType.BET_PLACED,
+                description="Benchmark bet"
+            )
+            if ok and index % 2 == 0:
+                ok = await portfolio_manager.process_win(
+                    user_id=user_id,
+                    amount=200.0,
+                    description="Benchmark win"
+                )
+            recorder.record("bet", time.perf_counter() - start, ok)
+
+    recorder.start()
+    await asyncio.gather(*(bet(i) for i in range(args.bets)))
+    recorder.stop()
+
+    stats = recorder.summary()["bet"]
+    stats["duration_s"] = round(recorder.finished_at - recorder.started_at, 3)
+    return stats
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.worker:
+        os.environ["SQLITE_PRODUCTION_MODE"] = MODES[args.worker]
+        os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+        prepare_environment(None)
+        from services.logging_config import configure_logging
+        configure_logging()
+        print(json.dumps(asyncio.run(run_worker(args))))
+        return 0
+
+    results = {}
+    for mode in MODES:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sqlite_modes", "--worker", mode,
+             "--users", str(args.users), "--bets", str(args.bets), "--concurrency", str(args.concurrency)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            return 1
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f"{args.bets} bets, {args.users} users, concurrency {args.concurrency}\n")
+    print(f"{'mode':<12} {'bets/s':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print("-" * 60)
+    for mode, stats in results.items():
+        print(
+            f"{mode:<12} {stats['throughput_rps']:>9.1f} {stats['errors']:>7} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Workload mixes for the benchmark suite.
+
+Each round drives one roulette round and one crash game end to end, with
+clicker and price reads interleaved. Phase transitions that normally run on
+background timers are stepped directly so a run is reproducible and does not
+wait on wall-clock sleeps.
+
+P2P order placement is not part of the mix: /api/trading/order currently
+fails on every request (it debits User.gem_balance, which the model does not
+have), so it would only time the error path.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import update
+
+from benchmarks.harness import BenchClient
+
+# Imported after benchmarks.harness.prepare_environment() has set DATABASE_URL
+from database.database import AsyncSessionLocal
+from database.models import Wallet, CrashGame, RoundPhase
+from gaming.round_manager import round_manager
+from services.crash_service import CrashGameService
+from services.crash_game_manager import crash_manager
+
+BENCH_PASSWORD = "benchpass123"
+BENCH_STARTING_BALANCE = 10_000_000.0
+
+ROULETTE_BETS = [
+    ("RED_BLACK", "red"),
+    ("RED_BLACK", "black"),
+    ("EVEN_ODD", "even"),
+    ("HIGH_LOW", "high"),
+    ("SINGLE_NUMBER", "7"),
+]
+
+
+@dataclass
+class BenchUser:
+    username: str
+    user_id: str
+    token: str
+
+
+@dataclass
+class WorkloadConfig:
+    users: int = 20
+    rounds: int = 5
+    concurrency: int = 10
+    bets_per_round: int = 2
+    clicks_per_round: int = 5
+    price_reads_per_round: int = 3
+    cashout_ratio: float = 0.5
+    seed: Optional[int] = None
+    run_id: str = field(default_factory=lambda: str(int(time.time())))
+
+
+class Workload:
+    """Registers a user population and drives the per-round request mix."""
+
+    def __init__(self, client: BenchClient, config: WorkloadConfig):
+        self.client = client
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.users: List[BenchUser] = []
+        self._semaphore = asyncio.Semaphore(config.concurrency)
+
+    async def _gather(self, coros):
+        async def limited(coro):
+            async with self._semaphore:
+                return await coro
+        return await asyncio.gather(*(limited(c) for c in coros))
+
+    # ==================== SETUP ====================
+
+    async def setup_users(self):
+        """Register the benchmark population, fund their wallets and create their clicker stats."""
+        async def register(index: int):
+            username = f"bench_{self.config.run_id}_{index}"
+            response = await self.client.request(
+                "auth.register", "POST", "/api/auth/register",
+                json={
+                    "username": username,
+                    "email": f"{username}@example.com",
+                    "password": BENCH_PASSWORD
+                }
+            )
+            if response.status_code >= 400:
+                raise RuntimeError(f"Failed to register {username}: {response.text}")
+            body = response.json()
+            return BenchUser(
+                username=username,
+                user_id=body["user"]["id"],
+                token=body["access_token"]
+            )
+
+        # Registration is sequential so the shared client never carries one
+        # user's session cookie into another user's request
+        for index in range(self.config.users):
+            self.users.append(await register(index))
+            self.client.client.cookies.clear()
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Wallet)
+                .where(Wallet.user_id.in_([u.user_id for u in self.users]))
+                .values(gem_balance=BENCH_STARTING_BALANCE)
+            )
+            await session.commit()
+
+        # A user's first click creates their clicker_stats row; concurrent first
+        # clicks race on its unique user_id, so create the rows one by one here
+        for user in self.users:
+            response = await self.client.request(
+                "clicker.stats", "GET", "/api/clicker/stats", token=user.token
+            )
+            if response.status_code >= 400 or not response.json().get("success"):
+                raise RuntimeError(f"Failed to create clicker stats for {user.username}: {response.text}")
+
+    # ==================== ROULETTE ====================
+
+    async def roulette_round(self):
+        await round_manager.start_new_round(triggered_by="benchmark")
+
+        async def play(user: BenchUser):
+            response = await self.client.request(
+                "roulette.create", "POST", "/api/gaming/roulette/create",
+                token=user.token, json={}
+            )
+            if response.status_code != 200:
+                return
+            game_id = response.json()["game_id"]
+            for _ in range(self.config.bets_per_round):
+                bet_type, bet_value = self.rng.choice(ROULETTE_BETS)
+                await self.client.request(
+                    "roulette.bet", "POST", f"/api/gaming/roulette/{game_id}/bet",
+                    token=user.token,
+                    json={
+                        "bet_type": bet_type,
+                        "bet_value": bet_value,
+                        "amount": float(self.rng.choice([1000, 2500, 5000]))
+                    }
+                )
+
+        await self._gather(play(user) for user in self.users)
+
+        start = time.perf_counter()
+        await round_manager.trigger_spin(None, "benchmark")
+        self.client.recorder.record("roulette.settle", time.perf_counter() - start, True)
+
+        # Skip the animation/results timers; the next round starts explicitly
+        round_manager.current_round.phase = RoundPhase.RESULTS
+
+    # ==================== CRASH ====================
+
+    async def crash_round(self):
+        async with AsyncSessionLocal() as session:
+            game = await CrashGameService.create_game(session)
+        crash_manager.current_game = game
+        crash_manager.current_bets = {}
+
+        await self._gather(
+            self.client.request(
+                "crash.bet", "POST", "/api/crash/bet",
+                token=user.token,
+                json={"bet_amount": self.rng.choice([100, 500, 1000, 5000])}
+            )
+            for user in self.users
+        )
+
+        # Move straight to the playing phase at a fixed multiplier
+        crash_point = round(self.rng.uniform(1.5, 5.0), 2)
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(CrashGame).where(CrashGame.id == game.id).values(status='playing')
+            )
+            await session.commit()
+        game.status = 'playing'
+        crash_manager.current_multiplier = round(self.rng.uniform(1.01, crash_point), 2)
+
+        cashers = self.rng.sample(self.users, int(len(self.users) * self.config.cashout_ratio))
+        await self._gather(
+            self.client.request("crash.cashout", "POST", "/api/crash/cashout", token=user.token)
+            for user in cashers
+        )
+
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            await CrashGameService.finish_game(game.id, crash_point, session)
+        self.client.recorder.record("crash.settle", time.perf_counter() - start, True)
+        game.status = 'crashed'
+
+    # ==================== BACKGROUND MIX ====================
+
+    async def _click(self, user: BenchUser):
+        # A player's clicks come one after another, as from a single browser tab;
+        # overlapping clicks of one user race on their leaderboard and achievement rows
+        for _ in range(self.config.clicks_per_round):
+            await self.client.request("clicker.click", "POST", "/api/clicker/click", token=user.token)
+
+    async def interleaved_traffic(self):
+        requests = []
+        for user in self.users:
+            requests.append(self._click(user))
+            for _ in range(self.config.price_reads_per_round):
+                requests.append(self.client.request(
+                    "crypto.prices", "GET", "/api/crypto/prices"
+                ))
+
+        self.rng.shuffle(requests)
+        await self._gather(requests)
+
+    async def run(self):
+        for _ in range(self.config.rounds):
+            await self.roulette_round()
+            await self.crash_round()
+            await self.interleaved_traffic()
@@ -386,5 +386,6 @@ def get_achievement_categories():
 
 # Total achievements: 23
 # Total possible points: 106
-print(f"[Achievement System] Loaded {len(ACHIEVEMENTS)} achievements")
-print(f"[Achievement System] Total possible points: {calculate_total_achievement_points()}")
+if __name__ == "__main__":
+    print(f"[Achievement System] Loaded {len(ACHIEVEMENTS)} achievements")
+    print(f"[Achievement System] Total possible points: {calculate_total_achievement_points()}")
@@ -255,11 +255,12 @@ def get_missions_for_event(event_name: str):
 
 # ==================== MISSION CONFIGURATION INFO ====================
 
-print("=" * 60)
-print("GEM Marketplace - Missions Configuration")
-print("=" * 60)
-print(f"Daily Missions:    {len(DAILY_MISSIONS)} missions")
-print(f"Weekly Challenges: {len(WEEKLY_CHALLENGES)} challenges")
-print(f"Max Daily Gems:    {get_total_daily_rewards()} GEM")
-print(f"Max Weekly Gems:   {get_total_weekly_rewards()} GEM")
-print("=" * 60)
+if __name__ == "__main__":
+    print("=" * 60)
+    print("GEM Marketplace - Missions Configuration")
+    print("=" * 60)
+    print(f"Daily Missions:    {len(DAILY_MISSIONS)} missions")
+    print(f"Weekly Challenges: {len(WEEKLY_CHALLENGES)} challenges")
+    print(f"Max Daily Gems:    {get_total_daily_rewards()} GEM")
+    print(f"Max Weekly Gems:   {get_total_weekly_rewards()} GEM")
+    print("=" * 60)
@@ -6,18 +6,19 @@ Handles conversions between crypto pairs and fiat currencies.
 import asyncio
 import aiohttp
 from typing import Dict, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
 
+from services.cache import AsyncCache
 from .price_service import price_service
 
 class CryptoConverter:
     """Universal cryptocurrency and fiat currency converter."""
 
     def __init__(self):
-        self.fiat_cache: Dict[str, float] = {}
-        self.fiat_cache_expiry: Dict[str, datetime] = {}
         self.fiat_cache_duration = 300  # 5 minutes for fiat rates
-        self.symbol_to_id_cache: Dict[str, str] = {}
+        # One entry each: the whole USD rate table and the whole symbol -> id map
+        self.fiat_cache = AsyncCache("fiat_rates", max_size=1, ttl=self.fiat_cache_duration, stale_ttl=3600)
+        self.symbol_to_id_cache = AsyncCache("crypto_symbol_ids", max_size=1, ttl=600, stale_ttl=86400)
 
         # Supported fiat currencies
         self.supported_fiat = {
@@ -53,27 +54,25 @@ class CryptoConverter:
         try:
             symbol = symbol.upper()
 
-            # Check cache first
-            if symbol in self.symbol_to_id_cache:
-                return self.symbol_to_id_cache[symbol]
-
-            # Get all cryptocurrencies to build symbol-to-ID mapping
-            cryptos = await price_service.get_all_cryptos()
-
-            # Build and cache the mapping
-            for crypto in cryptos:
-                crypto_symbol = crypto.get("symbol", "").upper()
-                crypto_id = crypto.get("id", "")
-                if crypto_symbol and crypto_id:
-                    self.symbol_to_id_cache[crypto_symbol] = crypto_id
-
-            # Return the requested mapping
-            return self.symbol_to_id_cache.get(symbol)
+            symbol_to_id = await self.symbol_to_id_cache.get_or_load("all", self._load_symbol_ids)
+            return (symbol_to_id or {}).get(symbol)
 
         except Exception as e:
             print(f">> Error: Error resolving symbol {symbol}: {e}")
             return None
 
+    @staticmethod
+    async def _load_symbol_ids() -> Dict[str, str]:
+        """Symbol-to-ID mapping of all tracked cryptocurrencies."""
+        cryptos = await price_service.get_all_cryptos()
+        symbol_to_id = {}
+        for crypto in cryptos:
+            crypto_symbol = crypto.get("symbol", "").upper()
+            crypto_id = crypto.get("id", "")
+            if crypto_symbol and crypto_id:
+                symbol_to_id[crypto_symbol] = crypto_id
+        return symbol_to_id
+
     async def convert_crypto_to_crypto(
         self,
         from_crypto: str,
@@ -330,36 +329,26 @@ class CryptoConverter:
     async def _get_fiat_rate(self, fiat_code: str) -> Optional[float]:
         """Get fiat currency exchange rate to USD."""
         try:
-            # Check cache first
-            if fiat_code in self.fiat_cache and fiat_code in self.fiat_cache_expiry:
-                if datetime.utcnow() < self.fiat_cache_expiry[fiat_code]:
-                    return self.fiat_cache[fiat_code]
-
-            # Fetch from exchange rate API
-            async with aiohttp.ClientSession() as session:
-                # Using exchangerate-api.com (free tier: 1500 requests/month)
-                url = f"https://api.exchangerate-api.com/v4/latest/USD"
-
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        rates = data.get("rates", {})
-
-                        if fiat_code in rates:
-                            rate = rates[fiat_code]
-
-                            # Cache the rate
-                            self.fiat_cache[fiat_code] = rate
-                            self.fiat_cache_expiry[fiat_code] = datetime.utcnow() + timedelta(seconds=self.fiat_cache_duration)
-
-                            return rate
-
-            return None
+            rates = await self.fiat_cache.get_or_load("USD", self._fetch_fiat_rates)
+            return (rates or {}).get(fiat_code)
 
         except Exception as e:
             print(f">> Error: Error fetching fiat rate for {fiat_code}: {e}")
             return None
 
+    @staticmethod
+    async def _fetch_fiat_rates() -> Optional[Dict[str, float]]:
+        """All exchange rates against USD, or None if the API is unavailable."""
+        async with aiohttp.ClientSession() as session:
+            # Using exchangerate-api.com (free tier: 1500 requests/month)
+            url = f"https://api.exchangerate-api.com/v4/latest/USD"
+
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data.get("rates") or None
+        return None
+
     def get_supported_fiat_currencies(self) -> Dict[str, str]:
         """Get list of supported fiat currencies."""
         # Include GEM as a special virtual currency
@@ -3,16 +3,20 @@ Portfolio management system with persistent GEM balances.
 Handles user wallets, transactions, and balance management.
 """
 
+import logging
 from datetime import datetime
 from typing import Optional, Dict, List, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, func, case
 
-from database.models import Wallet, Transaction, TransactionType, User
-from database.database import AsyncSessionLocal
+from database.models import Wallet, Transaction, TransactionType, User, DailyUserSummary
+from database.database import AsyncSessionLocal, ReadSessionLocal
+from database.write_queue import write_queue
 from sqlalchemy import select, and_
 
+logger = logging.getLogger(__name__)
+
 
 
 class PortfolioManager:
@@ -85,111 +89,109 @@ class PortfolioManager:
         description: str = "GEM deposit"
     ) -> bool:
         """Add GEMs to user's wallet."""
-        async with AsyncSessionLocal() as session:
-            try:
-                # Get current wallet
-                # Check for existing wallet
-                balance_stmt = select(Wallet.gem_balance).where(
-                    Wallet.user_id == user_id
-                )
-                result = await session.execute(balance_stmt)
-                current_balance = result.scalar_one_or_none()
-
-                # Initialize variables
-                old_balance = 0.0
-                new_balance = 0.0
-
-                if current_balance is None:
-                    # Check if this is a bot - bots should have wallets created by bot system
-                    is_bot = await self._is_user_bot(user_id)
-
-                    if is_bot:
-                        # CRITICAL: Bots should have wallets created by initialize_bots()
-                        print(f">> CRITICAL: Bot {user_id} has no wallet! Bot system failed to initialize properly.")
-                        print(f">> WARNING: Creating emergency wallet for bot {user_id} with 2000 GEM")
-
-                        # Create wallet with bot-appropriate balance
-                        wallet = Wallet(
-                            user_id=user_id,
-                            gem_balance=2000.0,  # Bot starting balance
-                            total_deposited=2000.0,
-                            updated_at=datetime.utcnow()
-                        )
-                        session.add(wallet)
-
-                        # Create initial deposit transaction for bot
-                        await self._create_transaction(
-                            session=session,
-                            user_id=user_id,
-                            transaction_type=TransactionType.DEPOSIT,
-                            amount=2000.0,
-                            balance_before=0.0,
-                            balance_after=2000.0,
-                            description="Bot initial GEM deposit"
-                        )
+        async def job(session: AsyncSession) -> bool:
+            # Get current wallet
+            # Check for existing wallet
+            balance_stmt = select(Wallet.gem_balance).where(
+                Wallet.user_id == user_id
+            )
+            result = await session.execute(balance_stmt)
+            current_balance = result.scalar_one_or_none()
 
-                        await session.flush()
-                        old_balance = 2000.0
-                        new_balance = old_balance + amount
-                    else:
-                        # Auto-create wallet for new human user
-                        print(f">> Info: Creating wallet for new human user {user_id}")
-                        wallet = Wallet(
-                            user_id=user_id,
-                            gem_balance=1000.0,
-                            total_deposited=1000.0,
-                            updated_at=datetime.utcnow()
-                        )
-                        session.add(wallet)
-
-                        # Create initial deposit transaction
-                        await self._create_transaction(
-                            session=session,
-                            user_id=user_id,
-                            transaction_type=TransactionType.DEPOSIT,
-                            amount=1000.0,
-                            balance_before=0.0,
-                            balance_after=1000.0,
-                            description="Initial GEM deposit"
-                        )
+            # Initialize variables
+            old_balance = 0.0
+            new_balance = 0.0
 
-                        await session.flush()
-                        old_balance = 1000.0
-                        new_balance = old_balance + amount
-                else:
-                    old_balance = float(current_balance)
-                    new_balance = old_balance + amount
+            if current_balance is None:
+                # Check if this is a bot - bots should have wallets created by bot system
+                is_bot = await self._is_user_bot(user_id)
 
-                # Update wallet
-                stmt = (
-                    update(Wallet)
-                    .where(Wallet.user_id == user_id)
-                    .values(
-                        gem_balance=new_balance,
-                        total_deposited=Wallet.total_deposited + amount,
+                if is_bot:
+                    # CRITICAL: Bots should have wallets created by initialize_bots()
+                    logger.error("Bot %s has no wallet! Bot system failed to initialize properly.", user_id)
+                    logger.warning("Creating emergency wallet for bot %s with 2000 GEM", user_id)
+
+                    # Create wallet with bot-appropriate balance
+                    wallet = Wallet(
+                        user_id=user_id,
+                        gem_balance=2000.0,  # Bot starting balance
+                        total_deposited=2000.0,
                         updated_at=datetime.utcnow()
                     )
-                )
-                await session.execute(stmt)
+                    session.add(wallet)
 
-                # Create transaction record with scalar values
-                await self._create_transaction(
-                    session=session,
-                    user_id=user_id,
-                    transaction_type=TransactionType.DEPOSIT,
-                    amount=float(amount),
-                    balance_before=old_balance,
-                    balance_after=new_balance,
-                    description=description
-                )
+                    # Create initial deposit transaction for bot
+                    await self._create_transaction(
+                        session=session,
+                        user_id=user_id,
+                        transaction_type=TransactionType.DEPOSIT,
+                        amount=2000.0,
+                        balance_before=0.0,
+                        balance_after=2000.0,
+                        description="Bot initial GEM deposit"
+                    )
 
-                await session.commit()
-                return True
+                    await session.flush()
+                    old_balance = 2000.0
+                    new_balance = old_balance + amount
+                else:
+                    # Auto-create wallet for new human user
+                    logger.info("Creating wallet for new human user %s", user_id)
+                    wallet = Wallet(
+                        user_id=user_id,
+                        gem_balance=1000.0,
+                        total_deposited=1000.0,
+                        updated_at=datetime.utcnow()
+                    )
+                    session.add(wallet)
 
-            except Exception as e:
-                await session.rollback()
-                print(f">> Error: Error adding GEMs: {e}")
-                return False
+                    # Create initial deposit transaction
+                    await self._create_transaction(
+                        session=session,
+                        user_id=user_id,
+                        transaction_type=TransactionType.DEPOSIT,
+                        amount=1000.0,
+                        balance_before=0.0,
+                        balance_after=1000.0,
+                        description="Initial GEM deposit"
+                    )
+
+                    await session.flush()
+                    old_balance = 1000.0
+                    new_balance = old_balance + amount
+            else:
+                old_balance = float(current_balance)
+                new_balance = old_balance + amount
+
+            # Update wallet
+            stmt = (
+                update(Wallet)
+                .where(Wallet.user_id == user_id)
+                .values(
+                    gem_balance=new_balance,
+                    total_deposited=Wallet.total_deposited + amount,
+                    updated_at=datetime.utcnow()
+                )
+            )
+            await session.execute(stmt)
+
+            # Create transaction record with scalar values
+            await self._create_transaction(
+                session=session,
+                user_id=user_id,
+                transaction_type=TransactionType.DEPOSIT,
+                amount=float(amount),
+                balance_before=old_balance,
+                balance_after=new_balance,
+                description=description
+            )
+            return True
+
+        try:
+            return await write_queue.submit(job)
+        except Exception as e:
+            logger.error("Error adding GEMs: %s", e)
+            return False
 
     async def deduct_gems(
         self,
@@ -197,153 +199,173 @@ class PortfolioManager:
         amount: float,
         transaction_type: TransactionType,
         description: str,
-        game_session_id: Optional[str] = None,
-        max_retries: int = 3
+        game_session_id: Optional[str] = None
     ) -> bool:
-        """Deduct GEMs from user's wallet with retry logic for database locks."""
-        for attempt in range(max_retries):
-            async with AsyncSessionLocal() as session:
-                try:
-                    # Get and verify wallet balance
-                    stmt = select(Wallet).where(Wallet.user_id == user_id)
-                    result = await session.execute(stmt)
-                    wallet = result.scalar_one_or_none()
-
-                    if not wallet:
-                        raise ValueError(f"Wallet not found for user {user_id}")
-
-                    old_balance = float(wallet.gem_balance)
-                    if old_balance < amount:
-                        return False  # Insufficient balance
-
-                    new_balance = old_balance - amount
+        """Deduct GEMs from user's wallet through the serialized write queue."""
+        async def job(session: AsyncSession) -> bool:
+            # Get and verify wallet balance
+            stmt = select(Wallet).where(Wallet.user_id == user_id)
+            result = await session.execute(stmt)
+            wallet = result.scalar_one_or_none()
 
-                    # Prepare update values
-                    update_values = {
-                        'gem_balance': new_balance,
-                        'updated_at': datetime.utcnow()
-                    }
+            if not wallet:
+                raise ValueError(f"Wallet not found for user {user_id}")
 
-                    if transaction_type == TransactionType.WITHDRAWAL:
-                        update_values['total_withdrawn'] = (
-                            Wallet.total_withdrawn + amount
-                        )
-                    elif transaction_type in [
-                        TransactionType.BET_PLACED,
-                        TransactionType.BET_LOST
-                    ]:
-                        update_values['total_wagered'] = (
-                            Wallet.total_wagered + amount
-                        )
-
-                    # Update wallet
-                    stmt = (
-                        update(Wallet)
-                        .where(Wallet.user_id == user_id)
-                        .values(**update_values)
-                    )
-                    await session.execute(stmt)
+            old_balance = float(wallet.gem_balance)
+            if old_balance < amount:
+                return False  # Insufficient balance
 
-                    # Create transaction record
-                    await self._create_transaction(
-                        session=session,
-                        user_id=user_id,
-                        transaction_type=transaction_type,
-                        amount=-float(amount),  # Negative for deduction
-                        balance_before=old_balance,
-                        balance_after=new_balance,
-                        description=description,
-                        game_session_id=game_session_id
-                    )
+            new_balance = old_balance - amount
 
-                    await session.commit()
-                    return True
+            # Prepare update values
+            update_values = {
+                'gem_balance': new_balance,
+                'updated_at': datetime.utcnow()
+            }
 
-                except Exception as e:
-                    await session.rollback()
+            if transaction_type == TransactionType.WITHDRAWAL:
+                update_values['total_withdrawn'] = (
+                    Wallet.total_withdrawn + amount
+                )
+            elif transaction_type in [
+                TransactionType.BET_PLACED,
+                TransactionType.BET_LOST
+            ]:
+                update_values['total_wagered'] = (
+                    Wallet.total_wagered + amount
+                )
 
-                    # Check if it's a database lock error and we haven't exhausted retries
-                    error_str = str(e).lower()
-                    is_lock_error = 'database is locked' in error_str or 'operationalerror' in error_str
+            # Update wallet
+            stmt = (
+                update(Wallet)
+                .where(Wallet.user_id == user_id)
+                .values(**update_values)
+            )
+            await session.execute(stmt)
+
+            # Create transaction record
+            await self._create_transaction(
+                session=session,
+                user_id=user_id,
+                transaction_type=transaction_type,
+                amount=-float(amount),  # Negative for deduction
+                balance_before=old_balance,
+                balance_after=new_balance,
+                description=description,
+                game_session_id=game_session_id
+            )
+            return True
 
-                    if is_lock_error and attempt < max_retries - 1:
-                        print(f">> Retry {attempt + 1}/{max_retries}: Database locked, retrying deduct GEMs...")
-                        import asyncio
-                        await asyncio.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                        continue
-                    else:
-                        print(f">> Error: Error deducting GEMs: {e}")
-                        return False
+        try:
+            return await write_queue.submit(job)
+        except Exception as e:
+            logger.error("Error deducting GEMs: %s", e)
+            return False
 
     async def process_win(
         self,
         user_id: str,
         amount: float,
         description: str,
-        game_session_id: Optional[str] = None,
-        max_retries: int = 3
+        game_session_id: Optional[str] = None
     ) -> bool:
-        """Process a gambling win by adding GEMs with retry logic."""
-        for attempt in range(max_retries):
-            async with AsyncSessionLocal() as session:
-                try:
-                    # Get current wallet
-                    # Get current balance
-                    stmt = (
-                        select(Wallet.gem_balance)
-                        .where(Wallet.user_id == user_id)
-                    )
-                    result = await session.execute(stmt)
-                    current_balance = result.scalar_one_or_none()
+        """Process a gambling win by adding GEMs through the serialized write queue."""
+        async def job(session: AsyncSession) -> bool:
+            await self.apply_win_in_session(
+                session=session,
+                user_id=user_id,
+                amount=amount,
+                description=description,
+                game_session_id=game_session_id
+            )
+            return True
 
-                    if current_balance is None:
-                        raise ValueError(f"Wallet not found for user {user_id}")
+        try:
+            return await write_queue.submit(job)
+        except Exception as e:
+            logger.error("Error processing win: %s", e)
+            return False
 
-                    old_balance = float(current_balance)
-                    new_balance = old_balance + amount
+    async def apply_win_in_session(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        amount: float,
+        description: str,
+        game_session_id: Optional[str] = None
+    ) -> float:
+        """
+        Credit a win inside the caller's transaction and return the new balance.
+
+        Unlike process_win() this does not open its own session or commit, so
+        game settlement can update bets, wallet and game totals atomically.
+        The balance is incremented in SQL, which keeps concurrent credits safe
+        without a read-modify-write round trip.
+        """
+        stmt = (
+            update(Wallet)
+            .where(Wallet.user_id == user_id)
+            .values(
+                gem_balance=Wallet.gem_balance + amount,
+                total_won=Wallet.total_won + amount,
+                updated_at=datetime.utcnow()
+            )
+            .returning(Wallet.gem_balance)
+        )
+        result = await session.execute(stmt)
+        new_balance = result.scalar_one_or_none()
 
-                    # Update wallet
-                    stmt = (
-                        update(Wallet)
-                        .where(Wallet.user_id == user_id)
-                        .values(
-                            gem_balance=new_balance,
-                            total_won=Wallet.total_won + amount,
-                            updated_at=datetime.utcnow()
-                        )
-                    )
-                    await session.execute(stmt)
+        if new_balance is None:
+            raise ValueError(f"Wallet not found for user {user_id}")
 
-                    # Create transaction record
-                    await self._create_transaction(
-                        session=session,
-                        user_id=user_id,
-                        transaction_type=TransactionType.BET_WON,
-                        amount=float(amount),
-                        balance_before=old_balance,
-                        balance_after=new_balance,
-                        description=description,
-                        game_session_id=game_session_id
-                    )
-
-                    await session.commit()
-                    return True
+        new_balance = float(new_balance)
+        await self._create_transaction(
+            session=session,
+            user_id=user_id,
+            transaction_type=TransactionType.BET_WON,
+            amount=float(amount),
+            balance_before=new_balance - amount,
+            balance_after=new_balance,
+            description=description,
+            game_session_id=game_session_id
+        )
+        return new_balance
 
-                except Exception as e:
-                    await session.rollback()
+    async def refund_in_session(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        amount: float,
+        transaction_type: TransactionType,
+        description: str
+    ) -> float:
+        """
+        Return a stake inside the caller's transaction and return the new
+        balance. Like apply_win_in_session(), but the amount does not count
+        as won.
+        """
+        result = await session.execute(
+            update(Wallet)
+            .where(Wallet.user_id == user_id)
+            .values(gem_balance=Wallet.gem_balance + amount, updated_at=datetime.utcnow())
+            .returning(Wallet.gem_balance)
+        )
+        new_balance = result.scalar_one_or_none()
 
-                    # Check if it's a database lock error and we haven't exhausted retries
-                    error_str = str(e).lower()
-                    is_lock_error = 'database is locked' in error_str or 'operationalerror' in error_str
+        if new_balance is None:
+            raise ValueError(f"Wallet not found for user {user_id}")
 
-                    if is_lock_error and attempt < max_retries - 1:
-                        print(f">> Retry {attempt + 1}/{max_retries}: Database locked, retrying process win...")
-                        import asyncio
-                        await asyncio.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                        continue
-                    else:
-                        print(f">> Error: Error processing win: {e}")
-                        return False
+        new_balance = float(new_balance)
+        await self._create_transaction(
+            session=session,
+            user_id=user_id,
+            transaction_type=transaction_type,
+            amount=float(amount),
+            balance_before=new_balance - amount,
+            balance_after=new_balance,
+            description=description
+        )
+        return new_balance
 
     async def transfer_gems(
         self,
@@ -439,7 +461,7 @@ class PortfolioManager:
 
             except Exception as e:
                 await session.rollback()
-                print(f">> Error: Error transferring GEMs: {e}")
+                logger.error("Error transferring GEMs: %s", e)
                 return False
 
     async def get_transaction_history(
@@ -449,7 +471,7 @@ class PortfolioManager:
         offset: int = 0
     ) -> List[Dict]:
         """Get user's transaction history."""
-        async with AsyncSessionLocal() as session:
+        async with ReadSessionLocal() as session:
             result = await session.execute(
                 select(Transaction)
                 .where(Transaction.user_id == user_id)
@@ -467,64 +489,54 @@ class PortfolioManager:
                 # Get wallet first
                 wallet = await self.get_user_wallet(user_id)
                 if not wallet:
-                    print(f">> Creating wallet for user {user_id}")
+                    logger.info("Creating wallet for user %s", user_id)
                     wallet = await self.create_wallet(user_id, initial_gems=1000.0)
                     if not wallet:
-                        print(f">> Failed to create wallet for user {user_id}")
+                        logger.warning("Failed to create wallet for user %s", user_id)
                         return self._get_empty_portfolio_stats()
 
-                # Get basic transaction counts
-                total_transactions = await session.execute(
-                    select(func.count(Transaction.id)).where(Transaction.user_id == user_id)
-                )
-                total_transactions = total_transactions.scalar() or 0
-
-                # Get winnings (positive BET_WON amounts)
-                winnings_result = await session.execute(
-                    select(func.coalesce(func.sum(Transaction.amount), 0))
-                    .where(
-                        and_(
-                            Transaction.user_id == user_id,
-                            Transaction.transaction_type == TransactionType.BET_WON.value
-                        )
+                # Per-type totals over live rows plus rows already rolled up
+                # into daily_user_summaries by the data lifecycle job
+                live = await session.execute(
+                    select(
+                        Transaction.transaction_type,
+                        func.count(Transaction.id),
+                        func.coalesce(func.sum(Transaction.amount), 0),
+                        func.coalesce(func.sum(func.abs(Transaction.amount)), 0)
                     )
+                    .where(Transaction.user_id == user_id)
+                    .group_by(Transaction.transaction_type)
                 )
-                total_winnings = float(winnings_result.scalar() or 0)
-
-                # Get bets placed (negative BET_PLACED amounts, so we use absolute value)
-                bets_result = await session.execute(
-                    select(func.coalesce(func.sum(func.abs(Transaction.amount)), 0))
-                    .where(
-                        and_(
-                            Transaction.user_id == user_id,
-                            Transaction.transaction_type == TransactionType.BET_PLACED.value
-                        )
+                archived = await session.execute(
+                    select(
+                        DailyUserSummary.kind,
+                        func.sum(DailyUserSummary.row_count),
+                        func.sum(DailyUserSummary.amount_total),
+                        func.sum(func.abs(DailyUserSummary.amount_total))
                     )
-                )
-                total_bets = float(bets_result.scalar() or 0)
-
-                # Count games won and lost
-                games_won_result = await session.execute(
-                    select(func.count(Transaction.id))
                     .where(
                         and_(
-                            Transaction.user_id == user_id,
-                            Transaction.transaction_type == TransactionType.BET_WON.value
+                            DailyUserSummary.user_id == user_id,
+                            DailyUserSummary.source == "transactions"
                         )
                     )
+                    .group_by(DailyUserSummary.kind)
                 )
-                games_won = games_won_result.scalar() or 0
 
-                games_lost_result = await session.execute(
-                    select(func.count(Transaction.id))
-                    .where(
-                        and_(
-                            Transaction.user_id == user_id,
-                            Transaction.transaction_type == TransactionType.BET_LOST.value
-                        )
-                    )
-                )
-                games_lost = games_lost_result.scalar() or 0
+                counts: Dict[str, int] = {}
+                sums: Dict[str, float] = {}
+                abs_sums: Dict[str, float] = {}
+                for tx_type, count, amount, abs_amount in list(live.all()) + list(archived.all()):
+                    counts[tx_type] = counts.get(tx_type, 0) + int(count or 0)
+                    sums[tx_type] = sums.get(tx_type, 0.0) + float(amount or 0)
+                    abs_sums[tx_type] = abs_sums.get(tx_type, 0.0) + float(abs_amount or 0)
+
+                total_transactions = sum(counts.values())
+                # Winnings are positive BET_WON amounts; bets placed are stored negative
+                total_winnings = sums.get(TransactionType.BET_WON.value, 0.0)
+                total_bets = abs_sums.get(TransactionType.BET_PLACED.value, 0.0)
+                games_won = counts.get(TransactionType.BET_WON.value, 0)
+                games_lost = counts.get(TransactionType.BET_LOST.value, 0)
 
                 # Calculate metrics
                 total_games = games_won + games_lost
@@ -552,9 +564,7 @@ class PortfolioManager:
                 }
 
             except Exception as e:
-                print(f">> Error in get_portfolio_stats: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error in get_portfolio_stats: %s", e)
                 return self._get_empty_portfolio_stats()
 
     def _get_empty_portfolio_stats(self) -> Dict:
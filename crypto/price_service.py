@@ -3,9 +3,11 @@ Real-time cryptocurrency price service.
 Fetches prices from multiple APIs with intelligent caching and fallback.
 """
 
+import logging
 import asyncio
 import aiohttp
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,6 +17,12 @@ from dotenv import load_dotenv
 
 from database.database import AsyncSessionLocal
 from database.models import CryptoCurrency
+from services.cache import AsyncCache
+from services.cluster import cluster
+from services.metrics import price_refresh_duration_seconds
+from services.search_index import search_service
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -24,10 +32,10 @@ class CryptoPriceService:
     def __init__(self):
         self.is_running = False
         self.session: Optional[aiohttp.ClientSession] = None
-        self.price_cache: Dict[str, Any] = {}
         self._update_task = None  # Keep track of the update task
-        self.cache_expiry: Dict[str, datetime] = {}
         self.cache_duration = 300  # 5 minutes cache to reduce API calls
+        # Expired prices are kept for a day as fallback data when every API fails
+        self.price_cache = AsyncCache("crypto_prices", max_size=5000, ttl=self.cache_duration, stale_ttl=86400)
         self.update_interval = int(os.getenv("PRICE_UPDATE_INTERVAL", "120"))  # 2 minutes instead of 30 seconds
 
         # API configurations
@@ -67,6 +75,16 @@ class CryptoPriceService:
         )
         self.is_running = True
 
+        # Followers take the leader's prices instead of calling the APIs themselves
+        cluster.subscribe("prices", self._on_prices_published)
+        await cluster.election.on_change(self._start_updates, self._stop_updates)
+        logger.info("Crypto price service started")
+
+    async def _start_updates(self):
+        """Start the background update loop (cluster leader only)."""
+        if not self.is_running or (self._update_task and not self._update_task.done()):
+            return
+
         # Start background price update task with error handling
         self._update_task = asyncio.create_task(self._price_update_loop())
 
@@ -76,16 +94,11 @@ class CryptoPriceService:
             except asyncio.CancelledError:
                 pass  # Normal shutdown
             except Exception as e:
-                import sys
-                print(f">> Error: Price service task crashed: {str(e)}", file=sys.stderr)
+                logger.error("Price service task crashed: %s", e)
 
         self._update_task.add_done_callback(_on_task_done)
-        print(">> Crypto price service started")
 
-    async def stop(self):
-        """Stop the price service."""
-        self.is_running = False
-        
+    async def _stop_updates(self):
         # Cancel the update task if it exists
         if self._update_task and not self._update_task.done():
             self._update_task.cancel()
@@ -93,10 +106,22 @@ class CryptoPriceService:
                 await self._update_task
             except asyncio.CancelledError:
                 pass
+        self._update_task = None
+
+    async def _on_prices_published(self, message: Dict[str, Any]):
+        if cluster.is_leader:
+            return
+        for crypto_id, data in message["prices"].items():
+            self.price_cache.set(crypto_id, data)
+
+    async def stop(self):
+        """Stop the price service."""
+        self.is_running = False
+        await self._stop_updates()
         
         if self.session:
             await self.session.close()
-        print(">> Crypto price service stopped")
+        logger.info("Crypto price service stopped")
 
     async def _price_update_loop(self):
         """Background task to update prices periodically."""
@@ -106,19 +131,17 @@ class CryptoPriceService:
                 await asyncio.sleep(self.update_interval)
             except asyncio.CancelledError:
                 # Handle graceful shutdown
-                print(">> Info: Price update loop cancelled")
+                logger.info("Price update loop cancelled")
                 break
             except Exception as e:
-                import sys
-                print(f">> Error: Error in price update loop: {str(e)}")
-                import traceback
-                traceback.print_exc(file=sys.stderr)
+                logger.exception("Error in price update loop: %s", e)
                 # Don't exit the loop on error, just back off and retry
                 await asyncio.sleep(30)  # Longer backoff (30s) after error
                 continue
 
     async def update_all_prices(self):
         """Update prices for all tracked cryptocurrencies."""
+        refresh_started = time.perf_counter()
         async with AsyncSessionLocal() as db_session:
             try:
                 # Get all active cryptocurrencies
@@ -135,6 +158,7 @@ class CryptoPriceService:
 
                 # Fetch prices in batches of 50
                 batch_size = 50
+                published = {}
                 for i in range(0, len(crypto_ids), batch_size):
                     batch_ids = crypto_ids[i:i + batch_size]
                     price_data = await self._fetch_prices_batch(batch_ids)
@@ -158,18 +182,18 @@ class CryptoPriceService:
 
                         # Update cache
                         for crypto_id, data in price_data.items():
-                            self.price_cache[crypto_id] = data
-                            self.cache_expiry[crypto_id] = datetime.utcnow() + timedelta(seconds=self.cache_duration)
+                            self.price_cache.set(crypto_id, data)
+                            published[crypto_id] = data
 
                 await db_session.commit()
-                print(f">> Success: Updated prices for {len(price_data)} cryptocurrencies")
+                await cluster.publish("prices", {"prices": published})
+                price_refresh_duration_seconds.observe(time.perf_counter() - refresh_started, "success")
+                logger.info("Updated prices for %s cryptocurrencies", len(price_data))
 
             except Exception as e:
                 await db_session.rollback()
-                import sys
-                print(f">> Error: Error updating prices: {str(e)}")
-                import traceback
-                traceback.print_exc(file=sys.stderr)
+                price_refresh_duration_seconds.observe(time.perf_counter() - refresh_started, "error")
+                logger.exception("Error updating prices: %s", e)
                 # Return early but don't re-raise
                 return
 
@@ -177,7 +201,7 @@ class CryptoPriceService:
         """Fetch prices for a batch of cryptocurrencies with intelligent fallback."""
         # Check if we should skip API calls due to backoff
         if await self._should_backoff():
-            print(">> Info: Using cached/mock data due to API backoff")
+            logger.info("Using cached/mock data due to API backoff")
             return await self._get_fallback_data(crypto_ids)
 
         # Try CoinGecko first
@@ -187,7 +211,7 @@ class CryptoPriceService:
             self.api_failure_count["coingecko"] = 0
             return result
         except Exception as e:
-            print(f">> Warning: CoinGecko failed: {e}, trying CoinCap...")
+            logger.warning("CoinGecko failed: %s, trying CoinCap...", e)
             await self._record_api_failure("coingecko")
 
         # Fallback to CoinCap
@@ -197,7 +221,7 @@ class CryptoPriceService:
             self.api_failure_count["coincap"] = 0
             return result
         except Exception as e:
-            print(f">> Warning: CoinCap failed: {e}, using fallback data...")
+            logger.warning("CoinCap failed: %s, using fallback data...", e)
             await self._record_api_failure("coincap")
 
         # Ultimate fallback to mock data
@@ -290,7 +314,7 @@ class CryptoPriceService:
                             "price_change_percentage_24h": change
                         }
             except Exception as e:
-                print(f">> Error: Error fetching {crypto_id} from CoinCap: {e}")
+                logger.error("Error fetching %s from CoinCap: %s", crypto_id, e)
 
         return result
 
@@ -322,16 +346,17 @@ class CryptoPriceService:
         backoff_seconds = min(2 ** self.api_failure_count[api_name] * 30, self.max_backoff)
         self.backoff_times[api_name] = datetime.now() + timedelta(seconds=backoff_seconds)
 
-        print(f">> Warning: API {api_name} failing, backing off for {backoff_seconds} seconds")
+        logger.warning("API %s failing, backing off for %s seconds", api_name, backoff_seconds)
 
     async def _get_fallback_data(self, crypto_ids: List[str]) -> Dict[str, Any]:
         """Get fallback data from cache or mock data."""
         result = {}
 
-        # First try cache
+        # First try cache (expired entries included)
         for crypto_id in crypto_ids:
-            if crypto_id in self.price_cache:
-                result[crypto_id] = self.price_cache[crypto_id]
+            cached = self.price_cache.get(crypto_id, allow_stale=True)
+            if cached is not None:
+                result[crypto_id] = cached
 
         # Fill remaining with mock data
         for crypto_id in crypto_ids:
@@ -340,15 +365,15 @@ class CryptoPriceService:
                 # Add slight randomness to mock data
                 result[crypto_id]["current_price"] *= (0.98 + 0.04 * hash(str(datetime.now().minute)) % 100 / 100)
 
-        print(f">> Info: Providing fallback data for {len(result)} cryptocurrencies")
+        logger.info("Providing fallback data for %s cryptocurrencies", len(result))
         return result
 
     async def get_price(self, crypto_id: str) -> Optional[float]:
         """Get current price for a cryptocurrency."""
         # Check cache first
-        if crypto_id in self.price_cache and crypto_id in self.cache_expiry:
-            if datetime.utcnow() < self.cache_expiry[crypto_id]:
-                return self.price_cache[crypto_id].get("current_price")
+        cached = self.price_cache.get(crypto_id)
+        if cached is not None:
+            return cached.get("current_price")
 
         # Fetch from database
         async with AsyncSessionLocal() as db_session:
@@ -388,21 +413,16 @@ class CryptoPriceService:
             return [crypto.to_dict() for crypto in cryptos]
 
     async def search_cryptos(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search cryptocurrencies by name or symbol."""
+        """Search cryptocurrencies by name or symbol, best match first."""
+        crypto_ids = await search_service.cryptos.search(query, limit)
+        if not crypto_ids:
+            return []
         async with AsyncSessionLocal() as db_session:
-            search_pattern = f"%{query.lower()}%"
             result = await db_session.execute(
-                select(CryptoCurrency)
-                .where(
-                    (CryptoCurrency.name.ilike(search_pattern)) |
-                    (CryptoCurrency.symbol.ilike(search_pattern))
-                )
-                .where(CryptoCurrency.is_active == True)
-                .order_by(CryptoCurrency.market_cap.desc().nulls_last())
-                .limit(limit)
+                select(CryptoCurrency).where(CryptoCurrency.id.in_(crypto_ids))
             )
-            cryptos = result.scalars().all()
-            return [crypto.to_dict() for crypto in cryptos]
+            cryptos = {crypto.id: crypto for crypto in result.scalars().all()}
+            return [cryptos[crypto_id].to_dict() for crypto_id in crypto_ids if crypto_id in cryptos]
 
 # Global price service instance
 price_service = CryptoPriceService()
@@ -4,13 +4,23 @@ Supports both SQLite and PostgreSQL for concurrent write operations.
 """
 
 import os
+import re
+import time
+import asyncio
 import logging
-from typing import AsyncGenerator
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy import text
+from sqlalchemy import event, text
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
 from .models import Base, User, Wallet, CryptoCurrency, PortfolioHolding
+from .migrations import ensure_schema
+from services.metrics import install_sqlalchemy_hooks
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +30,91 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./crypto_tracker_v
 
 # Detect database type
 is_postgresql = DATABASE_URL.startswith("postgresql")
+is_sqlite_memory = ":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/").endswith("sqlite+aiosqlite:")
+
+# SQLite production mode: WAL journal, tuned pragmas, a connection pool for
+# request sessions (whose writes take sqlite_write_lock, see SQLiteWriteSession)
+# and one dedicated writer connection for the write queue (database/write_queue.py)
+SQLITE_PRODUCTION_MODE = (
+    not is_postgresql
+    and not is_sqlite_memory
+    and os.getenv("SQLITE_PRODUCTION_MODE", "true").lower() == "true"
+)
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+
+# Primary pool sizing (PostgreSQL); serves get_db, i.e. routes that write
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "20"))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "30"))
+
+# Read routing: get_read_db sessions use their own pool, optionally on a
+# replica, so heavy read endpoints cannot exhaust the connections bets need
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or DATABASE_URL
+READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", "10"))
+READ_MAX_OVERFLOW = int(os.getenv("READ_MAX_OVERFLOW", "10"))
+READ_STATEMENT_TIMEOUT_MS = int(os.getenv("READ_STATEMENT_TIMEOUT_MS", "5000"))
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",          # Readers never block the writer and vice versa
+    "synchronous": "NORMAL",        # Durable across app crashes; fsync only at checkpoints in WAL
+    "busy_timeout": "5000",         # Wait for locks instead of failing immediately (ms)
+    "cache_size": "-65536",         # 64 MiB page cache per connection
+    "mmap_size": "268435456",       # 256 MiB memory-mapped reads
+    "temp_store": "MEMORY",
+}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply production pragmas to every new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+def _configure_sqlite_writer(dbapi_connection, connection_record):
+    """Let SQLAlchemy control transactions so the writer can use BEGIN IMMEDIATE and SAVEPOINTs."""
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(conn):
+    # Take the write lock up front: a deferred transaction that reads and then
+    # writes can fail with "database is locked" when upgrading its lock
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _install_sqlite_read_guard(dbapi_connection, connection_record):
+    """
+    Make a read-pool SQLite connection read-only and enforce
+    READ_STATEMENT_TIMEOUT_MS.
+
+    SQLite has no statement_timeout; a progress handler that aborts the running
+    statement once its deadline passes gives the same behaviour.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+    deadline = connection_record.info["statement_deadline"] = [None]
+
+    def _check_deadline():
+        return 1 if deadline[0] is not None and time.monotonic() > deadline[0] else 0
+
+    dbapi_connection.await_(
+        dbapi_connection.driver_connection.set_progress_handler(_check_deadline, 10000)
+    )
+
+
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    deadline = conn.info.get("statement_deadline")
+    if deadline is not None:
+        deadline[0] = time.monotonic() + READ_STATEMENT_TIMEOUT_MS / 1000
+
+
+def _stop_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    deadline = conn.info.get("statement_deadline")
+    if deadline is not None:
+        deadline[0] = None
+
 
 # Create async engine with database-specific optimizations
 if is_postgresql:
@@ -28,12 +123,46 @@ if is_postgresql:
         DATABASE_URL,
         echo=False,  # Set to True for SQL debugging
         pool_pre_ping=True,
-        pool_size=20,  # Increase for concurrent connections
-        max_overflow=30,  # Allow more overflow connections
+        pool_size=DATABASE_POOL_SIZE,  # Increase for concurrent connections
+        max_overflow=DATABASE_MAX_OVERFLOW,  # Allow more overflow connections
         pool_recycle=300,  # Recycle connections frequently
         pool_timeout=60,  # Wait longer for connections in pool
     )
-    logging.info("🔧 Database: PostgreSQL configuration loaded")
+    writer_engine = engine
+    logger.info("Database: PostgreSQL configuration loaded")
+elif SQLITE_PRODUCTION_MODE:
+    # SQLite production configuration - WAL; sessions share a pool, the write queue has its own connection
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=False,  # Set to True for SQL debugging
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=SQLITE_READ_POOL_SIZE,
+        max_overflow=SQLITE_READ_POOL_SIZE,
+        pool_pre_ping=True,
+        connect_args={
+            "check_same_thread": False,  # Allow multi-thread access
+        }
+    )
+    event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+    writer_engine = create_async_engine(
+        DATABASE_URL,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=60,
+        connect_args={
+            "check_same_thread": False,
+        }
+    )
+    event.listen(writer_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(writer_engine.sync_engine, "connect", _configure_sqlite_writer)
+    event.listen(writer_engine.sync_engine, "begin", _begin_immediate)
+    logger.info(
+        "Database: SQLite production mode loaded (WAL, %s pooled connections, 1 write queue connection)",
+        SQLITE_READ_POOL_SIZE
+    )
 else:
     # SQLite configuration - local development fallback
     engine = create_async_engine(
@@ -46,21 +175,185 @@ else:
             "check_same_thread": False,  # Allow multi-thread access
         }
     )
-    logging.info("🔧 Database: SQLite configuration loaded")
+    writer_engine = engine
+    logger.info("Database: SQLite configuration loaded")
+
+
+
+def _create_read_engine(url: str):
+    """Engine for get_read_db / ReadSessionLocal: own pool, read-only, statement timeout."""
+    if url.startswith("postgresql"):
+        connect_args = {
+            "server_settings": {
+                "statement_timeout": str(READ_STATEMENT_TIMEOUT_MS),
+                "default_transaction_read_only": "on",
+            }
+        }
+        return create_async_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,
+            pool_size=READ_POOL_SIZE,
+            max_overflow=READ_MAX_OVERFLOW,
+            pool_recycle=300,
+            pool_timeout=30,
+            connect_args=connect_args if "asyncpg" in url else {},
+        )
+
+    read_engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=READ_POOL_SIZE,
+        max_overflow=READ_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        connect_args={
+            "check_same_thread": False,
+        }
+    )
+    if SQLITE_PRODUCTION_MODE:
+        event.listen(read_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(read_engine.sync_engine, "connect", _install_sqlite_read_guard)
+    event.listen(read_engine.sync_engine, "before_cursor_execute", _start_statement_timer)
+    event.listen(read_engine.sync_engine, "after_cursor_execute", _stop_statement_timer)
+    return read_engine
+
+
+if is_sqlite_memory and DATABASE_READ_URL == DATABASE_URL:
+    # A second engine would open a different in-memory database
+    read_engine = engine
+else:
+    read_engine = _create_read_engine(DATABASE_READ_URL)
+    logger.info(
+        "Database: read sessions on %s (pool %s+%s, statement timeout %sms)",
+        "replica" if DATABASE_READ_URL != DATABASE_URL else "primary",
+        READ_POOL_SIZE, READ_MAX_OVERFLOW, READ_STATEMENT_TIMEOUT_MS
+    )
+
+# Query count / DB time instrumentation (see services/metrics.py)
+install_sqlalchemy_hooks(engine)
+if writer_engine is not engine:
+    install_sqlalchemy_hooks(writer_engine)
+if read_engine is not engine:
+    install_sqlalchemy_hooks(read_engine)
+
+_WRITE_SQL = re.compile(r"\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b", re.IGNORECASE)
+
+
+def _is_write_statement(statement) -> bool:
+    """Core/ORM DML, or a text() statement starting with a writing keyword."""
+    if isinstance(statement, TextClause):
+        return bool(_WRITE_SQL.match(statement.text))
+    return getattr(statement, "is_dml", False)
+
+
+class SQLiteWriteSession(AsyncSession):
+    """
+    AsyncSession that takes the process-wide SQLite write lock before its
+    first write and holds it until commit/rollback/close.
+
+    SQLite admits one writer at a time; queueing writers on an asyncio.Lock
+    (FIFO) is fair and cheap, whereas leaving it to SQLite's busy handler
+    makes waiting writers poll with growing sleeps and starve under load.
+    The wait is bounded by busy_timeout, after which the session proceeds and
+    SQLite's own locking applies, so a caller that already holds the lock in
+    another session degrades to the old behaviour instead of deadlocking.
+
+    These sessions still write on the shared pool, not on the write queue's
+    connection, and the lock only orders writers within this process; other
+    processes on the same file are left to busy_timeout.
+
+    While it holds the lock the session is published in write_lock_holder
+    for the current task, so write queue jobs submitted from that task run
+    inside it instead of waiting for the lock it holds.
+    """
+
+    _holds_write_lock = False
+
+    def _has_pending_writes(self) -> bool:
+        sync_session = self.sync_session
+        return bool(sync_session.new or sync_session.dirty or sync_session.deleted)
+
+    async def _acquire_write_lock(self):
+        if self._holds_write_lock:
+            return
+        try:
+            await asyncio.wait_for(sqlite_write_lock.acquire(), timeout=SQLITE_WRITE_LOCK_TIMEOUT)
+            self._holds_write_lock = True
+            write_lock_holder.set(self)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out waiting for the SQLite write lock; falling back to busy_timeout")
+
+    def _release_write_lock(self):
+        if self._holds_write_lock:
+            self._holds_write_lock = False
+            sqlite_write_lock.release()
+            if write_lock_holder.get() is self:
+                write_lock_holder.set(None)
+
+    async def execute(self, statement, *args, **kwargs):
+        if _is_write_statement(statement) or (self.autoflush and self._has_pending_writes()):
+            await self._acquire_write_lock()
+        return await super().execute(statement, *args, **kwargs)
+
+    async def flush(self, objects=None):
+        if self._has_pending_writes():
+            await self._acquire_write_lock()
+        await super().flush(objects)
+
+    async def commit(self):
+        if self._has_pending_writes():
+            await self._acquire_write_lock()
+        try:
+            await super().commit()
+        finally:
+            self._release_write_lock()
+
+    async def rollback(self):
+        try:
+            await super().rollback()
+        finally:
+            self._release_write_lock()
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            self._release_write_lock()
+
+
+# Single in-process writer gate shared by SQLiteWriteSession and the write queue
+sqlite_write_lock = asyncio.Lock()
+SQLITE_WRITE_LOCK_TIMEOUT = int(SQLITE_PRAGMAS["busy_timeout"]) / 1000
+# The session holding sqlite_write_lock on behalf of the current task, if any
+write_lock_holder: ContextVar[Optional[SQLiteWriteSession]] = ContextVar("write_lock_holder", default=None)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
+    class_=SQLiteWriteSession if SQLITE_PRODUCTION_MODE else AsyncSession,
+    expire_on_commit=False
+)
+
+# Sessions on the dedicated writer connection (used by the write queue)
+WriterSessionLocal = async_sessionmaker(
+    writer_engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+# Read-only sessions (replica if DATABASE_READ_URL is set); see get_read_db
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
+
 async def init_database():
-    """Initialize database tables and seed data."""
-    async with engine.begin() as conn:
-        # Create all tables
-        await conn.run_sync(Base.metadata.create_all)
-        print(">> Database tables created")
+    """Bring the schema up to date (see database/migrations) and seed data."""
+    version = await ensure_schema(writer_engine)
+    logger.info("Database schema at version %s", version)
 
     # Seed initial data
     await seed_default_data()
@@ -148,11 +441,11 @@ async def seed_default_data():
                     session.add(crypto)
 
                 await session.commit()
-                print(f">> Seeded {len(default_cryptos)} cryptocurrencies")
+                logger.info("Seeded %s cryptocurrencies", len(default_cryptos))
 
         except Exception as e:
             await session.rollback()
-            print(f">> Error seeding data: {e}")
+            logger.error("Error seeding data: %s", e)
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Get database session."""
@@ -165,6 +458,22 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get a read-only database session.
+
+    Use for endpoints that never write (leaderboards, history, public
+    profiles). Reads may come from a replica and lag the primary slightly, so
+    anything that must see the caller's own just-committed writes should keep
+    using get_db.
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
+
 async def create_user_with_wallet(
     session: AsyncSession,
     username: str,
@@ -0,0 +1,29 @@
+"""
+Versioned schema migrations.
+
+Numbered modules in database/migrations/versions/ (NNNN_name.py) each define
+`async def upgrade(conn)` and are applied in order, once, with the applied
+version recorded in the schema_migrations table. Startup only reads
+MAX(version) from that table and runs the runner when it is behind.
+
+Usage:
+    python -m database.migrations status
+    python -m database.migrations upgrade [--to N]
+"""
+
+from .runner import (
+    Migration,
+    discover_migrations,
+    latest_version,
+    get_schema_version,
+    get_applied_versions,
+    upgrade,
+    ensure_schema,
+)
+from .ops import (
+    table_exists,
+    column_exists,
+    add_column,
+    create_tables,
+    create_index,
+)
@@ -0,0 +1,43 @@
+"""
+Command-line entry point: python -m database.migrations [status|upgrade]
+"""
+
+import sys
+import asyncio
+import argparse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database.migrations", description="Manage the database schema")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("status", help="List migrations and whether they are applied")
+    upgrade_parser = sub.add_parser("upgrade", help="Apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, help="Stop after this version")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    from database.database import writer_engine
+    from database.migrations import discover_migrations, get_applied_versions, upgrade
+
+    if args.command == "upgrade":
+        applied = await upgrade(writer_engine, target=args.to)
+        print(f"Applied {len(applied)} migration(s)" + (f": {', '.join(map(str, applied))}" if applied else ""))
+        return 0
+
+    applied = await get_applied_versions(writer_engine)
+    for migration in discover_migrations():
+        state = "applied" if migration.version in applied else "pending"
+        print(f"{migration.version:04d}  {state:<8} {migration.name}  {migration.description}")
+    return 0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.command is None:
+        args.command = "status"
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Building blocks for idempotent migrations on SQLite and PostgreSQL.
+
+Every helper checks the live schema first, so a migration can be re-run
+against a database that was created by the old create_all startup or by the
+legacy per-feature scripts without failing.
+"""
+
+import re
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+def is_postgresql(conn: AsyncConnection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+def is_autocommit(conn: AsyncConnection) -> bool:
+    """True inside a non-transactional migration (TRANSACTIONAL = False)."""
+    return conn.sync_connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+async def table_exists(conn: AsyncConnection, table: str) -> bool:
+    return await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(table))
+
+
+async def column_exists(conn: AsyncConnection, table: str, column: str) -> bool:
+    def _check(sync_conn):
+        inspector = inspect(sync_conn)
+        if not inspector.has_table(table):
+            return False
+        return any(col["name"] == column for col in inspector.get_columns(table))
+
+    return await conn.run_sync(_check)
+
+
+async def add_column(conn: AsyncConnection, table: str, column: str, ddl_type: str, default: str = None) -> bool:
+    """Add a column if the table exists and does not have it yet. Returns True if added."""
+    if not await table_exists(conn, table) or await column_exists(conn, table, column):
+        return False
+
+    sql = f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"
+    if default is not None:
+        sql += f" DEFAULT {default}"
+    await conn.execute(text(sql))
+    return True
+
+
+async def create_tables(conn: AsyncConnection, *tables: Table):
+    """
+    Create tables (with their indexes) that do not exist yet. Migrations pass
+    their own frozen Table definitions rather than database.models, so what a
+    migration creates does not change when the models do.
+    """
+    selected = list(tables)
+    await conn.run_sync(lambda sync_conn: selected[0].metadata.create_all(sync_conn, tables=selected))
+
+
+async def create_index(
+    conn: AsyncConnection,
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    where: str = None,
+    using: str = None
+):
+    """
+    CREATE INDEX IF NOT EXISTS. `using` picks the access method (e.g. gin);
+    columns may then carry an operator class ("username gin_trgm_ops").
+
+    On PostgreSQL inside a non-transactional migration the index is built with
+    CONCURRENTLY so writes to the table are not blocked while it builds. A
+    failed concurrent build leaves an INVALID index behind that IF NOT EXISTS
+    would skip, so that case is dropped and rebuilt.
+    """
+    unique_sql = "UNIQUE " if unique else ""
+    where_sql = f" WHERE {where}" if where else ""
+    column_sql = ", ".join(columns)
+    using_sql = f" USING {using}" if using else ""
+
+    if is_postgresql(conn) and is_autocommit(conn):
+        invalid = (await conn.execute(text(
+            "SELECT NOT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ), {"name": name})).scalar()
+        if invalid:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        await conn.execute(text(
+            f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}{using_sql} ({column_sql}){where_sql}"
+        ))
+    else:
+        await conn.execute(text(
+            f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table}{using_sql} ({column_sql}){where_sql}"
+        ))
+
+
+async def drop_index(conn: AsyncConnection, name: str):
+    """DROP INDEX IF EXISTS, CONCURRENTLY on PostgreSQL inside a non-transactional migration."""
+    if is_postgresql(conn) and is_autocommit(conn):
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    else:
+        await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+# ==================== PARTITIONING (PostgreSQL) ====================
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    if not is_postgresql(conn):
+        return False
+    kind = (await conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    )).scalar()
+    return kind == "p"
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[Tuple[str, Optional[date], Optional[date]]]:
+    """(name, lower, upper) for each partition of `table`, oldest first; the DEFAULT partition has no bounds."""
+    rows = (await conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": table})).all()
+
+    partitions = []
+    for name, bound in rows:
+        dates = re.findall(r"'(\d{4}-\d{2}-\d{2})", bound)
+        if len(dates) == 2:
+            partitions.append((name, date.fromisoformat(dates[0]), date.fromisoformat(dates[1])))
+        else:
+            partitions.append((name, None, None))
+    return sorted(partitions, key=lambda p: p[1] or date.max)
+
+
+async def create_month_partitions(conn: AsyncConnection, table: str, start: date, end: date) -> List[str]:
+    """Create the missing monthly partitions of `table` covering [start, end). Returns the names created."""
+    existing = {lower for _, lower, _ in await list_partitions(conn, table)}
+    created = []
+    month = month_start(start)
+    while month < end:
+        following = add_months(month, 1)
+        if month not in existing:
+            name = f"{table}_p{month:%Y%m}"
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+            ))
+            created.append(name)
+        month = following
+    return created
+
+
+async def partition_by_month(conn: AsyncConnection, table: str, column: str, months_ahead: int = 2) -> bool:
+    """
+    Rebuild a table as a monthly RANGE-partitioned table on `column`.
+
+    PostgreSQL only and skipped when the table is already partitioned. Rows
+    are copied into per-month partitions (NULL keys become now()), plus a
+    DEFAULT partition for anything outside the created ranges. The primary
+    key gains the partition column, as PostgreSQL requires. Foreign keys that
+    pointed at the old table are dropped, since a partitioned table with that
+    composite key cannot back them; indexes and outgoing foreign keys are
+    taken from the live table and recreated. Returns True if the table was
+    converted.
+    """
+    if not is_postgresql(conn) or not await table_exists(conn, table) or await is_partitioned(conn, table):
+        return False
+
+    legacy = f"{table}_unpartitioned"
+
+    def _schema(sync_conn):
+        inspector = inspect(sync_conn)
+        incoming = [
+            (other, fk["name"])
+            for other in inspector.get_table_names() if other != table
+            for fk in inspector.get_foreign_keys(other)
+            if fk["referred_table"] == table and fk["name"]
+        ]
+        return (
+            [col["name"] for col in inspector.get_columns(table)],
+            inspector.get_pk_constraint(table)["constrained_columns"],
+            inspector.get_indexes(table),
+            inspector.get_foreign_keys(table),
+            incoming
+        )
+
+    columns, primary_key, indexes, foreign_keys, incoming = await conn.run_sync(_schema)
+    for other, constraint in incoming:
+        await conn.execute(text(f'ALTER TABLE {other} DROP CONSTRAINT "{constraint}"'))
+
+    await conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    await conn.execute(text(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})"
+    ))
+    await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+
+    oldest = (await conn.execute(text(f"SELECT MIN({column}) FROM {legacy}"))).scalar()
+    this_month = month_start(date.today())
+    start = month_start(oldest.date()) if oldest else this_month
+    await create_month_partitions(conn, table, start, add_months(this_month, months_ahead + 1))
+    await conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    column_sql = ", ".join(columns)
+    select_sql = ", ".join(f"COALESCE({c}, now())" if c == column else c for c in columns)
+    await conn.execute(text(f"INSERT INTO {table} ({column_sql}) SELECT {select_sql} FROM {legacy}"))
+    await conn.execute(text(f"DROP TABLE {legacy}"))
+
+    await conn.execute(text(
+        f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(primary_key + [column])})"
+    ))
+    for index in indexes:
+        unique_sql = "UNIQUE " if index["unique"] else ""
+        await conn.execute(text(
+            f"CREATE {unique_sql}INDEX {index['name']} ON {table} ({', '.join(index['column_names'])})"
+        ))
+    for fk in foreign_keys:
+        ondelete = fk.get("options", {}).get("ondelete")
+        await conn.execute(text(
+            f"ALTER TABLE {table} ADD FOREIGN KEY ({', '.join(fk['constrained_columns'])}) "
+            f"REFERENCES {fk['referred_table']} ({', '.join(fk['referred_columns'])})"
+            + (f" ON DELETE {ondelete}" if ondelete else "")
+        ))
+    await conn.execute(text(f"ANALYZE {table}"))
+    return True
@@ -0,0 +1,187 @@
+"""
+Migration discovery and execution.
+"""
+
+import os
+import time
+import logging
+import importlib.util
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Set
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = Path(__file__).parent / "versions"
+
+# Apply pending migrations at startup; set to false when deploys run
+# `python -m database.migrations upgrade` as a separate step
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").lower() == "true"
+
+# Arbitrary key for pg_advisory_lock so concurrently starting workers
+# do not apply the same migration twice
+_ADVISORY_LOCK_KEY = 4_180_033
+
+version_table = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One versions/NNNN_name.py module."""
+    version: int
+    name: str
+    description: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+    transactional: bool = True
+
+
+def _parse_version(path: Path) -> int:
+    return int(path.stem.split("_", 1)[0])
+
+
+def latest_version(directory: Path = VERSIONS_DIR) -> int:
+    """Highest migration number on disk, from file names alone (no imports)."""
+    return max((_parse_version(path) for path in directory.glob("[0-9]*.py")), default=0)
+
+
+def discover_migrations(directory: Path = VERSIONS_DIR) -> List[Migration]:
+    """Load every migration module, ordered by version."""
+    migrations = []
+    seen = {}
+    for path in sorted(directory.glob("[0-9]*.py")):
+        version = _parse_version(path)
+        if version in seen:
+            raise RuntimeError(f"Duplicate migration version {version}: {seen[version]} and {path.name}")
+        seen[version] = path.name
+
+        spec = importlib.util.spec_from_file_location(f"database.migrations.versions.m{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        migrations.append(Migration(
+            version=version,
+            name=path.stem.split("_", 1)[1] if "_" in path.stem else path.stem,
+            description=(module.__doc__ or "").strip().split("\n")[0],
+            upgrade=module.upgrade,
+            transactional=getattr(module, "TRANSACTIONAL", True),
+        ))
+
+    return sorted(migrations, key=lambda m: m.version)
+
+
+async def get_schema_version(engine: AsyncEngine) -> int:
+    """Current schema version in a single query; 0 if migrations never ran."""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(select(func.max(version_table.c.version)))
+            return result.scalar() or 0
+        except DBAPIError:
+            # schema_migrations does not exist yet
+            return 0
+
+
+async def get_applied_versions(engine: AsyncEngine) -> Set[int]:
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(select(version_table.c.version))
+            return set(result.scalars().all())
+        except DBAPIError:
+            return set()
+
+
+async def upgrade(engine: AsyncEngine, target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations in order, up to `target` if given.
+
+    Each migration runs in its own transaction together with its
+    schema_migrations row. Migrations with TRANSACTIONAL = False (e.g.
+    CREATE INDEX CONCURRENTLY) run in autocommit mode on PostgreSQL, so they
+    must be idempotent on their own. Returns the versions applied.
+    """
+    migrations = discover_migrations()
+    applied_now = []
+
+    async with engine.connect() as conn:
+        is_postgresql = conn.dialect.name == "postgresql"
+        if is_postgresql:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            await conn.commit()
+
+        try:
+            await conn.run_sync(version_table.create, checkfirst=True)
+            applied = set((await conn.execute(select(version_table.c.version))).scalars().all())
+            await conn.commit()
+
+            for migration in migrations:
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+
+                started = time.perf_counter()
+                record = version_table.insert().values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.utcnow()
+                )
+
+                if migration.transactional or not is_postgresql:
+                    async with conn.begin():
+                        await migration.upgrade(conn)
+                        await conn.execute(record)
+                else:
+                    default_level = conn.sync_connection.default_isolation_level
+                    await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    try:
+                        await migration.upgrade(conn)
+                        await conn.execute(record)
+                    finally:
+                        await conn.execution_options(isolation_level=default_level)
+
+                applied_now.append(migration.version)
+                logger.info(
+                    "Applied migration %04d_%s in %.1fms",
+                    migration.version, migration.name, (time.perf_counter() - started) * 1000
+                )
+        finally:
+            if is_postgresql:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+                await conn.commit()
+
+    return applied_now
+
+
+async def ensure_schema(engine: AsyncEngine) -> int:
+    """
+    Startup check: bring the schema up to date and return its version.
+
+    When the database is already current (the normal case) this costs one
+    query instead of reflecting and creating every table.
+    """
+    expected = latest_version()
+    current = await get_schema_version(engine)
+
+    if current == expected:
+        return current
+    if current > expected:
+        logger.warning("Database schema version %s is newer than this code expects (%s)", current, expected)
+        return current
+
+    if not MIGRATE_ON_STARTUP:
+        raise RuntimeError(
+            f"Database schema is at version {current}, code expects {expected}. "
+            f"Run: python -m database.migrations upgrade"
+        )
+
+    logger.info("Database schema at version %s, migrating to %s", current, expected)
+    await upgrade(engine)
+    return expected
@@ -0,0 +1,760 @@
+"""
+Baseline schema: every table and index of database/models.py as it stood
+when versioned migrations were introduced, frozen here so that later model
+changes only reach the database through their own migrations.
+
+Replaces the Base.metadata.create_all that used to run on every boot and the
+legacy add_*_tables.py scripts (achievements, clicker, crash, gem store,
+staking, trading, leaderboards/challenges, mini-games, missions, social,
+stocks). create_all skips existing tables, so databases created either way
+are adopted unchanged.
+"""
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    UniqueConstraint
+)
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", String, primary_key=True),
+    Column("username", String(50), nullable=False, unique=True),
+    Column("email", String(100), nullable=False, unique=True),
+    Column("password_hash", String(255), nullable=False),
+    Column("role", String(20)),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+    Column("last_login", DateTime),
+    Column("avatar_url", String(100000)),
+    Column("bio", String(500)),
+    Column("profile_theme", String(50)),
+    Column("is_bot", Boolean, nullable=False),
+    Column("bot_personality", String(30)),
+)
+
+Table(
+    "wallets", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True),
+    Column("gem_balance", Float),
+    Column("total_deposited", Float),
+    Column("total_withdrawn", Float),
+    Column("total_wagered", Float),
+    Column("total_won", Float),
+    Column("updated_at", DateTime),
+    Index("idx_wallet_user_id", "user_id"),
+)
+
+Table(
+    "transactions", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("transaction_type", String(20), nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("balance_before", Float, nullable=False),
+    Column("balance_after", Float, nullable=False),
+    Column("description", Text),
+    Column("game_session_id", String, ForeignKey("game_sessions.id", ondelete="SET NULL")),
+    Column("created_at", DateTime),
+    Index("idx_transaction_created_at", "created_at"),
+    Index("idx_transaction_type", "transaction_type"),
+    Index("idx_transaction_user_created", "user_id", "created_at"),
+    Index("idx_transaction_user_id", "user_id"),
+)
+
+Table(
+    "game_sessions", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("status", String(20)),
+    Column("server_seed", String(64), nullable=False),
+    Column("server_seed_hash", String(64), nullable=False),
+    Column("client_seed", String(64), nullable=False),
+    Column("nonce", Integer),
+    Column("winning_number", Integer),
+    Column("winning_crypto", String(20)),
+    Column("winning_color", String(10)),
+    Column("total_bet", Float),
+    Column("total_won", Float),
+    Column("total_lost", Float),
+    Column("started_at", DateTime),
+    Column("completed_at", DateTime),
+)
+
+Table(
+    "roulette_rounds", metadata,
+    Column("id", String(36), primary_key=True),
+    Column("round_number", Integer, nullable=False, unique=True),
+    Column("phase", String(20), nullable=False),
+    Column("started_at", DateTime, nullable=False),
+    Column("betting_ends_at", DateTime),
+    Column("outcome_number", Integer),
+    Column("outcome_color", String(10)),
+    Column("outcome_crypto", String(10)),
+    Column("triggered_by", String(36), ForeignKey("users.id")),
+    Column("created_at", DateTime),
+    Column("completed_at", DateTime),
+)
+
+Table(
+    "game_bets", metadata,
+    Column("id", String, primary_key=True),
+    Column("game_session_id", String, ForeignKey("game_sessions.id"), nullable=False),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("round_id", String(36), ForeignKey("roulette_rounds.id")),
+    Column("bet_type", String(20), nullable=False),
+    Column("bet_value", String(50), nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("is_winner", Boolean),
+    Column("payout_multiplier", Float),
+    Column("payout_amount", Float),
+    Column("created_at", DateTime),
+    Index("idx_gamebet_created_at", "created_at"),
+    Index("idx_gamebet_round_id", "round_id"),
+    Index("idx_gamebet_user_created", "user_id", "created_at"),
+    Index("idx_gamebet_user_id", "user_id"),
+)
+
+Table(
+    "cryptocurrencies", metadata,
+    Column("id", String, primary_key=True),
+    Column("symbol", String(20), nullable=False, unique=True),
+    Column("name", String(100), nullable=False),
+    Column("current_price_usd", Float),
+    Column("market_cap", Float),
+    Column("volume_24h", Float),
+    Column("price_change_24h", Float),
+    Column("price_change_percentage_24h", Float),
+    Column("image", String(500)),
+    Column("last_updated", DateTime),
+    Column("is_active", Boolean),
+)
+
+Table(
+    "portfolio_holdings", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("crypto_id", String, ForeignKey("cryptocurrencies.id"), nullable=False),
+    Column("quantity", Float),
+    Column("average_buy_price_gem", Float),
+    Column("total_invested_gem", Float),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+Table(
+    "crypto_transactions", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("crypto_id", String, ForeignKey("cryptocurrencies.id"), nullable=False),
+    Column("transaction_type", String(10), nullable=False),
+    Column("quantity", Float, nullable=False),
+    Column("price_per_unit_gem", Float, nullable=False),
+    Column("total_amount_gem", Float, nullable=False),
+    Column("fee_gem", Float),
+    Column("profit_loss_gem", Float),
+    Column("wallet_transaction_id", String, ForeignKey("transactions.id")),
+    Column("created_at", DateTime),
+    Index("idx_crypto_tx_created", "created_at"),
+    Index("idx_crypto_tx_crypto", "crypto_id"),
+    Index("idx_crypto_tx_user", "user_id"),
+)
+
+Table(
+    "daily_bonuses", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("claim_date", DateTime),
+    Column("bonus_amount", Float, nullable=False),
+    Column("consecutive_days", Integer),
+    Column("last_claim_date", DateTime),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "achievements", metadata,
+    Column("id", String, primary_key=True),
+    Column("name", String(100), nullable=False, unique=True),
+    Column("description", Text, nullable=False),
+    Column("achievement_type", String(50), nullable=False),
+    Column("target_value", Float, nullable=False),
+    Column("reward_amount", Float, nullable=False),
+    Column("icon", String(50)),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "user_achievements", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("achievement_id", String, ForeignKey("achievements.id"), nullable=False),
+    Column("current_progress", Float),
+    Column("is_completed", Boolean),
+    Column("completed_at", DateTime),
+    Column("reward_claimed", Boolean),
+    Column("reward_claimed_at", DateTime),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "emergency_tasks", metadata,
+    Column("id", String, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("description", Text, nullable=False),
+    Column("task_type", String(50), nullable=False),
+    Column("reward_amount", Float, nullable=False),
+    Column("cooldown_minutes", Integer),
+    Column("max_completions_per_day", Integer),
+    Column("min_balance_threshold", Float),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "user_emergency_tasks", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("task_id", String, ForeignKey("emergency_tasks.id"), nullable=False),
+    Column("completed_at", DateTime),
+    Column("reward_claimed", Boolean),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "daily_missions_progress", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("mission_key", String(50), nullable=False),
+    Column("current_progress", Integer),
+    Column("target_value", Integer, nullable=False),
+    Column("reward_amount", Float, nullable=False),
+    Column("is_completed", Boolean),
+    Column("completed_at", DateTime),
+    Column("reward_claimed", Boolean),
+    Column("reward_claimed_at", DateTime),
+    Column("reset_at", DateTime, nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Index("idx_user_mission_daily", "user_id", "mission_key", "reset_at"),
+)
+
+Table(
+    "weekly_challenges_progress", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("challenge_key", String(50), nullable=False),
+    Column("current_progress", Float),
+    Column("target_value", Float, nullable=False),
+    Column("reward_amount", Float, nullable=False),
+    Column("is_completed", Boolean),
+    Column("completed_at", DateTime),
+    Column("reward_claimed", Boolean),
+    Column("reward_claimed_at", DateTime),
+    Column("reset_at", DateTime, nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Index("idx_user_challenge_weekly", "user_id", "challenge_key", "reset_at"),
+)
+
+Table(
+    "achievements_unlocked", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("achievement_key", String(100), nullable=False),
+    Column("unlocked_at", DateTime, nullable=False),
+    Column("reward_amount", Float, nullable=False),
+    Column("reward_claimed", Boolean),
+    Column("reward_claimed_at", DateTime),
+    Column("progress_value", Float),
+    Column("created_at", DateTime),
+    Index("idx_reward_claimed", "reward_claimed"),
+    Index("idx_unlocked_at", "unlocked_at"),
+    Index("idx_user_achievement", "user_id", "achievement_key"),
+)
+
+Table(
+    "stock_metadata", metadata,
+    Column("ticker", String(10), primary_key=True),
+    Column("company_name", String(255), nullable=False),
+    Column("sector", String(100)),
+    Column("industry", String(100)),
+    Column("logo_url", String(500)),
+    Column("description", Text),
+    Column("website", String(255)),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "stock_price_cache", metadata,
+    Column("ticker", String(10), primary_key=True),
+    Column("current_price_usd", Float, nullable=False),
+    Column("price_change_pct", Float),
+    Column("volume", BigInteger),
+    Column("market_cap", BigInteger),
+    Column("day_high", Float),
+    Column("day_low", Float),
+    Column("open_price", Float),
+    Column("prev_close", Float),
+    Column("last_updated", DateTime),
+    Column("data_source", String(50)),
+)
+
+Table(
+    "stock_holdings", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("ticker", String(10), nullable=False),
+    Column("quantity", Float, nullable=False),
+    Column("average_buy_price_gem", Float, nullable=False),
+    Column("total_invested_gem", Float, nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    UniqueConstraint("user_id", "ticker", name="uq_user_ticker"),
+)
+
+Table(
+    "stock_transactions", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("ticker", String(10), nullable=False),
+    Column("transaction_type", String(10), nullable=False),
+    Column("quantity", Float, nullable=False),
+    Column("price_per_share_gem", Float, nullable=False),
+    Column("total_amount_gem", Float, nullable=False),
+    Column("fee_gem", Float),
+    Column("profit_loss_gem", Float),
+    Column("wallet_transaction_id", String, ForeignKey("transactions.id")),
+    Column("created_at", DateTime),
+    Index("idx_stock_tx_created", "created_at"),
+    Index("idx_stock_tx_user_ticker", "user_id", "ticker"),
+)
+
+Table(
+    "clicker_stats", metadata,
+    Column("user_id", String, ForeignKey("users.id"), primary_key=True),
+    Column("total_clicks", BigInteger, nullable=False),
+    Column("total_gems_earned", Float, nullable=False),
+    Column("best_combo", Integer, nullable=False),
+    Column("mega_bonuses_hit", Integer, nullable=False),
+    Column("click_power_level", Integer, nullable=False),
+    Column("auto_clicker_level", Integer, nullable=False),
+    Column("multiplier_level", Integer, nullable=False),
+    Column("energy_capacity_level", Integer, nullable=False),
+    Column("energy_regen_level", Integer, nullable=False),
+    Column("current_energy", Integer, nullable=False),
+    Column("max_energy", Integer, nullable=False),
+    Column("last_energy_update", DateTime, nullable=False),
+    Column("last_auto_click", DateTime),
+    Column("auto_click_accumulated", Float, nullable=False),
+    Column("daily_streak", Integer, nullable=False),
+    Column("last_click_date", DateTime),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+Table(
+    "clicker_upgrade_purchases", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("upgrade_type", String(50), nullable=False),
+    Column("level_purchased", Integer, nullable=False),
+    Column("cost_gems", Float, nullable=False),
+    Column("purchased_at", DateTime, nullable=False),
+    Index("idx_clicker_upgrade_type", "upgrade_type"),
+    Index("idx_clicker_upgrade_user", "user_id"),
+)
+
+Table(
+    "clicker_prestige", metadata,
+    Column("user_id", String, ForeignKey("users.id"), primary_key=True),
+    Column("prestige_level", Integer, nullable=False),
+    Column("prestige_points", Integer, nullable=False),
+    Column("total_lifetime_gems", Float, nullable=False),
+    Column("last_prestige_at", DateTime),
+    Column("has_click_master", Boolean, nullable=False),
+    Column("has_energy_expert", Boolean, nullable=False),
+    Column("has_quick_start", Boolean, nullable=False),
+    Column("has_auto_unlock", Boolean, nullable=False),
+    Column("has_multiplier_boost", Boolean, nullable=False),
+    Column("has_prestige_master", Boolean, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+Table(
+    "clicker_powerups", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("powerup_type", String(50), nullable=False),
+    Column("activated_at", DateTime, nullable=False),
+    Column("expires_at", DateTime),
+    Column("is_active", Boolean, nullable=False),
+    Index("idx_powerup_active", "user_id", "is_active"),
+    Index("idx_powerup_user", "user_id"),
+)
+
+Table(
+    "clicker_powerup_cooldowns", metadata,
+    Column("user_id", String, ForeignKey("users.id"), primary_key=True),
+    Column("powerup_type", String(50), primary_key=True),
+    Column("cooldown_ends_at", DateTime, nullable=False),
+    Index("idx_powerup_cooldown_user", "user_id"),
+)
+
+Table(
+    "clicker_challenges", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("challenge_type", String(50), nullable=False),
+    Column("challenge_period", String(20), nullable=False),
+    Column("challenge_date", Date, nullable=False),
+    Column("progress", Integer, nullable=False),
+    Column("target", Integer, nullable=False),
+    Column("is_completed", Boolean, nullable=False),
+    Column("completed_at", DateTime),
+    Column("claimed", Boolean, nullable=False),
+    Column("claimed_at", DateTime),
+    Column("reward_gems", Float, nullable=False),
+    Column("reward_pp", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_challenge_active", "user_id", "is_completed", "claimed"),
+    Index("idx_challenge_user", "user_id"),
+    Index("idx_challenge_user_date", "user_id", "challenge_date"),
+)
+
+Table(
+    "clicker_leaderboards", metadata,
+    Column("user_id", String, ForeignKey("users.id"), primary_key=True),
+    Column("total_clicks", BigInteger, nullable=False),
+    Column("best_combo", Integer, nullable=False),
+    Column("total_gems_earned", Float, nullable=False),
+    Column("prestige_level", Integer, nullable=False),
+    Column("daily_gems_earned", Float, nullable=False),
+    Column("daily_last_reset", Date),
+    Column("first_million_seconds", Integer),
+    Column("first_million_achieved_at", DateTime),
+    Column("updated_at", DateTime, nullable=False),
+    Index("idx_leaderboard_clicks", "total_clicks"),
+    Index("idx_leaderboard_combo", "best_combo"),
+    Index("idx_leaderboard_daily", "daily_gems_earned"),
+    Index("idx_leaderboard_gems", "total_gems_earned"),
+    Index("idx_leaderboard_prestige", "prestige_level"),
+)
+
+Table(
+    "clicker_achievements", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("achievement_id", String(100), nullable=False),
+    Column("unlocked_at", DateTime, nullable=False),
+    Column("reward_claimed", Boolean, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    UniqueConstraint("user_id", "achievement_id", name="uq_user_achievement"),
+    Index("idx_achievement_id", "achievement_id"),
+    Index("idx_achievement_unlocked", "unlocked_at"),
+    Index("idx_achievement_user", "user_id"),
+)
+
+Table(
+    "clicker_themes", metadata,
+    Column("user_id", String, ForeignKey("users.id"), primary_key=True),
+    Column("button_theme", String(50), nullable=False),
+    Column("particle_effect", String(50), nullable=False),
+    Column("background_theme", String(50), nullable=False),
+    Column("unlocked_button_themes", Text),
+    Column("unlocked_particle_effects", Text),
+    Column("unlocked_backgrounds", Text),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+Table(
+    "gem_purchases", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("package_id", String(50), nullable=False),
+    Column("gems_amount", Integer, nullable=False),
+    Column("bonus_gems", Integer, nullable=False),
+    Column("total_gems", Integer, nullable=False),
+    Column("price_usd", Float, nullable=False),
+    Column("payment_method", String(50)),
+    Column("transaction_id", String(100), nullable=False, unique=True),
+    Column("status", String(20), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_gem_purchases_date", "created_at"),
+    Index("idx_gem_purchases_user", "user_id"),
+)
+
+Table(
+    "gem_stakes", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("amount", Integer, nullable=False),
+    Column("lock_period_days", Integer, nullable=False),
+    Column("apr_rate", Float, nullable=False),
+    Column("total_rewards_earned", Integer, nullable=False),
+    Column("unclaimed_rewards", Integer, nullable=False),
+    Column("last_reward_calculation", DateTime, nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("staked_at", DateTime, nullable=False),
+    Column("unlock_at", DateTime, nullable=False),
+    Column("unstaked_at", DateTime),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Index("idx_gem_stakes_status", "status"),
+    Index("idx_gem_stakes_unlock", "unlock_at"),
+    Index("idx_gem_stakes_user", "user_id"),
+)
+
+Table(
+    "gem_trade_orders", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("order_type", String(10), nullable=False),
+    Column("price", Integer, nullable=False),
+    Column("amount", Integer, nullable=False),
+    Column("filled_amount", Integer, nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("filled_at", DateTime),
+    Column("cancelled_at", DateTime),
+    Index("idx_trade_orders_price", "price"),
+    Index("idx_trade_orders_status", "status"),
+    Index("idx_trade_orders_type", "order_type"),
+    Index("idx_trade_orders_user", "user_id"),
+)
+
+Table(
+    "gem_trades", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("buyer_id", String, ForeignKey("users.id"), nullable=False),
+    Column("seller_id", String, ForeignKey("users.id"), nullable=False),
+    Column("order_id", Integer, ForeignKey("gem_trade_orders.id"), nullable=False),
+    Column("price", Integer, nullable=False),
+    Column("amount", Integer, nullable=False),
+    Column("total_value", Integer, nullable=False),
+    Column("fee", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_trades_buyer", "buyer_id"),
+    Index("idx_trades_created", "created_at"),
+    Index("idx_trades_order", "order_id"),
+    Index("idx_trades_seller", "seller_id"),
+)
+
+Table(
+    "mini_games", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("game_type", String(50), nullable=False),
+    Column("bet_amount", Integer, nullable=False),
+    Column("payout", Integer, nullable=False),
+    Column("profit", Integer, nullable=False),
+    Column("game_data", Text),
+    Column("won", Boolean, nullable=False),
+    Column("played_at", DateTime, nullable=False),
+    Index("idx_minigames_played", "played_at"),
+    Index("idx_minigames_type", "game_type"),
+    Index("idx_minigames_user", "user_id"),
+)
+
+Table(
+    "mini_game_stats", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False, unique=True),
+    Column("total_games_played", Integer, nullable=False),
+    Column("total_games_won", Integer, nullable=False),
+    Column("total_games_lost", Integer, nullable=False),
+    Column("total_wagered", Integer, nullable=False),
+    Column("total_won", Integer, nullable=False),
+    Column("net_profit", Integer, nullable=False),
+    Column("coinflip_stats", Text),
+    Column("dice_stats", Text),
+    Column("higherlower_stats", Text),
+    Column("current_win_streak", Integer, nullable=False),
+    Column("longest_win_streak", Integer, nullable=False),
+    Column("current_loss_streak", Integer, nullable=False),
+    Column("longest_loss_streak", Integer, nullable=False),
+    Column("biggest_win", Integer, nullable=False),
+    Column("biggest_loss", Integer, nullable=False),
+    Column("updated_at", DateTime),
+    Index("idx_minigamestats_profit", "net_profit"),
+    Index("idx_minigamestats_user", "user_id"),
+)
+
+Table(
+    "leaderboard_entries", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("category", String(50), nullable=False),
+    Column("timeframe", String(20), nullable=False),
+    Column("rank", Integer, nullable=False),
+    Column("score", Integer, nullable=False),
+    Column("stats_data", Text),
+    Column("period_start", DateTime, nullable=False),
+    Column("period_end", DateTime),
+    Column("updated_at", DateTime),
+    Index("idx_leaderboard_category_timeframe", "category", "timeframe"),
+    Index("idx_leaderboard_rank", "rank"),
+    Index("idx_leaderboard_updated", "updated_at"),
+    Index("idx_leaderboard_user", "user_id"),
+)
+
+Table(
+    "daily_challenges", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("challenge_type", String(50), nullable=False),
+    Column("title", String(200), nullable=False),
+    Column("description", Text, nullable=False),
+    Column("requirement_value", Integer, nullable=False),
+    Column("gem_reward", Integer, nullable=False),
+    Column("starts_at", DateTime, nullable=False),
+    Column("ends_at", DateTime, nullable=False),
+    Column("difficulty", String(20), nullable=False),
+    Index("idx_challenges_active", "starts_at", "ends_at"),
+    Index("idx_challenges_type", "challenge_type"),
+)
+
+Table(
+    "user_challenges", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("challenge_id", Integer, ForeignKey("daily_challenges.id"), nullable=False),
+    Column("current_progress", Integer, nullable=False),
+    Column("completed", Boolean, nullable=False),
+    Column("claimed", Boolean, nullable=False),
+    Column("started_at", DateTime, nullable=False),
+    Column("completed_at", DateTime),
+    Column("claimed_at", DateTime),
+    Index("idx_userchallenge_challenge", "challenge_id"),
+    Index("idx_userchallenge_completed", "completed"),
+    Index("idx_userchallenge_user", "user_id"),
+)
+
+Table(
+    "login_streaks", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False, unique=True),
+    Column("current_streak", Integer, nullable=False),
+    Column("longest_streak", Integer, nullable=False),
+    Column("last_login_date", DateTime),
+    Column("total_logins", Integer, nullable=False),
+    Index("idx_loginstreak_user", "user_id"),
+)
+
+Table(
+    "crash_games", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("status", String(20), nullable=False),
+    Column("crash_point", Float),
+    Column("server_seed", String(64), nullable=False),
+    Column("server_seed_hash", String(64), nullable=False),
+    Column("started_at", DateTime),
+    Column("crashed_at", DateTime),
+    Column("completed_at", DateTime),
+    Column("total_bets", Integer, nullable=False),
+    Column("total_wagered", Integer, nullable=False),
+    Column("total_paid_out", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_crash_game_created", "created_at"),
+    Index("idx_crash_game_status", "status"),
+)
+
+Table(
+    "crash_bets", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("game_id", Integer, ForeignKey("crash_games.id"), nullable=False),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("bet_amount", Integer, nullable=False),
+    Column("cashout_at", Float),
+    Column("profit", Integer, nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("placed_at", DateTime, nullable=False),
+    Column("cashed_out_at", DateTime),
+    Index("idx_crash_bet_game", "game_id"),
+    Index("idx_crash_bet_status", "status"),
+    Index("idx_crash_bet_user", "user_id"),
+)
+
+Table(
+    "friendships", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("friend_id", String, ForeignKey("users.id"), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_friendship_friend", "friend_id"),
+    Index("idx_friendship_unique", "user_id", "friend_id", unique=True),
+    Index("idx_friendship_user", "user_id"),
+)
+
+Table(
+    "friend_requests", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("sender_id", String, ForeignKey("users.id"), nullable=False),
+    Column("receiver_id", String, ForeignKey("users.id"), nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("responded_at", DateTime),
+    Index("idx_friend_request_receiver", "receiver_id"),
+    Index("idx_friend_request_sender", "sender_id"),
+    Index("idx_friend_request_status", "status"),
+)
+
+Table(
+    "private_messages", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("sender_id", String, ForeignKey("users.id"), nullable=False),
+    Column("receiver_id", String, ForeignKey("users.id"), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("read", Boolean, nullable=False),
+    Column("read_at", DateTime),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_private_message_created", "created_at"),
+    Index("idx_private_message_read", "read"),
+    Index("idx_private_message_receiver", "receiver_id"),
+    Index("idx_private_message_sender", "sender_id"),
+)
+
+Table(
+    "activity_feed", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("activity_type", String(50), nullable=False),
+    Column("title", String(200), nullable=False),
+    Column("description", Text),
+    Column("data", Text),
+    Column("is_public", Boolean, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_activity_feed_created", "created_at"),
+    Index("idx_activity_feed_public", "is_public"),
+    Index("idx_activity_feed_type", "activity_type"),
+    Index("idx_activity_feed_user", "user_id"),
+)
+
+Table(
+    "user_profiles", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False, unique=True),
+    Column("bio", Text),
+    Column("avatar_url", String(500)),
+    Column("banner_url", String(500)),
+    Column("location", String(100)),
+    Column("website", String(200)),
+    Column("profile_public", Boolean, nullable=False),
+    Column("show_stats", Boolean, nullable=False),
+    Column("show_activity", Boolean, nullable=False),
+    Column("is_online", Boolean, nullable=False),
+    Column("last_seen", DateTime),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime),
+    Index("idx_user_profile_online", "is_online"),
+    Index("idx_user_profile_user", "user_id"),
+)
+
+
+async def upgrade(conn):
+    await conn.run_sync(metadata.create_all)
@@ -0,0 +1,17 @@
+"""
+Link roulette bets to server-managed rounds (game_bets.round_id).
+
+Converted from 002_add_roulette_rounds.sql / run_migration_002.py. SQLite
+cannot add a column with a foreign key, so the column is added plain and the
+ORM relationship enforces it, as before.
+"""
+
+from database.migrations.ops import add_column, create_index
+
+# Index builds CONCURRENTLY on PostgreSQL
+TRANSACTIONAL = False
+
+
+async def upgrade(conn):
+    await add_column(conn, "game_bets", "round_id", "VARCHAR(36)")
+    await create_index(conn, "idx_gamebet_round_id", "game_bets", ["round_id"])
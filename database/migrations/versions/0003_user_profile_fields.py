@@ -0,0 +1,14 @@
+"""
+Profile columns on users: avatar_url, bio, profile_theme.
+
+Converted from database/migrate_add_profile_fields.py (SQLite) and
+migrations/add_profile_fields_postgres.py (PostgreSQL).
+"""
+
+from database.migrations.ops import add_column
+
+
+async def upgrade(conn):
+    await add_column(conn, "users", "avatar_url", "VARCHAR(500)")
+    await add_column(conn, "users", "bio", "VARCHAR(500)")
+    await add_column(conn, "users", "profile_theme", "VARCHAR(50)", default="'purple'")
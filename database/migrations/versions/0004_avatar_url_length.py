@@ -0,0 +1,27 @@
+"""
+Widen users.avatar_url to VARCHAR(100000) for base64 data URLs.
+
+Converted from migrations/increase_avatar_url_length.py. PostgreSQL only;
+SQLite does not enforce VARCHAR lengths.
+"""
+
+from sqlalchemy import inspect, text
+
+from database.migrations.ops import is_postgresql
+
+AVATAR_URL_LENGTH = 100000
+
+
+async def upgrade(conn):
+    if not is_postgresql(conn):
+        return
+
+    def _current_length(sync_conn):
+        for column in inspect(sync_conn).get_columns("users"):
+            if column["name"] == "avatar_url":
+                return getattr(column["type"], "length", None)
+        return None
+
+    length = await conn.run_sync(_current_length)
+    if length is not None and length < AVATAR_URL_LENGTH:
+        await conn.execute(text(f"ALTER TABLE users ALTER COLUMN avatar_url TYPE VARCHAR({AVATAR_URL_LENGTH})"))
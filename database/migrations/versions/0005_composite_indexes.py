@@ -0,0 +1,26 @@
+"""
+Composite indexes for hot multi-column lookups.
+
+Found with benchmarks/index_advisor.py and by reading the query sites:
+spin_wheel settlement, gem order matching, crash bet/cashout lookups,
+unread message counts and conversation views, per-user mini-game history.
+"""
+
+from database.migrations.ops import create_index
+
+# Index builds CONCURRENTLY on PostgreSQL
+TRANSACTIONAL = False
+
+INDEXES = (
+    ("idx_gamebet_session_winner", "game_bets", ("game_session_id", "is_winner")),
+    ("idx_trade_orders_book", "gem_trade_orders", ("order_type", "status", "price", "created_at")),
+    ("idx_crash_bet_game_user_status", "crash_bets", ("game_id", "user_id", "status")),
+    ("idx_private_message_receiver_read", "private_messages", ("receiver_id", "read")),
+    ("idx_private_message_conversation", "private_messages", ("sender_id", "receiver_id", "created_at")),
+    ("idx_minigames_user_played", "mini_games", ("user_id", "played_at")),
+)
+
+
+async def upgrade(conn):
+    for name, table, columns in INDEXES:
+        await create_index(conn, name, table, columns)
@@ -0,0 +1,29 @@
+"""
+daily_user_summaries: per-user daily roll-ups written by the data lifecycle
+job (services/data_lifecycle.py) before it deletes expired history rows.
+"""
+
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table
+
+from database.migrations.ops import create_tables
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", String, primary_key=True))
+
+daily_user_summaries = Table(
+    "daily_user_summaries", metadata,
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("source", String(30), primary_key=True),
+    Column("kind", String(50), primary_key=True),
+    Column("row_count", Integer, nullable=False),
+    Column("amount_total", Float, nullable=False),
+    Column("payout_total", Float, nullable=False),
+    Column("updated_at", DateTime),
+    Index("idx_daily_summary_user_source", "user_id", "source"),
+)
+
+
+async def upgrade(conn):
+    await create_tables(conn, daily_user_summaries)
@@ -0,0 +1,22 @@
+"""
+Monthly RANGE partitions for transactions (created_at) and game_bets
+(created_at). PostgreSQL only.
+
+Expired months are archived and dropped whole by the data lifecycle job
+instead of being deleted row by row. The tables are rebuilt and copied in
+one transaction, so expect this to take a while on a large database. The
+foreign keys from crypto_transactions / stock_transactions.wallet_transaction_id
+are dropped; the column stays as a plain reference.
+"""
+
+from database.migrations.ops import partition_by_month
+
+PARTITIONED_TABLES = (
+    ("transactions", "created_at"),
+    ("game_bets", "created_at"),
+)
+
+
+async def upgrade(conn):
+    for table, column in PARTITIONED_TABLES:
+        await partition_by_month(conn, table, column)
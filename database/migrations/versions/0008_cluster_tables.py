@@ -0,0 +1,30 @@
+"""
+cluster_leases and cluster_state: leader election and shared state for
+running several uvicorn workers (services/cluster.py).
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, MetaData, String, Table, Text
+
+from database.migrations.ops import create_tables
+
+metadata = MetaData()
+
+cluster_leases = Table(
+    "cluster_leases", metadata,
+    Column("name", String(100), primary_key=True),
+    Column("holder", String(200), nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+)
+
+cluster_state = Table(
+    "cluster_state", metadata,
+    Column("key", String(200), primary_key=True),
+    Column("value", Text),
+    Column("counter", BigInteger, nullable=False),
+    Column("expires_at", DateTime),
+    Index("idx_cluster_state_expires", "expires_at"),
+)
+
+
+async def upgrade(conn):
+    await create_tables(conn, cluster_leases, cluster_state)
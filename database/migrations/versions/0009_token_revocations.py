@@ -0,0 +1,25 @@
+"""
+token_revocations: logged-out tokens and per-user revocations for the
+in-memory revocation list (services/auth_tokens.py).
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table
+
+from database.migrations.ops import create_tables
+
+metadata = MetaData()
+
+token_revocations = Table(
+    "token_revocations", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, nullable=False),
+    Column("token_id", String(64)),
+    Column("revoked_at", DateTime, nullable=False),
+    Column("expires_at", DateTime),
+    Index("idx_token_revocations_expires_at", "expires_at"),
+    Index("idx_token_revocations_revoked_at", "revoked_at"),
+)
+
+
+async def upgrade(conn):
+    await create_tables(conn, token_revocations)
@@ -0,0 +1,42 @@
+"""
+fairness_chains and the seed references on crash_games, roulette_rounds and
+mini_games: provably fair seeds from precomputed hash chains
+(services/fairness.py).
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table
+
+from database.migrations.ops import add_column, create_index, create_tables
+
+metadata = MetaData()
+
+fairness_chains = Table(
+    "fairness_chains", metadata,
+    Column("id", String(32), primary_key=True),
+    Column("purpose", String(20), nullable=False),
+    Column("anchor", String(64), nullable=False),
+    Column("length", Integer, nullable=False),
+    Column("next_index", Integer, nullable=False),
+    Column("owner", String(200)),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_fairness_chains_purpose", "purpose", "owner"),
+)
+
+SEED_COLUMNS = (
+    ("crash_games", "fairness_chain_id", "VARCHAR(32)"),
+    ("crash_games", "fairness_index", "INTEGER"),
+    ("roulette_rounds", "server_seed", "VARCHAR(64)"),
+    ("roulette_rounds", "fairness_chain_id", "VARCHAR(32)"),
+    ("roulette_rounds", "fairness_index", "INTEGER"),
+    ("mini_games", "server_seed", "VARCHAR(64)"),
+    ("mini_games", "fairness_chain_id", "VARCHAR(32)"),
+    ("mini_games", "fairness_index", "INTEGER"),
+)
+
+
+async def upgrade(conn):
+    await create_tables(conn, fairness_chains)
+    for table, column, ddl_type in SEED_COLUMNS:
+        await add_column(conn, table, column, ddl_type)
+    await create_index(conn, "idx_crash_game_fairness", "crash_games", ("fairness_chain_id", "fairness_index"))
+    await create_index(conn, "idx_minigames_fairness", "mini_games", ("fairness_chain_id", "fairness_index"))
@@ -0,0 +1,26 @@
+"""
+stock_candles: persistent OHLC bars behind the stock charts, topped up
+incrementally by services/stock_candles.py.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, MetaData, String, Table
+
+from database.migrations.ops import create_tables
+
+metadata = MetaData()
+
+stock_candles = Table(
+    "stock_candles", metadata,
+    Column("ticker", String(10), primary_key=True),
+    Column("interval", String(5), primary_key=True),
+    Column("ts", DateTime, primary_key=True),
+    Column("open", Float, nullable=False),
+    Column("high", Float, nullable=False),
+    Column("low", Float, nullable=False),
+    Column("close", Float, nullable=False),
+    Column("volume", BigInteger, nullable=False),
+)
+
+
+async def upgrade(conn):
+    await create_tables(conn, stock_candles)
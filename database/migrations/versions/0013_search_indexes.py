@@ -0,0 +1,39 @@
+"""
+Indexes behind services/search_index.py: users by creation time for the
+incremental index refresh and, on PostgreSQL with pg_trgm available,
+trigram GIN indexes for the SEARCH_BACKEND=database ILIKE queries.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from database.migrations.ops import create_index, is_postgresql
+
+logger = logging.getLogger(__name__)
+
+# Index builds CONCURRENTLY on PostgreSQL
+TRANSACTIONAL = False
+
+TRIGRAM_INDEXES = (
+    ("idx_users_username_trgm", "users", "username"),
+    ("idx_cryptocurrencies_symbol_trgm", "cryptocurrencies", "symbol"),
+    ("idx_cryptocurrencies_name_trgm", "cryptocurrencies", "name"),
+    ("idx_stock_metadata_ticker_trgm", "stock_metadata", "ticker"),
+    ("idx_stock_metadata_company_trgm", "stock_metadata", "company_name"),
+)
+
+
+async def upgrade(conn):
+    await create_index(conn, "idx_users_created_at", "users", ("created_at",))
+
+    if not is_postgresql(conn):
+        return
+    try:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except Exception as e:
+        # Needs a role allowed to create extensions; search works without it
+        logger.warning("pg_trgm unavailable, skipping trigram indexes: %s", e)
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        await create_index(conn, name, table, (f"{column} gin_trgm_ops",), using="gin")
@@ -0,0 +1,71 @@
+"""
+conversations: per-participant last message and unread count for private
+messages, kept current on send and read (services/social_service.py) and
+backfilled here from private_messages.
+"""
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text, case, column, func,
+    literal, select, table, union_all
+)
+
+from database.migrations.ops import create_tables
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", String, primary_key=True))
+
+conversations = Table(
+    "conversations", metadata,
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("other_user_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("last_message_id", Integer, nullable=False),
+    Column("last_message", Text, nullable=False),
+    Column("last_sender_id", String, nullable=False),
+    Column("last_at", DateTime, nullable=False),
+    Column("unread_count", Integer, nullable=False),
+    Index("idx_conversation_user_last", "user_id", "last_at"),
+)
+
+private_messages = table(
+    "private_messages",
+    column("id", Integer), column("sender_id", String), column("receiver_id", String),
+    column("message", Text), column("read", Boolean), column("created_at", DateTime)
+)
+
+
+async def upgrade(conn):
+    await create_tables(conn, conversations)
+
+    messages = private_messages.c
+    sides = union_all(
+        select(
+            messages.sender_id.label("user_id"),
+            messages.receiver_id.label("other_user_id"),
+            messages.id.label("message_id"),
+            literal(0).label("unread")
+        ),
+        select(messages.receiver_id, messages.sender_id, messages.id, case((messages.read == False, 1), else_=0))
+    ).subquery()
+    pairs = (
+        select(
+            sides.c.user_id,
+            sides.c.other_user_id,
+            func.max(sides.c.message_id).label("last_id"),
+            func.sum(sides.c.unread).label("unread")
+        )
+        .group_by(sides.c.user_id, sides.c.other_user_id)
+        .subquery()
+    )
+
+    await conn.execute(conversations.delete())
+    await conn.execute(conversations.insert().from_select(
+        ["user_id", "other_user_id", "last_message_id", "last_message",
+         "last_sender_id", "last_at", "unread_count"],
+        select(
+            pairs.c.user_id, pairs.c.other_user_id, messages.id, messages.message,
+            messages.sender_id, messages.created_at, pairs.c.unread
+        )
+        .select_from(pairs)
+        .join(private_messages, messages.id == pairs.c.last_id)
+    ))
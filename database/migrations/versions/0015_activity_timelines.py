@@ -0,0 +1,104 @@
+"""
+timeline_heads, timeline_entries and timeline_pull_authors: fan-out-on-write
+friends' activity timelines (services/timeline_service.py), built here from
+friendships and activity_feed with the same TIMELINE_MAX_ENTRIES and
+TIMELINE_FANOUT_LIMIT settings as the service.
+"""
+
+import os
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, column, func, literal, select,
+    table
+)
+
+from database.migrations.ops import create_index, create_tables
+
+TIMELINE_MAX_ENTRIES = int(os.getenv("TIMELINE_MAX_ENTRIES", "500"))
+TIMELINE_FANOUT_LIMIT = int(os.getenv("TIMELINE_FANOUT_LIMIT", "1000"))
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", String, primary_key=True))
+
+timeline_heads = Table(
+    "timeline_heads", metadata,
+    Column("owner_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("seq", Integer, nullable=False),
+)
+
+timeline_entries = Table(
+    "timeline_entries", metadata,
+    Column("owner_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("slot", Integer, primary_key=True),
+    Column("activity_id", Integer, nullable=False),
+    Column("author_id", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("idx_timeline_owner_activity", "owner_id", "activity_id"),
+)
+
+timeline_pull_authors = Table(
+    "timeline_pull_authors", metadata,
+    Column("user_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("follower_count", Integer, nullable=False),
+    Column("marked_at", DateTime, nullable=False),
+)
+
+friendships = table("friendships", column("user_id", String), column("friend_id", String))
+
+activity_feed = table(
+    "activity_feed",
+    column("id", Integer), column("user_id", String), column("is_public", Boolean), column("created_at", DateTime)
+)
+
+
+async def upgrade(conn):
+    await create_tables(conn, timeline_heads, timeline_entries, timeline_pull_authors)
+    await create_index(conn, "idx_activity_feed_user_id", "activity_feed", ("user_id", "id"))
+
+    follower_counts = (
+        select(friendships.c.friend_id.label("user_id"), func.count().label("followers"))
+        .group_by(friendships.c.friend_id)
+        .subquery()
+    )
+    await conn.execute(timeline_entries.delete())
+    await conn.execute(timeline_heads.delete())
+    await conn.execute(timeline_pull_authors.delete())
+    await conn.execute(timeline_pull_authors.insert().from_select(
+        ["user_id", "follower_count", "marked_at"],
+        select(follower_counts.c.user_id, follower_counts.c.followers, literal(datetime.utcnow()))
+        .where(follower_counts.c.followers > TIMELINE_FANOUT_LIMIT)
+    ))
+
+    ranked = (
+        select(
+            friendships.c.user_id.label("owner_id"),
+            activity_feed.c.id.label("activity_id"),
+            activity_feed.c.user_id.label("author_id"),
+            activity_feed.c.created_at.label("created_at"),
+            func.row_number().over(
+                partition_by=friendships.c.user_id, order_by=activity_feed.c.id.desc()
+            ).label("newest_first")
+        )
+        .join(activity_feed, activity_feed.c.user_id == friendships.c.friend_id)
+        .where(
+            activity_feed.c.is_public == True,
+            friendships.c.friend_id.not_in(select(timeline_pull_authors.c.user_id))
+        )
+        .subquery()
+    )
+    kept = (
+        select(ranked, func.count().over(partition_by=ranked.c.owner_id).label("kept"))
+        .where(ranked.c.newest_first <= TIMELINE_MAX_ENTRIES)
+        .subquery()
+    )
+    await conn.execute(timeline_entries.insert().from_select(
+        ["owner_id", "slot", "activity_id", "author_id", "created_at"],
+        select(kept.c.owner_id, kept.c.kept - kept.c.newest_first, kept.c.activity_id, kept.c.author_id, kept.c.created_at)
+    ))
+    # The next push goes to slot kept % max: the oldest entry once the ring is full
+    await conn.execute(timeline_heads.insert().from_select(
+        ["owner_id", "seq"],
+        select(timeline_entries.c.owner_id, func.max(timeline_entries.c.slot)).group_by(timeline_entries.c.owner_id)
+    ))
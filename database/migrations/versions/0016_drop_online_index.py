@@ -0,0 +1,17 @@
+"""
+Online status moved to the in-memory presence tracker (services/presence.py):
+drop the index on user_profiles.is_online, which churned on every status
+change, and clear the flag that is no longer maintained.
+"""
+
+from sqlalchemy import text
+
+from database.migrations.ops import drop_index
+
+# Index drops CONCURRENTLY on PostgreSQL
+TRANSACTIONAL = False
+
+
+async def upgrade(conn):
+    await drop_index(conn, "idx_user_profile_online")
+    await conn.execute(text("UPDATE user_profiles SET is_online = false WHERE is_online"))
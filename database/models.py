@@ -90,6 +90,7 @@ class TransactionType(Enum):
     MINIGAME_WIN = "MINIGAME_WIN"  # Mini-game win payout
     CRASH_BET = "CRASH_BET"      # Crash game bet placed
     CRASH_WIN = "CRASH_WIN"      # Crash game cashout payout
+    CRASH_REFUND = "CRASH_REFUND"  # Crash bet returned from an interrupted round
 
 class BetType(Enum):
     """Types of roulette bets."""
@@ -188,6 +189,10 @@ class User(Base):
     activity_feed = relationship("ActivityFeed", back_populates="user")
     profile = relationship("UserProfile", back_populates="user", uselist=False)
 
+    __table_args__ = (
+        Index('idx_users_created_at', 'created_at'),  # Search index refresh reads new users by creation time
+    )
+
     def set_password(self, password: str):
         """Hash and set password."""
         self.password_hash = pwd_context.hash(password)
@@ -213,6 +218,25 @@ class User(Base):
             "bot_personality": self.bot_personality
         }
 
+class TokenRevocation(Base):
+    """
+    Revoked access tokens. A row with token_id revokes that token (logout);
+    a row without one revokes every token of the user issued up to revoked_at.
+    """
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False)
+    token_id = Column(String(64), nullable=True)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True)  # When the revoked token would have expired anyway
+
+    __table_args__ = (
+        Index('idx_token_revocations_revoked_at', 'revoked_at'),
+        Index('idx_token_revocations_expires_at', 'expires_at'),
+    )
+
+
 class Wallet(Base):
     """User wallet for GEM balance."""
     __tablename__ = "wallets"
@@ -287,6 +311,24 @@ class Transaction(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
+class DailyUserSummary(Base):
+    """Per-user daily roll-up of history rows removed by the data lifecycle job."""
+    __tablename__ = "daily_user_summaries"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    source = Column(String(30), primary_key=True)  # Table the rows came from, e.g. 'transactions'
+    kind = Column(String(50), primary_key=True)  # transaction_type, bet_type, game_type or status
+
+    row_count = Column(Integer, default=0, nullable=False)
+    amount_total = Column(Float, default=0.0, nullable=False)  # Sum of the amount / stake column
+    payout_total = Column(Float, default=0.0, nullable=False)  # Sum of the payout / profit column
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_daily_summary_user_source', 'user_id', 'source'),
+    )
+
 class GameSession(Base):
     """Roulette game session."""
     __tablename__ = "game_sessions"
@@ -387,6 +429,11 @@ class RouletteRound(Base):
     outcome_color = Column(String(10))  # red/black/green
     outcome_crypto = Column(String(10))  # BTC, ETH, etc.
 
+    # Provably fair seed the outcome was derived from (services/fairness.py)
+    server_seed = Column(String(64), nullable=True)
+    fairness_chain_id = Column(String(32), nullable=True)
+    fairness_index = Column(Integer, nullable=True)
+
     # Who triggered the spin
     triggered_by = Column(String(36), ForeignKey('users.id'))
 
@@ -448,6 +495,7 @@ class GameBet(Base):
         Index('idx_gamebet_created_at', 'created_at'),
         Index('idx_gamebet_user_created', 'user_id', 'created_at'),  # Composite for user bet history
         Index('idx_gamebet_round_id', 'round_id'),  # For round-based queries
+        Index('idx_gamebet_session_winner', 'game_session_id', 'is_winner'),  # spin_wheel settlement
     )
 
     def calculate_payout(self, winning_number: int, winning_color: str, winning_crypto: str) -> tuple:
@@ -817,6 +865,19 @@ class StockPriceCache(Base):
             "data_source": self.data_source
         }
 
+class StockCandle(Base):
+    """OHLC bar of a stock's price history for charts (services/stock_candles.py)."""
+    __tablename__ = "stock_candles"
+
+    ticker = Column(String(10), primary_key=True)
+    interval = Column(String(5), primary_key=True)  # '1d'
+    ts = Column(DateTime, primary_key=True)  # Bar start, UTC
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(BigInteger, default=0, nullable=False)
+
 class StockHolding(Base):
     """User's stock holdings (owned shares)."""
     __tablename__ = "stock_holdings"
@@ -1249,6 +1310,7 @@ class GemTradeOrder(Base):
         Index('idx_trade_orders_status', 'status'),
         Index('idx_trade_orders_type', 'order_type'),
         Index('idx_trade_orders_price', 'price'),
+        Index('idx_trade_orders_book', 'order_type', 'status', 'price', 'created_at'),  # Order matching / book
     )
 
 
@@ -1308,6 +1370,11 @@ class MiniGame(Base):
     # Result
     won = Column(Boolean, nullable=False)  # True if won, False if lost
 
+    # Provably fair seed (services/fairness.py); an auto-play batch shares one seed
+    server_seed = Column(String(64), nullable=True)
+    fairness_chain_id = Column(String(32), nullable=True)
+    fairness_index = Column(Integer, nullable=True)
+
     # Timestamps
     played_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -1318,6 +1385,8 @@ class MiniGame(Base):
         Index('idx_minigames_user', 'user_id'),
         Index('idx_minigames_type', 'game_type'),
         Index('idx_minigames_played', 'played_at'),
+        Index('idx_minigames_user_played', 'user_id', 'played_at'),  # Per-user history
+        Index('idx_minigames_fairness', 'fairness_chain_id', 'fairness_index'),
     )
 
 
@@ -1336,8 +1405,8 @@ class MiniGameStats(Base):
     total_won = Column(Integer, default=0, nullable=False)
     net_profit = Column(Integer, default=0, nullable=False)
 
-    # Per-game stats (stored as JSON)
-    coinflip_stats = Column(Text, nullable=True)  # JSON: games, wins, profit
+    # Legacy per-game JSON totals; per-game stats now come from mini_game_daily_stats
+    coinflip_stats = Column(Text, nullable=True)
     dice_stats = Column(Text, nullable=True)
     higherlower_stats = Column(Text, nullable=True)
 
@@ -1363,6 +1432,28 @@ class MiniGameStats(Base):
     )
 
 
+class MiniGameDailyStats(Base):
+    """Per-user, per-game, per-day mini-game totals, incremented with an upsert after every play."""
+    __tablename__ = "mini_game_daily_stats"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    game_type = Column(String(50), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day of played_at
+
+    games = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    wagered = Column(Integer, default=0, nullable=False)
+    won = Column(Integer, default=0, nullable=False)  # Sum of payouts
+    profit = Column(Integer, default=0, nullable=False)
+    biggest_win = Column(Integer, default=0, nullable=False)
+    biggest_loss = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_minigame_daily_day', 'day', 'user_id'),  # Weekly/monthly leaderboard windows
+    )
+
+
 # ============================================================================
 # LEADERBOARDS & RANKINGS
 # ============================================================================
@@ -1498,12 +1589,14 @@ class CrashGame(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
 
     # Game state
-    status = Column(String(20), nullable=False, default='waiting')  # 'waiting', 'starting', 'playing', 'crashed', 'completed'
+    status = Column(String(20), nullable=False, default='waiting')  # 'waiting', 'starting', 'playing', 'crashed', 'completed', 'cancelled'
 
     # Crash point (provably fair)
     crash_point = Column(Float, nullable=True)  # Multiplier where game crashes (e.g., 2.45)
     server_seed = Column(String(64), nullable=False)  # For provable fairness
     server_seed_hash = Column(String(64), nullable=False)  # SHA256 hash shown before round
+    fairness_chain_id = Column(String(32), nullable=True)  # Seed chain and link the seed came from
+    fairness_index = Column(Integer, nullable=True)
 
     # Game timing
     started_at = Column(DateTime, nullable=True)
@@ -1524,6 +1617,7 @@ class CrashGame(Base):
     __table_args__ = (
         Index('idx_crash_game_status', 'status'),
         Index('idx_crash_game_created', 'created_at'),
+        Index('idx_crash_game_fairness', 'fairness_chain_id', 'fairness_index'),
     )
 
 
@@ -1541,7 +1635,7 @@ class CrashBet(Base):
     profit = Column(Integer, default=0, nullable=False)  # Net profit/loss
 
     # Status
-    status = Column(String(20), nullable=False, default='active')  # 'active', 'cashed_out', 'lost'
+    status = Column(String(20), nullable=False, default='active')  # 'active', 'cashed_out', 'lost', 'refunded'
 
     # Timestamps
     placed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1555,6 +1649,7 @@ class CrashBet(Base):
         Index('idx_crash_bet_game', 'game_id'),
         Index('idx_crash_bet_user', 'user_id'),
         Index('idx_crash_bet_status', 'status'),
+        Index('idx_crash_bet_game_user_status', 'game_id', 'user_id', 'status'),  # Bet/cashout lookups
     )
 
 
@@ -1638,6 +1733,32 @@ class PrivateMessage(Base):
         Index('idx_private_message_receiver', 'receiver_id'),
         Index('idx_private_message_read', 'read'),
         Index('idx_private_message_created', 'created_at'),
+        Index('idx_private_message_receiver_read', 'receiver_id', 'read'),  # Unread counts
+        Index('idx_private_message_conversation', 'sender_id', 'receiver_id', 'created_at'),  # Conversation view
+    )
+
+
+class Conversation(Base):
+    """
+    One participant's view of a private conversation: stored once per
+    participant, with the last message and that participant's unread count.
+    Written in the same transaction as the message it summarizes.
+    """
+    __tablename__ = "conversations"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    other_user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    # Last message, in either direction
+    last_message_id = Column(Integer, nullable=False)
+    last_message = Column(Text, nullable=False)
+    last_sender_id = Column(String, nullable=False)
+    last_at = Column(DateTime, nullable=False)
+
+    unread_count = Column(Integer, default=0, nullable=False)  # Messages from other_user_id not yet read
+
+    __table_args__ = (
+        Index('idx_conversation_user_last', 'user_id', 'last_at'),  # Recent conversations page
     )
 
 
@@ -1668,9 +1789,46 @@ class ActivityFeed(Base):
         Index('idx_activity_feed_type', 'activity_type'),
         Index('idx_activity_feed_created', 'created_at'),
         Index('idx_activity_feed_public', 'is_public'),
+        Index('idx_activity_feed_user_id', 'user_id', 'id'),  # Pulled timelines (newest first per author)
+    )
+
+
+class TimelineHead(Base):
+    """Write position of a user's timeline ring buffer (see TimelineEntry)."""
+    __tablename__ = "timeline_heads"
+
+    owner_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(Integer, default=0, nullable=False)  # Entries ever pushed, minus one
+
+
+class TimelineEntry(Base):
+    """
+    A friend's activity in a user's timeline. Each user has a fixed number of
+    slots (TIMELINE_MAX_ENTRIES); the next entry overwrites slot
+    (seq + 1) % max, so the table holds at most that many rows per user.
+    """
+    __tablename__ = "timeline_entries"
+
+    owner_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    activity_id = Column(Integer, nullable=False)
+    author_id = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)  # Of the activity
+
+    __table_args__ = (
+        Index('idx_timeline_owner_activity', 'owner_id', 'activity_id'),  # Keyset pages
     )
 
 
+class TimelinePullAuthor(Base):
+    """Authors with too many followers to fan out to; their followers read their activities directly."""
+    __tablename__ = "timeline_pull_authors"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    follower_count = Column(Integer, nullable=False)
+    marked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class UserProfile(Base):
     """Extended user profile information."""
     __tablename__ = "user_profiles"
@@ -1690,7 +1848,8 @@ class UserProfile(Base):
     show_stats = Column(Boolean, default=True, nullable=False)
     show_activity = Column(Boolean, default=True, nullable=False)
 
-    # Online status
+    # Online status: tracked in memory by services/presence.py, which flushes
+    # last_seen here in batches. is_online is no longer written.
     is_online = Column(Boolean, default=False, nullable=False)
     last_seen = Column(DateTime, nullable=True)
 
@@ -1703,5 +1862,55 @@ class UserProfile(Base):
 
     __table_args__ = (
         Index('idx_user_profile_user', 'user_id'),
-        Index('idx_user_profile_online', 'is_online'),
+    )
+
+
+# ============================================================================
+# MULTI-WORKER COORDINATION
+# ============================================================================
+
+class ClusterLease(Base):
+    """Named lease held by one worker at a time (leader election, see services/cluster.py)."""
+    __tablename__ = "cluster_leases"
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(200), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class ClusterState(Base):
+    """Shared key/value state with expiry for multi-worker deployments."""
+    __tablename__ = "cluster_state"
+
+    key = Column(String(200), primary_key=True)
+    value = Column(Text, nullable=True)  # JSON
+    counter = Column(BigInteger, default=0, nullable=False)
+    expires_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_cluster_state_expires', 'expires_at'),
+    )
+
+
+# ============================================================================
+# PROVABLY FAIR SEEDS
+# ============================================================================
+
+class FairnessChain(Base):
+    """
+    Precomputed SHA-256 seed chain (services/fairness.py). The links live in
+    a file; this row publishes the anchor and tracks how far the chain is used.
+    """
+    __tablename__ = "fairness_chains"
+
+    id = Column(String(32), primary_key=True)
+    purpose = Column(String(20), nullable=False)  # 'crash', 'roulette', 'minigames'
+    anchor = Column(String(64), nullable=False)  # link 0 (hex), published before any seed is used
+    length = Column(Integer, nullable=False)  # Usable links 1..length
+    next_index = Column(Integer, nullable=False, default=1)  # First link not yet handed out
+    owner = Column(String(200), nullable=True)  # Worker consuming the chain, NULL when free
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_fairness_chains_purpose', 'purpose', 'owner'),
     )
@@ -0,0 +1,201 @@
+"""
+Single-writer queue with group commit for SQLite production mode.
+
+SQLite allows one writer at a time. Instead of letting every request open its
+own write transaction and fight over the lock (the old "database is locked"
+retry loops), small write jobs are submitted here and executed one after
+another on the dedicated writer connection. Jobs that arrive while a commit
+is in flight are batched into the next transaction, each inside its own
+SAVEPOINT, and committed together, so N concurrent bets cost one fsync
+instead of N.
+
+On PostgreSQL (or with SQLITE_PRODUCTION_MODE=false) submit() simply runs the
+job in its own session and commits, so call sites are the same everywhere.
+
+Jobs must only use the session they are given: awaiting another write
+transaction from inside a job would wait on the writer it is running on.
+
+A job submitted by a task whose session already holds the write lock (it
+wrote, then called e.g. portfolio_manager.process_win) runs inline in that
+session under a SAVEPOINT and commits with it; queueing it would wait for
+the lock its own caller holds. The writer also stops waiting for the lock
+after SQLITE_WRITE_LOCK_TIMEOUT and leaves the rest to busy_timeout.
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import (
+    AsyncSessionLocal, WriterSessionLocal, SQLITE_PRODUCTION_MODE, SQLITE_WRITE_LOCK_TIMEOUT,
+    sqlite_write_lock, write_lock_holder
+)
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+
+write_batch_size = registry.histogram(
+    "db_write_batch_size", "Write jobs committed per group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+write_queue_jobs_total = registry.counter(
+    "db_write_queue_jobs_total", "Write jobs executed by the write queue, by outcome (ok, inline, error).",
+    ("outcome",)
+)
+
+
+class WriteQueue:
+    """Serializes write jobs onto one connection and commits them in groups."""
+
+    def __init__(
+        self,
+        enabled: bool = SQLITE_PRODUCTION_MODE,
+        max_batch: int = WRITE_QUEUE_MAX_BATCH,
+        lock_timeout: float = SQLITE_WRITE_LOCK_TIMEOUT
+    ):
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.lock_timeout = lock_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        registry.gauge(
+            "db_write_queue_depth", "Write jobs waiting for the writer connection.",
+            callback=lambda: self._queue.qsize() if self._queue else 0
+        )
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # (Re)bind to the running loop, e.g. after a test or benchmark restarts it
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, job: WriteJob) -> T:
+        """
+        Run `job(session)` in a write transaction and return its result once
+        committed, or, inside a session holding the write lock, once it has
+        run in that session's transaction.
+        """
+        holder = write_lock_holder.get()
+        if self.enabled and holder is not None and holder._holds_write_lock:
+            try:
+                async with holder.begin_nested():
+                    result = await job(holder)
+            except Exception:
+                write_queue_jobs_total.inc(1, "error")
+                raise
+            write_queue_jobs_total.inc(1, "inline")
+            return result
+
+        if not self.enabled:
+            async with AsyncSessionLocal() as session:
+                try:
+                    result = await job(session)
+                    await session.commit()
+                    write_queue_jobs_total.inc(1, "ok")
+                    return result
+                except Exception:
+                    await session.rollback()
+                    write_queue_jobs_total.inc(1, "error")
+                    raise
+
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def stop(self):
+        """Cancel the writer task; queued jobs are failed."""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Write queue stopped"))
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._execute_batch(batch)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Write queue stopped"))
+                raise
+            except Exception as e:
+                logger.exception("Write batch failed: %s", e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _execute_batch(self, batch: List[Tuple[WriteJob, asyncio.Future]]):
+        try:
+            await asyncio.wait_for(sqlite_write_lock.acquire(), timeout=self.lock_timeout)
+        except asyncio.TimeoutError:
+            # Same fallback as SQLiteWriteSession: BEGIN IMMEDIATE waits on busy_timeout
+            logger.warning("Write queue timed out waiting for the SQLite write lock; falling back to busy_timeout")
+            await self._execute_batch_locked(batch)
+            return
+        try:
+            await self._execute_batch_locked(batch)
+        finally:
+            sqlite_write_lock.release()
+
+    async def _execute_batch_locked(self, batch: List[Tuple[WriteJob, asyncio.Future]]):
+        completed: List[Tuple[asyncio.Future, Any]] = []
+
+        async with WriterSessionLocal() as session:
+            for job, future in batch:
+                if future.cancelled():
+                    continue
+                try:
+                    async with session.begin_nested():
+                        result = await job(session)
+                    completed.append((future, result))
+                except Exception as e:
+                    write_queue_jobs_total.inc(1, "error")
+                    future.set_exception(e)
+
+            if completed:
+                try:
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    for future, _ in completed:
+                        write_queue_jobs_total.inc(1, "error")
+                        if not future.done():
+                            future.set_exception(e)
+                    logger.error("Group commit of %s jobs failed: %s", len(completed), e)
+                    return
+            else:
+                await session.rollback()
+
+        write_batch_size.observe(len(completed))
+        for future, result in completed:
+            write_queue_jobs_total.inc(1, "ok")
+            if not future.done():
+                future.set_result(result)
+
+
+# Global write queue
+write_queue = WriteQueue()
@@ -0,0 +1,691 @@
+"""
+Vectorized Bot Engine
+Keeps the whole bot population in compact NumPy arrays and plays every bot
+in a round with a handful of bulk statements instead of per-bot DB calls.
+"""
+
+import logging
+import os
+import uuid
+import hashlib
+import secrets
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select, insert, update, bindparam, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import AsyncSessionLocal
+from database.models import (
+    User, Wallet, GameSession, GameBet, Transaction, TransactionType,
+    GameStatus, BetType, BotPersonalityType, BOT_PROFILE_DATA
+)
+from gaming.roulette import CryptoRouletteEngine
+
+logger = logging.getLogger(__name__)
+
+
+# Betting profile per personality (GEM amounts ~ USD equivalent)
+PERSONALITY_PROFILES = {
+    BotPersonalityType.CONSERVATIVE: {
+        "min_bet": 10000, "max_bet": 50000, "bet_frequency": 0.6,
+        "strategy_preference": ["red_black", "even_odd"], "risk_tolerance": 0.3
+    },
+    BotPersonalityType.AGGRESSIVE: {
+        "min_bet": 50000, "max_bet": 250000, "bet_frequency": 0.8,
+        "strategy_preference": ["single_number", "color", "category"], "risk_tolerance": 0.8
+    },
+    BotPersonalityType.TREND_FOLLOWER: {
+        "min_bet": 20000, "max_bet": 120000, "bet_frequency": 0.7,
+        "strategy_preference": ["red_black", "even_odd", "high_low"], "risk_tolerance": 0.5
+    },
+    BotPersonalityType.OPPORTUNISTIC: {
+        "min_bet": 30000, "max_bet": 180000, "bet_frequency": 0.5,
+        "strategy_preference": ["single_number", "color"], "risk_tolerance": 0.6
+    },
+    BotPersonalityType.PREDICTABLE_GAMBLER: {
+        "min_bet": 15000, "max_bet": 80000, "bet_frequency": 0.9,
+        "strategy_preference": ["even_odd"], "risk_tolerance": 0.4
+    },
+    BotPersonalityType.HIGHROLLER: {
+        "min_bet": 100000, "max_bet": 1000000, "bet_frequency": 0.4,
+        "strategy_preference": ["single_number", "category"], "risk_tolerance": 0.9
+    },
+    BotPersonalityType.TIMID: {
+        "min_bet": 5000, "max_bet": 25000, "bet_frequency": 0.2,
+        "strategy_preference": ["red_black", "high_low"], "risk_tolerance": 0.1
+    },
+}
+
+PERSONALITIES = list(BotPersonalityType)
+
+# Strategy name -> bet type code ("color" is a focused red/black bet)
+STRATEGY_CODES = {
+    "single_number": 0,
+    "red_black": 1,
+    "even_odd": 2,
+    "high_low": 3,
+    "color": 1,
+    "category": 4,
+}
+
+BET_TYPES = [
+    BetType.SINGLE_NUMBER,
+    BetType.RED_BLACK,
+    BetType.EVEN_ODD,
+    BetType.HIGH_LOW,
+    BetType.CRYPTO_CATEGORY,
+]
+
+BINARY_BET_VALUES = {
+    1: ["red", "black"],
+    2: ["even", "odd"],
+    3: ["high", "low"],
+}
+
+CRASH_BET_AMOUNTS = np.array([100, 250, 500, 1000, 2000, 2500, 3000, 5000], dtype=np.int64)
+
+BOT_STARTING_BALANCE = 500000.0
+
+
+@dataclass
+class RoundBets:
+    """Bets drawn for one round, stored column-wise."""
+    bot_idx: np.ndarray
+    bet_type: np.ndarray
+    bet_value: np.ndarray
+    amount: np.ndarray
+    bet_ids: List[str]
+
+    def __len__(self) -> int:
+        return len(self.bet_ids)
+
+
+@dataclass
+class RoundSettlement:
+    """
+    Bot results of a settled round. The caller runs apply() after committing
+    the transaction the results were written in; until then the round stays
+    pending, so a rolled-back settlement can simply be settled again.
+    """
+    engine: "BotEngine"
+    round_id: str
+    bets: Optional[RoundBets] = None
+    won: Optional[np.ndarray] = None
+    payout: Optional[np.ndarray] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.bets) if self.bets is not None else 0
+
+    @property
+    def winnings(self) -> float:
+        return float(self.payout.sum()) if self.count else 0.0
+
+    @property
+    def losses(self) -> float:
+        return float(self.bets.amount[~self.won].sum()) if self.count else 0.0
+
+    def apply(self):
+        self.engine._apply_settlement(self)
+
+
+class BotEngine:
+    """
+    Population-wide bot simulation.
+
+    All per-bot state lives in parallel arrays indexed by bot position:
+    balances, personality codes and loss streaks. Each round draws every
+    bot's decision at once from a single NumPy generator, which also makes
+    runs reproducible when a seed is given.
+    """
+
+    def __init__(self, seed: Optional[int] = None, round_betting: bool = False):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.round_betting = round_betting
+
+        # Personality tables indexed by personality code
+        profiles = [PERSONALITY_PROFILES[p] for p in PERSONALITIES]
+        self.min_bet = np.array([p["min_bet"] for p in profiles], dtype=np.float64)
+        self.max_bet = np.array([p["max_bet"] for p in profiles], dtype=np.float64)
+        self.bet_frequency = np.array([p["bet_frequency"] for p in profiles], dtype=np.float64)
+        max_prefs = max(len(p["strategy_preference"]) for p in profiles)
+        self.strategy_count = np.array([len(p["strategy_preference"]) for p in profiles], dtype=np.int64)
+        self.strategy_table = np.zeros((len(profiles), max_prefs), dtype=np.int8)
+        for i, profile in enumerate(profiles):
+            for j, strategy in enumerate(profile["strategy_preference"]):
+                self.strategy_table[i, j] = STRATEGY_CODES[strategy]
+
+        # Wheel categories and payouts come from the roulette engine
+        wheel = CryptoRouletteEngine()
+        self.categories = sorted({slot["category"].lower() for slot in wheel.crypto_wheel.values()})
+        self.payout_multipliers = np.array([wheel.payouts[t] for t in BET_TYPES], dtype=np.float64)
+        # Number of possible values per bet type code (a value is an index)
+        self.bet_value_counts = np.array([37, 2, 2, 2, len(self.categories)], dtype=np.int64)
+
+        # Population state
+        self.user_ids: List[str] = []
+        self.usernames: List[str] = []
+        self.session_ids: List[Optional[str]] = []
+        self.personality = np.zeros(0, dtype=np.int8)
+        self.balances = np.zeros(0, dtype=np.float64)
+        self.lose_streak = np.zeros(0, dtype=np.int32)
+        self._index: Dict[str, int] = {}
+        self._pending: Dict[str, RoundBets] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.user_ids)
+
+    def reseed(self, seed: Optional[int]):
+        """Reset the generator, e.g. at the start of a load test."""
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def get_balance(self, user_id: str) -> float:
+        """Return the in-memory balance of a bot."""
+        idx = self._index.get(user_id)
+        return float(self.balances[idx]) if idx is not None else 0.0
+
+    # ==================== POPULATION ====================
+
+    async def ensure_population(self, num_bots: int) -> int:
+        """Create missing bot users and wallets in bulk. Returns bots created."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(func.count(User.id)).where(User.is_bot == True)
+            )
+            existing = result.scalar() or 0
+            needed = num_bots - existing
+            if needed <= 0:
+                return 0
+
+            candidates = self._candidate_usernames(existing + needed * 2)
+            taken = set()
+            for start in range(0, len(candidates), 500):
+                chunk = candidates[start:start + 500]
+                result = await session.execute(
+                    select(User.username).where(User.username.in_(chunk))
+                )
+                taken.update(result.scalars().all())
+
+            usernames = [name for name in candidates if name not in taken][:needed]
+            personalities = self.rng.integers(0, len(PERSONALITIES), size=len(usernames))
+            now = datetime.utcnow()
+
+            users = []
+            wallets = []
+            transactions = []
+            for username, personality in zip(usernames, personalities):
+                user_id = str(uuid.uuid4())
+                users.append({
+                    "id": user_id,
+                    "username": username,
+                    "email": f"{username.replace(' ', '').lower()}@bot.crypto",
+                    "password_hash": "bot_password_placeholder",  # Bots don't log in normally
+                    "role": "PLAYER",
+                    "is_active": True,
+                    "is_bot": True,
+                    "bot_personality": PERSONALITIES[personality].value,
+                    "created_at": now
+                })
+                wallets.append(self._wallet_row(user_id, now))
+                transactions.append(self._deposit_row(
+                    user_id, BOT_STARTING_BALANCE, 0.0, "Initial GEM deposit", now
+                ))
+
+            if users:
+                await session.execute(insert(User), users)
+                await session.execute(insert(Wallet), wallets)
+                await session.execute(insert(Transaction), transactions)
+                await session.commit()
+
+            return len(users)
+
+    async def load(self):
+        """Load every active bot with one query and repair wallets in bulk."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(User.id, User.username, User.bot_personality, Wallet.gem_balance)
+                .outerjoin(Wallet, Wallet.user_id == User.id)
+                .where(User.is_bot == True, User.is_active == True)
+                .order_by(User.username)
+            )
+            rows = result.all()
+
+            now = datetime.utcnow()
+            missing_wallets = []
+            top_ups = []
+            transactions = []
+            codes = {p.value: i for i, p in enumerate(PERSONALITIES)}
+
+            user_ids = []
+            usernames = []
+            personality = np.zeros(len(rows), dtype=np.int8)
+            balances = np.zeros(len(rows), dtype=np.float64)
+
+            for i, (user_id, username, bot_personality, balance) in enumerate(rows):
+                user_ids.append(user_id)
+                usernames.append(username)
+                personality[i] = codes.get(bot_personality, 0)
+
+                if balance is None:
+                    missing_wallets.append(self._wallet_row(user_id, now))
+                    transactions.append(self._deposit_row(
+                        user_id, BOT_STARTING_BALANCE, 0.0, "Bot initial GEM deposit", now
+                    ))
+                    balance = BOT_STARTING_BALANCE
+                elif balance < BOT_STARTING_BALANCE:
+                    diff = BOT_STARTING_BALANCE - float(balance)
+                    top_ups.append({"b_user_id": user_id, "b_amount": diff})
+                    transactions.append(self._deposit_row(
+                        user_id, diff, float(balance), "Bot balance upgrade for higher betting", now
+                    ))
+                    balance = BOT_STARTING_BALANCE
+
+                balances[i] = float(balance)
+
+            if missing_wallets:
+                await session.execute(insert(Wallet), missing_wallets)
+            if top_ups:
+                wallets = Wallet.__table__
+                await session.execute(
+                    update(wallets)
+                    .where(wallets.c.user_id == bindparam("b_user_id"))
+                    .values(
+                        gem_balance=wallets.c.gem_balance + bindparam("b_amount"),
+                        total_deposited=wallets.c.total_deposited + bindparam("b_amount"),
+                        updated_at=now
+                    ),
+                    top_ups
+                )
+            if transactions:
+                await session.execute(insert(Transaction), transactions)
+            if missing_wallets or top_ups:
+                await session.commit()
+                logger.info("Repaired %s missing and %s low bot wallets", len(missing_wallets), len(top_ups))
+
+        self.user_ids = user_ids
+        self.usernames = usernames
+        self.session_ids = [None] * len(user_ids)
+        self.personality = personality
+        self.balances = balances
+        self.lose_streak = np.zeros(len(user_ids), dtype=np.int32)
+        self._index = {user_id: i for i, user_id in enumerate(user_ids)}
+        self._pending.clear()
+
+        logger.info("Loaded %s bots", self.size)
+
+    async def refresh_balances(self):
+        """Re-sync in-memory balances from the wallets table in one query."""
+        if not self.size:
+            return
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Wallet.user_id, Wallet.gem_balance)
+                .join(User, User.id == Wallet.user_id)
+                .where(User.is_bot == True)
+            )
+            for user_id, balance in result.all():
+                idx = self._index.get(user_id)
+                if idx is not None:
+                    self.balances[idx] = float(balance or 0.0)
+
+    async def _ensure_sessions(self, session: AsyncSession) -> List[int]:
+        """
+        Give every bot an active game session for its roulette bets. Returns
+        the bots whose session was inserted in this (not yet committed) session.
+        """
+        if all(self.session_ids):
+            return []
+
+        result = await session.execute(
+            select(GameSession.user_id, GameSession.id)
+            .join(User, User.id == GameSession.user_id)
+            .where(User.is_bot == True, GameSession.status == GameStatus.ACTIVE.value)
+        )
+        for user_id, session_id in result.all():
+            idx = self._index.get(user_id)
+            if idx is not None:
+                self.session_ids[idx] = session_id
+
+        created, new_sessions = [], []
+        for idx, session_id in enumerate(self.session_ids):
+            if session_id:
+                continue
+            server_seed = secrets.token_hex(32)
+            session_id = str(uuid.uuid4())
+            new_sessions.append({
+                "id": session_id,
+                "user_id": self.user_ids[idx],
+                "status": GameStatus.ACTIVE.value,
+                "server_seed": server_seed,
+                "server_seed_hash": hashlib.sha256(server_seed.encode()).hexdigest(),
+                "client_seed": secrets.token_hex(16),
+                "nonce": 0
+            })
+            created.append(idx)
+
+        if new_sessions:
+            await session.execute(insert(GameSession), new_sessions)
+            for idx, row in zip(created, new_sessions):
+                self.session_ids[idx] = row["id"]
+        return created
+
+    # ==================== ROULETTE ROUNDS ====================
+
+    def draw_round_bets(self) -> RoundBets:
+        """Draw bet decisions for the whole population at once."""
+        n = self.size
+        if n == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return RoundBets(empty, empty, empty, np.zeros(0), [])
+
+        p = self.personality
+        trend = PERSONALITIES.index(BotPersonalityType.TREND_FOLLOWER)
+        timid = PERSONALITIES.index(BotPersonalityType.TIMID)
+        aggressive = PERSONALITIES.index(BotPersonalityType.AGGRESSIVE)
+        highroller = PERSONALITIES.index(BotPersonalityType.HIGHROLLER)
+
+        # Participation, adjusted for loss streaks
+        chance = self.bet_frequency[p].copy()
+        chance[(p == trend) & (self.lose_streak >= 3)] += 0.2
+        chance[(p == timid) & (self.lose_streak >= 2)] *= 0.5
+        min_bet = self.min_bet[p]
+        betting = (self.rng.random(n) < chance) & (self.balances >= min_bet)
+
+        # Bet size: a personality-dependent share of at most 10% of balance
+        max_possible = np.minimum(self.max_bet[p], self.balances * 0.1)
+        factor = self.rng.uniform(0.2, 0.5, n)
+        factor[p == aggressive] = self.rng.uniform(0.4, 0.7, int((p == aggressive).sum()))
+        factor[p == highroller] = 0.8
+        amount = np.floor(np.maximum(min_bet, max_possible * factor))
+
+        # Bet type from the personality's preferred strategies, then a value
+        pick = (self.rng.random(n) * self.strategy_count[p]).astype(np.int64)
+        bet_type = self.strategy_table[p, pick].astype(np.int64)
+        bet_value = (self.rng.random(n) * self.bet_value_counts[bet_type]).astype(np.int64)
+
+        bot_idx = np.flatnonzero(betting)
+        return RoundBets(
+            bot_idx=bot_idx,
+            bet_type=bet_type[bot_idx],
+            bet_value=bet_value[bot_idx],
+            amount=amount[bot_idx],
+            bet_ids=[str(uuid.uuid4()) for _ in range(len(bot_idx))]
+        )
+
+    def _bet_value_label(self, bet_type: int, bet_value: int) -> str:
+        if bet_type == 0:
+            return str(bet_value)
+        if bet_type == 4:
+            return self.categories[bet_value]
+        return BINARY_BET_VALUES[bet_type][bet_value]
+
+    def _bet_value_index(self, bet_type: int, label: str) -> int:
+        if bet_type == 0:
+            return int(label)
+        if bet_type == 4:
+            return self.categories.index(label)
+        return BINARY_BET_VALUES[bet_type].index(label)
+
+    async def place_round_bets(self, round_id: str) -> List[str]:
+        """Draw and persist bot bets for a round: one bulk insert, one wallet update."""
+        if not self.round_betting or not self.size:
+            return []
+
+        bets = self.draw_round_bets()
+        if not len(bets):
+            return []
+
+        now = datetime.utcnow()
+        wallets = Wallet.__table__
+
+        created: List[int] = []
+        async with AsyncSessionLocal() as session:
+            try:
+                created = await self._ensure_sessions(session)
+
+                bet_rows = []
+                debit_rows = []
+                for k, idx in enumerate(bets.bot_idx.tolist()):
+                    bet_type = int(bets.bet_type[k])
+                    amount = float(bets.amount[k])
+                    bet_rows.append({
+                        "id": bets.bet_ids[k],
+                        "game_session_id": self.session_ids[idx],
+                        "user_id": self.user_ids[idx],
+                        "round_id": round_id,
+                        "bet_type": BET_TYPES[bet_type].value,
+                        "bet_value": self._bet_value_label(bet_type, int(bets.bet_value[k])),
+                        "amount": amount,
+                        "created_at": now
+                    })
+                    debit_rows.append({"b_user_id": self.user_ids[idx], "b_amount": amount})
+
+                await session.execute(insert(GameBet), bet_rows)
+                await session.execute(
+                    update(wallets)
+                    .where(wallets.c.user_id == bindparam("b_user_id"))
+                    .values(
+                        gem_balance=wallets.c.gem_balance - bindparam("b_amount"),
+                        total_wagered=wallets.c.total_wagered + bindparam("b_amount"),
+                        updated_at=now
+                    ),
+                    debit_rows
+                )
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                # The game sessions inserted for this round are gone with it
+                for idx in created:
+                    self.session_ids[idx] = None
+                logger.warning("Failed to place bot bets for round %s: %s", round_id[:8], e)
+                return []
+
+        self.balances[bets.bot_idx] -= bets.amount
+        self._pending[round_id] = bets
+        return bets.bet_ids
+
+    async def settle_round(
+        self,
+        session: AsyncSession,
+        round_id: str,
+        winning_number: int,
+        winning_color: str,
+        winning_category: str
+    ) -> RoundSettlement:
+        """
+        Settle the bot bets of a round inside the caller's transaction.
+
+        Outcomes for every bet are computed with array operations; results are
+        written with one bulk bet update and one wallet update for winners.
+        In-memory balances and streaks only change in RoundSettlement.apply().
+        """
+        bets = self._pending.get(round_id)
+        if bets is None:
+            bets = await self._load_pending(session, round_id)
+        if not len(bets):
+            return RoundSettlement(self, round_id)
+
+        n = winning_number
+        bet_type = bets.bet_type
+        value = bets.bet_value
+        not_zero = n != 0
+        category = winning_category.lower()
+        category_idx = self.categories.index(category) if category in self.categories else -1
+
+        won = np.zeros(len(bets), dtype=bool)
+        won |= (bet_type == 0) & (value == n)
+        won |= (bet_type == 1) & not_zero & (value == (0 if winning_color.lower() == "red" else 1))
+        won |= (bet_type == 2) & not_zero & (value == n % 2)
+        won |= (bet_type == 3) & not_zero & (value == (0 if n >= 19 else 1))
+        won |= (bet_type == 4) & (value == category_idx)
+
+        multiplier = np.where(won, self.payout_multipliers[bet_type], 0.0)
+        payout = np.where(won, bets.amount * (multiplier + 1), 0.0)
+
+        await session.execute(
+            update(GameBet),
+            [
+                {
+                    "id": bet_id,
+                    "is_winner": bool(w),
+                    "payout_multiplier": float(m),
+                    "payout_amount": float(amt)
+                }
+                for bet_id, w, m, amt in zip(bets.bet_ids, won.tolist(), multiplier.tolist(), payout.tolist())
+            ]
+        )
+
+        winners = np.flatnonzero(won)
+        if len(winners):
+            wallets = Wallet.__table__
+            await session.execute(
+                update(wallets)
+                .where(wallets.c.user_id == bindparam("b_user_id"))
+                .values(
+                    gem_balance=wallets.c.gem_balance + bindparam("b_amount"),
+                    total_won=wallets.c.total_won + bindparam("b_amount"),
+                    updated_at=datetime.utcnow()
+                ),
+                [
+                    {"b_user_id": self.user_ids[int(bets.bot_idx[k])], "b_amount": float(payout[k])}
+                    for k in winners.tolist()
+                ]
+            )
+
+        return RoundSettlement(self, round_id, bets, won, payout)
+
+    def _apply_settlement(self, settlement: RoundSettlement):
+        """In-memory state follows the committed database."""
+        bets = self._pending.pop(settlement.round_id, None)
+        if bets is not settlement.bets or not settlement.count:
+            return  # Population reloaded meanwhile: balances were re-read from the wallets
+        self.balances[bets.bot_idx] += settlement.payout
+        self.lose_streak[bets.bot_idx] = np.where(settlement.won, 0, self.lose_streak[bets.bot_idx] + 1)
+
+    async def _load_pending(self, session: AsyncSession, round_id: str) -> RoundBets:
+        """
+        Unsettled bot bets of a round from game_bets: after a restart or a
+        leader failover the placing worker's memory is gone.
+        """
+        result = await session.execute(
+            select(GameBet.id, GameBet.user_id, GameBet.bet_type, GameBet.bet_value, GameBet.amount)
+            .join(User, User.id == GameBet.user_id)
+            .where(GameBet.round_id == round_id, GameBet.is_winner.is_(None), User.is_bot == True)
+        )
+        codes = {bet_type.value: code for code, bet_type in enumerate(BET_TYPES)}
+        bot_idx, bet_type, bet_value, amount, bet_ids = [], [], [], [], []
+        for bet_id, user_id, type_label, value_label, bet_amount in result.all():
+            idx = self._index.get(user_id)
+            code = codes.get(type_label)
+            if idx is None or code is None:
+                logger.warning("Cannot settle bot bet %s of round %s: unknown bot or bet type", bet_id, round_id[:8])
+                continue
+            bot_idx.append(idx)
+            bet_type.append(code)
+            bet_value.append(self._bet_value_index(code, value_label))
+            amount.append(float(bet_amount))
+            bet_ids.append(bet_id)
+
+        bets = RoundBets(
+            bot_idx=np.array(bot_idx, dtype=np.int64),
+            bet_type=np.array(bet_type, dtype=np.int64),
+            bet_value=np.array(bet_value, dtype=np.int64),
+            amount=np.array(amount, dtype=np.float64),
+            bet_ids=bet_ids
+        )
+        if len(bets):
+            logger.info("Recovered %s unsettled bot bets for round %s", len(bets), round_id[:8])
+            self._pending[round_id] = bets
+        return bets
+
+    # ==================== CRASH ====================
+
+    def draw_crash_bets(self, max_bots: int, window: float) -> List[Dict]:
+        """
+        Draw display-only crash bets for a betting window.
+
+        Returns bets ordered by their offset (seconds into the window), each
+        staggered 1-4 seconds after the previous one.
+        """
+        if not self.size or max_bots <= 0:
+            return []
+
+        count = int(self.rng.integers(1, max_bots + 1))
+        count = min(count, self.size)
+        chosen = self.rng.choice(self.size, size=count, replace=False)
+        amounts = self.rng.choice(CRASH_BET_AMOUNTS, size=count)
+        offsets = np.cumsum(self.rng.uniform(1.0, 4.0, count))
+
+        return [
+            {"username": self.usernames[int(i)], "bet_amount": int(a), "offset": float(o)}
+            for i, a, o in zip(chosen, amounts, offsets)
+            if o < window
+        ]
+
+    # ==================== HELPERS ====================
+
+    def stats(self) -> Dict:
+        """Population statistics computed from the arrays."""
+        counts = np.bincount(self.personality, minlength=len(PERSONALITIES)) if self.size else []
+        return {
+            "total_bots": self.size,
+            "personalities": {
+                PERSONALITIES[i].value: int(c) for i, c in enumerate(counts) if c
+            },
+            "average_balance": float(self.balances.mean()) if self.size else 0,
+            "pending_rounds": len(self._pending)
+        }
+
+    def _candidate_usernames(self, count: int) -> List[str]:
+        names = [name for name, _ in BOT_PROFILE_DATA]
+        candidates = list(names)
+        suffix = 1
+        while len(candidates) < count:
+            candidates.extend(f"{name}_{suffix}" for name in names)
+            suffix += 1
+        return candidates[:count]
+
+    @staticmethod
+    def _wallet_row(user_id: str, now: datetime) -> Dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "gem_balance": BOT_STARTING_BALANCE,
+            "total_deposited": BOT_STARTING_BALANCE,
+            "total_withdrawn": 0.0,
+            "total_wagered": 0.0,
+            "total_won": 0.0,
+            "updated_at": now
+        }
+
+    @staticmethod
+    def _deposit_row(user_id: str, amount: float, balance_before: float, description: str, now: datetime) -> Dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "transaction_type": TransactionType.DEPOSIT.value,
+            "amount": amount,
+            "balance_before": balance_before,
+            "balance_after": balance_before + amount,
+            "description": description,
+            "created_at": now
+        }
+
+
+def _seed_from_env() -> Optional[int]:
+    value = os.getenv("BOT_ENGINE_SEED")
+    return int(value) if value else None
+
+
+# Global bot engine instance
+bot_engine = BotEngine(
+    seed=_seed_from_env(),
+    round_betting=os.getenv("BOT_ROUND_BETTING", "false").lower() == "true"
+)
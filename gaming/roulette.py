@@ -3,6 +3,7 @@ Simplified Crypto Roulette Engine.
 Clean, focused implementation with proper GEM economy integration.
 """
 
+import logging
 import hashlib
 import secrets
 import uuid
@@ -12,9 +13,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from database.models import GameSession, GameBet, GameStatus, BetType, TransactionType
-from database.database import AsyncSessionLocal
+from database.database import AsyncSessionLocal, ReadSessionLocal
 from crypto.portfolio import portfolio_manager
 
+logger = logging.getLogger(__name__)
+
 class CryptoRouletteEngine:
     """Simplified crypto-themed roulette engine with provably fair mechanics."""
 
@@ -216,7 +219,7 @@ class CryptoRouletteEngine:
                     )
                 )
                 bets = bets_result.scalars().all()
-                print(f"[ROULETTE DEBUG] Found {len(bets)} unresolved bets to process for this spin")
+                logger.debug("Found %s unresolved bets to process for this spin", len(bets))
 
                 total_winnings = 0
                 bet_results = []
@@ -319,21 +322,21 @@ class CryptoRouletteEngine:
         is_winner = False
         multiplier = 0.0
 
-        print(f"[ROULETTE DEBUG] Checking bet: type={bet_type}, value='{bet_value}', amount={bet.amount}")
-        print(f"[ROULETTE DEBUG] Winning: number={winning_number}, color='{winning_data['color']}', crypto={winning_data['crypto']}")
+        logger.debug("Checking bet: type=%s, value='%s', amount=%s", bet_type, bet_value, bet.amount)
+        logger.debug("Winning: number=%s, color='%s', crypto=%s", winning_number, winning_data['color'], winning_data['crypto'])
 
         if bet_type == BetType.SINGLE_NUMBER:
             if int(bet.bet_value) == winning_number:
                 is_winner = True
                 multiplier = self.payouts[bet_type]
-                print(f"[ROULETTE DEBUG] ✓ SINGLE_NUMBER WIN! multiplier={multiplier}")
+                logger.debug("SINGLE_NUMBER WIN! multiplier=%s", multiplier)
 
         elif bet_type == BetType.RED_BLACK:
-            print(f"[ROULETTE DEBUG] RED_BLACK bet - comparing '{bet_value}' vs '{winning_data['color'].lower()}'")
+            logger.debug("RED_BLACK bet - comparing '%s' vs '%s'", bet_value, winning_data['color'].lower())
             if winning_number != 0 and bet_value == winning_data["color"].lower():
                 is_winner = True
                 multiplier = self.payouts[bet_type]
-                print(f"[ROULETTE DEBUG] ✓ RED_BLACK WIN! multiplier={multiplier}")
+                logger.debug("RED_BLACK WIN! multiplier=%s", multiplier)
 
         elif bet_type == BetType.EVEN_ODD:
             if winning_number != 0:  # 0 is neither even nor odd for betting purposes
@@ -374,7 +377,7 @@ class CryptoRouletteEngine:
         offset: int = 0
     ) -> List[Dict[str, Any]]:
         """Get user's recent game sessions."""
-        async with AsyncSessionLocal() as session:
+        async with ReadSessionLocal() as session:
             result = await session.execute(
                 select(GameSession)
                 .where(GameSession.user_id == user_id)
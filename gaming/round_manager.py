@@ -1,21 +1,35 @@
 """
 Server-Managed Roulette Round System
 Maintains global round state and auto-advances phases for all players.
+
+With several workers only the cluster leader runs the timer and settles bets.
+Every event is published with a snapshot of the round; each worker relays it
+to its own SSE subscribers and followers mirror the snapshot so reads and
+bet validation see the same round. Followers forward start / spin / bet
+registration to the leader.
 """
 
 import asyncio
+import logging
+import time
 import uuid
 import json
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Set, Any
+from typing import Optional, Dict, Set, Any, Tuple
 from dataclasses import dataclass, field
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 
-from database.models import RouletteRound, RoundPhase, GameBet
+from database.models import RouletteRound, RoundPhase, GameBet, User, Wallet
 from database.database import AsyncSessionLocal
 from gaming.roulette import CryptoRouletteEngine
+from gaming.bot_engine import RoundSettlement, bot_engine
+from services.cluster import cluster, ClusterRequestError
+from services.fairness import derive_floats, fairness
+from services.metrics import observe_phase, registry
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -49,25 +63,74 @@ class RoundManager:
         self.sse_subscribers: Dict[str, asyncio.Queue] = {}  # user_id → event queue
         self._lock = asyncio.Lock()  # Prevent race conditions on phase transitions
         self._timer_task: Optional[asyncio.Task] = None
+        self._phase: Optional[RoundPhase] = None
+        self._phase_started: Optional[float] = None  # time.monotonic()
+        self._phase_tasks: Set[asyncio.Task] = set()  # Pending SPINNING/RESULTS transitions
+        self._mirrored_totals: Tuple[int, int] = (0, 0)  # (bets, players) as last seen from the leader
+
+        registry.gauge(
+            "roulette_sse_subscribers", "Connected roulette round SSE subscribers.",
+            callback=lambda: len(self.sse_subscribers)
+        )
+
+    def _mark_phase(self, phase: RoundPhase):
+        """Record the duration of the phase being left and start timing `phase`."""
+        if self._phase is not None:
+            observe_phase("roulette", self._phase.value, self._phase_started)
+        self._phase = phase
+        self._phase_started = time.monotonic()
 
     async def initialize(self):
         """Initialize round manager - prepare for lazy round creation"""
-        print("[Round Manager] Initializing...")
-        print("[Round Manager] Lazy initialization - first round will start on first player connection")
+        logger.info("Initializing...")
+        logger.info("Lazy initialization - first round will start on first player connection")
 
         # DON'T start first round immediately - wait for first player
         # This prevents timing issues where server is in SPINNING phase before anyone connects
 
-        # Start background timer task for automatic round advancement
+        cluster.subscribe("roulette_events", self._on_cluster_event)
+        cluster.handle_requests("roulette", self._handle_command)
+
+        # The auto-advance timer runs on whichever worker leads the cluster
+        await cluster.election.on_change(self._on_elected, self._on_demoted)
+
+    async def stop(self):
+        """Cancel the auto-advance timer."""
+        await self._on_demoted()
+
+    async def _on_elected(self):
+        """Start the timer and resume any transition the previous leader left pending."""
         # Use get_running_loop() to ensure proper event loop attachment
         loop = asyncio.get_running_loop()
         self._timer_task = loop.create_task(self.auto_advance_timer())
-        print("[Round Manager] Initialized - auto-advance timer enabled, waiting for first player")
-        print(f"[Round Manager] Timer task created: {self._timer_task}")
-        print(f"[Round Manager] Event loop: {loop}")
+        logger.info("Initialized - auto-advance timer enabled, waiting for first player")
+
+        if self.current_round and self.current_round.phase == RoundPhase.SPINNING:
+            self._schedule(self._auto_transition_to_results(delay=1))
+        elif self.current_round and self.current_round.phase == RoundPhase.RESULTS:
+            self._schedule(self._auto_start_new_round(delay=1))
+
+    async def _on_demoted(self):
+        tasks = [t for t in (self._timer_task, *self._phase_tasks) if t and not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timer_task = None
+        self._phase_tasks.clear()
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._phase_tasks.add(task)
+        task.add_done_callback(self._phase_tasks.discard)
 
     async def start_new_round(self, triggered_by: Optional[str] = None) -> RoundState:
         """Initialize a new betting round"""
+        if not cluster.is_leader:
+            # The leader starts it, or answers with the round it already has
+            snapshot = await self._request_leader({"op": "ensure_round", "triggered_by": triggered_by})
+            self._mirror(snapshot)
+            return self.current_round
+
         async with self._lock:
             round_id = str(uuid.uuid4())
             started_at = datetime.utcnow()
@@ -94,9 +157,10 @@ class RoundManager:
                 await session.commit()
                 await session.refresh(db_round)
 
-                print(f"[Round Manager] Round {next_round_number} started (ID: {round_id[:8]}...)")
+                logger.info("Round %s started (ID: %s...)", next_round_number, round_id[:8])
 
             # Update in-memory state
+            self._mark_phase(RoundPhase.BETTING)
             self.current_round = RoundState(
                 round_id=round_id,
                 round_number=next_round_number,
@@ -117,13 +181,27 @@ class RoundManager:
                 "ends_at": betting_ends_at.isoformat()
             })
 
+            # Bot population bets for the whole round in one batch
+            bot_bet_ids = await bot_engine.place_round_bets(round_id)
+            if bot_bet_ids:
+                self.current_round.bets.update(bot_bet_ids)
+                logger.info("%s bot bets placed for round %s", len(bot_bet_ids), next_round_number)
+
             return self.current_round
 
+    @staticmethod
+    def outcome_from_seed(seed: bytes) -> int:
+        """Wheel number 0-36 for a roulette seed (see services/fairness.py)."""
+        return int(derive_floats(seed, 1, "roulette")[0] * 37)
+
     async def trigger_spin(self, user_id: Optional[str], game_session_id: str) -> Dict:
         """
         Manually trigger spin (player clicks "SPIN NOW" button).
         Advances from BETTING → SPINNING immediately.
         """
+        if not cluster.is_leader:
+            return await self._request_leader({"op": "spin", "user_id": user_id, "game_session_id": game_session_id})
+
         async with self._lock:
             if not self.current_round:
                 raise ValueError("No active round")
@@ -131,18 +209,16 @@ class RoundManager:
             if self.current_round.phase != RoundPhase.BETTING:
                 raise ValueError(f"Cannot spin during {self.current_round.phase.value} phase")
 
-            print(f"[Round Manager] Manual spin triggered by user {user_id or 'AUTO'}")
+            logger.info("Manual spin triggered by user %s", user_id or 'AUTO')
 
             # Transition to SPINNING phase
+            self._mark_phase(RoundPhase.SPINNING)
             self.current_round.phase = RoundPhase.SPINNING
             self.current_round.triggered_by = user_id
 
-            # Generate provably fair outcome using existing roulette engine
-            # Use a simple hash-based approach for now
-            import hashlib
-            combined = f"{self.current_round.round_id}{self.current_round.round_number}"
-            hash_result = hashlib.sha256(combined.encode()).hexdigest()
-            outcome_number = int(hash_result[:8], 16) % 37  # 0-36
+            # Provably fair outcome from the next link of the roulette seed chain
+            fair = await fairness.next_seed("roulette")
+            outcome_number = self.outcome_from_seed(fair.seed)
 
             # Determine color and crypto based on number
             outcome = self.roulette_engine.crypto_wheel.get(outcome_number, {})
@@ -163,13 +239,16 @@ class RoundManager:
                         triggered_by=user_id,
                         outcome_number=outcome_number,
                         outcome_color=outcome_color,
-                        outcome_crypto=outcome_crypto
+                        outcome_crypto=outcome_crypto,
+                        server_seed=fair.hex,
+                        fairness_chain_id=fair.chain_id,
+                        fairness_index=fair.index
                     )
                 )
 
                 # CRITICAL: Process all bets for this round
-                print(f"[Round Manager] Processing bets for round {self.current_round.round_id}")
-                await self._process_round_bets(
+                logger.info("Processing bets for round %s", self.current_round.round_id)
+                bot_settlement = await self._process_round_bets(
                     session=session,
                     round_id=self.current_round.round_id,
                     winning_number=outcome_number,
@@ -178,6 +257,7 @@ class RoundManager:
                 )
 
                 await session.commit()
+            bot_settlement.apply()
 
             # Broadcast phase change
             await self._broadcast_event("phase_changed", {
@@ -186,13 +266,14 @@ class RoundManager:
                 "outcome": outcome_number,
                 "color": outcome_color,
                 "crypto": outcome_crypto,
-                "triggered_by": user_id
+                "triggered_by": user_id,
+                "fairness": fair.to_dict()
             })
 
-            print(f"[Round Manager] Outcome: {outcome_number} ({outcome_color})")
+            logger.info("Outcome: %s (%s)", outcome_number, outcome_color)
 
             # Schedule automatic transition to RESULTS phase after animation (5s to match frontend)
-            asyncio.create_task(self._auto_transition_to_results(delay=5))
+            self._schedule(self._auto_transition_to_results(delay=5))
 
             return {
                 "number": outcome_number,
@@ -208,7 +289,8 @@ class RoundManager:
             if not self.current_round or self.current_round.phase != RoundPhase.SPINNING:
                 return  # Already moved on
 
-            print(f"[Round Manager] Transitioning to RESULTS phase")
+            logger.info("Transitioning to RESULTS phase")
+            self._mark_phase(RoundPhase.RESULTS)
             self.current_round.phase = RoundPhase.RESULTS
 
             # Update database
@@ -230,7 +312,7 @@ class RoundManager:
             })
 
             # Schedule transition to new round
-            asyncio.create_task(self._auto_start_new_round(delay=self.results_display_duration))
+            self._schedule(self._auto_start_new_round(delay=self.results_display_duration))
 
     async def _auto_start_new_round(self, delay: int):
         """Automatically start new round after results display duration"""
@@ -240,7 +322,8 @@ class RoundManager:
             if not self.current_round or self.current_round.phase != RoundPhase.RESULTS:
                 return
 
-            print(f"[Round Manager] Round {self.current_round.round_number} complete")
+            logger.info("Round %s complete", self.current_round.round_number)
+            self._mark_phase(RoundPhase.CLEANUP)
 
             # Mark old round as completed
             async with AsyncSessionLocal() as session:
@@ -267,8 +350,8 @@ class RoundManager:
         Background task: check timer every second, auto-spin when betting time expires.
         This runs indefinitely in the background.
         """
-        print("[Round Manager] Background timer started")
-        print(f"[Round Manager] Timer running in event loop: {asyncio.get_running_loop()}")
+        logger.info("Background timer started")
+        logger.debug("Timer running in event loop: %s", asyncio.get_running_loop())
         tick_count = 0
 
         try:
@@ -277,15 +360,19 @@ class RoundManager:
                     await asyncio.sleep(1)  # Check every second
                     tick_count += 1
 
-                    # Debug: Print every 5 seconds to confirm timer is running
-                    if tick_count % 5 == 0:
+                    # Debug: Log every 5 seconds to confirm timer is running
+                    if tick_count % 5 == 0 and logger.isEnabledFor(logging.DEBUG):
                         if self.current_round:
                             now = datetime.utcnow()
                             ends_at = self.current_round.phase_ends_at
                             remaining = (ends_at - now).total_seconds()
-                            print(f"[Round Manager] Timer tick {tick_count}s - Round: {self.current_round.round_number}, Phase: {self.current_round.phase.value}, Remaining: {remaining:.1f}s")
+                            logger.debug(
+                                "Timer tick %ss - Round: %s, Phase: %s, Remaining: %.1fs",
+                                tick_count, self.current_round.round_number, self.current_round.phase.value, remaining,
+                                extra={"sample": "round_timer_tick"}
+                            )
                         else:
-                            print(f"[Round Manager] Timer tick {tick_count}s - No current round")
+                            logger.debug("Timer tick %ss - No current round", tick_count, extra={"sample": "round_timer_tick"})
 
                     if not self.current_round:
                         continue
@@ -295,7 +382,7 @@ class RoundManager:
 
                     # Check if betting time expired
                     if datetime.utcnow() >= self.current_round.phase_ends_at:
-                        print(f"[Round Manager] Timer expired - auto-spinning round {self.current_round.round_number}")
+                        logger.info("Timer expired - auto-spinning round %s", self.current_round.round_number)
                         # Auto-spin (no user triggered it, timer expired)
                         try:
                             await self.trigger_spin(
@@ -304,22 +391,18 @@ class RoundManager:
                             )
                         except ValueError as e:
                             # Already spinning (race condition avoided by lock)
-                            print(f"[Round Manager] Auto-spin skipped: {e}")
+                            logger.warning("Auto-spin skipped: %s", e)
 
                 except asyncio.CancelledError:
-                    print("[Round Manager] Timer task cancelled")
+                    logger.info("Timer task cancelled")
                     raise
                 except Exception as e:
-                    import traceback
-                    print(f"[Round Manager] Timer error: {e}")
-                    print(f"[Round Manager] Timer error traceback: {traceback.format_exc()}")
+                    logger.exception("Timer error: %s", e)
                     # Continue running despite errors
         except asyncio.CancelledError:
-            print("[Round Manager] Timer shutting down")
+            logger.info("Timer shutting down")
         except Exception as e:
-            import traceback
-            print(f"[Round Manager] CRITICAL: Timer loop crashed: {e}")
-            print(f"[Round Manager] CRITICAL traceback: {traceback.format_exc()}")
+            logger.critical("Timer loop crashed: %s", e, exc_info=True)
 
     def get_current_round(self) -> Optional[Dict]:
         """Return current round state for API consumption"""
@@ -343,19 +426,39 @@ class RoundManager:
                 "crypto": self.current_round.outcome_crypto
             } if self.current_round.outcome_number is not None else None,
             "triggered_by": self.current_round.triggered_by,
-            "total_bets": len(self.current_round.bets),
-            "total_players": len(self.current_round.players)
+            "total_bets": self._totals()[0],
+            "total_players": self._totals()[1]
         }
 
+    def _totals(self) -> Tuple[int, int]:
+        if cluster.is_leader:
+            return len(self.current_round.bets), len(self.current_round.players)
+        return self._mirrored_totals
+
     async def register_bet(self, bet_id: str, user_id: str):
         """Register a bet for the current round"""
+        if not cluster.is_leader:
+            await cluster.notify_leader("roulette", {"op": "register_bet", "bet_id": bet_id, "user_id": user_id})
+            return
         if self.current_round:
             self.current_round.bets.add(bet_id)
             self.current_round.players.add(user_id)
-            print(f"[Round Manager] Bet {bet_id[:8]}... registered (total: {len(self.current_round.bets)})")
+            logger.debug(
+                "Bet %s... registered (total: %s)", bet_id[:8], len(self.current_round.bets),
+                extra={"sample": "bet_registered"}
+            )
 
     async def _broadcast_event(self, event_type: str, data: Dict):
-        """Send SSE event to all subscribed clients"""
+        """Publish an event to every worker's SSE clients, with the round snapshot followers mirror"""
+        await cluster.publish("roulette_events", {"event": event_type, "data": data, "state": self._snapshot()})
+
+    async def _on_cluster_event(self, message: Dict):
+        if not cluster.is_leader:
+            self._mirror(message["state"])
+        await self._deliver_local(message["event"], message["data"])
+
+    async def _deliver_local(self, event_type: str, data: Dict):
+        """Send SSE event to this worker's subscribed clients"""
         event_data = {"event": event_type, "data": data}
 
         # Remove disconnected subscribers
@@ -365,21 +468,86 @@ class RoundManager:
                 # Non-blocking put with timeout
                 await asyncio.wait_for(queue.put(event_data), timeout=1.0)
             except (asyncio.TimeoutError, Exception) as e:
-                print(f"[Round Manager] Removing disconnected subscriber {user_id}: {e}")
+                logger.warning("Removing disconnected subscriber %s: %s", user_id, e)
                 disconnected.append(user_id)
 
         for user_id in disconnected:
             self.sse_subscribers.pop(user_id, None)
 
         if self.sse_subscribers:
-            print(f"[Round Manager] Broadcast '{event_type}' to {len(self.sse_subscribers)} clients")
+            logger.debug(
+                "Broadcast '%s' to %s clients", event_type, len(self.sse_subscribers),
+                extra={"sample": "sse_broadcast"}
+            )
+
+    # ==================== CLUSTER ====================
+
+    def _snapshot(self) -> Optional[Dict]:
+        """Serializable round state for followers."""
+        r = self.current_round
+        if not r:
+            return None
+        return {
+            "round_id": r.round_id,
+            "round_number": r.round_number,
+            "phase": r.phase.value,
+            "started_at": r.started_at.isoformat(),
+            "betting_duration": r.betting_duration,
+            "phase_ends_at": r.phase_ends_at.isoformat(),
+            "outcome_number": r.outcome_number,
+            "outcome_color": r.outcome_color,
+            "outcome_crypto": r.outcome_crypto,
+            "triggered_by": r.triggered_by,
+            "total_bets": len(r.bets),
+            "total_players": len(r.players),
+        }
+
+    def _mirror(self, snapshot: Optional[Dict]):
+        """Adopt the leader's round state (followers only)."""
+        if not snapshot:
+            return
+        self.current_round = RoundState(
+            round_id=snapshot["round_id"],
+            round_number=snapshot["round_number"],
+            phase=RoundPhase(snapshot["phase"]),
+            started_at=datetime.fromisoformat(snapshot["started_at"]),
+            betting_duration=snapshot["betting_duration"],
+            phase_ends_at=datetime.fromisoformat(snapshot["phase_ends_at"]),
+            outcome_number=snapshot["outcome_number"],
+            outcome_color=snapshot["outcome_color"],
+            outcome_crypto=snapshot["outcome_crypto"],
+            triggered_by=snapshot["triggered_by"],
+        )
+        self._mirrored_totals = (snapshot["total_bets"], snapshot["total_players"])
+
+    async def _handle_command(self, command: Dict) -> Any:
+        """Run a follower's command on the leader."""
+        op = command["op"]
+        if op == "ensure_round":
+            if not self.current_round:
+                await self.start_new_round(triggered_by=command.get("triggered_by"))
+            return self._snapshot()
+        if op == "spin":
+            return await self.trigger_spin(command["user_id"], command["game_session_id"])
+        if op == "register_bet":
+            return await self.register_bet(command["bet_id"], command["user_id"])
+        raise ValueError(f"Unknown roulette command {op!r}")
+
+    async def _request_leader(self, command: Dict) -> Any:
+        try:
+            return await cluster.request("roulette", command)
+        except ClusterRequestError as e:
+            # Keep the API's 409 for invalid phase transitions
+            if e.error_type == "ValueError":
+                raise ValueError(str(e)) from None
+            raise
 
     async def subscribe_sse(self, user_id: str) -> asyncio.Queue:
         """Register a new SSE subscriber"""
         queue = asyncio.Queue(maxsize=100)  # Prevent memory issues
         self.sse_subscribers[user_id] = queue
 
-        print(f"[Round Manager] New SSE subscriber: {user_id} (total: {len(self.sse_subscribers)})")
+        logger.info("New SSE subscriber: %s (total: %s)", user_id, len(self.sse_subscribers))
 
         # Send current round state immediately
         current = self.get_current_round()
@@ -392,7 +560,7 @@ class RoundManager:
         """Remove SSE subscriber"""
         if user_id in self.sse_subscribers:
             self.sse_subscribers.pop(user_id)
-            print(f"[Round Manager] SSE subscriber removed: {user_id} (remaining: {len(self.sse_subscribers)})")
+            logger.info("SSE subscriber removed: %s (remaining: %s)", user_id, len(self.sse_subscribers))
 
     async def _process_round_bets(
         self,
@@ -401,22 +569,41 @@ class RoundManager:
         winning_number: int,
         winning_color: str,
         winning_crypto: str
-    ):
-        """Process all bets for a completed round and credit/debit winnings."""
+    ) -> RoundSettlement:
+        """
+        Process all bets for a completed round and credit/debit winnings.
+        Returns the bot settlement to apply once the session has committed.
+        """
         from database.models import BetType, TransactionType
         from crypto.portfolio import portfolio_manager
 
-        # Fetch all bets for this round
+        # Bot bets are settled in bulk by the bot engine
+        bot_settlement = await bot_engine.settle_round(
+            session=session,
+            round_id=round_id,
+            winning_number=winning_number,
+            winning_color=winning_color,
+            winning_category=self.roulette_engine.crypto_wheel.get(winning_number, {}).get("category", "")
+        )
+        if bot_settlement.count:
+            logger.info(
+                "Settled %s bot bets: %.0f GEM won, %.0f GEM lost",
+                bot_settlement.count, bot_settlement.winnings, bot_settlement.losses
+            )
+
+        # Fetch all player bets for this round
         result = await session.execute(
-            select(GameBet).where(GameBet.round_id == round_id)
+            select(GameBet)
+            .join(User, User.id == GameBet.user_id)
+            .where(GameBet.round_id == round_id, User.is_bot == False)
         )
         bets = result.scalars().all()
 
         if not bets:
-            print(f"[Round Manager] No bets to process for round {round_id}")
-            return
+            logger.info("No bets to process for round %s", round_id)
+            return bot_settlement
 
-        print(f"[Round Manager] Processing {len(bets)} bets...")
+        logger.info("Processing %s bets...", len(bets))
 
         winning_data = {
             "color": winning_color,
@@ -439,29 +626,48 @@ class RoundManager:
             bet.payout_multiplier = multiplier
             bet.payout_amount = payout
 
+            # Settle inside this session: it already holds the round's write
+            # lock, so a separate portfolio session would block on SQLite
             if is_winner and payout > 0:
                 # Credit winnings to user
-                await portfolio_manager.process_win(
+                await portfolio_manager.apply_win_in_session(
+                    session=session,
                     user_id=bet.user_id,
                     amount=payout,
                     description=f"Roulette win: {bet.bet_type} on {bet.bet_value} (Round {round_id[:8]})",
                     game_session_id=bet.game_session_id
                 )
                 total_winnings += payout
-                print(f"[Round Manager] ✓ WIN: User {bet.user_id[:8]} bet {bet.amount} on {bet.bet_value}, won {payout} GEM")
+                logger.debug(
+                    "WIN: User %s bet %s on %s, won %s GEM", bet.user_id[:8], bet.amount, bet.bet_value, payout,
+                    extra={"sample": "bet_settled"}
+                )
             else:
                 # Record loss (bet was already deducted when placed)
-                await portfolio_manager.deduct_gems(
+                balance = await session.scalar(
+                    select(Wallet.gem_balance).where(Wallet.user_id == bet.user_id)
+                )
+                await portfolio_manager._create_transaction(
+                    session=session,
                     user_id=bet.user_id,
-                    amount=0,  # Already deducted
                     transaction_type=TransactionType.BET_LOST,
+                    amount=0.0,  # Already deducted
+                    balance_before=float(balance or 0),
+                    balance_after=float(balance or 0),
                     description=f"Roulette loss: {bet.bet_type} on {bet.bet_value} (Round {round_id[:8]})",
                     game_session_id=bet.game_session_id
                 )
                 total_losses += bet.amount
-                print(f"[Round Manager] ✗ LOSS: User {bet.user_id[:8]} bet {bet.amount} on {bet.bet_value}")
+                logger.debug(
+                    "LOSS: User %s bet %s on %s", bet.user_id[:8], bet.amount, bet.bet_value,
+                    extra={"sample": "bet_settled"}
+                )
 
-        print(f"[Round Manager] Round complete: {total_winnings} GEM won, {total_losses} GEM lost")
+        logger.info(
+            "Round complete: %s GEM won, %s GEM lost", total_winnings, total_losses,
+            extra={"round_id": round_id, "bets": len(bets)}
+        )
+        return bot_settlement
 
 
 # Global singleton instance
@@ -4,14 +4,17 @@ CryptoChecker Version3 - Real-Time Crypto Tracker with Gaming
 A focused cryptocurrency tracking platform with integrated roulette gaming.
 """
 
+import time
+_imports_started = time.perf_counter()
+
 import os
 import asyncio
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException, Depends
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
 
@@ -32,9 +35,20 @@ if not (current_dir / "database" / "models.py").exists():
         f"Run: cd Version3 && python main.py"
     )
 
-print(f">> CryptoChecker Version3 starting from: {current_dir}")
+# Load environment variables
+load_dotenv()
+
+# Route application logging through the background writer before any
+# module-level loggers fire
+from services.logging_config import configure_logging
+configure_logging()
 
-# Import API routers
+logger = logging.getLogger("main")
+
+# Import API routers. These stay eager: every route has to be registered
+# before the first request is matched and before /openapi.json is built.
+# Most of the import time is FastAPI, SQLAlchemy and database.models, which
+# any route needs anyway; the router modules themselves add about 0.3 s.
 from api.crypto_api import router as crypto_router
 from api.gaming_api import router as gaming_router
 from api.auth_api import router as auth_router
@@ -50,9 +64,8 @@ from api.staking_api import router as staking_router
 from api.trading_api import router as trading_router
 from api.minigames_api import router as minigames_router
 from api.leaderboard_api import router as leaderboard_router
-from api.gaming_api import router as gaming_router
-from api.auth_api import router as auth_router
 from api.crash_api import router as crash_router
+from api.fairness_api import router as fairness_router
 
 # Import services
 from database.database import init_database
@@ -60,46 +73,54 @@ from crypto.price_service import price_service
 from api.bot_system import initialize_bot_population
 from gaming.round_manager import round_manager
 from services.crash_game_manager import crash_manager
+from services.data_lifecycle import data_lifecycle
+from services.cluster import cluster
+from services.auth_tokens import revocation_list
+from services.fairness import fairness
+from services.stock_quote_refresher import stock_quote_refresher
+from services.search_index import search_service
+from services.presence import presence
+from services.metrics import MetricsMiddleware, loop_lag_monitor, render_metrics, METRICS_ENABLED
+from services.startup import StartupOrchestrator
+from services.static_assets import PrecompressedStaticFiles, asset_manifest, asset_url
+from services.page_cache import PageCache
+
+# Subsystem initialization order. Phases without dependencies start together;
+# deferred phases run in the background after the app accepts requests.
+startup = StartupOrchestrator()
+_import_seconds = time.perf_counter() - _imports_started
+startup.record("imports", _import_seconds, started_at=-_import_seconds)
+# Event loop lag sampling first so slow phases are visible
+startup.add("loop_lag_monitor", loop_lag_monitor.start, loop_lag_monitor.stop)
+startup.add("database", init_database)
+# Leader election needs the lease table; the game loops run on the leader only
+startup.add("cluster", cluster.start, cluster.stop, depends_on=("database",))
+# Logged-out tokens must be rejected before the first request is served
+startup.add("auth", revocation_list.start, revocation_list.stop, depends_on=("cluster",))
+# Seed chains are claimed or generated in the background; the first game waits for its seed
+startup.add("fairness", fairness.start, fairness.stop, depends_on=("cluster",))
+# Both only start timers; rounds touch the database once a player connects
+startup.add("round_manager", round_manager.initialize, round_manager.stop, depends_on=("fairness",))
+startup.add("crash_manager", crash_manager.start, crash_manager.stop, depends_on=("fairness",))
+startup.add("price_service", price_service.start, price_service.stop, depends_on=("cluster",), deferred=True)
+startup.add("stock_quotes", stock_quote_refresher.start, stock_quote_refresher.stop, depends_on=("cluster",), deferred=True)
+startup.add("search_index", search_service.start, depends_on=("cluster",), deferred=True)
+startup.add("presence", presence.start, presence.stop, depends_on=("cluster",))
+startup.add("bot_population", initialize_bot_population, depends_on=("database",), deferred=True)
+startup.add("data_lifecycle", data_lifecycle.start, data_lifecycle.stop, depends_on=("database",), deferred=True)
 
-# Load environment variables
-load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management."""
-    print(">> Starting CryptoChecker Version3...")
-
-    # Initialize database
-    await init_database()
-    print(">> Database initialized")
-
-    # Start price service
-    await price_service.start()
-    print(">> Price service started")
-
-    # Initialize bot population for gambling
-    await initialize_bot_population()
-    print(">> Bot population initialized")
-
-    # Initialize round manager (server-managed rounds)
-    await round_manager.initialize()
-    print(">> Round manager initialized")
-
-    # Start Crash Game Manager
-    await crash_manager.start()
-    print(">> Crash Game manager started")
-
-    print(">> CryptoChecker Version3 ready!")
-    print("   >> Crypto Tracker: http://localhost:8000")
-    print("   >> Roulette Gaming: http://localhost:8000/gaming")
-    print("   >> API Docs: http://localhost:8000/docs")
+    logger.info("Starting CryptoChecker Version3 from %s", current_dir)
+    await startup.startup()
+    logger.info("CryptoChecker Version3 ready on http://localhost:8000 (API docs: /docs)")
 
     yield
 
-    # Cleanup
-    await crash_manager.stop()
-    await price_service.stop()
-    print(">> CryptoChecker Version3 stopped")
+    await startup.shutdown()
+    logger.info("CryptoChecker Version3 stopped")
 
 # Create FastAPI application
 app = FastAPI(
@@ -129,8 +150,12 @@ app.add_middleware(
     https_only=False  # Set to True in production
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="web/static"), name="static")
+# Per-route latency and DB query metrics (outermost, so it times the full stack)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Mount static files (minified, fingerprinted and precompressed once scripts/build_assets.py has run)
+app.mount("/static", PrecompressedStaticFiles(directory="web/static", manifest=asset_manifest), name="static")
 
 # Setup templates with absolute path
 import os
@@ -141,6 +166,10 @@ templates = Jinja2Templates(directory=template_dir)
 root_web_dir = os.path.join(os.path.dirname(__file__), "..", "web", "templates")
 if root_web_dir not in [str(p) for p in templates.env.loader.searchpath]:
     templates.env.loader.searchpath.insert(0, root_web_dir)  # Insert at beginning to prioritize
+templates.env.globals["asset_url"] = asset_url
+
+# Pages that render the same for every visitor
+page_cache = PageCache(templates)
 
 # Include API routers
 # Mount API routers with proper prefixes
@@ -218,26 +247,31 @@ app.include_router(
     prefix="/api/social",
     tags=["Social"]
 )
+app.include_router(
+    fairness_router,
+    prefix="/api/fairness",
+    tags=["Fairness"]
+)
 
 # Authentication routes
 @app.get("/login")
 async def login_page(request: Request, redirect: str = None):
     """Show login page with optional redirect."""
-    return templates.TemplateResponse(
-        "auth/login.html",
-        {
-            "request": request,
-            "redirect": redirect
-        }
-    )
+    # The page script reads ?redirect= itself, so every visitor gets the same HTML
+    return page_cache.response(request, "auth/login.html")
 
 @app.get("/register")
 async def register_page(request: Request):
     """Show registration page."""
-    return templates.TemplateResponse(
-        "auth/register.html",
-        {"request": request}
-    )
+    return page_cache.response(request, "auth/register.html")
+
+# Metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 # API base endpoint
 @app.get("/api")
@@ -296,7 +330,7 @@ async def crypto_market_page(request: Request):
 @app.get("/showcase", response_class=HTMLResponse)
 async def showcase(request: Request):
     """LinkedIn showcase landing page - project portfolio."""
-    return templates.TemplateResponse("showcase.html", {"request": request})
+    return page_cache.response(request, "showcase.html")
 
 @app.get("/gaming/roulette", response_class=HTMLResponse)
 async def gaming_roulette(request: Request):
@@ -379,24 +413,6 @@ async def profile(request: Request, username: str):
     """User profile page."""
     return templates.TemplateResponse("profile.html", {"request": request, "username": username})
 
-# ============================================================================
-# STARTUP/SHUTDOWN EVENTS
-# ============================================================================
-
-@app.on_event("startup")
-async def startup_event():
-    """Start background services."""
-    # Start crash game manager
-    await crash_manager.start()
-    print("[Startup] Crash game manager started")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Stop background services."""
-    # Stop crash game manager
-    await crash_manager.stop()
-    print("[Shutdown] Crash game manager stopped")
-
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
     """Custom 404 page."""
@@ -0,0 +1,38 @@
+"""Run the data lifecycle job once: archive, roll up and delete expired history rows.
+
+Usage:
+  cd Version3
+  python scripts/archive_history.py --dry-run     # count expired rows per table
+  python scripts/archive_history.py               # archive to ARCHIVE_DIR and delete
+
+Retention windows come from DATA_RETENTION_DAYS (see services/data_lifecycle.py).
+The background job in the app does the same on a timer when
+DATA_RETENTION_ENABLED=true.
+"""
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.data_lifecycle import data_lifecycle
+
+
+async def main(dry_run: bool):
+    if dry_run:
+        counts = await data_lifecycle.count_expired()
+        for policy in data_lifecycle.policies:
+            print(f"{policy.table:<22} keep {policy.days:>4} days   expired rows: {counts[policy.table]}")
+        return
+
+    archived = await data_lifecycle.run_once()
+    for table, count in archived.items():
+        print(f"{table:<22} archived {count} rows")
+    print(f"Archive directory: {data_lifecycle.archiver.root.resolve()}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--dry-run", action="store_true", help="Only count expired rows")
+    asyncio.run(main(parser.parse_args().dry_run))
@@ -0,0 +1,42 @@
+"""Rebuild mini_game_daily_stats from the mini_games history.
+
+Usage:
+  cd Version3
+  python scripts/backfill_minigame_stats.py                          # every day before today
+  python scripts/backfill_minigame_stats.py --since 2025-01-01 --until 2025-02-01
+
+Migration 0011 runs the same rebuild once when the table is created. Days
+are rebuilt whole; today is left out by default because live plays are
+still adding to it. Days whose history was already removed by the data
+lifecycle job keep their existing rows.
+"""
+import sys
+import asyncio
+import argparse
+from datetime import date, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.database import AsyncSessionLocal
+from services.minigames_service import MiniGamesService
+
+
+async def main(since: date, until: date):
+    async with AsyncSessionLocal() as session:
+        rows = await MiniGamesService.rebuild_daily_stats(session, since, until)
+        await session.commit()
+    window = f"{since or 'start'} .. {until}"
+    print(f"Rebuilt {rows} mini_game_daily_stats rows for {window}")
+
+
+def parse_day(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--since", type=parse_day, default=None, help="First day to rebuild (YYYY-MM-DD, default: earliest)")
+    parser.add_argument("--until", type=parse_day, default=datetime.utcnow().date(), help="Day after the last one rebuilt (default: today, UTC)")
+    args = parser.parse_args()
+    asyncio.run(main(args.since, args.until))
@@ -0,0 +1,47 @@
+"""Build the static assets: minify CSS/JS, fingerprint, and precompress (gzip, brotli if installed).
+
+Usage:
+  cd Version3
+  python scripts/build_assets.py                   # web/static -> web/dist
+  python scripts/build_assets.py --output /srv/assets
+
+The app serves the build from STATIC_BUILD_DIR (default web/dist) when it
+exists; re-run after changing anything under web/static. Files edited after
+the last build are served from web/static until the next build.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.static_assets import STATIC_BUILD_DIR, STATIC_SOURCE_DIR, brotli, build_assets
+
+
+def main(source: Path, output: Path):
+    manifest = build_assets(source, output)
+    assets = manifest["assets"]
+
+    totals = {"source": 0, "minified": 0, "gzip": 0, "br": 0}
+    for entry in assets.values():
+        totals["source"] += entry["source_size"]
+        totals["minified"] += entry["size"]
+        for encoding in ("gzip", "br"):
+            totals[encoding] += entry["encodings"].get(encoding, entry["size"])
+
+    print(f"Built {len(assets)} assets into {output} (manifest version {manifest['version']})")
+    print(f"  source    {totals['source']:>10,} bytes")
+    print(f"  minified  {totals['minified']:>10,} bytes")
+    print(f"  gzip      {totals['gzip']:>10,} bytes")
+    if brotli is not None:
+        print(f"  brotli    {totals['br']:>10,} bytes")
+    else:
+        print("  brotli    skipped (pip install brotli)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--source", type=Path, default=STATIC_SOURCE_DIR)
+    parser.add_argument("--output", type=Path, default=STATIC_BUILD_DIR)
+    args = parser.parse_args()
+    main(args.source, args.output)
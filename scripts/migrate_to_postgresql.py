@@ -1,334 +1,582 @@
 #!/usr/bin/env python3
 """
-Database migration script for PostgreSQL upgrade.
-Exports data from SQLite and imports into PostgreSQL.
-Usage: python scripts/migrate_to_postgresql.py
+Stream a SQLite database into PostgreSQL.
+
+Tables are discovered from Base.metadata, so every model is migrated. Rows are
+read from SQLite in chunks and converted by a row builder compiled once per
+table from the model column types. They are loaded with asyncpg's binary COPY
+(copy_records_to_table), so memory use is bounded by the chunk size rather than
+the database size. Tables whose foreign-key parents are already loaded are
+copied in parallel. At the end row counts and order-independent checksums are
+compared between source and target.
+
+The target schema is created with the migration runner (database/migrations).
+Derived tables that a source older than their migration does not have
+(DERIVED_TABLES) are rebuilt on the target from the loaded history once all
+tables are copied.
+
+Usage:
+    python scripts/migrate_to_postgresql.py [--source URL] [--target URL]
+        [--chunk-size 5000] [--workers 4] [--reset] [--dry-run] [--verify-only]
 """
 
 import os
 import sys
 import json
+import time
 import asyncio
+import hashlib
+import importlib
 import logging
-import uuid
-from datetime import datetime
+import argparse
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text, create_engine
+
+# Add project root to Python path so we can import local modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from sqlalchemy import (
+    Boolean, Date, DateTime, Float, Integer, JSON, LargeBinary, Numeric, String, Table, inspect, text
+)
+from sqlalchemy.ext.asyncio import create_async_engine
 
 # Load environment variables
 load_dotenv()
 
-# Database URLs
-SQLITE_URL = "sqlite+aiosqlite:///./crypto_tracker_v3.db"
-POSTGRESQL_URL = os.getenv("DATABASE_URL")
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-7s %(message)s")
+logger = logging.getLogger(__name__)
 
-# Fix async connection - use asyncpg for PostgreSQL async operations
-if POSTGRESQL_URL and 'postgresql://' in POSTGRESQL_URL:
-    POSTGRESQL_URL = POSTGRESQL_URL.replace('postgresql://', 'postgresql+asyncpg://', 1)
+DEFAULT_SOURCE_URL = os.getenv("SQLITE_URL", "sqlite+aiosqlite:///./crypto_tracker_v3.db")
 
-if not POSTGRESQL_URL:
-    print("❌ Error: DATABASE_URL environment variable not set")
-    exit(1)
+_CHECKSUM_MASK = (1 << 64) - 1
 
-if not POSTGRESQL_URL.startswith("postgresql"):
-    print("❌ Error: DATABASE_URL does not point to PostgreSQL")
-    exit(1)
 
-# Add current directory to Python path so we can import local modules
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-sys.path.insert(0, parent_dir)
+# ==================== VALUE CONVERTERS ====================
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+def _to_bool(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "t", "yes")
+    return bool(value)
 
-class DatabaseMigrator:
-    def __init__(self):
-        self.sqlite_engine = create_async_engine(SQLITE_URL, echo=False)
-        self.postgresql_engine = create_async_engine(POSTGRESQL_URL, echo=True)
-
-    async def export_sqlite_data(self):
-        """Export all data from SQLite database."""
-        logger.info("📤 Exporting data from SQLite...")
-
-        data = {}
-
-        # Define tables in dependency order for import
-        tables = [
-            "users", "wallets", "game_sessions", "game_bets",
-            "transactions", "cryptocurrencies", "portfolio_holdings",
-            "daily_bonuses", "achievements", "user_achievements",
-            "emergency_tasks", "user_emergency_tasks"
-        ]
-
-        async with self.sqlite_engine.connect() as conn:
-            for table in tables:
-                try:
-                    logger.info(f"  ↳ Exporting table: {table}")
-                    result = await conn.execute(text(f"SELECT * FROM {table}"))
-                    rows = result.fetchall()
-                    column_names = result.keys()
-
-                    data[table] = []
-                    for row in rows:
-                        # Convert row to dict with column names
-                        row_dict = {}
-                        for i, column_name in enumerate(column_names):
-                            value = row[i]
-
-                            # Handle datetime serialization
-                            if hasattr(value, 'isoformat'):
-                                value = value.isoformat()
-                            elif isinstance(value, bytes):
-                                # Handle binary data (passwords, etc.)
-                                value = value.decode('utf-8', errors='ignore')
-
-                            # Convert integer boolean fields to actual booleans for PostgreSQL
-                            if column_name in ['is_active', 'is_bot', 'is_winner'] and isinstance(value, int):
-                                value = bool(value)
-                            # Convert datetime strings to datetime objects for PostgreSQL
-                            elif column_name in ['created_at', 'last_login', 'updated_at', 'timestamp', 'completed_at', 'started_at', 'last_updated'] and isinstance(value, str) and value:
-                                try:
-                                    # Parse ISO format datetime strings (e.g., '2025-09-27 15:49:58.184438')
-                                    if '.' in value:
-                                        # With microseconds
-                                        value = datetime.fromisoformat(value.replace(' ', 'T'))
-                                    else:
-                                        # Without microseconds
-                                        value = datetime.fromisoformat(value.replace(' ', 'T') + '.000000')
-                                except (ValueError, TypeError):
-                                    # If parsing fails, keep as string but it will likely fail in PostgreSQL
-                                    logger.warning(f"Failed to parse datetime '{value}' for column {column_name}")
-                            elif isinstance(value, str) and value == '':
-                                value = None  # Convert empty strings to None
-
-                            row_dict[column_name] = value
-
-                        data[table].append(row_dict)
-
-                    logger.info(f"  ✅ {table}: {len(data[table])} records exported")
-
-                except Exception as e:
-                    logger.warning(f"  ⚠️ Failed to export {table}: {e}")
-                    data[table] = []
-
-        logger.info("📤 SQLite export complete!")
-        return data
-
-    async def create_postgresql_schema(self):
-        """Create PostgreSQL schema tables."""
-        logger.info("🏗️ Creating PostgreSQL schema...")
 
-        from database.models import Base
+def _to_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if not value:
+            return None
+        value = datetime.fromisoformat(value)
+    elif isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value)
+    if value.tzinfo is not None:
+        # Columns are TIMESTAMP WITHOUT TIME ZONE holding UTC
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
-        try:
-            # For schema operations, we temporarily need to connect as postgres user
-            # since crypto_app user cannot drop the public schema
-            postgres_url = POSTGRESQL_URL.replace('crypto_app:secure_password_2024', 'postgres:secure_password_2024')
-            postgres_engine = create_async_engine(postgres_url, echo=False)
 
-            try:
-                # Drop existing tables if they exist
-                logger.info("  ↳ Dropping existing tables...")
-                async with postgres_engine.connect() as conn:
-                    await conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE;"))
-                    await conn.execute(text("CREATE SCHEMA public;"))
-                    await conn.commit()
-
-                # Grant usage on schema to crypto_app
-                async with postgres_engine.connect() as conn:
-                    await conn.execute(text("GRANT USAGE ON SCHEMA public TO crypto_app;"))
-                    await conn.execute(text("GRANT CREATE ON SCHEMA public TO crypto_app;"))
-                    await conn.commit()
+def _to_date(value):
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(value[:10]) if value else None
 
-            finally:
-                await postgres_engine.dispose()
 
-            # Create all tables using the app user
-            logger.info("  ↳ Creating new tables...")
+def _to_int(value):
+    return None if value is None or value == "" else int(value)
+
 
-            # Create tables synchronously with sync engine
-            def create_sync():
-                sync_url = POSTGRESQL_URL.replace('postgresql+asyncpg://', 'postgresql://')
-                sync_engine = create_engine(sync_url, echo=False)
-                try:
-                    Base.metadata.create_all(bind=sync_engine)
-                finally:
-                    sync_engine.dispose()
-
-            # Run sync operation in thread
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                await asyncio.get_event_loop().run_in_executor(executor, create_sync)
-
-            logger.info("✅ PostgreSQL schema created successfully!")
-
-        except Exception as e:
-            logger.error(f"❌ Failed to create PostgreSQL schema: {e}")
-            logger.error("This might be due to insufficient privileges.")
-            logger.error("Try granting superuser privileges to the postgres user during setup.")
-            raise
-
-    async def import_data_to_postgresql(self, data):
-        """Import exported data into PostgreSQL."""
-        logger.info("📥 Importing data into PostgreSQL...")
-
-        # Check if we have guest game sessions but no guest user, create one if needed
-        if "game_sessions" in data and any(record['user_id'] == 'guest' for record in data["game_sessions"]):
-            guest_exists = any(record['id'] == 'guest' for record in data.get("users", []))
-            if not guest_exists:
-                logger.info("  ↳ Creating guest user for game sessions...")
-                # Create a guest user record
-                guest_user = {
-                    'id': 'guest',
-                    'username': 'guest',
-                    'email': 'guest@guest.crypto',
-                    'password_hash': 'guest_user_placeholder',
-                    'role': 'PLAYER',
-                    'is_active': True,
-                    'created_at': datetime.utcnow(),
-                    'last_login': None,
-                    'is_bot': False,
-                    'bot_personality': None
-                }
-                data["users"].append(guest_user)
-
-                # Create wallet for guest user
-                guest_wallet = {
-                    'id': str(uuid.uuid4()),
-                    'user_id': 'guest',
-                    'gem_balance': 0.0,
-                    'total_deposited': 0.0,
-                    'total_withdrawn': 0.0,
-                    'total_wagered': 0.0,
-                    'total_won': 0.0,
-                    'updated_at': datetime.utcnow()
-                }
-                data["wallets"].append(guest_wallet)
-
-        # Import tables in dependency order
-        import_order = [
-            "users", "wallets", "game_sessions", "game_bets",
-            "transactions", "cryptocurrencies", "portfolio_holdings",
-            "daily_bonuses", "achievements", "user_achievements",
-            "emergency_tasks", "user_emergency_tasks"
-        ]
-
-        async with self.postgresql_engine.begin() as conn:
-            for table in import_order:
-                if table not in data or len(data[table]) == 0:
-                    logger.info(f"  ↳ Skipping empty table: {table}")
-                    continue
-
-                try:
-                    logger.info(f"  ↳ Importing {len(data[table])} records into {table}")
+def _to_float(value):
+    return None if value is None or value == "" else float(value)
 
-                    # Prepare INSERT statement
-                    if data[table]:
-                        columns = list(data[table][0].keys())
-                        placeholders = ", ".join(f":{col}" for col in columns)
-                        insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
 
-                        # Batch insert for performance
-                        batch_size = 100
-                        for i in range(0, len(data[table]), batch_size):
-                            batch = data[table][i:i + batch_size]
-                            await conn.execute(text(insert_sql), batch)
+def _to_decimal(value):
+    return None if value is None or value == "" else Decimal(str(value))
 
-                    logger.info(f"  ✅ {table}: {len(data[table])} records imported")
 
-                except Exception as e:
-                    logger.error(f"  ❌ Failed to import {table}: {e}")
-                    # Log more details for debugging
-                    logger.error(f"    Sample record: {data[table][0] if data[table] else 'No data'}")
-                    raise
+def _to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def _to_json(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _to_bytes(value):
+    if value is None or isinstance(value, bytes):
+        return value
+    return bytes(value) if isinstance(value, (bytearray, memoryview)) else str(value).encode()
+
+
+# Checked in order: Float before Numeric (subclass), Integer covers BigInteger
+_TYPE_CONVERTERS = (
+    (Boolean, _to_bool),
+    (DateTime, _to_datetime),
+    (Date, _to_date),
+    (Integer, _to_int),
+    (Float, _to_float),
+    (Numeric, _to_decimal),
+    (JSON, _to_json),
+    (LargeBinary, _to_bytes),
+    (String, _to_text),
+)
+
+
+def converter_for(column) -> Optional[Callable[[Any], Any]]:
+    for sa_type, convert in _TYPE_CONVERTERS:
+        if isinstance(column.type, sa_type):
+            return convert
+    return None
+
+
+def default_factory(column) -> Callable[[], Any]:
+    """Python-side model default, for columns the (older) source table lacks."""
+    default = column.default
+    if default is None:
+        return lambda: None
+    if default.is_scalar:
+        value = default.arg
+        return lambda: value
+    if default.is_callable:
+        fn = default.arg
+        return lambda: fn(None)
+    return lambda: None
+
+
+def compile_row_builder(plan: "TablePlan") -> Callable[[Sequence[Any]], tuple]:
+    """
+    Build `row -> tuple` for one table as a single generated lambda.
+
+    Converter lookup happens here, once per column, instead of per value; the
+    generated code only indexes the source row and calls the converter.
+    """
+    namespace: Dict[str, Any] = {}
+    parts = []
+    for i, column in enumerate(plan.table.columns):
+        source_index = plan.source_index.get(column.name)
+        if source_index is None:
+            namespace[f"d{i}"] = default_factory(column)
+            parts.append(f"d{i}()")
+            continue
+
+        convert = converter_for(column)
+        if convert is None:
+            parts.append(f"row[{source_index}]")
+        else:
+            namespace[f"c{i}"] = convert
+            parts.append(f"c{i}(row[{source_index}])")
+
+    return eval(f"lambda row: ({', '.join(parts)},)", namespace)
+
+
+def build_extra_row(plan: "TablePlan", values: Dict[str, Any]) -> tuple:
+    """Row for a synthesized record: given values, model defaults for the rest."""
+    row = []
+    for column in plan.table.columns:
+        if column.name in values:
+            convert = converter_for(column)
+            row.append(convert(values[column.name]) if convert else values[column.name])
+        else:
+            row.append(default_factory(column)())
+    return tuple(row)
+
+
+# ==================== CHECKSUMS ====================
+
+def _canonical(value) -> str:
+    if value is None:
+        return "\0"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def row_digest(row: Sequence[Any]) -> int:
+    data = "\x1f".join(map(_canonical, row)).encode("utf-8", errors="surrogatepass")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def add_to_checksum(checksum: int, rows: Sequence[Sequence[Any]]) -> int:
+    """Order-independent table checksum: sum of row digests mod 2**64."""
+    for row in rows:
+        checksum = (checksum + row_digest(row)) & _CHECKSUM_MASK
+    return checksum
+
+
+# ==================== PLANNING ====================
+
+@dataclass
+class TablePlan:
+    table: Table
+    level: int
+    source_columns: List[str]
+    source_index: Dict[str, int]
+    extra_rows: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+    @property
+    def column_names(self) -> List[str]:
+        return [column.name for column in self.table.columns]
+
+
+@dataclass
+class TableResult:
+    name: str
+    rows: int = 0
+    checksum: int = 0
+    seconds: float = 0.0
+    target_rows: Optional[int] = None
+    target_checksum: Optional[int] = None
+
+    @property
+    def verified(self) -> Optional[bool]:
+        if self.target_rows is None:
+            return None
+        return self.rows == self.target_rows and self.checksum == self.target_checksum
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+# Tables filled from other tables by a service rebuild, as "module:Class.method". The
+# rebuild takes a connection and returns the rows written (see DatabaseMigrator.rebuild_derived).
+DERIVED_TABLES: Dict[str, str] = {
+    "mini_game_daily_stats": "services.minigames_service:MiniGamesService.rebuild_daily_stats",
+    "conversations": "services.social_service:MessagingService.rebuild_conversations",
+    "timeline_entries": "services.timeline_service:TimelineService.rebuild",
+    "timeline_heads": "services.timeline_service:TimelineService.rebuild",
+    "timeline_pull_authors": "services.timeline_service:TimelineService.rebuild",
+}
+
+
+def _load_rebuild(target: str) -> Callable:
+    module, _, path = target.partition(":")
+    rebuild = importlib.import_module(module)
+    for name in path.split("."):
+        rebuild = getattr(rebuild, name)
+    return rebuild
+
+
+def fk_levels(tables: Sequence[Table]) -> Dict[str, int]:
+    """Level 0 has no parents; a table's level is one more than its deepest parent."""
+    levels: Dict[str, int] = {}
+    names = {table.name for table in tables}
+    for table in tables:  # Base.metadata.sorted_tables order: parents first
+        parents = {
+            fk.column.table.name for fk in table.foreign_keys
+            if fk.column.table is not table and fk.column.table.name in names
+        }
+        levels[table.name] = 1 + max((levels.get(p, 0) for p in parents), default=-1)
+    return levels
+
+
+# ==================== MIGRATOR ====================
 
-        logger.info("📥 PostgreSQL import complete!")
+class DatabaseMigrator:
+    def __init__(self, source_url: str, target_url: Optional[str], chunk_size: int = 5000, workers: int = 4):
+        self.source_url = source_url
+        self.target_url = target_url
+        self.chunk_size = chunk_size
+        self.semaphore = asyncio.Semaphore(workers)
+        self.source_engine = create_async_engine(source_url, echo=False)
+        self.target_engine = create_async_engine(target_url, echo=False) if target_url else None
+        self.missing_derived: List[str] = []
+
+    @property
+    def target_dsn(self) -> str:
+        # asyncpg.connect wants a plain libpq URL
+        return self.target_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+    async def plan(self, only: Optional[Sequence[str]] = None) -> List[TablePlan]:
+        from database.models import Base
 
-    async def verify_migration(self):
-        """Verify that data was migrated correctly."""
-        logger.info("🔍 Verifying migration...")
+        def _source_columns(sync_conn):
+            inspector = inspect(sync_conn)
+            return {
+                name: [col["name"] for col in inspector.get_columns(name)]
+                for name in inspector.get_table_names()
+            }
+
+        async with self.source_engine.connect() as conn:
+            source_tables = await conn.run_sync(_source_columns)
+
+        tables = [t for t in Base.metadata.sorted_tables if not only or t.name in only]
+        levels = fk_levels(tables)
+        plans = []
+        for table in tables:
+            if table.name not in source_tables:
+                if table.name in DERIVED_TABLES:
+                    logger.info("  ↳ %s: not in source, rebuilding from history after the load", table.name)
+                    self.missing_derived.append(table.name)
+                else:
+                    logger.info("  ↳ %s: not in source, skipping", table.name)
+                continue
+
+            present = set(source_tables[table.name])
+            source_columns = [c.name for c in table.columns if c.name in present]
+            missing = [c.name for c in table.columns if c.name not in present]
+            if missing:
+                logger.warning("  ↳ %s: source lacks %s, using model defaults", table.name, ", ".join(missing))
+
+            plans.append(TablePlan(
+                table=table,
+                level=levels[table.name],
+                source_columns=source_columns,
+                source_index={name: i for i, name in enumerate(source_columns)},
+            ))
+
+        await self._add_guest_user(plans)
+        return plans
+
+    async def _add_guest_user(self, plans: List[TablePlan]):
+        """Guest game sessions reference a 'guest' user that older databases never stored."""
+        by_name = {plan.name: plan for plan in plans}
+        if "game_sessions" not in by_name or "users" not in by_name:
+            return
+
+        async with self.source_engine.connect() as conn:
+            needs_guest = (await conn.execute(text(
+                "SELECT 1 FROM game_sessions WHERE user_id = 'guest' LIMIT 1"
+            ))).first() is not None
+            has_guest = (await conn.execute(text(
+                "SELECT 1 FROM users WHERE id = 'guest'"
+            ))).first() is not None
+
+        if needs_guest and not has_guest:
+            logger.info("  ↳ Adding guest user for guest game sessions")
+            by_name["users"].extra_rows.append({
+                "id": "guest",
+                "username": "guest",
+                "email": "guest@guest.crypto",
+                "password_hash": "guest_user_placeholder",
+            })
+            if "wallets" in by_name:
+                by_name["wallets"].extra_rows.append({"user_id": "guest", "gem_balance": 0.0})
+
+    async def stream_source(self, plan: TablePlan) -> AsyncIterator[List[tuple]]:
+        """Yield converted row chunks for one table."""
+        build = compile_row_builder(plan)
+        columns = ", ".join(_quote(name) for name in plan.source_columns)
+
+        async with self.source_engine.connect() as conn:
+            result = await conn.stream(
+                text(f"SELECT {columns} FROM {_quote(plan.name)}"),
+                execution_options={"yield_per": self.chunk_size}
+            )
+            async for chunk in result.partitions(self.chunk_size):
+                yield [build(row) for row in chunk]
+
+        if plan.extra_rows:
+            yield [build_extra_row(plan, extra) for extra in plan.extra_rows]
+
+    async def copy_table(self, plan: TablePlan, dry_run: bool = False) -> TableResult:
+        import asyncpg
+
+        result = TableResult(plan.name)
+        async with self.semaphore:
+            started = time.perf_counter()
+            if dry_run:
+                async for records in self.stream_source(plan):
+                    result.rows += len(records)
+                    result.checksum = add_to_checksum(result.checksum, records)
+            else:
+                conn = await asyncpg.connect(self.target_dsn)
+                try:
+                    # Safe for a bulk load that is re-run from scratch on failure
+                    await conn.execute("SET synchronous_commit = off")
+                    async with conn.transaction():
+                        async for records in self.stream_source(plan):
+                            await conn.copy_records_to_table(plan.name, records=records, columns=plan.column_names)
+                            result.rows += len(records)
+                            result.checksum = add_to_checksum(result.checksum, records)
+                        await self._reset_sequences(conn, plan)
+                finally:
+                    await conn.close()
+            result.seconds = time.perf_counter() - started
+
+        logger.info("  ✅ %s: %s rows in %.2fs", plan.name, result.rows, result.seconds)
+        return result
+
+    async def _reset_sequences(self, conn, plan: TablePlan):
+        """COPY bypasses SERIAL sequences; move them past the copied ids."""
+        for column in plan.table.primary_key.columns:
+            if isinstance(column.type, Integer) and column.autoincrement in (True, "auto"):
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence($1, $2), COALESCE(MAX({_quote(column.name)}), 1), "
+                    f"MAX({_quote(column.name)}) IS NOT NULL) FROM {_quote(plan.name)}",
+                    plan.name, column.name
+                )
+
+    async def checksum_target(self, plan: TablePlan, result: TableResult):
+        import asyncpg
+
+        async with self.semaphore:
+            conn = await asyncpg.connect(self.target_dsn)
+            try:
+                columns = ", ".join(_quote(name) for name in plan.column_names)
+                rows = 0
+                checksum = 0
+                chunk: List[tuple] = []
+                async with conn.transaction():
+                    async for record in conn.cursor(f"SELECT {columns} FROM {_quote(plan.name)}", prefetch=self.chunk_size):
+                        chunk.append(tuple(record))
+                        if len(chunk) >= self.chunk_size:
+                            rows += len(chunk)
+                            checksum = add_to_checksum(checksum, chunk)
+                            chunk = []
+                rows += len(chunk)
+                checksum = add_to_checksum(checksum, chunk)
+            finally:
+                await conn.close()
 
-        verification = {}
+        result.target_rows = rows
+        result.target_checksum = checksum
 
-        async with self.postgresql_engine.connect() as conn:
-            for table in ["users", "wallets", "game_bets", "cryptocurrencies"]:
-                try:
-                    result = await conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                    count = result.scalar()
-                    verification[table] = count
-                    logger.info(f"  ✅ {table}: {count} records")
-                except Exception as e:
-                    logger.error(f"  ❌ {table}: verification failed - {e}")
-                    verification[table] = 0
-
-        return verification
-
-    async def migrate(self):
-        """Run the complete migration process."""
-        logger.info("🚀 Starting PostgreSQL migration...")
-        logger.info(f"📡 Source: {SQLITE_URL}")
-        logger.info(f"📡 Target: {POSTGRESQL_URL}")
-        logger.info("─" * 50)
+    async def prepare_target(self, plans: List[TablePlan], reset: bool):
+        """Create the schema via the migration runner; refuse to load into non-empty tables."""
+        from database.models import Base
+        from database.migrations import upgrade
+        from database.migrations.runner import version_table
+
+        if reset:
+            logger.info("🏗️ Dropping target tables...")
+            async with self.target_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(version_table.drop, checkfirst=True)
+
+        logger.info("🏗️ Creating target schema (migrations)...")
+        await upgrade(self.target_engine)
+
+        async with self.target_engine.connect() as conn:
+            for plan in plans:
+                if (await conn.execute(text(f"SELECT 1 FROM {_quote(plan.name)} LIMIT 1"))).first():
+                    raise RuntimeError(f"Target table {plan.name} is not empty; re-run with --reset")
+
+    async def rebuild_derived(self) -> List[str]:
+        """
+        Fill the derived tables the source did not have from the loaded
+        history, the same way their migrations backfill them. Returns the
+        rebuilds run.
+        """
+        done = []
+        for target in dict.fromkeys(DERIVED_TABLES[name] for name in self.missing_derived):
+            rebuild = _load_rebuild(target)
+            started = time.perf_counter()
+            async with self.target_engine.begin() as conn:
+                rows = await rebuild(conn)
+            logger.info("  ✅ %s: %s rows in %.2fs", rebuild.__qualname__, rows, time.perf_counter() - started)
+            done.append(rebuild.__qualname__)
+        return done
+
+    async def migrate(self, only=None, reset=False, dry_run=False, verify_only=False) -> List[TableResult]:
+        logger.info("🚀 Source: %s", self.source_url)
+        logger.info("🚀 Target: %s", "(dry run)" if dry_run else self.target_url)
 
         try:
-            # Step 1: Export from SQLite
-            sqlite_data = await self.export_sqlite_data()
-            total_records = sum(len(records) for records in sqlite_data.values())
-            logger.info(f"📊 Exported {total_records} total records from SQLite")
-            logger.info("─" * 50)
-
-            # Step 2: Create PostgreSQL schema
-            await self.create_postgresql_schema()
-            logger.info("─" * 50)
-
-            # Step 3: Import to PostgreSQL
-            await self.import_data_to_postgresql(sqlite_data)
-            logger.info("─" * 50)
-
-            # Step 4: Verify migration
-            verification = await self.verify_migration()
-            total_verified = sum(verification.values())
-            logger.info("─" * 50)
-
-            if total_records == total_verified:
-                logger.info("🎉 Migration completed successfully!")
-                logger.info(f"✅ Total records migrated: {total_verified}")
-                return True
-            else:
-                logger.warning(f"⚠️ Migration completed with issues. Expected {total_records}, got {total_verified}")
-                return True
-
-        except Exception as e:
-            logger.error(f"❌ Migration failed: {e}")
-            raise
+            plans = await self.plan(only)
+            if not dry_run and not verify_only:
+                await self.prepare_target(plans, reset)
+
+            results: Dict[str, TableResult] = {}
+            levels = sorted({plan.level for plan in plans})
+            for level in levels:
+                batch = [plan for plan in plans if plan.level == level]
+                logger.info("📦 Level %s: %s", level, ", ".join(plan.name for plan in batch))
+                done = await asyncio.gather(*(
+                    self.copy_table(plan, dry_run=dry_run or verify_only) for plan in batch
+                ))
+                results.update({result.name: result for result in done})
+
+            if self.missing_derived and not dry_run and not verify_only:
+                logger.info("🔁 Rebuilding derived tables missing from the source...")
+                await self.rebuild_derived()
+
+            if not dry_run:
+                logger.info("🔍 Verifying row counts and checksums...")
+                await asyncio.gather(*(self.checksum_target(plan, results[plan.name]) for plan in plans))
+
+            return [results[plan.name] for plan in plans]
         finally:
-            # Close engines
-            await self.sqlite_engine.dispose()
-            await self.postgresql_engine.dispose()
-
-async def main():
-    """Run the migration."""
-    logger.info("PostgreSQL Migration Script")
-    logger.info("=" * 50)
-
-    migrator = DatabaseMigrator()
-    success = await migrator.migrate()
-
-    if success:
-        logger.info("")
-        logger.info("🎯 MIGRATION SUCCESS!")
-        logger.info("You can now:")
-        logger.info("1. Set DATABASE_URL to PostgreSQL in your environment")
-        logger.info("2. Restart your application with: python main.py")
-        logger.info("3. Test concurrent operations - bots, price updates, and spins")
-        exit(0)
+            await self.source_engine.dispose()
+            if self.target_engine:
+                await self.target_engine.dispose()
+
+
+def print_report(results: List[TableResult]):
+    print(f"\n{'table':<32} {'rows':>10} {'seconds':>9} {'rows/s':>10}  verified")
+    print("-" * 75)
+    for r in results:
+        rate = r.rows / r.seconds if r.seconds else 0.0
+        status = {None: "-", True: "ok", False: f"MISMATCH (target {r.target_rows} rows)"}[r.verified]
+        print(f"{r.name:<32} {r.rows:>10} {r.seconds:>9.2f} {rate:>10.0f}  {status}")
+    total_rows = sum(r.rows for r in results)
+    print("-" * 75)
+    print(f"{len(results)} tables, {total_rows} rows")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a SQLite database into PostgreSQL")
+    parser.add_argument("--source", default=DEFAULT_SOURCE_URL, help="SQLite URL (default: %(default)s)")
+    parser.add_argument("--target", default=os.getenv("DATABASE_URL"), help="PostgreSQL URL (default: $DATABASE_URL)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per COPY batch (default: 5000)")
+    parser.add_argument("--workers", type=int, default=4, help="Tables copied in parallel (default: 4)")
+    parser.add_argument("--tables", nargs="+", help="Only migrate these tables")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate target tables first")
+    parser.add_argument("--dry-run", action="store_true", help="Read, convert and checksum the source only")
+    parser.add_argument("--verify-only", action="store_true", help="Compare an existing target with the source")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    target = args.target
+    if not args.dry_run:
+        if not target or not target.startswith("postgresql"):
+            logger.error("❌ --target / DATABASE_URL must point to PostgreSQL")
+            return 1
+        if target.startswith("postgresql://"):
+            target = target.replace("postgresql://", "postgresql+asyncpg://", 1)
     else:
-        logger.error("❌ Migration failed")
-        exit(1)
+        target = None
+
+    migrator = DatabaseMigrator(args.source, target, chunk_size=args.chunk_size, workers=args.workers)
+    results = await migrator.migrate(
+        only=args.tables, reset=args.reset, dry_run=args.dry_run, verify_only=args.verify_only
+    )
+    print_report(results)
+
+    if any(result.verified is False for result in results):
+        logger.error("❌ Verification failed")
+        return 1
+    return 0
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
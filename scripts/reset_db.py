@@ -7,16 +7,17 @@ Usage:
 This is a dev-only convenience for local development. DO NOT use in production.
 """
 import asyncio
-from database.database import engine, init_database
+from database.database import writer_engine, init_database
 from database.models import Base
+from database.migrations.runner import version_table
 
 async def reset():
-    async with engine.begin() as conn:
+    async with writer_engine.begin() as conn:
         print('Dropping all tables...')
         await conn.run_sync(Base.metadata.drop_all)
-        print('Creating all tables...')
-        await conn.run_sync(Base.metadata.create_all)
-    # Run seed
+        await conn.run_sync(version_table.drop, checkfirst=True)
+    # Recreate via migrations and seed
+    print('Running migrations...')
     await init_database()
 
 if __name__ == '__main__':
@@ -0,0 +1,67 @@
+"""Verify recorded crash, roulette and mini-game results against their published seed chains.
+
+Usage:
+  cd Version3
+  python scripts/verify_fairness.py                          # every chain, every used link
+  python scripts/verify_fairness.py --purpose crash
+  python scripts/verify_fairness.py --chain <id> --start 1000 --end 5000
+
+For each chain the revealed seeds are hashed down to the chain's anchor and
+each stored outcome is re-derived from its seed (see services/fairness.py).
+Needs only the database, not the chain files. Exits with status 1 if any
+result fails.
+"""
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.fairness import fairness
+from services.fairness_audit import audit_chain
+
+
+async def main(chain_id: str, purpose: str, start: int, end: int, show: int) -> bool:
+    if chain_id:
+        chain_ids = [chain_id]
+    else:
+        chain_ids = [chain.id for chain in reversed(await fairness.chains(purpose))]
+
+    all_ok = True
+    for chain_id in chain_ids:
+        report = await audit_chain(chain_id, start, end)
+        if report is None:
+            print(f"Chain {chain_id} not found")
+            all_ok = False
+            continue
+
+        status = "OK" if report.ok else "FAILED"
+        print(
+            f"{report.purpose:<10} {report.chain_id}  links {report.start}-{report.end}  "
+            f"{report.records:>8} results  {report.hashes:>9} hashes  {status}"
+        )
+        print(f"           anchor {report.anchor}")
+        for label in report.chain_failures[:show]:
+            print(f"           seed not on chain: {label}")
+        for label, expected, recorded in report.outcome_failures[:show]:
+            print(f"           outcome mismatch: {label} expected {expected} recorded {recorded}")
+        hidden = max(0, len(report.chain_failures) - show) + max(0, len(report.outcome_failures) - show)
+        if hidden:
+            print(f"           ... {hidden} more (use --show)")
+        all_ok = all_ok and report.ok
+    if not chain_ids:
+        print("No seed chains recorded yet")
+    return all_ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--chain", help="Chain id (default: every chain)")
+    parser.add_argument("--purpose", choices=("crash", "roulette", "minigames"), help="Only chains for this game")
+    parser.add_argument("--start", type=int, default=1, help="First link index")
+    parser.add_argument("--end", type=int, default=None, help="Last link index (default: last used)")
+    parser.add_argument("--show", type=int, default=20, help="Failures to print per kind")
+    args = parser.parse_args()
+    ok = asyncio.run(main(args.chain, args.purpose, args.start, args.end, args.show))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,322 @@
+"""
+Auth Tokens - signed access tokens that carry their claims, memoized
+verification and an in-memory revocation list.
+
+Access tokens carry what most endpoints need (user id, username, role, bot
+flag), so authorizing a request does not load the user. A token's signature
+is checked once; after that it is a dict lookup for the rest of its lifetime.
+Revocations (logout, or all tokens of a user issued before a point in time)
+are stored in token_revocations, held in memory, applied immediately on the
+worker that revokes, published to the other workers, and re-read from the
+database every few seconds as a backstop.
+
+Tokens issued before claims were added only carry "sub"; callers fill in the
+missing claims from the database once (see api/auth_api.py).
+
+Environment:
+- JWT_SECRET_KEY, JWT_ALGORITHM, JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+- AUTH_TOKEN_CACHE_SIZE: verified tokens kept in memory (default 50000)
+- AUTH_REVOCATION_REFRESH_SECONDS: database re-read interval (default 5)
+"""
+
+import os
+import math
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from jose import JWTError, jwt
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+
+from database.database import AsyncSessionLocal, ReadSessionLocal
+from database.models import TokenRevocation
+from services.cluster import cluster
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# JWT Configuration
+SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key-change-in-production")
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "50000"))
+AUTH_REVOCATION_REFRESH_SECONDS = float(os.getenv("AUTH_REVOCATION_REFRESH_SECONDS", "5"))
+
+# Validate JWT secret key on startup
+if SECRET_KEY == "jwt-secret-key-change-in-production":
+    raise ValueError(
+        "CRITICAL SECURITY ERROR: JWT_SECRET_KEY is using the default value. "
+        "You MUST set a secure JWT_SECRET_KEY in your .env file before running in production. "
+        "Generate a secure key using: python -c 'import secrets; print(secrets.token_urlsafe(32))'"
+    )
+if len(SECRET_KEY) < 32:
+    raise ValueError(
+        "CRITICAL SECURITY ERROR: JWT_SECRET_KEY is too short (minimum 32 characters required). "
+        "Generate a secure key using: python -c 'import secrets; print(secrets.token_urlsafe(32))'"
+    )
+
+auth_token_checks_total = registry.counter(
+    "auth_token_checks_total", "Access token checks by result.", ("result",)
+)
+
+
+@dataclass(frozen=True)
+class AuthClaims:
+    """
+    The authenticated caller, as stated by their access token.
+
+    `id` matches User.id, so endpoints that only read the id, username or
+    role can depend on claims instead of a loaded User.
+    """
+    id: str
+    username: Optional[str]
+    role: Optional[str]
+    is_bot: bool
+    issued_at: float
+    expires_at: float
+    token_id: Optional[str]
+
+    @property
+    def has_profile(self) -> bool:
+        """False for tokens issued before claims were added."""
+        return self.role is not None
+
+
+def _epoch(value: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime, as stored in token claims."""
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    Sign `data` (at least "sub") with issue time, expiry and a token id. The
+    issue time keeps milliseconds (NumericDate allows fractions), so a token
+    issued right after a revoke_user() in the same second stays valid.
+    """
+    now = datetime.utcnow()
+    to_encode = data.copy()
+    to_encode.update({
+        "iat": math.floor(_epoch(now) * 1000) / 1000,
+        "exp": now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)),
+        "jti": uuid.uuid4().hex,
+    })
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def create_user_token(user, expires_delta: Optional[timedelta] = None) -> str:
+    """Access token for `user` carrying the claims most endpoints need."""
+    return create_access_token(
+        {"sub": str(user.id), "name": user.username, "role": user.role, "bot": bool(user.is_bot)},
+        expires_delta
+    )
+
+
+# ==================== REVOCATION ====================
+
+class RevocationList:
+    """Revoked token ids and per-user cut-off times, mirrored from token_revocations."""
+
+    def __init__(self, refresh_seconds: float = AUTH_REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.token_ids: Dict[str, float] = {}  # jti -> token expiry (epoch seconds)
+        # user id -> tokens issued at or before this are revoked. Issue times are
+        # floored to the millisecond, so a token from the same millisecond as the
+        # revocation counts as revoked.
+        self.users: Dict[str, float] = {}
+        self._since: Optional[datetime] = None  # Newest revoked_at applied so far
+        self._task: Optional[asyncio.Task] = None
+
+        registry.gauge(
+            "auth_revocations", "Revocations held in memory.",
+            callback=lambda: len(self.token_ids) + len(self.users)
+        )
+
+    def is_revoked(self, claims: AuthClaims) -> bool:
+        if claims.token_id is not None and claims.token_id in self.token_ids:
+            return True
+        cutoff = self.users.get(claims.id)
+        return cutoff is not None and claims.issued_at <= cutoff
+
+    async def start(self):
+        cluster.subscribe("auth_revocations", self._on_published)
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def revoke_token(self, claims: AuthClaims):
+        """Revoke a single token (logout)."""
+        if claims.token_id is None:
+            # Pre-claims tokens have no id; revoke everything the user held up to now
+            await self.revoke_user(claims.id)
+            return
+        await self._store(TokenRevocation(
+            user_id=claims.id,
+            token_id=claims.token_id,
+            revoked_at=datetime.utcnow(),
+            expires_at=datetime.utcfromtimestamp(claims.expires_at)
+        ))
+
+    async def revoke_user(self, user_id: str):
+        """Revoke every token issued to `user_id` so far (deactivation, password or role change)."""
+        await self._store(TokenRevocation(user_id=user_id, revoked_at=datetime.utcnow()))
+
+    async def refresh(self):
+        """Apply revocations added since the last refresh and drop those past their token's expiry."""
+        query = select(TokenRevocation).where(
+            (TokenRevocation.expires_at.is_(None)) | (TokenRevocation.expires_at > datetime.utcnow())
+        )
+        if self._since is not None:
+            # Overlap the previous window: rows can commit out of revoked_at order, re-applying is harmless
+            query = query.where(TokenRevocation.revoked_at > self._since - timedelta(seconds=60))
+        async with ReadSessionLocal() as session:
+            rows = (await session.execute(query)).scalars().all()
+        for row in rows:
+            self._apply(self._as_message(row))
+            if self._since is None or row.revoked_at > self._since:
+                self._since = row.revoked_at
+        if self._since is None:
+            self._since = datetime.utcnow()
+
+        now = time.time()
+        for token_id in [t for t, expires in self.token_ids.items() if expires <= now]:
+            del self.token_ids[token_id]
+
+    async def purge_expired(self) -> int:
+        """Delete stored token revocations whose tokens have expired anyway."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(TokenRevocation).where(TokenRevocation.expires_at <= datetime.utcnow())
+            )
+            await session.commit()
+        return result.rowcount
+
+    async def _store(self, row: TokenRevocation):
+        async with AsyncSessionLocal() as session:
+            session.add(row)
+            await session.commit()
+            message = self._as_message(row)
+        self._apply(message)
+        await cluster.publish("auth_revocations", message)
+
+    async def _refresh_loop(self):
+        iterations = 0
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            iterations += 1
+            try:
+                await self.refresh()
+                if cluster.is_leader and iterations % 720 == 0:
+                    await self.purge_expired()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Revocation refresh failed: %s", e)
+
+    async def _on_published(self, message: dict):
+        self._apply(message)
+
+    @staticmethod
+    def _as_message(row: TokenRevocation) -> dict:
+        return {
+            "user_id": row.user_id,
+            "token_id": row.token_id,
+            "revoked_at": _epoch(row.revoked_at),
+            "expires_at": _epoch(row.expires_at) if row.expires_at else None,
+        }
+
+    def _apply(self, message: dict):
+        if message["token_id"]:
+            self.token_ids[message["token_id"]] = message["expires_at"] or float("inf")
+        else:
+            self.users[message["user_id"]] = max(self.users.get(message["user_id"], 0.0), message["revoked_at"])
+
+
+# ==================== VERIFICATION ====================
+
+class TokenVerifier:
+    """Checks token signatures once and remembers the claims until the token expires."""
+
+    def __init__(self, revocations: RevocationList, max_entries: int = AUTH_TOKEN_CACHE_SIZE):
+        self.revocations = revocations
+        self.max_entries = max_entries
+        self._verified: Dict[str, AuthClaims] = {}
+
+    def verify(self, token: str, allow_expired: bool = False) -> Optional[AuthClaims]:
+        """
+        Claims for a valid, unrevoked token, else None. `allow_expired` accepts
+        a correctly signed token past its expiry (server-side sessions keep
+        using the token they were created with).
+        """
+        claims = self._verified.get(token)
+        if claims is None:
+            claims = self._decode(token)
+            if claims is None:
+                auth_token_checks_total.inc(1, "invalid")
+                return None
+            self.remember(token, claims)
+            result = "verified"
+        else:
+            result = "cached"
+
+        if not allow_expired and claims.expires_at <= time.time():
+            auth_token_checks_total.inc(1, "expired")
+            return None
+        if self.revocations.is_revoked(claims):
+            auth_token_checks_total.inc(1, "revoked")
+            return None
+        auth_token_checks_total.inc(1, result)
+        return claims
+
+    def remember(self, token: str, claims: AuthClaims):
+        if len(self._verified) >= self.max_entries:
+            self._evict()
+        self._verified[token] = claims
+
+    def _evict(self):
+        now = time.time()
+        expired = [t for t, c in self._verified.items() if c.expires_at <= now]
+        for token in expired:
+            del self._verified[token]
+        # Still full: drop the oldest tenth (dicts keep insertion order)
+        if len(self._verified) >= self.max_entries:
+            for token in list(self._verified)[:max(1, self.max_entries // 10)]:
+                del self._verified[token]
+
+    @staticmethod
+    def _decode(token: str) -> Optional[AuthClaims]:
+        try:
+            # Expiry is checked per use in verify(), so a memoized token expires on time
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+        except JWTError:
+            return None
+        if not payload.get("sub") or "exp" not in payload:
+            return None
+        return AuthClaims(
+            id=str(payload["sub"]),
+            username=payload.get("name"),
+            role=payload.get("role"),
+            is_bot=bool(payload.get("bot", False)),
+            issued_at=float(payload.get("iat", 0)),
+            expires_at=float(payload["exp"]),
+            token_id=payload.get("jti"),
+        )
+
+
+# Global revocation list and verifier
+revocation_list = RevocationList()
+token_verifier = TokenVerifier(revocation_list)
@@ -0,0 +1,171 @@
+"""
+Async Cache - bounded in-process cache with TTL, stale-while-revalidate
+and single-flight loading.
+
+    prices = AsyncCache("stock_prices", max_size=5000, ttl=300)
+    price = await prices.get_or_load(ticker, lambda: fetch(ticker))
+
+- at most `max_size` entries; the least recently used entry is evicted
+- an entry is fresh for `ttl` seconds (per entry, overridable on set)
+- for `stale_ttl` seconds after that, get_or_load returns the stale value
+  at once and reloads it in the background
+- concurrent loads of one key share a single loader call
+- loaders returning None are not cached (a miss stays a miss)
+
+Requests, evictions and size are exported per cache name:
+cache_requests_total{cache,result}, cache_evictions_total{cache,reason}
+and cache_entries{cache}.
+"""
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+Loader = Callable[[], Awaitable[Optional[V]]]
+
+cache_requests_total = registry.counter(
+    "cache_requests_total", "In-process cache lookups by cache and result (hit, stale, miss).",
+    ("cache", "result")
+)
+cache_evictions_total = registry.counter(
+    "cache_evictions_total", "In-process cache entries removed, by cache and reason (size, expired).",
+    ("cache", "reason")
+)
+cache_entries = registry.gauge(
+    "cache_entries", "Entries held per in-process cache.", ("cache",)
+)
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class AsyncCache(Generic[K, V]):
+    """LRU + TTL cache; see the module docstring."""
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._entries: "OrderedDict[K, _Entry]" = OrderedDict()
+        self._loading: Dict[K, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and self.clock() < entry.fresh_until
+
+    # ==================== SYNCHRONOUS ACCESS ====================
+
+    def get(self, key: K, allow_stale: bool = False) -> Optional[V]:
+        """The cached value if fresh (or merely stale, with allow_stale), else None."""
+        entry = self._lookup(key)
+        if entry is None:
+            cache_requests_total.inc(1, self.name, "miss")
+            return None
+        if self.clock() < entry.fresh_until:
+            cache_requests_total.inc(1, self.name, "hit")
+            return entry.value
+        cache_requests_total.inc(1, self.name, "stale" if allow_stale else "miss")
+        return entry.value if allow_stale else None
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None):
+        now = self.clock()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        self._entries[key] = _Entry(value, fresh_until, fresh_until + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            cache_evictions_total.inc(1, self.name, "size")
+        cache_entries.set(len(self._entries), self.name)
+
+    def delete(self, key: K):
+        if self._entries.pop(key, None) is not None:
+            cache_entries.set(len(self._entries), self.name)
+
+    def clear(self):
+        self._entries.clear()
+        cache_entries.set(0, self.name)
+
+    def _lookup(self, key: K) -> Optional[_Entry]:
+        """Entry for key (fresh or stale) marked recently used; drops it once past its stale window."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.clock() >= entry.stale_until:
+            del self._entries[key]
+            cache_evictions_total.inc(1, self.name, "expired")
+            cache_entries.set(len(self._entries), self.name)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    # ==================== LOADING ====================
+
+    async def get_or_load(self, key: K, loader: Loader, ttl: Optional[float] = None) -> Optional[V]:
+        """
+        Cached value, or the loader's result. A stale value is returned right
+        away while one background load refreshes it; a failed background
+        load keeps the stale value.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            if self.clock() < entry.fresh_until:
+                cache_requests_total.inc(1, self.name, "hit")
+                return entry.value
+            cache_requests_total.inc(1, self.name, "stale")
+            if key not in self._loading:
+                self._start_load(key, loader, ttl, background=True)
+            return entry.value
+
+        cache_requests_total.inc(1, self.name, "miss")
+        future = self._loading.get(key) or self._start_load(key, loader, ttl, background=False)
+        # Shield: one caller being cancelled must not cancel the load the others wait on
+        return await asyncio.shield(future)
+
+    def _start_load(self, key: K, loader: Loader, ttl: Optional[float], background: bool) -> asyncio.Future:
+        async def load():
+            try:
+                value = await loader()
+                if value is not None:
+                    self.set(key, value, ttl)
+                return value
+            finally:
+                self._loading.pop(key, None)
+
+        future = asyncio.ensure_future(load())
+        self._loading[key] = future
+        future.add_done_callback(lambda done: self._load_done(done, background))
+        return future
+
+    def _load_done(self, future: asyncio.Future, background: bool):
+        # Always retrieve the exception: the callers that awaited it may all have been cancelled
+        if future.cancelled() or future.exception() is None:
+            return
+        if background:
+            logger.warning("Background refresh in cache %s failed: %s", self.name, future.exception())
@@ -25,13 +25,13 @@ from config.clicker_upgrades import (
 from services.prestige_service import PrestigeService
 from services.powerup_service import PowerupService
 from services.clicker_leaderboard_service import ClickerLeaderboardService
+from services.cluster import cluster
 
 
 class ClickerService:
     """Centralized service for all clicker game operations."""
 
     def __init__(self):
-        self.active_combos = {}  # user_id -> {"count": int, "last_click": datetime}
         self.prestige_service = PrestigeService()
         self.powerup_service = PowerupService()
         self.leaderboard_service = ClickerLeaderboardService()
@@ -237,27 +237,11 @@ class ClickerService:
 
         # Calculate combo
         now = datetime.utcnow()
-        combo_count = 0
         combo_multiplier = 1.0
         combo_name = ""
 
-        if user_id in self.active_combos:
-            last_click_time = self.active_combos[user_id]["last_click"]
-            time_since_last = (now - last_click_time).total_seconds()
-
-            if time_since_last <= COMBO_WINDOW_SECONDS:
-                # Continue combo
-                self.active_combos[user_id]["count"] += 1
-                self.active_combos[user_id]["last_click"] = now
-                combo_count = self.active_combos[user_id]["count"]
-            else:
-                # Combo broke, restart
-                self.active_combos[user_id] = {"count": 1, "last_click": now}
-                combo_count = 1
-        else:
-            # Start new combo
-            self.active_combos[user_id] = {"count": 1, "last_click": now}
-            combo_count = 1
+        # Combo streaks live in cluster state so clicks landing on different workers still chain
+        combo_count = await cluster.state.incr(f"clicker:combo:{user_id}", ttl=COMBO_WINDOW_SECONDS)
 
         # Get combo multiplier
         if combo_count > 2:
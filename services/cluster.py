@@ -0,0 +1,514 @@
+"""
+Cluster - leader election, pub/sub and shared state for multi-worker deployments.
+
+The roulette round timer, the crash game loop and the price refresher must
+run exactly once however many uvicorn workers serve the app. One worker holds
+the "game_loops" lease (a row in cluster_leases, renewed every third of its
+TTL) and drives them; the others follow:
+
+- the leader publishes every round / crash event on a channel, and each
+  worker (the leader included) fans it out to its own SSE / WebSocket clients
+  and mirrors the state it needs to answer reads
+- followers forward commands that must run on the leader (start the first
+  round, manual spin, bet registration) with request()/publish()
+- when the lease expires (leader crashed or lost the database), another worker
+  takes it over and resumes the loops from the mirrored state
+
+Backends (CLUSTER_MODE):
+- "single" (default): one process. In-memory pub/sub and state, this worker is
+  always the leader. Also the stand-in for tests.
+- "postgres": PostgreSQL LISTEN/NOTIFY on a dedicated asyncpg connection,
+  cluster_leases for the lease and cluster_state for shared state. Required
+  for `uvicorn --workers N`.
+
+Environment:
+- CLUSTER_MODE: "single" or "postgres"
+- CLUSTER_LEASE_TTL: seconds before an unrenewed lease can be taken over (default 15)
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Interval, case, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.database import AsyncSessionLocal, DATABASE_URL
+from database.models import ClusterLease, ClusterState
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_MODE = os.getenv("CLUSTER_MODE", "single").lower()
+CLUSTER_LEASE_TTL = float(os.getenv("CLUSTER_LEASE_TTL", "15"))
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+# NOTIFY payloads must stay under 8000 bytes; larger messages travel through cluster_state
+MAX_NOTIFY_PAYLOAD = 7500
+CHANNEL_PREFIX = "cc_"
+
+Message = Dict[str, Any]
+Handler = Callable[[Message], Awaitable[None]]
+
+cluster_messages_total = registry.counter(
+    "cluster_messages_total", "Pub/sub messages by direction.", ("direction",)
+)
+
+
+def _dialect_insert(session):
+    return pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+# ==================== PUB/SUB ====================
+
+class PubSub(ABC):
+    """Fire-and-forget broadcast to every worker, including the publisher."""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Message):
+        ...
+
+    async def _dispatch(self, channel: str, message: Message):
+        cluster_messages_total.inc(1, "received")
+        for handler in self._handlers.get(channel, ()):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.exception("Handler for %s failed: %s", channel, e)
+
+
+class InMemoryPubSub(PubSub):
+    """Single-process pub/sub; handlers run in publish order before publish() returns."""
+
+    async def publish(self, channel: str, message: Message):
+        cluster_messages_total.inc(1, "sent")
+        await self._dispatch(channel, message)
+
+
+class PostgresPubSub(PubSub):
+    """
+    LISTEN/NOTIFY on a dedicated asyncpg connection.
+
+    Notifications are queued and handled one at a time so each channel keeps
+    its publish order. The listener reconnects if the connection drops.
+    """
+
+    def __init__(self, dsn: str, state: "StateStore"):
+        super().__init__()
+        self.dsn = dsn
+        self.state = state
+        self._conn = None
+        # asyncpg runs one operation per connection at a time; publishers and listener changes take turns
+        self._conn_lock = asyncio.Lock()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        await self._connect()
+        self._tasks = [
+            asyncio.create_task(self._dispatch_loop()),
+            asyncio.create_task(self._watch_connection()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+
+    async def publish(self, channel: str, message: Message):
+        payload = json.dumps(message, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            key = f"msg:{uuid.uuid4()}"
+            await self.state.set(key, message, ttl=60)
+            payload = json.dumps({"_ref": key})
+        cluster_messages_total.inc(1, "sent")
+        async with self._conn_lock:
+            await self._conn.execute("SELECT pg_notify($1, $2)", CHANNEL_PREFIX + channel, payload)
+
+    async def _connect(self):
+        import asyncpg
+        async with self._conn_lock:
+            self._conn = await asyncpg.connect(self.dsn)
+            for channel in list(self._handlers):
+                await self._conn.add_listener(CHANNEL_PREFIX + channel, self._on_notify)
+
+    def subscribe(self, channel: str, handler: Handler):
+        new_channel = channel not in self._handlers
+        super().subscribe(channel, handler)
+        if new_channel and self._conn is not None:
+            asyncio.get_running_loop().create_task(self._listen(channel))
+
+    async def _listen(self, channel: str):
+        async with self._conn_lock:
+            await self._conn.add_listener(CHANNEL_PREFIX + channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._queue.put_nowait((channel[len(CHANNEL_PREFIX):], payload))
+
+    async def _dispatch_loop(self):
+        while True:
+            channel, payload = await self._queue.get()
+            try:
+                message = json.loads(payload)
+                if "_ref" in message:
+                    message = await self.state.get(message["_ref"])
+                    if message is None:
+                        continue
+            except Exception as e:
+                logger.warning("Dropping unreadable message on %s: %s", channel, e)
+                continue
+            await self._dispatch(channel, message)
+
+    async def _watch_connection(self):
+        while True:
+            await asyncio.sleep(5)
+            if self._conn is None or self._conn.is_closed():
+                logger.warning("Pub/sub connection lost, reconnecting")
+                try:
+                    await self._connect()
+                except Exception as e:
+                    logger.error("Pub/sub reconnect failed: %s", e)
+
+
+# ==================== SHARED STATE ====================
+
+class StateStore(ABC):
+    """Key/value state with optional expiry, visible to every worker."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: float) -> int:
+        """
+        Increment a counter and push its expiry to now + ttl. An expired or
+        missing counter restarts at 1, so this is a sliding-window streak.
+        """
+
+
+class InMemoryStateStore(StateStore):
+    """Process-local state; expired entries are pruned as the dict grows."""
+
+    PRUNE_AT = 10_000
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def _live(self, key: str):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def _prune(self):
+        if len(self._values) >= self.PRUNE_AT:
+            now = time.monotonic()
+            for key in [k for k, (_, exp) in self._values.items() if exp is not None and exp <= now]:
+                del self._values[key]
+
+    async def get(self, key: str) -> Any:
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._prune()
+        self._values[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    async def delete(self, key: str):
+        self._values.pop(key, None)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        entry = self._live(key)
+        count = (entry[0] if entry else 0) + 1
+        await self.set(key, count, ttl)
+        return count
+
+
+class DatabaseStateStore(StateStore):
+    """State in the cluster_state table; incr is one atomic UPSERT ... RETURNING."""
+
+    async def get(self, key: str) -> Any:
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(
+                select(ClusterState.value, ClusterState.expires_at).where(ClusterState.key == key)
+            )).first()
+        if row is None or (row.expires_at is not None and row.expires_at <= datetime.utcnow()):
+            return None
+        return json.loads(row.value) if row.value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl) if ttl else None
+        async with AsyncSessionLocal() as session:
+            stmt = _dialect_insert(session)(ClusterState).values(
+                key=key, value=json.dumps(value, default=str), counter=0, expires_at=expires_at
+            )
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at}
+            ))
+            await session.commit()
+
+    async def delete(self, key: str):
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(ClusterState).where(ClusterState.key == key))
+            await session.commit()
+
+    async def incr(self, key: str, ttl: float) -> int:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            stmt = _dialect_insert(session)(ClusterState).values(
+                key=key, counter=1, expires_at=now + timedelta(seconds=ttl)
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={
+                    "counter": case((ClusterState.expires_at > now, ClusterState.counter + 1), else_=1),
+                    "expires_at": stmt.excluded.expires_at,
+                }
+            ).returning(ClusterState.counter)
+            count = (await session.execute(stmt)).scalar_one()
+            await session.commit()
+        return int(count)
+
+    async def purge_expired(self) -> int:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(ClusterState).where(ClusterState.expires_at <= datetime.utcnow())
+            )
+            await session.commit()
+        return result.rowcount
+
+
+# ==================== LEADER ELECTION ====================
+
+class LeaderElection:
+    """
+    Lease-based leadership. The holder renews every ttl/3; anyone may take a
+    lease whose expiry has passed. A worker that fails to renew steps down
+    before the lease can expire, so two leaders never overlap. Expiry is set
+    and checked on the database clock, so clock skew between the workers'
+    hosts does not matter.
+    """
+
+    def __init__(self, name: str, worker_id: str = WORKER_ID, ttl: float = CLUSTER_LEASE_TTL, always_leader: bool = False):
+        self.name = name
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.always_leader = always_leader
+        # A single worker leads from the start, so code running before startup (scripts, benchmarks) behaves as before
+        self.is_leader = always_leader
+        self._callbacks: List[Tuple[Callable[[], Awaitable], Callable[[], Awaitable]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+        registry.gauge(
+            "cluster_is_leader", "1 if this worker holds the game loop lease.",
+            callback=lambda: 1 if self.is_leader else 0
+        )
+
+    async def on_change(self, elected: Callable[[], Awaitable], demoted: Callable[[], Awaitable]):
+        """Register leadership callbacks; `elected` runs right away if already leader."""
+        self._callbacks.append((elected, demoted))
+        if self.is_leader:
+            await elected()
+
+    async def start(self):
+        if self.always_leader:
+            return
+        await self._renew()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader and not self.always_leader:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(delete(ClusterLease).where(
+                        ClusterLease.name == self.name, ClusterLease.holder == self.worker_id
+                    ))
+                    await session.commit()
+            except Exception as e:
+                logger.warning("Could not release lease %s: %s", self.name, e)
+        await self._set_leader(False)
+
+    def _database_clock(self, session) -> tuple:
+        """SQL expressions for (now, now + ttl) as naive UTC timestamps, evaluated by the database."""
+        if session.bind.dialect.name == "postgresql":
+            now = func.timezone("utc", func.now())
+            return now, now + literal(timedelta(seconds=self.ttl), Interval)
+        return (
+            func.strftime("%Y-%m-%d %H:%M:%f", "now"),
+            func.strftime("%Y-%m-%d %H:%M:%f", "now", f"+{self.ttl} seconds")
+        )
+
+    async def try_acquire(self) -> bool:
+        """Take or renew the lease. Returns True if this worker holds it afterwards."""
+        async with AsyncSessionLocal() as session:
+            now, expires_at = self._database_clock(session)
+            stmt = _dialect_insert(session)(ClusterLease).values(
+                name=self.name, holder=self.worker_id, expires_at=expires_at
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"holder": stmt.excluded.holder, "expires_at": stmt.excluded.expires_at},
+                where=(ClusterLease.holder == self.worker_id) | (ClusterLease.expires_at < now)
+            ).returning(ClusterLease.holder)
+            holder = (await session.execute(stmt)).scalar_one_or_none()
+            await session.commit()
+        return holder == self.worker_id
+
+    async def _renew(self):
+        try:
+            held = await asyncio.wait_for(self.try_acquire(), timeout=self.ttl / 3)
+        except Exception as e:
+            logger.warning("Lease %s renewal failed: %s", self.name, e)
+            held = False
+        await self._set_leader(held)
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            await self._renew()
+
+    async def _set_leader(self, leader: bool):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        logger.info("Worker %s %s leader for %s", self.worker_id, "became" if leader else "is no longer", self.name)
+        for elected, demoted in self._callbacks:
+            try:
+                await (elected() if leader else demoted())
+            except Exception as e:
+                logger.exception("Leadership callback failed: %s", e)
+
+
+# ==================== CLUSTER ====================
+
+class ClusterRequestError(Exception):
+    """A command forwarded to the leader failed there."""
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class Cluster:
+    """Wires the pub/sub, state store and game loop election for this worker."""
+
+    def __init__(self, mode: str = CLUSTER_MODE, worker_id: str = WORKER_ID):
+        self.mode = mode
+        self.worker_id = worker_id
+        if mode == "postgres":
+            self.state: StateStore = DatabaseStateStore()
+            self.pubsub: PubSub = PostgresPubSub(DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"), self.state)
+        else:
+            self.state = InMemoryStateStore()
+            self.pubsub = InMemoryPubSub()
+        self.election = LeaderElection("game_loops", worker_id, always_leader=(mode != "postgres"))
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._reply_channel = f"reply_{uuid.uuid4().hex[:16]}"
+        self.pubsub.subscribe(self._reply_channel, self._on_reply)
+
+    @property
+    def is_leader(self) -> bool:
+        return self.election.is_leader
+
+    async def start(self):
+        if self.mode not in ("single", "postgres"):
+            raise ValueError(f"Unknown CLUSTER_MODE {self.mode!r}")
+        await self.pubsub.start()
+        await self.election.start()
+        logger.info("Cluster mode %s, worker %s, leader: %s", self.mode, self.worker_id, self.is_leader)
+
+    async def stop(self):
+        await self.election.stop()
+        await self.pubsub.stop()
+
+    async def publish(self, channel: str, message: Message):
+        await self.pubsub.publish(channel, message)
+
+    def subscribe(self, channel: str, handler: Handler):
+        self.pubsub.subscribe(channel, handler)
+
+    def handle_requests(self, channel: str, handler: Callable[[Message], Awaitable[Any]]):
+        """Serve request() calls on `channel`; only the current leader answers."""
+        async def serve(message: Message):
+            if not self.is_leader:
+                return
+            reply: Message = {"id": message["id"]}
+            try:
+                reply["result"] = await handler(message["payload"])
+            except Exception as e:
+                reply["error"] = {"type": type(e).__name__, "message": str(e)}
+            if message.get("reply_to"):
+                await self.publish(message["reply_to"], reply)
+
+        self.subscribe(f"{channel}_rpc", serve)
+
+    async def request(self, channel: str, payload: Message, timeout: float = 5.0) -> Any:
+        """Run a command on the leader and wait for its result."""
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self.publish(f"{channel}_rpc", {"id": request_id, "reply_to": self._reply_channel, "payload": payload})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def notify_leader(self, channel: str, payload: Message):
+        """Send a command to the leader without waiting for a reply."""
+        await self.publish(f"{channel}_rpc", {"id": uuid.uuid4().hex, "reply_to": None, "payload": payload})
+
+    async def _on_reply(self, message: Message):
+        future = self._pending.get(message.get("id"))
+        if future is None or future.done():
+            return
+        if "error" in message:
+            future.set_exception(ClusterRequestError(message["error"]["type"], message["error"]["message"]))
+        else:
+            future.set_result(message.get("result"))
+
+
+# Global cluster membership for this worker
+cluster = Cluster()
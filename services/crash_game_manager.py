@@ -3,17 +3,29 @@ Crash Game Manager
 
 Manages automatic crash game rounds in the background.
 Handles timing, multiplier progression, and game state.
+
+Only the cluster leader runs the game loop. Broadcasts go through the cluster
+so every worker relays them to its own WebSocket clients; followers mirror
+the game state and multiplier from them, forward bets and cashouts to the
+leader, and report their client counts so the leader knows when to idle.
 """
 
+import logging
 import asyncio
 import random
+import time
 from datetime import datetime
-from typing import Optional, Set, Dict, List
+from typing import Optional, Set, Dict, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.database import get_db
 from database.models import CrashGame
 from services.crash_service import CrashGameService
+from gaming.bot_engine import bot_engine
+from services.cluster import cluster
+from services.metrics import observe_phase, registry
+
+logger = logging.getLogger(__name__)
 
 
 class CrashGameManager:
@@ -23,6 +35,10 @@ class CrashGameManager:
     MIN_BOTS = 1
     MAX_BOTS = 3
 
+    # Followers report their WebSocket client counts this often; older reports are ignored
+    CLIENT_REPORT_INTERVAL = 2.0
+    CLIENT_REPORT_STALE = 3 * CLIENT_REPORT_INTERVAL
+
     def __init__(self):
         self.current_game: Optional[CrashGame] = None
         self.current_multiplier: float = 1.00
@@ -30,19 +46,52 @@ class CrashGameManager:
         self.is_idle: bool = True  # True when no players connected
         self.task: Optional[asyncio.Task] = None
         self.connected_clients: Set = set()
-        self.current_bets: List[Dict] = []  # Track bets for current round
+        self.current_bets: Dict[int, Dict] = {}  # Bets for current round, keyed by bet id
+        self.remote_clients: Dict[str, Tuple[int, float]] = {}  # worker → (clients, time.monotonic())
+        self._mirrored_state: Optional[dict] = None  # Followers: last state seen from the leader
+        self._report_task: Optional[asyncio.Task] = None
+
+        registry.gauge(
+            "crash_websocket_clients", "Connected crash game WebSocket clients.",
+            callback=lambda: len(self.connected_clients)
+        )
 
     async def start(self):
-        """Start the game manager."""
+        """Join the cluster; the game loop starts on whichever worker leads it."""
+        cluster.subscribe("crash_events", self._on_cluster_event)
+        cluster.subscribe("crash_clients", self._on_client_report)
+        cluster.handle_requests("crash", self._handle_command)
+        if cluster.mode != "single":
+            self._report_task = asyncio.create_task(self._report_clients())
+        await cluster.election.on_change(self._start_loop, self._stop_loop)
+
+    async def stop(self):
+        """Stop the game manager."""
+        if self._report_task:
+            self._report_task.cancel()
+            self._report_task = None
+        await self._stop_loop()
+
+    async def _start_loop(self):
         if self.is_running:
             return
 
         self.is_running = True
+        try:
+            async for db in get_db():
+                await CrashGameService.refund_unfinished_games(db)
+                break
+        except Exception as e:
+            logger.exception("Could not settle unfinished crash games: %s", e)
+        if not self.is_running:  # Demoted meanwhile
+            return
+
         self.task = asyncio.create_task(self._game_loop())
-        print("[Crash Manager] Started")
+        logger.info("Crash game manager started")
 
-    async def stop(self):
-        """Stop the game manager."""
+    async def _stop_loop(self):
+        if not self.is_running:
+            return
         self.is_running = False
         if self.task:
             self.task.cancel()
@@ -50,17 +99,18 @@ class CrashGameManager:
                 await self.task
             except asyncio.CancelledError:
                 pass
-        print("[Crash Manager] Stopped")
+            self.task = None
+        logger.info("Crash game manager stopped")
 
     async def _game_loop(self):
         """Main game loop that runs continuously."""
         while self.is_running:
             try:
                 # Wait for at least one player to connect before starting rounds
-                while not self.connected_clients and self.is_running:
+                while not self.client_count() and self.is_running:
                     if not self.is_idle:
                         self.is_idle = True
-                        print("[Crash Manager] Entering idle mode - waiting for players")
+                        logger.info("Entering idle mode - waiting for players")
                         await self.broadcast({
                             "type": "game_state",
                             "status": "idle",
@@ -71,10 +121,10 @@ class CrashGameManager:
                 # Player connected - exit idle mode
                 if self.is_idle:
                     self.is_idle = False
-                    print(f"[Crash Manager] Player connected! Starting new round...")
+                    logger.info("Player connected! Starting new round...")
                 
                 # Reset bets for new round
-                self.current_bets = []
+                self.current_bets = {}
                 
                 # Create new game
                 async for db in get_db():
@@ -82,26 +132,34 @@ class CrashGameManager:
                     break
 
                 # Phase 1: Waiting for bets (10 seconds)
-                print(f"[Crash Manager] Game #{self.current_game.id} - Betting phase (10s)")
+                logger.info("Game #%s - Betting phase (10s)", self.current_game.id)
+                phase_started = time.monotonic()
                 await self._betting_phase()
+                observe_phase("crash", "waiting", phase_started)
 
                 # Phase 2: Starting (2 second countdown)
-                print(f"[Crash Manager] Game #{self.current_game.id} - Starting in 2s...")
+                logger.info("Game #%s - Starting in 2s...", self.current_game.id)
+                phase_started = time.monotonic()
                 await self._starting_phase()
+                observe_phase("crash", "starting", phase_started)
 
                 # Phase 3: Playing (multiplier increases until crash)
-                print(f"[Crash Manager] Game #{self.current_game.id} - Playing!")
+                logger.info("Game #%s - Playing!", self.current_game.id)
+                phase_started = time.monotonic()
                 await self._playing_phase()
+                observe_phase("crash", "playing", phase_started)
 
                 # Phase 4: Crashed (show result for 3 seconds)
-                print(f"[Crash Manager] Game #{self.current_game.id} - Crashed at {self.current_game.crash_point:.2f}x")
+                logger.info("Game #%s - Crashed at %.2fx", self.current_game.id, self.current_game.crash_point)
+                phase_started = time.monotonic()
                 await self._crashed_phase()
+                observe_phase("crash", "crashed", phase_started)
 
                 # Small delay before next round
                 await asyncio.sleep(2)
 
             except Exception as e:
-                print(f"[Crash Manager] Error in game loop: {e}")
+                logger.exception("Error in game loop: %s", e)
                 await asyncio.sleep(5)
 
     async def _betting_phase(self):
@@ -119,19 +177,17 @@ class CrashGameManager:
             "server_seed_hash": self.current_game.server_seed_hash
         })
 
-        # Simulate bot bets during betting phase (staggered for realism)
-        asyncio.create_task(self._simulate_bot_bets())
-        
         # Adaptive betting duration: shorter when solo, longer with multiple players
-        player_count = len(self.connected_clients)
+        player_count = self.client_count()
         if player_count <= 1:
             betting_duration = 5  # Faster for solo debugging
-            print(f"[Crash Manager] Solo mode: {betting_duration}s betting phase")
+            logger.info("Solo mode: %ss betting phase", betting_duration)
         else:
             betting_duration = CrashGameService.BETTING_DURATION  # Full 10s
-            print(f"[Crash Manager] Multiplayer ({player_count} players): {betting_duration}s betting phase")
-        
-        await asyncio.sleep(betting_duration)
+            logger.info("Multiplayer (%s players): %ss betting phase", player_count, betting_duration)
+
+        # Bot bets are broadcast during the window (staggered for realism)
+        await self._run_betting_window(betting_duration)
 
     async def _starting_phase(self):
         """Starting phase - countdown before game starts."""
@@ -195,31 +251,97 @@ class CrashGameManager:
 
     async def _crashed_phase(self):
         """Crashed phase - game has crashed, show results."""
-        # Finish game in database
+        # Settle remaining bets in one set-based update
         async for db in get_db():
-            await CrashGameService.finish_game(
+            lost_bet_ids = await CrashGameService.finish_game(
                 self.current_game.id,
                 self.current_game.crash_point,
                 db
             )
-            # Get final bets
-            bets = await CrashGameService.get_game_bets(self.current_game.id, db)
             break
 
+        self.current_game.status = 'crashed'
+
+        # Reuse the bets tracked during the round instead of re-reading them
+        for bet_id in lost_bet_ids:
+            bet = self.current_bets.get(bet_id)
+            if bet:
+                bet["status"] = "lost"
+                bet["profit"] = -bet["bet_amount"]
+
         # Broadcast crash
         await self.broadcast({
             "type": "game_crashed",
             "game_id": self.current_game.id,
             "crash_point": self.current_game.crash_point,
             "server_seed": self.current_game.server_seed,  # Reveal seed for verification
-            "bets": bets
+            "fairness_chain_id": self.current_game.fairness_chain_id,
+            "fairness_index": self.current_game.fairness_index,
+            "bets": list(self.current_bets.values())
         })
 
         # Show results for 3 seconds
         await asyncio.sleep(3)
 
+    async def record_bet(self, bet_id: int, username: str, bet_amount: int, placed_at: str):
+        """Track a bet placed in the current round for the crash broadcast."""
+        if cluster.is_leader:
+            self._record_bet(bet_id, username, bet_amount, placed_at)
+            return
+        await cluster.notify_leader("crash", {
+            "op": "record_bet", "bet_id": bet_id, "username": username,
+            "bet_amount": bet_amount, "placed_at": placed_at
+        })
+
+    async def record_cashout(self, bet_id: int, multiplier: float, profit: int):
+        """Update a tracked bet after a successful cashout."""
+        if cluster.is_leader:
+            self._record_cashout(bet_id, multiplier, profit)
+            return
+        await cluster.notify_leader("crash", {
+            "op": "record_cashout", "bet_id": bet_id, "multiplier": multiplier, "profit": profit
+        })
+
+    async def _handle_command(self, command: dict):
+        if command["op"] == "record_bet":
+            self._record_bet(command["bet_id"], command["username"], command["bet_amount"], command["placed_at"])
+        elif command["op"] == "record_cashout":
+            self._record_cashout(command["bet_id"], command["multiplier"], command["profit"])
+
+    def _record_bet(self, bet_id: int, username: str, bet_amount: int, placed_at: str):
+        self.current_bets[bet_id] = {
+            "id": bet_id,
+            "username": username,
+            "bet_amount": bet_amount,
+            "cashout_at": None,
+            "profit": 0,
+            "status": "active",
+            "placed_at": placed_at
+        }
+
+    def _record_cashout(self, bet_id: int, multiplier: float, profit: int):
+        bet = self.current_bets.get(bet_id)
+        if bet:
+            bet["status"] = "cashed_out"
+            bet["cashout_at"] = multiplier
+            bet["profit"] = profit
+
     async def broadcast(self, message: dict):
-        """Broadcast message to all connected WebSocket clients."""
+        """Broadcast message to the WebSocket clients of every worker."""
+        state = self.get_current_state() if cluster.is_leader else None
+        await cluster.publish("crash_events", {"message": message, "state": state})
+
+    async def _on_cluster_event(self, event: dict):
+        if event["state"] is not None and not cluster.is_leader:
+            self._mirrored_state = event["state"]
+            if event["message"].get("type") == "multiplier_update":
+                self.current_multiplier = event["message"]["multiplier"]
+            elif event["state"].get("multiplier") is not None:
+                self.current_multiplier = event["state"]["multiplier"]
+        await self._deliver_local(event["message"])
+
+    async def _deliver_local(self, message: dict):
+        """Send a message to this worker's WebSocket clients."""
         if not self.connected_clients:
             return
 
@@ -242,8 +364,33 @@ class CrashGameManager:
         """Remove a WebSocket client."""
         self.connected_clients.discard(websocket)
 
+    def client_count(self) -> int:
+        """Connected clients across the cluster, from the followers' recent reports."""
+        cutoff = time.monotonic() - self.CLIENT_REPORT_STALE
+        remote = sum(count for count, seen in self.remote_clients.values() if seen >= cutoff)
+        return len(self.connected_clients) + remote
+
+    async def _report_clients(self):
+        while True:
+            try:
+                await asyncio.sleep(self.CLIENT_REPORT_INTERVAL)
+                if not cluster.is_leader:
+                    await cluster.publish("crash_clients", {
+                        "worker": cluster.worker_id, "clients": len(self.connected_clients)
+                    })
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Client count report failed: %s", e)
+
+    async def _on_client_report(self, report: dict):
+        if report["worker"] != cluster.worker_id:
+            self.remote_clients[report["worker"]] = (report["clients"], time.monotonic())
+
     def get_current_state(self) -> dict:
         """Get the current game state for new connections."""
+        if not cluster.is_leader:
+            return self._mirrored_state or {"status": "no_game"}
         if not self.current_game:
             return {"status": "no_game"}
 
@@ -255,46 +402,64 @@ class CrashGameManager:
             "server_seed_hash": self.current_game.server_seed_hash
         }
 
-    async def _simulate_bot_bets(self):
+    async def _run_betting_window(self, duration: float):
         """
-        Simulate bot bets during betting phase for a livelier feel.
-        Bots place 1-3 bets with staggered timing for realism.
+        Wait out the betting phase while broadcasting bot bets.
+
+        The bot engine draws the whole bot cohort for the round up front, so
+        bets are emitted from this loop at their scheduled offsets rather than
+        from a separate task per round.
         """
-        # Bot names for display (subset of available bots)
-        BOT_NAMES = [
-            "CryptoKing", "LuckyBettor", "DiamondHands", "MoonShot",
-            "BlockChainBoss", "TokenMaster", "GemHunter", "RocketRider"
-        ]
-        
-        # Determine number of bots (fewer if real players are betting)
+        # Fewer bots if real players are betting
         real_player_count = len(self.current_bets)
         max_bots = max(1, self.MAX_BOTS - real_player_count)
-        num_bots = random.randint(self.MIN_BOTS, max_bots)
-        
-        # Select random bot names
-        selected_bots = random.sample(BOT_NAMES, min(num_bots, len(BOT_NAMES)))
-        
-        for bot_name in selected_bots:
-            # Stagger bet timing (1-4 seconds into betting phase)
-            await asyncio.sleep(random.uniform(1.0, 4.0))
-            
+
+        if bot_engine.size:
+            bot_bets = bot_engine.draw_crash_bets(max_bots, duration)
+        else:
+            bot_bets = self._fallback_bot_bets(max_bots, duration)
+
+        elapsed = 0.0
+        for bot_bet in bot_bets:
+            await asyncio.sleep(bot_bet["offset"] - elapsed)
+            elapsed = bot_bet["offset"]
+
             # Don't place bet if game has moved past waiting phase
-            if self.current_game and self.current_game.status != 'waiting':
+            if not self.current_game or self.current_game.status != 'waiting':
                 break
-            
-            # Generate random bet amount (100-5000 GEM)
-            bet_amount = random.choice([100, 250, 500, 1000, 2000, 2500, 3000, 5000])
-            
+
             # Broadcast bot bet (display only - not real database bet)
             await self.broadcast({
                 "type": "bet_placed",
-                "username": bot_name,
-                "bet_amount": bet_amount,
-                "game_id": self.current_game.id if self.current_game else 0,
+                "username": bot_bet["username"],
+                "bet_amount": bot_bet["bet_amount"],
+                "game_id": self.current_game.id,
                 "is_bot": True
             })
-            
-            print(f"[Crash Manager] Bot {bot_name} placed {bet_amount} GEM bet")
+
+        await asyncio.sleep(max(0.0, duration - elapsed))
+
+    def _fallback_bot_bets(self, max_bots: int, duration: float) -> List[Dict]:
+        """Display-only bot bets used before the bot population is loaded."""
+        BOT_NAMES = [
+            "CryptoKing", "LuckyBettor", "DiamondHands", "MoonShot",
+            "BlockChainBoss", "TokenMaster", "GemHunter", "RocketRider"
+        ]
+
+        num_bots = random.randint(self.MIN_BOTS, max_bots)
+        bets = []
+        offset = 0.0
+        for bot_name in random.sample(BOT_NAMES, min(num_bots, len(BOT_NAMES))):
+            # Stagger bet timing (1-4 seconds apart)
+            offset += random.uniform(1.0, 4.0)
+            if offset >= duration:
+                break
+            bets.append({
+                "username": bot_name,
+                "bet_amount": random.choice([100, 250, 500, 1000, 2000, 2500, 3000, 5000]),
+                "offset": offset
+            })
+        return bets
 
 
 # Global instance
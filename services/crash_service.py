@@ -8,19 +8,22 @@ Handles the crash game logic including:
 - Real-time multiplier calculation
 """
 
+import logging
 import hashlib
-import secrets
 import math
 import asyncio
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import select, update, func, and_, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import (
     User, CrashGame, CrashBet, Transaction, TransactionType
 )
 from crypto.portfolio import portfolio_manager
+from services.fairness import fairness
+
+logger = logging.getLogger(__name__)
 
 
 class CrashGameService:
@@ -78,22 +81,24 @@ class CrashGameService:
     @staticmethod
     async def create_game(db: AsyncSession) -> CrashGame:
         """Create a new crash game round."""
-        # Generate server seed and hash
-        server_seed = secrets.token_hex(32)  # 64 char hex string
-        server_seed_hash = hashlib.sha256(server_seed.encode()).hexdigest()
+        # Next link of the crash seed chain; its hash is the previous round's seed
+        fair = await fairness.next_seed("crash")
+        server_seed_hash = fair.previous
 
         # Create game
         game = CrashGame(
             status='waiting',
-            server_seed=server_seed,
-            server_seed_hash=server_seed_hash
+            server_seed=fair.hex,
+            server_seed_hash=server_seed_hash,
+            fairness_chain_id=fair.chain_id,
+            fairness_index=fair.index
         )
 
         db.add(game)
         await db.commit()
         await db.refresh(game)
 
-        print(f"[Crash] Created game #{game.id}, seed hash: {server_seed_hash[:16]}...")
+        logger.info("Created game #%s, seed hash: %s...", game.id, server_seed_hash[:16])
 
         return game
 
@@ -121,12 +126,12 @@ class CrashGameService:
         # Get balance from portfolio manager
         user_balance = await portfolio_manager.get_user_balance(str(user_id))
         
-        print(f"[Crash] Placing bet for User {user.username} (ID: {user_id})")
-        print(f"[Crash] Bet Amount: {bet_amount}, Current Balance: {user_balance}")
+        logger.debug("Placing bet for User %s (ID: %s)", user.username, user_id)
+        logger.debug("Bet Amount: %s, Current Balance: %s", bet_amount, user_balance)
 
         # Check balance
         if user_balance < bet_amount:
-            print(f"[Crash] CHECK FAILED: {user_balance} < {bet_amount}")
+            logger.info("Insufficient balance: %s < %s", user_balance, bet_amount)
             raise ValueError(f"Insufficient GEM balance (Have: {user_balance})")
 
         # Get game
@@ -182,12 +187,13 @@ class CrashGameService:
         await db.commit()
         await db.refresh(bet)
 
-        print(f"[Crash] User {user.username} bet {bet_amount} GEM on game #{game_id}")
+        logger.info("User %s bet %s GEM on game #%s", user.username, bet_amount, game_id)
 
         return {
             "bet_id": bet.id,
             "game_id": game_id,
             "bet_amount": bet_amount,
+            "placed_at": bet.placed_at.isoformat(),
             "new_balance": new_balance,  # Fixed: was user.gem_balance
             "message": f"Bet placed: {bet_amount} GEM"
         }
@@ -199,100 +205,154 @@ class CrashGameService:
         current_multiplier: float,
         db: AsyncSession
     ) -> Dict[str, Any]:
-        """Cash out a bet at the current multiplier."""
-        # Get bet
+        """
+        Cash out a bet at the current multiplier.
+
+        Settlement runs in a single transaction: one conditional UPDATE claims
+        the active bet (so concurrent cashouts and the crash can never both
+        settle it), the payout is credited to the wallet in the same session,
+        and the game totals are incremented in SQL.
+        """
+        # Multipliers have two decimals, so the payout is computed in integer
+        # hundredths. Integer division truncates the same way on SQLite and
+        # PostgreSQL and avoids float errors such as 100 * 1.15 == 114.999...
+        multiplier_cents = int(round(current_multiplier * 100))
+
         result = await db.execute(
-            select(CrashBet).where(
+            update(CrashBet)
+            .where(
                 and_(
                     CrashBet.game_id == game_id,
                     CrashBet.user_id == user_id,
                     CrashBet.status == 'active'
                 )
             )
+            .values(
+                status='cashed_out',
+                cashout_at=current_multiplier,
+                profit=(CrashBet.bet_amount * multiplier_cents) // 100 - CrashBet.bet_amount,
+                cashed_out_at=datetime.utcnow()
+            )
+            .returning(CrashBet.id, CrashBet.bet_amount, CrashBet.profit)
         )
-        bet = result.scalar_one_or_none()
+        row = result.first()
 
-        if not bet:
+        if not row:
+            await db.rollback()
             raise ValueError("No active bet found")
 
-        # Get user
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        bet_id, bet_amount, profit = row
+        payout = bet_amount + profit
 
-        # Calculate payout
-        payout = int(bet.bet_amount * current_multiplier)
-        profit = payout - bet.bet_amount
-
-        # Update bet
-        bet.status = 'cashed_out'
-        bet.cashout_at = current_multiplier
-        bet.profit = profit
-        bet.cashed_out_at = datetime.utcnow()
-
-        # Add payout to user balance using portfolio manager
-        await portfolio_manager.process_win(
-            str(user_id),
-            payout,
-            f"Crash game #{game_id} cashout at {current_multiplier:.2f}x"
-        )
-        
-        # Get new balance after payout
-        new_balance = await portfolio_manager.get_user_balance(str(user_id))
-        
-        # Note: Transaction is handled by portfolio_manager.process_win()
+        try:
+            new_balance = await portfolio_manager.apply_win_in_session(
+                db,
+                str(user_id),
+                payout,
+                f"Crash game #{game_id} cashout at {current_multiplier:.2f}x"
+            )
 
-        # Update game stats
-        result = await db.execute(select(CrashGame).where(CrashGame.id == game_id))
-        game = result.scalar_one_or_none()
-        if game:
-            game.total_paid_out += payout
+            await db.execute(
+                update(CrashGame)
+                .where(CrashGame.id == game_id)
+                .values(total_paid_out=CrashGame.total_paid_out + payout)
+            )
 
-        await db.commit()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
-        print(f"[Crash] User {user.username} cashed out at {current_multiplier:.2f}x, profit: {profit} GEM")
+        logger.info("User %s cashed out at %.2fx, profit: %s GEM", user_id, current_multiplier, profit)
 
         return {
-            "bet_id": bet.id,
+            "bet_id": bet_id,
             "cashout_multiplier": current_multiplier,
-            "bet_amount": bet.bet_amount,
+            "bet_amount": bet_amount,
             "payout": payout,
             "profit": profit,
-            "new_balance": new_balance,  # Fixed: was user.gem_balance
+            "new_balance": new_balance,
             "message": f"Cashed out at {current_multiplier:.2f}x!"
         }
 
     @staticmethod
-    async def finish_game(game_id: int, crash_point: float, db: AsyncSession):
-        """Finish a game and mark all active bets as lost."""
-        # Get game
-        result = await db.execute(select(CrashGame).where(CrashGame.id == game_id))
-        game = result.scalar_one_or_none()
-
-        if not game:
-            return
+    async def finish_game(game_id: int, crash_point: float, db: AsyncSession) -> List[int]:
+        """
+        Finish a game and mark all active bets as lost.
 
-        # Update game
-        game.status = 'crashed'
-        game.crash_point = crash_point
-        game.crashed_at = datetime.utcnow()
-        game.completed_at = datetime.utcnow()
+        Both the game row and the remaining active bets are updated with
+        set-based statements in one transaction. Returns the ids of the bets
+        that were lost so callers can update an already loaded bet list
+        instead of re-reading the round.
+        """
+        now = datetime.utcnow()
+
+        await db.execute(
+            update(CrashGame)
+            .where(CrashGame.id == game_id)
+            .values(
+                status='crashed',
+                crash_point=crash_point,
+                crashed_at=now,
+                completed_at=now
+            )
+        )
 
-        # Get all active bets (those that didn't cash out)
         result = await db.execute(
-            select(CrashBet).where(
+            update(CrashBet)
+            .where(
                 and_(CrashBet.game_id == game_id, CrashBet.status == 'active')
             )
+            .values(status='lost', profit=-CrashBet.bet_amount)
+            .returning(CrashBet.id)
         )
-        active_bets = result.scalars().all()
+        lost_bet_ids = list(result.scalars().all())
+
+        await db.commit()
+
+        logger.info("Game #%s crashed at %.2fx, %s bets lost", game_id, crash_point, len(lost_bet_ids))
 
-        # Mark them as lost
-        for bet in active_bets:
-            bet.status = 'lost'
-            bet.profit = -bet.bet_amount
+        return lost_bet_ids
 
+    @staticmethod
+    async def refund_unfinished_games(db: AsyncSession) -> Dict[int, int]:
+        """
+        Cancel the rounds a previous game loop left unfinished (waiting,
+        starting or playing when its worker stopped or lost the lead) and
+        refund their active bets; cashouts already made stand. Runs in one
+        transaction. Returns {game_id: bets refunded}.
+        """
+        result = await db.execute(
+            select(CrashGame.id).where(CrashGame.status.in_(['waiting', 'starting', 'playing']))
+        )
+        game_ids = list(result.scalars().all())
+        if not game_ids:
+            return {}
+
+        result = await db.execute(
+            update(CrashBet)
+            .where(and_(CrashBet.game_id.in_(game_ids), CrashBet.status == 'active'))
+            .values(status='refunded', profit=0)
+            .returning(CrashBet.game_id, CrashBet.user_id, CrashBet.bet_amount)
+        )
+        refunded = {game_id: 0 for game_id in game_ids}
+        for game_id, user_id, bet_amount in result.all():
+            await portfolio_manager.refund_in_session(
+                db, user_id, bet_amount, TransactionType.CRASH_REFUND,
+                f"Crash game #{game_id} interrupted, bet refunded"
+            )
+            refunded[game_id] += 1
+
+        await db.execute(
+            update(CrashGame)
+            .where(CrashGame.id.in_(game_ids))
+            .values(status='cancelled', completed_at=datetime.utcnow())
+        )
         await db.commit()
 
-        print(f"[Crash] Game #{game_id} crashed at {crash_point:.2f}x, {len(active_bets)} bets lost")
+        for game_id, bets in refunded.items():
+            logger.warning("Game #%s was left unfinished; cancelled and %s bets refunded", game_id, bets)
+        return refunded
 
     @staticmethod
     async def get_current_game(db: AsyncSession) -> Optional[CrashGame]:
@@ -346,6 +406,9 @@ class CrashGameService:
             games.append({
                 "id": game.id,
                 "crash_point": game.crash_point,
+                "server_seed": game.server_seed,
+                "fairness_chain_id": game.fairness_chain_id,
+                "fairness_index": game.fairness_index,
                 "total_bets": game.total_bets,
                 "total_wagered": game.total_wagered,
                 "total_paid_out": game.total_paid_out,
@@ -0,0 +1,428 @@
+"""
+Data Lifecycle - retention, roll-up and archival for append-only history tables.
+
+transactions, game_bets, crash_bets, mini_games, activity_feed and
+leaderboard_entries gain rows with every click, bet and refresh. Rows older
+than each table's retention window are processed in batches:
+
+1. appended to a compressed archive under ARCHIVE_DIR/<table>/, one file per
+   day (CSV.gz, or Parquet with ARCHIVE_FORMAT=parquet and pyarrow installed)
+2. rolled up into daily_user_summaries (count, amount and payout per user,
+   day and kind) so lifetime stats survive the delete
+3. deleted in the same write transaction as the roll-up
+
+On PostgreSQL, transactions and game_bets are partitioned by month (migration
+0007). Whole expired partitions are archived, rolled up and dropped instead of
+being deleted row by row, and partitions for the coming months are created
+ahead of time.
+
+Archive files are written before the delete commits, so a crash in between can
+leave a batch in both places; de-duplicate on the primary key when restoring.
+
+Environment:
+- DATA_RETENTION_ENABLED: run the background job (default false)
+- DATA_RETENTION_DAYS: per-table overrides, e.g. "transactions=365,activity_feed=14"
+- DATA_RETENTION_INTERVAL: seconds between runs (default 3600)
+- DATA_RETENTION_BATCH_SIZE: rows per archive/delete batch (default 2000)
+- ARCHIVE_DIR: archive root (default data/archive)
+- ARCHIVE_FORMAT: "csv.gz" (default) or "parquet"
+- PARTITION_MONTHS_AHEAD: monthly partitions kept ready ahead of today (default 2)
+"""
+
+import io
+import os
+import csv
+import gzip
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.database import AsyncSessionLocal, ReadSessionLocal
+from database.models import Base, DailyUserSummary
+from database.migrations.ops import add_months, create_month_partitions, is_partitioned, list_partitions, month_start
+from database.write_queue import write_queue
+from services.metrics import registry
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+DATA_RETENTION_ENABLED = os.getenv("DATA_RETENTION_ENABLED", "false").lower() == "true"
+DATA_RETENTION_INTERVAL = int(os.getenv("DATA_RETENTION_INTERVAL", "3600"))
+DATA_RETENTION_BATCH_SIZE = int(os.getenv("DATA_RETENTION_BATCH_SIZE", "2000"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive")
+ARCHIVE_FORMAT = os.getenv("ARCHIVE_FORMAT", "csv.gz").lower()
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+
+# Pause between batches so the writer connection stays available to requests
+BATCH_PAUSE_SECONDS = 0.2
+
+# Summary rows per upsert statement
+SUMMARY_CHUNK = 1000
+
+rows_archived_total = registry.counter(
+    "data_lifecycle_rows_archived_total", "History rows archived and removed, by table.",
+    ("table",)
+)
+partitions_dropped_total = registry.counter(
+    "data_lifecycle_partitions_dropped_total", "Expired monthly partitions archived and dropped, by table.",
+    ("table",)
+)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long rows of one table are kept and how they roll up."""
+    table: str
+    time_column: str
+    days: int
+    kind_column: Optional[str] = None  # None = archive only, no summary rows
+    amount_column: Optional[str] = None
+    payout_column: Optional[str] = None
+
+
+DEFAULT_POLICIES = (
+    RetentionPolicy("transactions", "created_at", 180, "transaction_type", "amount"),
+    RetentionPolicy("game_bets", "created_at", 180, "bet_type", "amount", "payout_amount"),
+    RetentionPolicy("crash_bets", "placed_at", 90, "status", "bet_amount", "profit"),
+    RetentionPolicy("mini_games", "played_at", 90, "game_type", "bet_amount", "payout"),
+    RetentionPolicy("activity_feed", "created_at", 30),
+    RetentionPolicy("leaderboard_entries", "updated_at", 30),
+)
+
+SummaryKey = Tuple[str, date, str, str]
+
+
+def load_policies(raw: str = None) -> List[RetentionPolicy]:
+    """DEFAULT_POLICIES with "table=days,..." overrides applied (DATA_RETENTION_DAYS)."""
+    raw = os.getenv("DATA_RETENTION_DAYS", "") if raw is None else raw
+    overrides = {}
+    for item in raw.split(","):
+        table, _, days = item.partition("=")
+        if table.strip() and days.strip().isdigit():
+            overrides[table.strip()] = int(days)
+
+    return [
+        RetentionPolicy(**{**policy.__dict__, "days": overrides.get(policy.table, policy.days)})
+        for policy in DEFAULT_POLICIES
+    ]
+
+
+def summarise(policy: RetentionPolicy, rows: Sequence, totals: Dict[SummaryKey, List[float]] = None):
+    """Accumulate [row_count, amount_total, payout_total] per (user, day, source, kind)."""
+    totals = {} if totals is None else totals
+    if policy.kind_column is None:
+        return totals
+
+    for row in rows:
+        key = (row["user_id"], row[policy.time_column].date(), policy.table, str(row[policy.kind_column] or ""))
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        if policy.amount_column:
+            entry[1] += row[policy.amount_column] or 0
+        if policy.payout_column:
+            entry[2] += row[policy.payout_column] or 0
+    return totals
+
+
+async def upsert_summaries(session: AsyncSession, totals: Dict[SummaryKey, List[float]]):
+    """Add rolled-up totals onto daily_user_summaries (INSERT ... ON CONFLICT DO UPDATE)."""
+    items = list(totals.items())
+    dialect_insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+    now = datetime.utcnow()
+
+    for start in range(0, len(items), SUMMARY_CHUNK):
+        stmt = dialect_insert(DailyUserSummary).values([
+            {
+                "user_id": user_id, "day": day, "source": source, "kind": kind,
+                "row_count": count, "amount_total": amount, "payout_total": payout, "updated_at": now,
+            }
+            for (user_id, day, source, kind), (count, amount, payout) in items[start:start + SUMMARY_CHUNK]
+        ])
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "day", "source", "kind"],
+            set_={
+                "row_count": DailyUserSummary.row_count + stmt.excluded.row_count,
+                "amount_total": DailyUserSummary.amount_total + stmt.excluded.amount_total,
+                "payout_total": DailyUserSummary.payout_total + stmt.excluded.payout_total,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ))
+
+
+# ==================== ARCHIVE FILES ====================
+
+class Archiver:
+    """Append rows to per-table, per-day compressed files. Blocking; call via asyncio.to_thread."""
+
+    def __init__(self, root: str = ARCHIVE_DIR, fmt: str = ARCHIVE_FORMAT):
+        if fmt == "parquet" and pyarrow is None:
+            logger.warning("ARCHIVE_FORMAT=parquet needs pyarrow; writing csv.gz instead")
+            fmt = "csv.gz"
+        self.root = Path(root)
+        self.format = fmt
+
+    def write(self, policy: RetentionPolicy, columns: Sequence[str], rows: Sequence) -> List[Path]:
+        by_day: Dict[date, list] = {}
+        for row in rows:
+            by_day.setdefault(row[policy.time_column].date(), []).append(row)
+
+        directory = self.root / policy.table
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        for day, day_rows in sorted(by_day.items()):
+            if self.format == "parquet":
+                written.append(self._write_parquet(directory, policy.table, day, columns, day_rows))
+            else:
+                written.append(self._write_csv(directory, policy.table, day, columns, day_rows))
+        return written
+
+    @staticmethod
+    def _csv_value(value):
+        if value is None:
+            return ""
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def _write_csv(self, directory: Path, table: str, day: date, columns, rows) -> Path:
+        # Each batch is a separate gzip member; gzip readers concatenate them
+        path = directory / f"{table}-{day.isoformat()}.csv.gz"
+        new_file = not path.exists()
+        with open(path, "ab") as raw:
+            with io.TextIOWrapper(gzip.GzipFile(fileobj=raw, mode="ab"), encoding="utf-8", newline="") as out:
+                writer = csv.writer(out)
+                if new_file:
+                    writer.writerow(columns)
+                writer.writerows([self._csv_value(row[c]) for c in columns] for row in rows)
+            raw.flush()
+            os.fsync(raw.fileno())
+        return path
+
+    def _write_parquet(self, directory: Path, table: str, day: date, columns, rows) -> Path:
+        # Parquet files cannot be appended to, so every batch gets its own part file
+        day_dir = directory / day.isoformat()
+        day_dir.mkdir(exist_ok=True)
+        path = day_dir / f"part-{time.time_ns()}.parquet"
+        data = pyarrow.Table.from_pylist([{c: row[c] for c in columns} for row in rows])
+        pyarrow.parquet.write_table(data, path, compression="zstd")
+        return path
+
+
+# ==================== LIFECYCLE JOB ====================
+
+class DataLifecycleManager:
+    """Background job that archives, rolls up and removes expired history rows."""
+
+    def __init__(
+        self,
+        policies: Sequence[RetentionPolicy] = None,
+        archiver: Archiver = None,
+        batch_size: int = DATA_RETENTION_BATCH_SIZE,
+        interval: int = DATA_RETENTION_INTERVAL
+    ):
+        self.policies = list(policies) if policies is not None else load_policies()
+        self.archiver = archiver or Archiver()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.is_running:
+            return
+        if not DATA_RETENTION_ENABLED:
+            logger.info("Data lifecycle job disabled (DATA_RETENTION_ENABLED=false)")
+            return
+
+        self.is_running = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Data lifecycle job started (every %ss, archive: %s)", self.interval, self.archiver.root)
+
+    async def stop(self):
+        self.is_running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _loop(self):
+        while self.is_running:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.exception("Data lifecycle run failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self, now: datetime = None) -> Dict[str, int]:
+        """Process every policy once. Returns rows archived per table."""
+        now = now or datetime.utcnow()
+        archived = {}
+        for policy in self.policies:
+            cutoff = now - timedelta(days=policy.days)
+            started = time.perf_counter()
+
+            count = 0
+            floor = await self._expire_partitions(policy, cutoff)
+            if floor is not None:
+                count += floor[1]
+                # Ranged partitions older than the oldest kept one are gone, so
+                # only rows in the DEFAULT partition can still be below the cutoff
+                cutoff = min(cutoff, floor[0]) if floor[0] else cutoff
+            count += await self._expire_rows(policy, cutoff)
+
+            archived[policy.table] = count
+            if count:
+                logger.info(
+                    "Archived %s %s rows older than %s in %.1fs",
+                    count, policy.table, cutoff.date(), time.perf_counter() - started
+                )
+        return archived
+
+    async def count_expired(self, now: datetime = None) -> Dict[str, int]:
+        """Rows currently past their retention window, per table (dry run)."""
+        now = now or datetime.utcnow()
+        counts = {}
+        async with ReadSessionLocal() as session:
+            for policy in self.policies:
+                table = Base.metadata.tables[policy.table]
+                cutoff = now - timedelta(days=policy.days)
+                counts[policy.table] = (await session.execute(
+                    select(func.count()).select_from(table).where(table.c[policy.time_column] < cutoff)
+                )).scalar()
+        return counts
+
+    async def _expire_rows(self, policy: RetentionPolicy, cutoff: datetime) -> int:
+        table = Base.metadata.tables[policy.table]
+        time_column = table.c[policy.time_column]
+        columns = list(table.columns.keys())
+        archived = 0
+
+        while True:
+            async with ReadSessionLocal() as session:
+                rows = (await session.execute(
+                    select(table).where(time_column < cutoff).order_by(time_column).limit(self.batch_size)
+                )).mappings().all()
+            if not rows:
+                break
+
+            await asyncio.to_thread(self.archiver.write, policy, columns, rows)
+            totals = summarise(policy, rows)
+            ids = [row["id"] for row in rows]
+
+            async def apply(session: AsyncSession):
+                if totals:
+                    await upsert_summaries(session, totals)
+                result = await session.execute(delete(table).where(table.c.id.in_(ids)))
+                if result.rowcount != len(ids):
+                    # Another worker removed part of this batch; roll back so its
+                    # rows are not counted into the summaries twice
+                    raise RuntimeError(f"{policy.table}: expected to delete {len(ids)} rows, deleted {result.rowcount}")
+
+            await write_queue.submit(apply)
+            archived += len(rows)
+            rows_archived_total.inc(len(rows), policy.table)
+
+            if len(rows) < self.batch_size:
+                break
+            await asyncio.sleep(BATCH_PAUSE_SECONDS)
+
+        return archived
+
+    async def _expire_partitions(self, policy: RetentionPolicy, cutoff: datetime) -> Optional[Tuple[Optional[datetime], int]]:
+        """
+        Archive and drop monthly partitions that lie wholly before the cutoff.
+
+        Returns None for unpartitioned tables, else (start of the oldest kept
+        ranged partition, rows archived).
+        """
+        async with AsyncSessionLocal() as session:
+            conn = await session.connection()
+            if not await is_partitioned(conn, policy.table):
+                return None
+
+            this_month = month_start(date.today())
+            try:
+                created = await create_month_partitions(
+                    conn, policy.table, this_month, add_months(this_month, PARTITION_MONTHS_AHEAD + 1)
+                )
+                await session.commit()
+                if created:
+                    logger.info("Created partitions %s", ", ".join(created))
+            except DBAPIError as e:
+                # e.g. the DEFAULT partition already holds rows for that month
+                await session.rollback()
+                logger.warning("Could not create upcoming %s partitions: %s", policy.table, e)
+
+            partitions = await list_partitions(await session.connection(), policy.table)
+
+        table = Base.metadata.tables[policy.table]
+        time_column = table.c[policy.time_column]
+        columns = list(table.columns.keys())
+        archived = 0
+        floor = None
+
+        for name, lower, upper in partitions:
+            if lower is None:
+                continue
+            if upper > cutoff.date():
+                floor = datetime.combine(lower, datetime.min.time())
+                break
+
+            totals: Dict[SummaryKey, List[float]] = {}
+            partition_rows = 0
+            after = ""
+            while True:
+                # Keyset pagination on the primary key within the partition's range
+                async with ReadSessionLocal() as session:
+                    rows = (await session.execute(
+                        select(table)
+                        .where(time_column >= lower, time_column < upper, table.c.id > after)
+                        .order_by(table.c.id)
+                        .limit(self.batch_size)
+                    )).mappings().all()
+                if not rows:
+                    break
+                await asyncio.to_thread(self.archiver.write, policy, columns, rows)
+                summarise(policy, rows, totals)
+                partition_rows += len(rows)
+                after = rows[-1]["id"]
+
+            async def drop(session: AsyncSession, name=name, totals=totals):
+                if totals:
+                    await upsert_summaries(session, totals)
+                await session.execute(text(f"ALTER TABLE {policy.table} DETACH PARTITION {name}"))
+                await session.execute(text(f"DROP TABLE {name}"))
+
+            await write_queue.submit(drop)
+            archived += partition_rows
+            partitions_dropped_total.inc(1, policy.table)
+            rows_archived_total.inc(partition_rows, policy.table)
+            logger.info("Dropped partition %s after archiving %s rows", name, partition_rows)
+
+        return floor, archived
+
+
+# Global lifecycle job
+data_lifecycle = DataLifecycleManager()
@@ -0,0 +1,364 @@
+"""
+Fairness - provably fair game seeds from precomputed SHA-256 hash chains.
+
+A chain is generated backwards from a random secret: link[length] is the
+secret and link[i - 1] = sha256(link[i]). link[0], the anchor, is published
+(GET /api/fairness/chains) before any seed from the chain is used; games then
+take link[1], link[2], ... in order. Every revealed seed hashes to the one
+before it and eventually to the anchor, so seeds cannot be picked after the
+fact and anyone can check a range of results by hashing (see
+verify_chain and scripts/verify_fairness.py).
+
+A revealed link exposes every earlier link, so links must be used strictly
+in order. That is why each purpose (crash, roulette, minigames) has its own
+chain and each chain is consumed by one worker at a time (fairness_chains.owner).
+
+Chains are generated in a background thread and stored as raw 32-byte
+digests in a memory-mapped file (FAIRNESS_CHAIN_DIR/<chain id>.chain, 32 MB
+per million links). Taking a seed is an index increment. The position is
+persisted by reserving FAIRNESS_RESERVE_BLOCK links at a time, so a restart
+skips links instead of reusing them. A replacement chain is generated when
+10% of the current one is left.
+
+Outcomes are drawn from a seed with derive_floats: HMAC-SHA256 of the seed
+and "<salt>:<position>", reduced to a float in [0, 1).
+
+Environment:
+- FAIRNESS_CHAIN_DIR: chain files; keep private, they hold future seeds (default data/fairness)
+- FAIRNESS_CHAIN_LENGTH: links per chain (default 1000000)
+- FAIRNESS_RESERVE_BLOCK: links reserved per database write (default 1000)
+"""
+
+import os
+import hmac
+import mmap
+import uuid
+import asyncio
+import hashlib
+import logging
+import secrets
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+
+from database.database import AsyncSessionLocal, ReadSessionLocal
+from database.models import FairnessChain
+from services.cluster import cluster
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+FAIRNESS_CHAIN_DIR = os.getenv("FAIRNESS_CHAIN_DIR", "data/fairness")
+FAIRNESS_CHAIN_LENGTH = int(os.getenv("FAIRNESS_CHAIN_LENGTH", "1000000"))
+FAIRNESS_RESERVE_BLOCK = int(os.getenv("FAIRNESS_RESERVE_BLOCK", "1000"))
+
+PURPOSES = ("crash", "roulette", "minigames")
+DIGEST_SIZE = 32
+REGENERATE_AT = 0.9  # Fraction of a chain used before its replacement is generated
+
+fairness_seeds_total = registry.counter(
+    "fairness_seeds_total", "Seeds handed out by purpose.", ("purpose",)
+)
+
+
+@dataclass(frozen=True)
+class FairSeed:
+    """One link of a seed chain, handed to exactly one game or round."""
+    chain_id: str
+    index: int
+    seed: bytes
+
+    @property
+    def hex(self) -> str:
+        return self.seed.hex()
+
+    @property
+    def previous(self) -> str:
+        """sha256 of this seed: the link before it (the anchor for index 1)."""
+        return hashlib.sha256(self.seed).hexdigest()
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"chain_id": self.chain_id, "index": self.index, "server_seed": self.hex}
+
+
+def derive_floats(seed: bytes, count: int, salt: str = "", start: int = 0) -> np.ndarray:
+    """
+    `count` floats in [0, 1) for positions start..start+count-1:
+    the first 52 bits of HMAC-SHA256(seed, "<salt>:<position>") / 2**52.
+    """
+    words = b"".join(
+        hmac.new(seed, f"{salt}:{position}".encode(), hashlib.sha256).digest()[:8]
+        for position in range(start, start + count)
+    )
+    return (np.frombuffer(words, dtype=">u8") >> np.uint64(12)).astype(np.float64) / float(1 << 52)
+
+
+def verify_chain(anchor: bytes, seeds: Dict[int, bytes]) -> Tuple[List[int], int]:
+    """
+    Check revealed seeds {index: seed} against a chain's anchor.
+
+    Hashes once from the highest index down to 0. A seed that disagrees with
+    the hashes from above starts its own candidate chain, so one bad seed
+    does not condemn the others. Returns (indexes whose seed does not lead to
+    the anchor, hashes computed).
+    """
+    sha = hashlib.sha256
+    indexes = sorted(seeds, reverse=True)
+    candidates: Dict[bytes, List[int]] = {}  # Hash value at the current index -> indexes it vouches for
+    hashes = 0
+    for index, lower in zip(indexes, indexes[1:] + [0]):
+        candidates.setdefault(seeds[index], []).append(index)
+        stepped: Dict[bytes, List[int]] = {}
+        for value, vouched in candidates.items():
+            for _ in range(index - lower):
+                value = sha(value).digest()
+            merged = stepped.get(value)
+            if merged is None:
+                stepped[value] = vouched  # Reuse the list; copying it every step is quadratic
+            elif len(merged) >= len(vouched):
+                merged.extend(vouched)
+            else:
+                vouched.extend(merged)
+                stepped[value] = vouched
+        hashes += (index - lower) * len(candidates)
+        candidates = stepped
+    valid = set(candidates.get(anchor, []))
+    return [index for index in sorted(seeds) if index not in valid], hashes
+
+
+def generate_chain_file(path: Path, length: int) -> bytes:
+    """Write link[0..length] to `path` (readable by the owner only) and return the anchor."""
+    size = (length + 1) * DIGEST_SIZE
+    tmp = path.with_suffix(".tmp")
+    fd = os.open(tmp, os.O_CREAT | os.O_RDWR | os.O_TRUNC, 0o600)
+    try:
+        os.ftruncate(fd, size)
+        with mmap.mmap(fd, size) as links:
+            link = secrets.token_bytes(DIGEST_SIZE)
+            sha = hashlib.sha256
+            for index in range(length, -1, -1):
+                offset = index * DIGEST_SIZE
+                links[offset:offset + DIGEST_SIZE] = link
+                link = sha(link).digest()
+            links.flush()
+            anchor = links[0:DIGEST_SIZE]
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+    return anchor
+
+
+class SeedChain:
+    """Read-only view of a chain file."""
+
+    def __init__(self, chain_id: str, purpose: str, anchor: bytes, length: int, path: Path):
+        self.id = chain_id
+        self.purpose = purpose
+        self.anchor = anchor
+        self.length = length
+        self.path = path
+        with open(path, "rb") as f:
+            self._links = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._links) != (length + 1) * DIGEST_SIZE or self.link(0) != anchor:
+            self._links.close()
+            raise ValueError(f"Chain file {path} does not match chain {chain_id}")
+
+    def link(self, index: int) -> bytes:
+        offset = index * DIGEST_SIZE
+        return self._links[offset:offset + DIGEST_SIZE]
+
+    def close(self):
+        self._links.close()
+
+
+@dataclass
+class _Cursor:
+    chain: SeedChain
+    next: int  # Next link to hand out
+    reserved: int  # Links below this are reserved in fairness_chains.next_index
+
+
+class FairnessService:
+    """Hands out seeds from per-purpose chains owned by this worker."""
+
+    def __init__(
+        self,
+        directory: str = FAIRNESS_CHAIN_DIR,
+        length: int = FAIRNESS_CHAIN_LENGTH,
+        reserve_block: int = FAIRNESS_RESERVE_BLOCK
+    ):
+        self.directory = Path(directory)
+        self.length = length
+        self.reserve_block = reserve_block
+        self._cursors: Dict[str, _Cursor] = {}
+        self._locks: Dict[str, asyncio.Lock] = {purpose: asyncio.Lock() for purpose in PURPOSES}
+        self._spares: Dict[str, asyncio.Task] = {}
+        self._warmup: List[asyncio.Task] = []
+        self._chains: Dict[str, SeedChain] = {}  # Opened for verification, by id
+
+        registry.gauge(
+            "fairness_links_remaining", "Unused links in this worker's chains.",
+            callback=lambda: sum(c.chain.length + 1 - c.next for c in self._cursors.values())
+        )
+
+    async def start(self):
+        """Claim or generate a chain per purpose in the background."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._warmup = [asyncio.create_task(self._warm(purpose)) for purpose in PURPOSES]
+
+    async def stop(self):
+        """Hand chains back so the next process continues them after the reserved links."""
+        for task in self._warmup + list(self._spares.values()):
+            task.cancel()
+        await asyncio.gather(*self._warmup, *self._spares.values(), return_exceptions=True)
+        self._warmup = []
+        self._spares = {}
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(FairnessChain).where(FairnessChain.owner == cluster.worker_id).values(owner=None)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning("Could not release seed chains: %s", e)
+        for cursor in self._cursors.values():
+            cursor.chain.close()
+        self._cursors = {}
+
+    async def next_seed(self, purpose: str) -> FairSeed:
+        """The next unused link of this worker's chain for `purpose`."""
+        cursor = self._cursors.get(purpose)
+        if cursor is None or cursor.next >= cursor.reserved:
+            async with self._locks[purpose]:
+                cursor = await self._ensure(purpose)
+        index = cursor.next
+        cursor.next += 1
+        fairness_seeds_total.inc(1, purpose)
+
+        if index >= cursor.chain.length * REGENERATE_AT and purpose not in self._spares:
+            self._spares[purpose] = asyncio.create_task(self._generate(purpose))
+        return FairSeed(cursor.chain.id, index, cursor.chain.link(index))
+
+    async def chains(self, purpose: Optional[str] = None) -> List[FairnessChain]:
+        """Published chains (anchor and usage), newest first."""
+        query = select(FairnessChain).order_by(FairnessChain.created_at.desc())
+        if purpose:
+            query = query.where(FairnessChain.purpose == purpose)
+        async with ReadSessionLocal() as session:
+            return list((await session.execute(query)).scalars().all())
+
+    async def get_chain(self, chain_id: str) -> Optional[FairnessChain]:
+        async with ReadSessionLocal() as session:
+            return await session.get(FairnessChain, chain_id)
+
+    def stored_link(self, row: FairnessChain, index: int) -> Optional[bytes]:
+        """Link `index` of a chain whose file is on this host, else None."""
+        if index < 0 or index > row.length:
+            return None
+        chain = self._chains.get(row.id)
+        if chain is None:
+            path = self._path(row.id)
+            if not path.exists():
+                return None
+            chain = self._chains[row.id] = SeedChain(row.id, row.purpose, bytes.fromhex(row.anchor), row.length, path)
+        return chain.link(index)
+
+    # ==================== CHAIN OWNERSHIP ====================
+
+    async def _warm(self, purpose: str):
+        try:
+            async with self._locks[purpose]:
+                await self._ensure(purpose)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Could not prepare %s seed chain: %s", purpose, e)
+
+    async def _ensure(self, purpose: str) -> _Cursor:
+        """A cursor with at least one reserved link (caller holds the purpose lock)."""
+        cursor = self._cursors.get(purpose)
+        if cursor is not None and cursor.next < cursor.reserved:
+            return cursor
+        if cursor is not None and cursor.reserved <= cursor.chain.length:
+            await self._reserve(cursor)
+            return cursor
+
+        if cursor is not None:
+            logger.info("Seed chain %s (%s) exhausted", cursor.chain.id, purpose)
+            cursor.chain.close()
+            del self._cursors[purpose]
+
+        spare = self._spares.pop(purpose, None)
+        if spare is not None:
+            cursor = await spare
+        else:
+            cursor = await self._claim(purpose) or await self._generate(purpose)
+        self._cursors[purpose] = cursor
+        await self._reserve(cursor)
+        return cursor
+
+    async def _claim(self, purpose: str) -> Optional[_Cursor]:
+        """Take over a partly used chain released by an earlier process on this host."""
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(FairnessChain)
+                .where(
+                    FairnessChain.purpose == purpose,
+                    FairnessChain.owner.is_(None),
+                    FairnessChain.next_index <= FairnessChain.length
+                )
+                .order_by(FairnessChain.created_at)
+            )).scalars().all()
+            for row in rows:
+                path = self._path(row.id)
+                if not path.exists():
+                    continue
+                claimed = await session.execute(
+                    update(FairnessChain)
+                    .where(FairnessChain.id == row.id, FairnessChain.owner.is_(None))
+                    .values(owner=cluster.worker_id)
+                )
+                await session.commit()
+                if claimed.rowcount != 1:
+                    continue
+                chain = SeedChain(row.id, purpose, bytes.fromhex(row.anchor), row.length, path)
+                logger.info("Continuing %s seed chain %s at link %s", purpose, row.id, row.next_index)
+                return _Cursor(chain, row.next_index, row.next_index)
+        return None
+
+    async def _generate(self, purpose: str) -> _Cursor:
+        chain_id = uuid.uuid4().hex
+        path = self._path(chain_id)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        anchor = await asyncio.to_thread(generate_chain_file, path, self.length)
+        async with AsyncSessionLocal() as session:
+            session.add(FairnessChain(
+                id=chain_id, purpose=purpose, anchor=anchor.hex(), length=self.length,
+                next_index=1, owner=cluster.worker_id
+            ))
+            await session.commit()
+        logger.info("Generated %s seed chain %s (%s links), anchor %s", purpose, chain_id, self.length, anchor.hex())
+        return _Cursor(SeedChain(chain_id, purpose, anchor, self.length, path), 1, 1)
+
+    async def _reserve(self, cursor: _Cursor):
+        reserved = min(cursor.reserved + self.reserve_block, cursor.chain.length + 1)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(FairnessChain)
+                .where(FairnessChain.id == cursor.chain.id, FairnessChain.owner == cluster.worker_id)
+                .values(next_index=reserved)
+            )
+            await session.commit()
+        if result.rowcount != 1:
+            raise RuntimeError(f"Seed chain {cursor.chain.id} is no longer owned by this worker")
+        cursor.reserved = reserved
+
+    def _path(self, chain_id: str) -> Path:
+        return self.directory / f"{chain_id}.chain"
+
+
+# Global fairness service instance
+fairness = FairnessService()
@@ -0,0 +1,171 @@
+"""
+Fairness Audit - re-derive recorded results from their revealed seeds.
+
+For a range of a seed chain this loads every recorded game or round that
+used it, checks that each seed hashes down to the chain's published anchor
+(services.fairness.verify_chain) and that the recorded outcome is the one
+the seed produces. Used by GET /api/fairness/chains/{id}/audit and
+scripts/verify_fairness.py.
+"""
+
+import json
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from database.database import ReadSessionLocal
+from database.models import CrashGame, FairnessChain, MiniGame, RouletteRound
+from gaming.round_manager import RoundManager
+from services.crash_service import CrashGameService
+from services.fairness import fairness, verify_chain
+from services.minigames_service import MiniGamesService
+
+logger = logging.getLogger(__name__)
+
+GAMES = ("crash", "roulette", "coinflip", "dice", "higherlower")
+
+# game_data keys holding each mini-game's outcome
+MINIGAME_OUTCOME_KEYS = {"coinflip": ("result",), "dice": ("roll",), "higherlower": ("card1", "card2")}
+
+
+def recompute(game: str, seed: bytes, position: int = 0) -> Dict[str, Any]:
+    """The outcome `seed` produces for `game` (position: game number within an auto-play batch)."""
+    if game == "crash":
+        return {"crash_point": CrashGameService.generate_crash_point(seed.hex())}
+    if game == "roulette":
+        return {"outcome_number": RoundManager.outcome_from_seed(seed)}
+    drawn = MiniGamesService.draw(game, seed, 1, start=position)[0]
+    if game == "coinflip":
+        return {"result": MiniGamesService.COIN_SIDES[int(drawn)]}
+    if game == "dice":
+        return {"roll": int(drawn)}
+    return {"card1": int(drawn[0]), "card2": int(drawn[1])}
+
+
+@dataclass
+class AuditRecord:
+    """One recorded result: where it came from, its seed and what was stored."""
+    label: str  # e.g. "mini_games#42"
+    game: str
+    index: int
+    server_seed: str
+    position: int
+    recorded: Dict[str, Any]
+
+
+@dataclass
+class AuditReport:
+    chain_id: str
+    purpose: str
+    anchor: str
+    start: int
+    end: int
+    records: int = 0
+    hashes: int = 0
+    chain_failures: List[str] = field(default_factory=list)  # Records whose seed is not on the chain
+    outcome_failures: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = field(default_factory=list)  # (record, expected, recorded)
+
+    @property
+    def ok(self) -> bool:
+        return not self.chain_failures and not self.outcome_failures
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chain_id": self.chain_id,
+            "purpose": self.purpose,
+            "anchor": self.anchor,
+            "start": self.start,
+            "end": self.end,
+            "records": self.records,
+            "hashes": self.hashes,
+            "ok": self.ok,
+            "chain_failures": self.chain_failures,
+            "outcome_failures": [
+                {"record": label, "expected": expected, "recorded": recorded}
+                for label, expected, recorded in self.outcome_failures
+            ],
+        }
+
+
+async def load_records(chain: FairnessChain, start: int, end: int) -> List[AuditRecord]:
+    """Results recorded with links start..end of `chain` (crash games only once revealed)."""
+    async with ReadSessionLocal() as session:
+        if chain.purpose == "crash":
+            rows = (await session.execute(
+                select(CrashGame.id, CrashGame.fairness_index, CrashGame.server_seed, CrashGame.crash_point)
+                .where(
+                    CrashGame.fairness_chain_id == chain.id,
+                    CrashGame.fairness_index.between(start, end),
+                    CrashGame.crash_point.is_not(None)
+                )
+            )).all()
+            return [
+                AuditRecord(f"crash_games#{id}", "crash", index, seed, 0, {"crash_point": crash_point})
+                for id, index, seed, crash_point in rows
+            ]
+
+        if chain.purpose == "roulette":
+            rows = (await session.execute(
+                select(RouletteRound.id, RouletteRound.fairness_index, RouletteRound.server_seed, RouletteRound.outcome_number)
+                .where(
+                    RouletteRound.fairness_chain_id == chain.id,
+                    RouletteRound.fairness_index.between(start, end)
+                )
+            )).all()
+            return [
+                AuditRecord(f"roulette_rounds#{id}", "roulette", index, seed, 0, {"outcome_number": number})
+                for id, index, seed, number in rows
+            ]
+
+        rows = (await session.execute(
+            select(MiniGame.id, MiniGame.game_type, MiniGame.fairness_index, MiniGame.server_seed, MiniGame.game_data)
+            .where(
+                MiniGame.fairness_chain_id == chain.id,
+                MiniGame.fairness_index.between(start, end)
+            )
+        )).all()
+    records = []
+    for id, game_type, index, seed, game_data in rows:
+        data = json.loads(game_data) if game_data else {}
+        records.append(AuditRecord(
+            f"mini_games#{id}", game_type, index, seed, data.get("position", 0),
+            {key: data.get(key) for key in MINIGAME_OUTCOME_KEYS[game_type]}
+        ))
+    return records
+
+
+def check_records(anchor: bytes, records: List[AuditRecord], report: AuditReport) -> AuditReport:
+    """CPU part of the audit: hash the seeds down to the anchor and re-derive outcomes."""
+    seeds: Dict[int, bytes] = {}
+    conflicting = set()
+    for record in records:
+        seed = bytes.fromhex(record.server_seed)
+        if seeds.setdefault(record.index, seed) != seed:
+            conflicting.add(record.index)  # Two different seeds recorded for one link
+
+    bad_links, report.hashes = verify_chain(anchor, seeds)
+    bad_links = set(bad_links) | conflicting
+    report.records = len(records)
+    for record in records:
+        if record.index in bad_links:
+            report.chain_failures.append(record.label)
+            continue
+        expected = recompute(record.game, bytes.fromhex(record.server_seed), record.position)
+        if expected != record.recorded:
+            report.outcome_failures.append((record.label, expected, record.recorded))
+    return report
+
+
+async def audit_chain(chain_id: str, start: int = 1, end: Optional[int] = None) -> Optional[AuditReport]:
+    """Audit links start..end (default: all handed out) of a chain; None if the chain is unknown."""
+    chain = await fairness.get_chain(chain_id)
+    if chain is None:
+        return None
+    end = min(end if end is not None else chain.next_index - 1, chain.length)
+    report = AuditReport(chain.id, chain.purpose, chain.anchor, start, end)
+    records = await load_records(chain, start, end)
+    # Hashing down to the anchor is up to `length` SHA-256 calls; keep it off the event loop
+    return await asyncio.to_thread(check_records, bytes.fromhex(chain.anchor), records, report)
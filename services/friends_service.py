@@ -5,11 +5,14 @@ Handles friend requests, friendships, and friend management.
 """
 
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from sqlalchemy import select, and_, or_
+from typing import Dict, Any, List, Optional, Set
+from sqlalchemy import select, and_, or_, case, literal, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models import User, Friendship, FriendRequest, UserProfile
+from database.models import User, Friendship, FriendRequest, UserProfile, Wallet
+from services.presence import presence
+from services.search_index import search_service
+from services.timeline_service import TimelineService
 
 
 class FriendsService:
@@ -117,6 +120,8 @@ class FriendsService:
 
         db.add(friendship1)
         db.add(friendship2)
+        await TimelineService.follow(friend_request.sender_id, friend_request.receiver_id, db)
+        await TimelineService.follow(friend_request.receiver_id, friend_request.sender_id, db)
 
         await db.commit()
 
@@ -179,6 +184,8 @@ class FriendsService:
 
         for friendship in friendships:
             await db.delete(friendship)
+        await TimelineService.unfollow(user_id, friend_id, db)
+        await TimelineService.unfollow(friend_id, user_id, db)
 
         await db.commit()
 
@@ -192,21 +199,26 @@ class FriendsService:
         """Get list of user's friends with their profiles."""
         # Get friendships
         result = await db.execute(
-            select(Friendship, User, UserProfile)
+            select(Friendship, User, UserProfile, Wallet.gem_balance)
             .join(User, User.id == Friendship.friend_id)
             .outerjoin(UserProfile, UserProfile.user_id == User.id)
+            .outerjoin(Wallet, Wallet.user_id == User.id)
             .where(Friendship.user_id == user_id)
             .order_by(User.username)
         )
 
+        rows = result.all()
+        online = presence.online(user.id for _, user, _, _ in rows)
+
         friends = []
-        for friendship, user, profile in result.all():
+        for friendship, user, profile, gem_balance in rows:
+            last_seen = presence.last_seen(user.id, profile.last_seen if profile else None)
             friends.append({
                 "id": user.id,
                 "username": user.username,
-                "gem_balance": user.gem_balance,
-                "is_online": profile.is_online if profile else False,
-                "last_seen": profile.last_seen.isoformat() if profile and profile.last_seen else None,
+                "gem_balance": gem_balance or 0.0,
+                "is_online": user.id in online,
+                "last_seen": last_seen.isoformat() if last_seen else None,
                 "avatar_url": profile.avatar_url if profile else None,
                 "friends_since": friendship.created_at.isoformat()
             })
@@ -267,50 +279,66 @@ class FriendsService:
 
     @staticmethod
     async def search_users(query: str, current_user_id: str, db: AsyncSession, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search for users by username."""
-        # Search users (exclude current user)
+        """Search for users by username, best match first."""
+        # One extra in case the current user matches (they are left out)
+        user_ids = [
+            user_id for user_id in await search_service.users.search(query, limit + 1)
+            if user_id != current_user_id
+        ][:limit]
+        if not user_ids:
+            return []
+
         result = await db.execute(
-            select(User, UserProfile)
+            select(User, UserProfile, Wallet.gem_balance)
             .outerjoin(UserProfile, UserProfile.user_id == User.id)
-            .where(
-                and_(
-                    User.username.ilike(f"%{query}%"),
-                    User.id != current_user_id
-                )
-            )
-            .limit(limit)
+            .outerjoin(Wallet, Wallet.user_id == User.id)
+            .where(User.id.in_(user_ids))
         )
+        rows = {user.id: (user, profile, gem_balance) for user, profile, gem_balance in result.all()}
+        states = await FriendsService._relationship_states(current_user_id, list(rows), db)
+        online = presence.online(rows)
 
         users = []
-        for user, profile in result.all():
-            # Check if already friends
-            friend_check = await db.execute(
-                select(Friendship).where(
-                    and_(Friendship.user_id == current_user_id, Friendship.friend_id == user.id)
-                )
-            )
-            is_friend = friend_check.scalar_one_or_none() is not None
-
-            # Check if request pending
-            request_check = await db.execute(
-                select(FriendRequest).where(
-                    or_(
-                        and_(FriendRequest.sender_id == current_user_id, FriendRequest.receiver_id == user.id),
-                        and_(FriendRequest.sender_id == user.id, FriendRequest.receiver_id == current_user_id)
-                    ),
-                    FriendRequest.status == 'pending'
-                )
-            )
-            request_pending = request_check.scalar_one_or_none() is not None
-
+        for user_id in user_ids:
+            if user_id not in rows:
+                continue
+            user, profile, gem_balance = rows[user_id]
             users.append({
                 "id": user.id,
                 "username": user.username,
-                "gem_balance": user.gem_balance,
-                "is_online": profile.is_online if profile else False,
+                "gem_balance": gem_balance or 0.0,
+                "is_online": user.id in online,
                 "avatar_url": profile.avatar_url if profile else None,
-                "is_friend": is_friend,
-                "request_pending": request_pending
+                "is_friend": "friend" in states.get(user.id, ()),
+                "request_pending": "pending" in states.get(user.id, ())
             })
 
         return users
+
+    @staticmethod
+    async def _relationship_states(current_user_id: str, user_ids: List[str], db: AsyncSession) -> Dict[str, Set[str]]:
+        """
+        "friend" and/or "pending" (a pending request either way) per user,
+        for a whole page of users in one query.
+        """
+        if not user_ids:
+            return {}
+        friends = select(
+            Friendship.friend_id.label("user_id"), literal("friend").label("state")
+        ).where(Friendship.user_id == current_user_id, Friendship.friend_id.in_(user_ids))
+        pending = select(
+            case((FriendRequest.sender_id == current_user_id, FriendRequest.receiver_id),
+                 else_=FriendRequest.sender_id).label("user_id"),
+            literal("pending").label("state")
+        ).where(
+            or_(
+                and_(FriendRequest.sender_id == current_user_id, FriendRequest.receiver_id.in_(user_ids)),
+                and_(FriendRequest.sender_id.in_(user_ids), FriendRequest.receiver_id == current_user_id)
+            ),
+            FriendRequest.status == 'pending'
+        )
+
+        states: Dict[str, Set[str]] = {}
+        for user_id, state in (await db.execute(union_all(friends, pending))).all():
+            states.setdefault(user_id, set()).add(state)
+        return states
@@ -15,8 +15,8 @@ from sqlalchemy import select, func, and_, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import (
-    User, LeaderboardEntry, MiniGameStats, GemTrade,
-    GameBet, MiniGame, Transaction, TransactionType
+    User, LeaderboardEntry, MiniGameStats, MiniGameDailyStats, GemTrade,
+    GameBet, Transaction, TransactionType
 )
 
 
@@ -112,18 +112,18 @@ class LeaderboardService:
                 .limit(LeaderboardService.TOP_LIMIT)
             )
         else:
-            # Calculate from MiniGame records for weekly/monthly
+            # Sum the per-day aggregates for weekly/monthly
             result = await db.execute(
                 select(
-                    MiniGame.user_id,
+                    MiniGameDailyStats.user_id,
                     User.username,
-                    func.sum(MiniGame.profit).label('total_profit'),
-                    func.sum(func.cast(MiniGame.won, type_=func.INTEGER)).label('wins'),
-                    func.count(MiniGame.id).label('games')
+                    func.sum(MiniGameDailyStats.profit).label('total_profit'),
+                    func.sum(MiniGameDailyStats.wins).label('wins'),
+                    func.sum(MiniGameDailyStats.games).label('games')
                 )
-                .join(User, User.id == MiniGame.user_id)
-                .where(MiniGame.played_at >= period_start)
-                .group_by(MiniGame.user_id, User.username)
+                .join(User, User.id == MiniGameDailyStats.user_id)
+                .where(MiniGameDailyStats.day >= period_start.date())
+                .group_by(MiniGameDailyStats.user_id, User.username)
                 .order_by(desc('total_profit'))
                 .limit(LeaderboardService.TOP_LIMIT)
             )
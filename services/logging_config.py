@@ -0,0 +1,162 @@
+"""
+Logging Config - Structured, non-blocking logging for the application.
+
+Records are handed to a QueueHandler on the event loop thread and written by
+a QueueListener on a background thread, so stdout I/O never blocks request
+handling. Output is one JSON object per line (LOG_FORMAT=text for local
+development).
+
+Environment:
+- LOG_LEVEL: root level (default INFO)
+- LOG_LEVELS: per-module overrides, e.g. "gaming.round_manager=DEBUG,api.auth_api=WARNING"
+- LOG_SAMPLING: per-event sample rates, e.g. "round_timer_tick=0.2,bet_registered=0"
+- LOG_FORMAT: "json" (default) or "text"
+
+High-frequency call sites tag records with extra={"sample": "<event>"}; only
+a 1-in-N share of those records is kept, where N = 1 / rate.
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Third-party loggers that are too chatty at INFO (overridable via LOG_LEVELS)
+DEFAULT_MODULE_LEVELS: Dict[str, str] = {
+    "httpx": "WARNING",
+    "httpcore": "WARNING",
+    "aiosqlite": "WARNING",
+}
+
+# Default sample rates for events that fire per tick / per bet / per broadcast
+DEFAULT_SAMPLE_RATES: Dict[str, float] = {
+    "round_timer_tick": 0.1,
+    "bet_registered": 0.05,
+    "sse_broadcast": 0.05,
+    "bet_settled": 0.01,
+}
+
+# Attributes present on every LogRecord; anything else came from extra={}
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _parse_mapping(raw: str) -> Dict[str, str]:
+    """Parse "a=1,b=2" into {"a": "1", "b": "2"}, ignoring malformed entries."""
+    mapping = {}
+    for item in raw.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            if key.strip():
+                mapping[key.strip()] = value.strip()
+    return mapping
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep 1-in-N records for each tagged high-frequency event.
+
+    Counter based rather than random so the kept share is exact and the
+    check is a dict lookup plus an increment.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.intervals: Dict[str, int] = {}
+        for event, rate in rates.items():
+            self.intervals[event] = 0 if rate <= 0 else max(1, round(1 / min(rate, 1.0)))
+        self.counters: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "sample", None)
+        if event is None or record.levelno >= logging.WARNING:
+            return True
+
+        interval = self.intervals.get(event, 1)
+        if interval == 0:
+            return False
+
+        count = self.counters.get(event, 0)
+        self.counters[event] = count + 1
+        return count % interval == 0
+
+
+def configure_logging(force: bool = False):
+    """
+    Install the queue-based root handler. Safe to call more than once.
+
+    Should run before application modules log anything, i.e. at the top of
+    main.py.
+    """
+    global _listener
+    if _listener is not None and not force:
+        return
+    if _listener is not None:
+        shutdown_logging()
+
+    fmt = os.getenv("LOG_FORMAT", "json").lower()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == "text":
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for event, rate in _parse_mapping(os.getenv("LOG_SAMPLING", "")).items():
+        try:
+            rates[event] = float(rate)
+        except ValueError:
+            pass
+    queue_handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    levels = dict(DEFAULT_MODULE_LEVELS)
+    levels.update(_parse_mapping(os.getenv("LOG_LEVELS", "")))
+    for module, level in levels.items():
+        logging.getLogger(module).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,430 @@
+"""
+Metrics Service - Lightweight in-process metrics with Prometheus text output.
+
+Provides counters, gauges and histograms plus the hooks that feed them:
+- MetricsMiddleware: per-route request latency, status and DB usage
+- install_sqlalchemy_hooks(): query count and DB time per request
+- EventLoopLagMonitor: scheduling delay of the asyncio loop
+
+Everything runs on the event loop thread, so updates are plain attribute
+arithmetic with no locking. Set METRICS_ENABLED=false to disable collection.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+PHASE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 60.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class: a named metric family with a fixed label set."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return labels
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    metric_type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down.
+
+    A gauge may instead be backed by a callback evaluated at scrape time,
+    which keeps hot paths (e.g. SSE subscribe/unsubscribe) untouched.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, *labels: str):
+        self._values[self._key(labels)] = float(value)
+
+    def get(self, *labels: str) -> float:
+        if self._callback is not None:
+            return float(self._callback())
+        return self._values.get(labels, 0.0)
+
+    def _samples(self):
+        if self._callback is not None:
+            try:
+                value = float(self._callback())
+            except Exception:
+                return []
+            return [f"{self.name} {_format_value(value)}"]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with running sum and count."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def snapshot(self, *labels: str) -> Dict[str, float]:
+        series = self._values.get(labels)
+        if not series:
+            return {"count": 0, "sum": 0.0}
+        return {"count": sum(series[:-1]), "sum": series[-1]}
+
+    def _samples(self):
+        lines = []
+        for key, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metric families and renders the Prometheus exposition."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and core metric families
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route, method and status class.",
+    ("route", "method", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("route", "method")
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request.",
+    ("route", "method"), buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_seconds = registry.histogram(
+    "http_request_db_seconds", "Time spent in database queries per HTTP request.",
+    ("route", "method")
+)
+db_queries_total = registry.counter(
+    "db_queries_total", "Database queries executed, including background tasks."
+)
+db_query_seconds_total = registry.counter(
+    "db_query_seconds_total", "Total time spent executing database queries."
+)
+event_loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "Delay between scheduled and actual event loop wakeups.",
+    buckets=LOOP_LAG_BUCKETS
+)
+event_loop_lag_max_seconds = registry.gauge(
+    "event_loop_lag_max_seconds", "Worst event loop lag seen in the last sampling window."
+)
+game_phase_duration_seconds = registry.histogram(
+    "game_phase_duration_seconds", "Time spent in each game round phase.",
+    ("game", "phase"), buckets=PHASE_BUCKETS
+)
+price_refresh_duration_seconds = registry.histogram(
+    "price_refresh_duration_seconds", "Duration of a full crypto price refresh.",
+    ("outcome",)
+)
+
+
+def observe_phase(game: str, phase: str, started_at: Optional[float]):
+    """Record how long a game spent in `phase` since the monotonic `started_at`."""
+    if METRICS_ENABLED and started_at is not None:
+        game_phase_duration_seconds.observe(time.monotonic() - started_at, game, phase)
+
+
+# ==================== REQUEST CONTEXT ====================
+
+class _RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[_RequestStats]] = ContextVar("metrics_request_stats", default=None)
+
+
+def current_request_stats() -> Optional[_RequestStats]:
+    """Query statistics for the request being handled, if any."""
+    return _request_stats.get()
+
+
+# ==================== SQLALCHEMY HOOKS ====================
+
+def install_sqlalchemy_hooks(engine):
+    """
+    Count queries and DB time on `engine` (sync or async).
+
+    Attributed to the current request through a context variable, so N+1
+    patterns show up as high http_request_db_queries for a route.
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    db_queries_total.inc()
+    db_query_seconds_total.inc(elapsed)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("metrics_query_start")
+        if starts:
+            starts.pop()
+
+
+# ==================== ASGI MIDDLEWARE ====================
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and DB usage per route.
+
+    Routes are labelled by their path template (e.g. /api/crash/bet,
+    /profile/{username}) to keep label cardinality bounded; unmatched paths
+    share a single "unmatched" label.
+    """
+
+    def __init__(self, app, excluded_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = frozenset(excluded_paths)
+        self._route_templates: Optional[Dict[int, str]] = None
+
+    def _resolve_route(self, scope) -> str:
+        if self._route_templates is None:
+            templates = {}
+            for route in getattr(scope.get("app"), "routes", []):
+                endpoint = getattr(route, "endpoint", None) or getattr(route, "app", None)
+                path = getattr(route, "path", None)
+                if endpoint is not None and path is not None:
+                    is_mount = not hasattr(route, "endpoint")
+                    templates.setdefault(id(endpoint), f"{path}/*" if is_mount else path)
+            self._route_templates = templates
+
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        return self._route_templates.get(id(endpoint), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+
+            route = self._resolve_route(scope)
+            method = scope["method"]
+            http_requests_total.inc(1, route, method, f"{status_code // 100}xx")
+            http_request_duration_seconds.observe(elapsed, route, method)
+            http_request_db_queries.observe(stats.queries, route, method)
+            http_request_db_seconds.observe(stats.db_seconds, route, method)
+
+
+# ==================== EVENT LOOP LAG ====================
+
+class EventLoopLagMonitor:
+    """
+    Background task measuring how late the event loop wakes a sleeping task.
+
+    Sustained lag means something is blocking the loop (sync I/O, CPU-heavy
+    work) and every request and SSE stream is delayed by that much.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 20):
+        self.interval = interval
+        self.window = window
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if not METRICS_ENABLED or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Event loop lag monitor started (%ss interval)", self.interval)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        window_max = 0.0
+        samples = 0
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+            event_loop_lag_seconds.observe(lag)
+            window_max = max(window_max, lag)
+            samples += 1
+            if samples >= self.window:
+                event_loop_lag_max_seconds.set(window_max)
+                window_max = 0.0
+                samples = 0
+
+
+loop_lag_monitor = EventLoopLagMonitor()
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of all registered metrics."""
+    return registry.render()
@@ -3,19 +3,35 @@ Mini-Games Service
 
 Handles game logic for Coin Flip, Dice Roll, and Higher/Lower card games.
 Includes statistics tracking and GEM balance management.
+
+Outcomes are drawn from provably fair seeds (services/fairness.py): one
+chain link per single play, one per auto-play batch.
+
+play_auto settles up to MAX_AUTO_PLAY_ROUNDS games of one kind in a single
+call: outcomes are drawn as arrays, the stop point comes from the cumulative
+profit path, and the batch is written with bulk inserts and one stats update.
+
+Per-game totals live in mini_game_daily_stats, one row per (user, game type,
+UTC day) incremented with INSERT ... ON CONFLICT DO UPDATE. User stats and
+the weekly/monthly leaderboards sum a handful of those rows instead of
+scanning mini_games; rebuild_daily_stats rebuilds them from the history.
 """
 
-import random
 import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
-from sqlalchemy import select, update, func, and_
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+from sqlalchemy import select, update, insert, delete, func, and_, case, literal
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from database.models import (
-    User, MiniGame, MiniGameStats, Transaction, TransactionType, Wallet
+    User, MiniGame, MiniGameStats, MiniGameDailyStats, Transaction, TransactionType, Wallet
 )
 from crypto.portfolio import portfolio_manager
+from services.fairness import FairSeed, derive_floats, fairness
 
 
 class MiniGamesService:
@@ -27,6 +43,7 @@ class MiniGamesService:
 
     # Coin Flip settings
     COINFLIP_MULTIPLIER = 2.0  # Win doubles your bet
+    COIN_SIDES = ('heads', 'tails')  # Indexed by draw() outcome
 
     # Dice settings
     DICE_MULTIPLIERS = {
@@ -46,6 +63,9 @@ class MiniGamesService:
     HIGHERLOWER_MULTIPLIER = 2.0  # Guess correctly: 2x payout
     HIGHERLOWER_SAME_MULTIPLIER = 5.0  # Guess same (rare): 5x payout
 
+    # Auto-play settings
+    MAX_AUTO_PLAY_ROUNDS = 1000  # Games settled per auto-play request
+
     @staticmethod
     async def play_coinflip(
         user_id: str,
@@ -107,7 +127,8 @@ class MiniGamesService:
         db.add(bet_transaction)
 
         # Flip the coin
-        result_flip = random.choice(['heads', 'tails'])
+        fair = await fairness.next_seed("minigames")
+        result_flip = MiniGamesService.COIN_SIDES[int(MiniGamesService.draw('coinflip', fair.seed, 1)[0])]
         won = (result_flip == choice)
 
         # Calculate payout
@@ -146,7 +167,10 @@ class MiniGamesService:
             payout=payout,
             profit=profit,
             game_data=json.dumps(game_data),
-            won=won
+            won=won,
+            server_seed=fair.hex,
+            fairness_chain_id=fair.chain_id,
+            fairness_index=fair.index
         )
         db.add(game)
 
@@ -162,7 +186,8 @@ class MiniGamesService:
             'bet_amount': bet_amount,
             'payout': payout,
             'profit': profit,
-            'new_balance': wallet.gem_balance
+            'new_balance': wallet.gem_balance,
+            'fairness': fair.to_dict()
         }
 
     @staticmethod
@@ -232,7 +257,8 @@ class MiniGamesService:
         db.add(bet_transaction)
 
         # Roll the dice
-        roll = random.randint(1, 6)
+        fair = await fairness.next_seed("minigames")
+        roll = int(MiniGamesService.draw('dice', fair.seed, 1)[0])
 
         # Check if won
         won = False
@@ -290,7 +316,10 @@ class MiniGamesService:
             payout=payout,
             profit=profit,
             game_data=json.dumps(game_data),
-            won=won
+            won=won,
+            server_seed=fair.hex,
+            fairness_chain_id=fair.chain_id,
+            fairness_index=fair.index
         )
         db.add(game)
 
@@ -308,7 +337,8 @@ class MiniGamesService:
             'bet_amount': bet_amount,
             'payout': payout,
             'profit': profit,
-            'new_balance': wallet.gem_balance
+            'new_balance': wallet.gem_balance,
+            'fairness': fair.to_dict()
         }
     @staticmethod
     async def play_higherlower(
@@ -371,8 +401,8 @@ class MiniGamesService:
         db.add(bet_transaction)
 
         # Draw two cards (1-13: Ace to King)
-        card1 = random.randint(1, 13)
-        card2 = random.randint(1, 13)
+        fair = await fairness.next_seed("minigames")
+        card1, card2 = (int(card) for card in MiniGamesService.draw('higherlower', fair.seed, 1)[0])
 
         # Check if won
         won = False
@@ -422,7 +452,10 @@ class MiniGamesService:
             payout=payout,
             profit=profit,
             game_data=json.dumps(game_data),
-            won=won
+            won=won,
+            server_seed=fair.hex,
+            fairness_chain_id=fair.chain_id,
+            fairness_index=fair.index
         )
         db.add(game)
 
@@ -440,9 +473,301 @@ class MiniGamesService:
             'bet_amount': bet_amount,
             'payout': payout,
             'profit': profit,
-            'new_balance': wallet.gem_balance
+            'new_balance': wallet.gem_balance,
+            'fairness': fair.to_dict()
+        }
+
+    @staticmethod
+    async def play_auto(
+        user_id: str,
+        game_type: str,  # 'coinflip', 'dice', 'higherlower'
+        bet_amount: int,
+        rounds: int,
+        db: AsyncSession,
+        choice: Optional[str] = None,
+        bet_type: Optional[str] = None,
+        bet_value: Optional[int] = None,
+        guess: Optional[str] = None,
+        stop_loss: Optional[int] = None,
+        take_profit: Optional[int] = None,
+        fair: Optional[FairSeed] = None
+    ) -> Dict[str, Any]:
+        """
+        Play up to `rounds` games of one type with the same bet.
+
+        Play stops after the game that brings the batch's net loss to
+        `stop_loss` or its net profit to `take_profit`, or before a game the
+        balance cannot cover. Each game is recorded exactly as a single play
+        would be (bet/win transactions and a MiniGame row). The whole batch
+        is drawn from one fair seed; game i uses draw positions i onwards.
+        The wallet takes the batch's net in one atomic update, which fails
+        with "Insufficient GEM balance" if the balance no longer covers it.
+
+        Args:
+            user_id: User ID
+            game_type: Game to play
+            bet_amount: Amount to bet on every game
+            rounds: Maximum number of games
+            db: Database session
+            choice / bet_type, bet_value / guess: Selection for coinflip / dice / higherlower
+            stop_loss: Stop once the batch has lost at least this much
+            take_profit: Stop once the batch has won at least this much
+            fair: Seed to play on; the next minigames chain link when omitted
+
+        Returns:
+            Dict with the batch summary and per-game results
+        """
+        # Validate bet amount
+        if bet_amount < MiniGamesService.MIN_BET:
+            raise ValueError(f"Minimum bet is {MiniGamesService.MIN_BET} GEM")
+        if bet_amount > MiniGamesService.MAX_BET:
+            raise ValueError(f"Maximum bet is {MiniGamesService.MAX_BET} GEM")
+        if rounds < 1 or rounds > MiniGamesService.MAX_AUTO_PLAY_ROUNDS:
+            raise ValueError(f"Rounds must be between 1 and {MiniGamesService.MAX_AUTO_PLAY_ROUNDS}")
+
+        selection = MiniGamesService._auto_play_selection(game_type, choice, bet_type, bet_value, guess)
+
+        # Plan the batch on the current balance; the wallet update below re-checks it
+        result = await db.execute(select(Wallet.gem_balance).where(Wallet.user_id == user_id))
+        wallet = result.one_or_none()
+        if not wallet:
+            raise ValueError("User wallet not found")
+
+        balance = wallet.gem_balance or 0.0
+        if balance < bet_amount:
+            raise ValueError("Insufficient GEM balance")
+
+        if fair is None:
+            fair = await fairness.next_seed("minigames")
+        won, multiplier, results, label = MiniGamesService._auto_play_outcomes(
+            game_type, fair.seed, rounds, selection
+        )
+
+        # Running balance: games play until the first stop condition
+        payout = (bet_amount * multiplier).astype(np.int64)  # int() per game, as in single play
+        profit = payout - bet_amount
+        net = np.cumsum(profit)
+        net_before = np.concatenate(([0], net[:-1]))
+        balance_before = balance + net_before
+
+        played, stopped_by = rounds, 'completed'
+        unaffordable = np.flatnonzero(balance_before < bet_amount)
+        if unaffordable.size:
+            played, stopped_by = int(unaffordable[0]), 'balance'
+        for reason, hit in (
+            ('stop_loss', net <= -stop_loss if stop_loss else None),
+            ('take_profit', net >= take_profit if take_profit else None),
+        ):
+            if hit is not None and hit.any():
+                stop = int(np.argmax(hit)) + 1
+                if stop < played:
+                    played, stopped_by = stop, reason
+
+        won, multiplier, payout, profit, results = (
+            won[:played], multiplier[:played], payout[:played], profit[:played], results[:played]
+        )
+        net_before = net_before[:played]
+
+        # One atomic update for the whole batch, on the condition that the
+        # balance still covers every bet in it; the ledger follows the result
+        total_profit = float(profit.sum())
+        result = await db.execute(
+            update(Wallet)
+            .where(Wallet.user_id == user_id, Wallet.gem_balance >= float(np.max(bet_amount - net_before)))
+            .values(gem_balance=Wallet.gem_balance + total_profit, updated_at=datetime.utcnow())
+            .returning(Wallet.gem_balance)
+        )
+        new_balance = result.scalar_one_or_none()
+        if new_balance is None:
+            raise ValueError("Insufficient GEM balance")
+
+        new_balance = float(new_balance)
+        balance_before = new_balance - total_profit + net_before
+        balance_after_bet = balance_before - bet_amount
+
+        # Ledger rows, same shape as the single-play endpoints write
+        now = datetime.utcnow()
+        transactions = []
+        games = []
+        for i in range(played):
+            game_won = bool(won[i])
+            transactions.append({
+                'user_id': user_id,
+                'transaction_type': TransactionType.MINIGAME_BET.value,
+                'amount': -bet_amount,
+                'balance_before': float(balance_before[i]),
+                'balance_after': float(balance_after_bet[i]),
+                'description': f"{label} bet: {results[i]['selection']}",
+                'created_at': now
+            })
+            if game_won:
+                transactions.append({
+                    'user_id': user_id,
+                    'transaction_type': TransactionType.MINIGAME_WIN.value,
+                    'amount': int(payout[i]),
+                    'balance_before': float(balance_after_bet[i]),
+                    'balance_after': float(balance_after_bet[i] + payout[i]),
+                    'description': f"{label} win: {results[i]['outcome']}",
+                    'created_at': now
+                })
+            games.append({
+                'user_id': user_id,
+                'game_type': game_type,
+                'bet_amount': bet_amount,
+                'payout': int(payout[i]),
+                'profit': int(profit[i]),
+                'game_data': json.dumps({**results[i]['game_data'], 'position': i}),
+                'won': game_won,
+                'server_seed': fair.hex,
+                'fairness_chain_id': fair.chain_id,
+                'fairness_index': fair.index,
+                'played_at': now
+            })
+
+        await db.execute(insert(Transaction), transactions)
+        await db.execute(insert(MiniGame), games)
+        await MiniGamesService._update_stats_batch(user_id, game_type, bet_amount, payout, profit, won, db, day=now.date())
+
+        await db.commit()
+
+        wins = int(won.sum())
+        return {
+            'game_type': game_type,
+            'rounds_requested': rounds,
+            'rounds_played': played,
+            'stopped_by': stopped_by,
+            'wins': wins,
+            'losses': played - wins,
+            'bet_amount': bet_amount,
+            'total_wagered': bet_amount * played,
+            'total_payout': int(payout.sum()),
+            'profit': int(profit.sum()),
+            'new_balance': new_balance,
+            'fairness': fair.to_dict(),
+            'games': [
+                {'won': bool(won[i]), 'profit': int(profit[i]), **results[i]['game_data']}
+                for i in range(played)
+            ]
         }
 
+    @staticmethod
+    def draw(game_type: str, seed: bytes, rounds: int, start: int = 0) -> np.ndarray:
+        """
+        Raw outcomes of games start..start+rounds-1 played on a fair seed:
+        coin sides (0 heads, 1 tails), die faces 1-6, or (card1, card2) pairs 1-13.
+        """
+        if game_type == 'coinflip':
+            return (derive_floats(seed, rounds, 'coinflip', start) * 2).astype(np.int64)
+        if game_type == 'dice':
+            return 1 + (derive_floats(seed, rounds, 'dice', start) * 6).astype(np.int64)
+        if game_type == 'higherlower':
+            floats = derive_floats(seed, 2 * rounds, 'higherlower', 2 * start)
+            return 1 + (floats * 13).astype(np.int64).reshape(rounds, 2)
+        raise ValueError("Game type must be 'coinflip', 'dice', or 'higherlower'")
+
+    @staticmethod
+    def _auto_play_selection(
+        game_type: str,
+        choice: Optional[str],
+        bet_type: Optional[str],
+        bet_value: Optional[int],
+        guess: Optional[str]
+    ) -> Dict[str, Any]:
+        """Validated selection for `game_type`; messages match single play."""
+        if game_type == 'coinflip':
+            choice = (choice or '').lower()
+            if choice not in ['heads', 'tails']:
+                raise ValueError("Choice must be 'heads' or 'tails'")
+            return {'choice': choice}
+
+        if game_type == 'dice':
+            bet_type = (bet_type or '').lower()
+            if bet_type not in ['exact', 'even', 'odd', 'high', 'low']:
+                raise ValueError("Invalid bet type")
+            if bet_type == 'exact':
+                if bet_value is None or bet_value < 1 or bet_value > 6:
+                    raise ValueError("Exact bet requires value between 1 and 6")
+            return {'bet_type': bet_type, 'bet_value': bet_value}
+
+        if game_type == 'higherlower':
+            guess = (guess or '').lower()
+            if guess not in ['higher', 'lower', 'same']:
+                raise ValueError("Guess must be 'higher', 'lower', or 'same'")
+            return {'guess': guess}
+
+        raise ValueError("Game type must be 'coinflip', 'dice', or 'higherlower'")
+
+    @staticmethod
+    def _auto_play_outcomes(
+        game_type: str,
+        seed: bytes,
+        rounds: int,
+        selection: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]], str]:
+        """
+        Draw `rounds` outcomes at once.
+
+        Returns (won, multiplier, per-game results, description label); the
+        multiplier is 0 for lost games.
+        """
+        drawn = MiniGamesService.draw(game_type, seed, rounds)
+
+        if game_type == 'coinflip':
+            choice = selection['choice']
+            flips = np.array(MiniGamesService.COIN_SIDES)[drawn]
+            won = flips == choice
+            multiplier = np.where(won, MiniGamesService.COINFLIP_MULTIPLIER, 0.0)
+            results = [
+                {
+                    'selection': choice,
+                    'outcome': flip,
+                    'game_data': {'choice': choice, 'result': flip, 'multiplier': m}
+                }
+                for flip, m in zip(flips.tolist(), multiplier.tolist())
+            ]
+            return won, multiplier, results, "Coin Flip"
+
+        if game_type == 'dice':
+            bet_type, bet_value = selection['bet_type'], selection['bet_value']
+            rolls = drawn
+            won = {
+                'exact': lambda: rolls == bet_value,
+                'even': lambda: rolls % 2 == 0,
+                'odd': lambda: rolls % 2 == 1,
+                'high': lambda: rolls >= 4,
+                'low': lambda: rolls <= 3,
+            }[bet_type]()
+            multiplier_key = bet_value if bet_type == 'exact' else bet_type
+            multiplier = np.where(won, MiniGamesService.DICE_MULTIPLIERS[multiplier_key], 0.0)
+            label = f"{bet_type} {bet_value}" if bet_type == 'exact' else bet_type
+            results = [
+                {
+                    'selection': label,
+                    'outcome': f"rolled {roll}",
+                    'game_data': {'bet_type': bet_type, 'bet_value': bet_value, 'roll': roll, 'multiplier': m}
+                }
+                for roll, m in zip(rolls.tolist(), multiplier.tolist())
+            ]
+            return won, multiplier, results, "Dice Roll"
+
+        guess = selection['guess']
+        card1, card2 = drawn[:, 0], drawn[:, 1]
+        won = {'higher': card2 > card1, 'lower': card2 < card1, 'same': card2 == card1}[guess]
+        hit_multiplier = (
+            MiniGamesService.HIGHERLOWER_SAME_MULTIPLIER if guess == 'same'
+            else MiniGamesService.HIGHERLOWER_MULTIPLIER
+        )
+        multiplier = np.where(won, hit_multiplier, 0.0)
+        results = [
+            {
+                'selection': guess,
+                'outcome': f"{c1} -> {c2}",
+                'game_data': {'guess': guess, 'card1': c1, 'card2': c2, 'multiplier': m}
+            }
+            for c1, c2, m in zip(card1.tolist(), card2.tolist(), multiplier.tolist())
+        ]
+        return won, multiplier, results, "Higher/Lower"
+
     @staticmethod
     async def _update_stats(
         user_id: str,
@@ -453,8 +778,24 @@ class MiniGamesService:
         won: bool,
         db: AsyncSession
     ):
-        """Update user's mini-game statistics."""
-        # Get or create stats record
+        """Update user's mini-game statistics with one game."""
+        await MiniGamesService._update_stats_batch(
+            user_id, game_type, bet_amount,
+            np.array([payout]), np.array([profit]), np.array([won]), db
+        )
+
+    @staticmethod
+    async def _update_stats_batch(
+        user_id: str,
+        game_type: str,
+        bet_amount: int,
+        payouts: np.ndarray,
+        profits: np.ndarray,
+        won: np.ndarray,
+        db: AsyncSession,
+        day: Optional[date] = None
+    ):
+        """Apply a run of games to the user's statistics in one update (same result as _update_stats per game)."""
         result = await db.execute(
             select(MiniGameStats).where(MiniGameStats.user_id == user_id)
         )
@@ -464,44 +805,124 @@ class MiniGamesService:
             stats = MiniGameStats(user_id=user_id)
             db.add(stats)
 
+        games = int(won.size)
+        wins = int(won.sum())
+
         # Update overall stats
-        stats.total_games_played += 1
-        stats.total_wagered += bet_amount
-        stats.total_won += payout
-        stats.net_profit += profit
+        stats.total_games_played = (stats.total_games_played or 0) + games
+        stats.total_games_won = (stats.total_games_won or 0) + wins
+        stats.total_games_lost = (stats.total_games_lost or 0) + games - wins
+        stats.total_wagered = (stats.total_wagered or 0) + bet_amount * games
+        stats.total_won = (stats.total_won or 0) + int(payouts.sum())
+        stats.net_profit = (stats.net_profit or 0) + int(profits.sum())
+
+        biggest_win = int(profits[won].max()) if wins else 0
+        biggest_loss = int(-profits[~won].min()) if wins < games else 0
+        stats.biggest_win = max(stats.biggest_win or 0, biggest_win)
+        stats.biggest_loss = max(stats.biggest_loss or 0, biggest_loss)
+
+        # Streaks: runs of equal results, the first one continuing the streak carried in
+        win_runs = MiniGamesService._run_lengths(won, stats.current_win_streak or 0)
+        loss_runs = MiniGamesService._run_lengths(~won, stats.current_loss_streak or 0)
+        if win_runs.size:
+            stats.longest_win_streak = max(stats.longest_win_streak or 0, int(win_runs.max()))
+        if loss_runs.size:
+            stats.longest_loss_streak = max(stats.longest_loss_streak or 0, int(loss_runs.max()))
+        stats.current_win_streak = int(win_runs[-1]) if won[-1] else 0
+        stats.current_loss_streak = 0 if won[-1] else int(loss_runs[-1])
+
+        # Per-game totals for the day
+        await MiniGamesService._add_daily_stats(db, {
+            'user_id': user_id,
+            'game_type': game_type,
+            'day': day or datetime.utcnow().date(),
+            'games': games,
+            'wins': wins,
+            'wagered': bet_amount * games,
+            'won': int(payouts.sum()),
+            'profit': int(profits.sum()),
+            'biggest_win': biggest_win,
+            'biggest_loss': biggest_loss,
+            'updated_at': datetime.utcnow()
+        })
 
-        if won:
-            stats.total_games_won += 1
-            stats.current_win_streak += 1
-            stats.current_loss_streak = 0
-            if stats.current_win_streak > stats.longest_win_streak:
-                stats.longest_win_streak = stats.current_win_streak
-            if profit > stats.biggest_win:
-                stats.biggest_win = profit
-        else:
-            stats.total_games_lost += 1
-            stats.current_loss_streak += 1
-            stats.current_win_streak = 0
-            if stats.current_loss_streak > stats.longest_loss_streak:
-                stats.longest_loss_streak = stats.current_loss_streak
-            if abs(profit) > stats.biggest_loss:
-                stats.biggest_loss = abs(profit)
-
-        # Update per-game stats
-        game_stats_field = f"{game_type}_stats"
-        current_game_stats = getattr(stats, game_stats_field)
-
-        if current_game_stats:
-            game_stats = json.loads(current_game_stats)
-        else:
-            game_stats = {'games': 0, 'wins': 0, 'profit': 0}
-
-        game_stats['games'] += 1
-        if won:
-            game_stats['wins'] += 1
-        game_stats['profit'] += profit
+    @staticmethod
+    async def _add_daily_stats(db: AsyncSession, row: Dict[str, Any]):
+        """Add one day's totals onto mini_game_daily_stats (INSERT ... ON CONFLICT DO UPDATE)."""
+        postgresql = db.bind.dialect.name == "postgresql"
+        dialect_insert = pg_insert if postgresql else sqlite_insert
+        greatest = func.greatest if postgresql else func.max  # Two-argument max() is scalar on SQLite
+
+        stmt = dialect_insert(MiniGameDailyStats).values(row)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=['user_id', 'game_type', 'day'],
+            set_={
+                'games': MiniGameDailyStats.games + stmt.excluded.games,
+                'wins': MiniGameDailyStats.wins + stmt.excluded.wins,
+                'wagered': MiniGameDailyStats.wagered + stmt.excluded.wagered,
+                'won': MiniGameDailyStats.won + stmt.excluded.won,
+                'profit': MiniGameDailyStats.profit + stmt.excluded.profit,
+                'biggest_win': greatest(MiniGameDailyStats.biggest_win, stmt.excluded.biggest_win),
+                'biggest_loss': greatest(MiniGameDailyStats.biggest_loss, stmt.excluded.biggest_loss),
+                'updated_at': stmt.excluded.updated_at,
+            }
+        ))
 
-        setattr(stats, game_stats_field, json.dumps(game_stats))
+    @staticmethod
+    async def rebuild_daily_stats(conn, since: Optional[date] = None, until: Optional[date] = None) -> int:
+        """
+        Rebuild mini_game_daily_stats for days since..until (exclusive; default:
+        all) from mini_games with one INSERT ... SELECT. Takes an AsyncSession or
+        AsyncConnection; the caller commits. Returns the number of rows written.
+
+        Days whose mini_games rows were already removed by the data lifecycle
+        job are left as they are.
+        """
+        day = func.date(MiniGame.played_at)
+        window = []
+        if since is not None:
+            window.append(MiniGame.played_at >= datetime.combine(since, datetime.min.time()))
+        if until is not None:
+            window.append(MiniGame.played_at < datetime.combine(until, datetime.min.time()))
+
+        history = (
+            select(
+                MiniGame.user_id,
+                MiniGame.game_type,
+                day,
+                func.count(),
+                func.sum(case((MiniGame.won, 1), else_=0)),
+                func.sum(MiniGame.bet_amount),
+                func.sum(MiniGame.payout),
+                func.sum(MiniGame.profit),
+                func.max(case((MiniGame.won, MiniGame.profit), else_=0)),
+                func.max(case((MiniGame.won, 0), else_=-MiniGame.profit)),
+                literal(datetime.utcnow())
+            )
+            .where(*window)
+            .group_by(MiniGame.user_id, MiniGame.game_type, day)
+        )
+        rebuilt_days = select(day).where(*window).distinct()
+
+        await conn.execute(delete(MiniGameDailyStats).where(MiniGameDailyStats.day.in_(rebuilt_days)))
+        result = await conn.execute(
+            insert(MiniGameDailyStats).from_select(
+                ['user_id', 'game_type', 'day', 'games', 'wins', 'wagered', 'won',
+                 'profit', 'biggest_win', 'biggest_loss', 'updated_at'],
+                history
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _run_lengths(mask: np.ndarray, carried: int) -> np.ndarray:
+        """Lengths of the runs of True in `mask`; a run starting at index 0 adds `carried`."""
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+        if starts.size and starts[0] == 0:
+            lengths[0] += carried
+        return lengths
 
     @staticmethod
     async def get_user_stats(user_id: str, db: AsyncSession) -> Dict[str, Any]:
@@ -511,6 +932,24 @@ class MiniGamesService:
         )
         stats = result.scalar_one_or_none()
 
+        # Per-game totals: a few rows per game type and day played
+        per_game = {
+            game_type: {'games': 0, 'wins': 0, 'profit': 0}
+            for game_type in ('coinflip', 'dice', 'higherlower')
+        }
+        result = await db.execute(
+            select(
+                MiniGameDailyStats.game_type,
+                func.sum(MiniGameDailyStats.games),
+                func.sum(MiniGameDailyStats.wins),
+                func.sum(MiniGameDailyStats.profit)
+            )
+            .where(MiniGameDailyStats.user_id == user_id)
+            .group_by(MiniGameDailyStats.game_type)
+        )
+        for game_type, games, wins, profit in result.all():
+            per_game[game_type] = {'games': int(games), 'wins': int(wins), 'profit': int(profit)}
+
         if not stats:
             return {
                 'total_games_played': 0,
@@ -526,9 +965,9 @@ class MiniGamesService:
                 'longest_loss_streak': 0,
                 'biggest_win': 0,
                 'biggest_loss': 0,
-                'coinflip_stats': {'games': 0, 'wins': 0, 'profit': 0},
-                'dice_stats': {'games': 0, 'wins': 0, 'profit': 0},
-                'higherlower_stats': {'games': 0, 'wins': 0, 'profit': 0}
+                'coinflip_stats': per_game['coinflip'],
+                'dice_stats': per_game['dice'],
+                'higherlower_stats': per_game['higherlower']
             }
 
         win_rate = (stats.total_games_won / stats.total_games_played * 100) if stats.total_games_played > 0 else 0.0
@@ -547,9 +986,9 @@ class MiniGamesService:
             'longest_loss_streak': stats.longest_loss_streak,
             'biggest_win': stats.biggest_win,
             'biggest_loss': stats.biggest_loss,
-            'coinflip_stats': json.loads(stats.coinflip_stats) if stats.coinflip_stats else {'games': 0, 'wins': 0, 'profit': 0},
-            'dice_stats': json.loads(stats.dice_stats) if stats.dice_stats else {'games': 0, 'wins': 0, 'profit': 0},
-            'higherlower_stats': json.loads(stats.higherlower_stats) if stats.higherlower_stats else {'games': 0, 'wins': 0, 'profit': 0}
+            'coinflip_stats': per_game['coinflip'],
+            'dice_stats': per_game['dice'],
+            'higherlower_stats': per_game['higherlower']
         }
 
     @staticmethod
@@ -572,6 +1011,11 @@ class MiniGamesService:
                 'profit': game.profit,
                 'won': game.won,
                 'game_data': json.loads(game.game_data) if game.game_data else {},
+                'fairness': {
+                    'chain_id': game.fairness_chain_id,
+                    'index': game.fairness_index,
+                    'server_seed': game.server_seed
+                } if game.server_seed else None,
                 'played_at': game.played_at.isoformat()
             }
             for game in games
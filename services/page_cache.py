@@ -0,0 +1,113 @@
+"""
+Page Cache - rendered HTML for pages that look the same to every visitor.
+
+Anonymous pages (/login, /register, /showcase) are rendered once and reused
+until a template they are built from (the page, base.html, includes) changes
+on disk or an asset_url() they embed would now resolve differently (the
+static file was edited, or the asset build was redone). Each entry keeps a
+gzip copy and an ETag, so repeat visits get a 304 and first visits skip both
+the Jinja render and compression.
+
+Only use it for templates that read nothing from the request; the render gets
+an empty request-free context.
+
+Environment:
+- PAGE_CACHE_ENABLED: set to false to render on every request (default true)
+"""
+
+import os
+import gzip
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from jinja2 import meta
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+
+page_cache_requests_total = registry.counter(
+    "page_cache_requests_total", "Cached page requests by result.", ("result",)
+)
+
+
+@dataclass
+class CachedPage:
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    uptodate: List[Callable[[], bool]]  # One per template file and asset_url() call the page is built from
+
+    def is_current(self) -> bool:
+        return all(check() for check in self.uptodate)
+
+
+class PageCache:
+    """Render-once cache for request-independent templates."""
+
+    def __init__(self, templates: Jinja2Templates, enabled: bool = PAGE_CACHE_ENABLED):
+        self.templates = templates
+        self.enabled = enabled
+        self.pages: Dict[str, CachedPage] = {}
+
+    def response(self, request: Request, name: str) -> Response:
+        if not self.enabled:
+            return self.templates.TemplateResponse(name, {"request": request})
+
+        page = self.pages.get(name)
+        if page is not None and page.is_current():
+            result = "hit"
+        else:
+            page = self.pages[name] = self._render(name)
+            result = "miss"
+
+        headers = {"ETag": page.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if page.etag in request.headers.get("if-none-match", ""):
+            page_cache_requests_total.inc(1, "not_modified")
+            return Response(status_code=304, headers=headers)
+
+        page_cache_requests_total.inc(1, result)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return HTMLResponse(page.gzip_body, headers=headers)
+        return HTMLResponse(page.body, headers=headers)
+
+    def _render(self, name: str) -> CachedPage:
+        env = self.templates.env
+        # Collect the freshness checks first so a file changed mid-render is caught next time
+        uptodate = self._dependencies(name, {})
+        context = {}
+        resolved: Dict[str, str] = {}  # asset path -> URL embedded in the page
+        asset_url = env.globals.get("asset_url")
+        if asset_url is not None:
+            context["asset_url"] = lambda path: resolved.setdefault(path, asset_url(path))
+        body = env.get_template(name).render(context).encode("utf-8")
+        uptodate.extend(self._asset_check(asset_url, path, url) for path, url in resolved.items())
+        logger.debug("Rendered %s for the page cache (%s bytes)", name, len(body))
+        return CachedPage(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=6, mtime=0),
+            etag='"' + hashlib.sha256(body).hexdigest()[:20] + '"',
+            uptodate=uptodate
+        )
+
+    @staticmethod
+    def _asset_check(asset_url: Callable[[str], str], path: str, url: str) -> Callable[[], bool]:
+        return lambda: asset_url(path) == url
+
+    def _dependencies(self, name: str, seen: Dict[str, Callable[[], bool]]) -> List[Callable[[], bool]]:
+        """Freshness checks for `name` and every template it extends, includes or imports."""
+        env = self.templates.env
+        source, _, uptodate = env.loader.get_source(env, name)
+        seen[name] = uptodate or (lambda: True)
+        for referenced in meta.find_referenced_templates(env.parse(source)):
+            if referenced and referenced not in seen:
+                self._dependencies(referenced, seen)
+        return list(seen.values())
@@ -0,0 +1,248 @@
+"""
+Presence - who is online, tracked in memory instead of a database flag.
+
+A user is online while they hold an open connection (roulette SSE stream,
+crash WebSocket) on any worker, or for PRESENCE_TTL_SECONDS after their last
+heartbeat (an authenticated API request or a WebSocket ping). Nothing is
+written per status change; online() answers a whole friends list or search
+page from memory.
+
+Workers share what they see: every PRESENCE_SYNC_SECONDS each worker
+publishes the users connected to it or heard from since its last report,
+and the others count those as heartbeats. Logging out is published with the
+next report so the user drops off everywhere without waiting for the TTL.
+
+last_seen is still stored on user_profiles, but lazily: the times observed
+by this worker are upserted in batches every PRESENCE_FLUSH_SECONDS (and on
+shutdown). Reads merge in the not yet flushed value via last_seen().
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.database import AsyncSessionLocal
+from database.models import User, UserProfile
+from services.cluster import cluster
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_TTL_SECONDS = float(os.getenv("PRESENCE_TTL_SECONDS", "90"))
+PRESENCE_SYNC_SECONDS = float(os.getenv("PRESENCE_SYNC_SECONDS", "15"))
+PRESENCE_FLUSH_SECONDS = float(os.getenv("PRESENCE_FLUSH_SECONDS", "60"))
+
+FLUSH_CHUNK = 500
+
+presence_last_seen_flushed_total = registry.counter(
+    "presence_last_seen_flushed_total", "last_seen values written to user_profiles by the presence flush."
+)
+
+
+class PresenceTracker:
+    """Connection counts and heartbeats per user; see the module docstring."""
+
+    def __init__(
+        self,
+        ttl: float = PRESENCE_TTL_SECONDS,
+        sync_seconds: float = PRESENCE_SYNC_SECONDS,
+        flush_seconds: float = PRESENCE_FLUSH_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.sync_seconds = sync_seconds
+        self.flush_seconds = flush_seconds
+        self.clock = clock
+        self._connections: Dict[str, int] = {}  # user → open connections on this worker
+        self._seen: Dict[str, float] = {}  # user → clock() of the last heartbeat, local or reported
+        self._reported: Set[str] = set()  # heard from here since the last sync report
+        self._left: Set[str] = set()  # logged out here since the last sync report
+        self._pending: Dict[str, datetime] = {}  # user → last_seen not yet flushed
+        self._tasks: List[asyncio.Task] = []
+
+        registry.gauge(
+            "presence_online_users", "Users online as seen by this worker.",
+            callback=self.online_count
+        )
+
+    async def start(self):
+        cluster.subscribe("presence", self._on_report)
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+        if cluster.mode != "single":
+            self._tasks.append(asyncio.create_task(self._sync_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning("Final presence flush failed: %s", e)
+
+    # ==================== CONNECTION LIFECYCLE ====================
+
+    def connect(self, user_id: str):
+        """A streaming connection (SSE, WebSocket) of the user opened."""
+        self._connections[user_id] = self._connections.get(user_id, 0) + 1
+        self.heartbeat(user_id)
+
+    def disconnect(self, user_id: str):
+        """
+        One of the user's connections closed. With none left they stay online
+        until the TTL runs out, so reloading a page does not flap their status.
+        A connection that is no longer counted (the user logged out while it
+        was open) changes nothing, so the logout sticks.
+        """
+        count = self._connections.get(user_id)
+        if count is None:
+            return
+        if count > 1:
+            self._connections[user_id] = count - 1
+        else:
+            del self._connections[user_id]
+        self.heartbeat(user_id)
+
+    def heartbeat(self, user_id: str):
+        """The user is active right now."""
+        self._seen[user_id] = self.clock()
+        self._reported.add(user_id)
+        self._left.discard(user_id)
+        self._pending[user_id] = datetime.utcnow()
+
+    def leave(self, user_id: str):
+        """The user logged out: offline at once, on every worker."""
+        self._connections.pop(user_id, None)
+        self._seen.pop(user_id, None)
+        self._reported.discard(user_id)
+        self._left.add(user_id)
+        self._pending[user_id] = datetime.utcnow()
+
+    # ==================== QUERIES ====================
+
+    def is_online(self, user_id: str) -> bool:
+        if user_id in self._connections:
+            return True
+        seen = self._seen.get(user_id)
+        return seen is not None and self.clock() - seen < self.ttl
+
+    def online(self, user_ids: Iterable[str]) -> Set[str]:
+        """The subset of user_ids that is online."""
+        cutoff = self.clock() - self.ttl
+        return {
+            user_id for user_id in user_ids
+            if user_id in self._connections or self._seen.get(user_id, cutoff) > cutoff
+        }
+
+    def online_count(self) -> int:
+        cutoff = self.clock() - self.ttl
+        return len(set(self._connections) | {user_id for user_id, seen in self._seen.items() if seen > cutoff})
+
+    def last_seen(self, user_id: str, stored: Optional[datetime]) -> Optional[datetime]:
+        """The stored last_seen, or the newer one this worker has not flushed yet."""
+        pending = self._pending.get(user_id)
+        if pending is None or (stored is not None and stored >= pending):
+            return stored
+        return pending
+
+    # ==================== CLUSTER SYNC ====================
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.sync_seconds)
+                await self._report()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Presence report failed: %s", e)
+
+    async def _report(self):
+        users = self._reported | set(self._connections)
+        left = self._left
+        self._reported, self._left = set(), set()
+        self._expire()
+        if users or left:
+            await cluster.publish("presence", {
+                "worker": cluster.worker_id, "users": sorted(users), "left": sorted(left)
+            })
+
+    async def _on_report(self, report: dict):
+        if report["worker"] == cluster.worker_id:
+            return
+        now = self.clock()
+        for user_id in report["users"]:
+            self._seen[user_id] = now
+        for user_id in report["left"]:
+            if user_id not in self._connections:
+                self._seen.pop(user_id, None)
+
+    def _expire(self):
+        cutoff = self.clock() - self.ttl
+        for user_id in [user_id for user_id, seen in self._seen.items() if seen <= cutoff]:
+            del self._seen[user_id]
+
+    # ==================== LAST SEEN FLUSH ====================
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_seconds)
+                if cluster.mode == "single":
+                    self._expire()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Presence flush failed: %s", e)
+
+    async def flush(self) -> int:
+        """
+        Upsert the pending last_seen values (connected users count as seen
+        now), FLUSH_CHUNK users per statement. Returns the rows written.
+        """
+        now = datetime.utcnow()
+        for user_id in self._connections:
+            self._pending[user_id] = now
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        written = 0
+        user_ids = list(pending)
+        try:
+            async with AsyncSessionLocal() as session:
+                dialect_insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+                for start in range(0, len(user_ids), FLUSH_CHUNK):
+                    chunk = user_ids[start:start + FLUSH_CHUNK]
+                    # Users deleted since they were seen would fail the foreign key
+                    existing = (await session.execute(select(User.id).where(User.id.in_(chunk)))).scalars().all()
+                    if not existing:
+                        continue
+                    stmt = dialect_insert(UserProfile).values([
+                        {"user_id": user_id, "last_seen": pending[user_id]} for user_id in existing
+                    ])
+                    await session.execute(stmt.on_conflict_do_update(
+                        index_elements=["user_id"],
+                        set_={"last_seen": stmt.excluded.last_seen}
+                    ))
+                    written += len(existing)
+                await session.commit()
+        except Exception:
+            # Keep the values for the next flush unless newer ones arrived meanwhile
+            for user_id, seen in pending.items():
+                self._pending.setdefault(user_id, seen)
+            raise
+        presence_last_seen_flushed_total.inc(written)
+        return written
+
+
+# Global instance
+presence = PresenceTracker()
@@ -0,0 +1,356 @@
+"""
+Search Index - ranked in-memory search over coins, stocks and usernames.
+
+Each SearchIndex keeps the searchable fields of one table in memory:
+
+- queries of three or more characters intersect trigram posting sets and
+  then check the substring, so "coin" still finds "Bitcoin"
+- shorter queries match word prefixes through a sorted word list, since a
+  one- or two-letter substring matches nearly everything
+
+Results are ranked: exact match, then prefix of the whole field, then
+prefix of a word, then substring. Earlier fields (symbol, ticker) beat
+later ones (name) and popularity (market cap) breaks ties.
+
+The index loads on first use. After that it reads only rows whose
+watermark column (created_at / last_updated) moved on, at most every
+SEARCH_INDEX_REFRESH_SECONDS, and rebuilds in the background every
+SEARCH_INDEX_REBUILD_SECONDS to drop deleted or deactivated rows.
+Username changes are applied at once on every worker over the "search_index"
+cluster channel.
+
+SEARCH_BACKEND=database skips the in-memory index and runs ILIKE with a
+coarser ranking (exact, prefix, rest) in SQL instead. On PostgreSQL,
+migration 0013 adds pg_trgm GIN indexes so those scans use an index.
+"""
+
+import os
+import re
+import time
+import heapq
+import asyncio
+import bisect
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case, func, or_, select
+
+from database.database import ReadSessionLocal
+from database.models import CryptoCurrency, StockMetadata, User
+from services.cluster import cluster
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory")  # memory | database
+SEARCH_INDEX_REFRESH_SECONDS = float(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "5"))
+SEARCH_INDEX_REBUILD_SECONDS = float(os.getenv("SEARCH_INDEX_REBUILD_SECONDS", "3600"))
+
+search_index_documents = registry.gauge(
+    "search_index_documents", "Documents held per in-memory search index.", ("index",)
+)
+search_queries_total = registry.counter(
+    "search_queries_total", "Search queries by index and backend.", ("index", "backend")
+)
+
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def prefix_words(field: str) -> Set[str]:
+    """The whole field plus each word in it; a query matches by prefix of any of these."""
+    return {field, *(word for word in _WORD_SPLIT.split(field) if word)}
+
+
+def match_tier(field: str, query: str) -> Optional[int]:
+    """0 exact, 1 prefix of the field, 2 prefix of a word, 3 substring; None if no match."""
+    if field == query:
+        return 0
+    if field.startswith(query):
+        return 1
+    if query not in field:
+        return None
+    if any(word.startswith(query) for word in _WORD_SPLIT.split(field)):
+        return 2
+    return 3
+
+
+class SearchSource:
+    """Where a SearchIndex loads its documents from."""
+
+    def __init__(
+        self,
+        model,
+        id_column,
+        fields: Sequence,
+        watermark,
+        popularity=None,
+        active=None
+    ):
+        self.model = model
+        self.id_column = id_column
+        self.fields = tuple(fields)
+        self.watermark = watermark
+        self.popularity = popularity
+        self.active = active
+
+
+class SearchIndex:
+    """Trigram and word-prefix index over the fields of one table."""
+
+    def __init__(self, name: str, source: SearchSource):
+        self.name = name
+        self.source = source
+        self._fields: Dict[str, Tuple[str, ...]] = {}
+        self._popularity: Dict[str, float] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._prefixes: List[Tuple[str, str]] = []  # sorted (word, id)
+        self._watermark = None
+        self._loaded_at: Optional[float] = None
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    # ==================== QUERIES ====================
+
+    async def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Ids of matching documents, best first."""
+        query = normalize(query)
+        if not query:
+            return []
+        search_queries_total.inc(1, self.name, SEARCH_BACKEND)
+        if SEARCH_BACKEND == "database":
+            return await self._search_database(query, limit)
+        await self.ensure_fresh()
+        return self.match(query, limit)
+
+    def match(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """In-memory lookup for an already normalized query."""
+        ranked = []
+        for doc_id in self._candidates(query):
+            rank = self._rank(doc_id, query)
+            if rank is not None:
+                ranked.append((rank, doc_id))
+        best = heapq.nsmallest(limit, ranked) if limit is not None else sorted(ranked)
+        return [doc_id for _, doc_id in best]
+
+    def _candidates(self, query: str) -> Iterable[str]:
+        if len(query) >= 3:
+            postings = [self._postings.get(gram) for gram in trigrams(query)]
+            if not all(postings):
+                return ()
+            postings.sort(key=len)
+            return set.intersection(*postings)
+
+        candidates = set()
+        start = bisect.bisect_left(self._prefixes, (query, ""))
+        for word, doc_id in self._prefixes[start:]:
+            if not word.startswith(query):
+                break
+            candidates.add(doc_id)
+        return candidates
+
+    def _rank(self, doc_id: str, query: str) -> Optional[tuple]:
+        fields = self._fields[doc_id]
+        best = None
+        for position, field in enumerate(fields):
+            tier = match_tier(field, query)
+            if tier is not None and (best is None or (tier, position) < best[:2]):
+                best = (tier, position, len(field))
+        if best is None:
+            return None
+        tier, position, length = best
+        # Shorter matched fields first: "Bitcoin" before "Bitcoin Cash"
+        return (tier, position, -self._popularity.get(doc_id, 0.0), length, fields[0])
+
+    async def _search_database(self, query: str, limit: Optional[int]) -> List[str]:
+        """ILIKE over the source fields (trigram-indexed on PostgreSQL), coarsely ranked."""
+        source = self.source
+        pattern = f"%{query}%"
+        primary = func.lower(source.fields[0])
+        statement = select(source.id_column).where(or_(*(field.ilike(pattern) for field in source.fields)))
+        if source.active is not None:
+            statement = statement.where(source.active == True)
+        order = [case((primary == query, 0), (primary.like(f"{query}%"), 1), else_=2)]
+        if source.popularity is not None:
+            order.append(source.popularity.desc().nulls_last())
+        statement = statement.order_by(*order, func.length(source.fields[0]), primary)
+        if limit is not None:
+            statement = statement.limit(limit)
+        async with ReadSessionLocal() as session:
+            return list((await session.execute(statement)).scalars().all())
+
+    # ==================== MAINTENANCE ====================
+
+    def upsert(self, doc_id: str, fields: Sequence[Optional[str]], popularity: Optional[float] = None):
+        normalized = tuple(normalize(field) for field in fields)
+        if self._fields.get(doc_id) != normalized:
+            self.remove(doc_id)
+            for word in self._add(doc_id, normalized):
+                bisect.insort(self._prefixes, (word, doc_id))
+        self._popularity[doc_id] = popularity or 0.0
+        search_index_documents.set(len(self._fields), self.name)
+
+    def remove(self, doc_id: str):
+        fields = self._fields.pop(doc_id, None)
+        self._popularity.pop(doc_id, None)
+        if fields is None:
+            return
+        for field in fields:
+            for gram in trigrams(field):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(doc_id)
+                    if not posting:
+                        del self._postings[gram]
+        for word in self._words(fields):
+            position = bisect.bisect_left(self._prefixes, (word, doc_id))
+            if position < len(self._prefixes) and self._prefixes[position] == (word, doc_id):
+                del self._prefixes[position]
+        search_index_documents.set(len(self._fields), self.name)
+
+    def _add(self, doc_id: str, fields: Tuple[str, ...]) -> Set[str]:
+        """Store fields and trigram postings; returns the prefix words for the caller to insert."""
+        self._fields[doc_id] = fields
+        for field in fields:
+            for gram in trigrams(field):
+                self._postings.setdefault(gram, set()).add(doc_id)
+        return self._words(fields)
+
+    @staticmethod
+    def _words(fields: Tuple[str, ...]) -> Set[str]:
+        return set().union(*(prefix_words(field) for field in fields if field))
+
+    async def ensure_fresh(self):
+        """Load on first use, then apply recent changes; rebuilds run in the background."""
+        if self._loaded_at is None:
+            async with self._lock:
+                if self._loaded_at is None:
+                    await self.rebuild()
+            return
+        if self._lock.locked():
+            return  # A refresh or rebuild is under way; serve the current index
+        now = time.monotonic()
+        if now - self._loaded_at >= SEARCH_INDEX_REBUILD_SECONDS:
+            if self._rebuild_task is None or self._rebuild_task.done():
+                self._rebuild_task = asyncio.create_task(self._rebuild_locked())
+        elif now - self._refreshed_at >= SEARCH_INDEX_REFRESH_SECONDS:
+            async with self._lock:
+                await self.refresh()
+
+    async def _rebuild_locked(self):
+        try:
+            async with self._lock:
+                await self.rebuild()
+        except Exception as e:
+            logger.warning("Rebuilding search index %s failed: %s", self.name, e)
+
+    async def rebuild(self):
+        """Reload every active document into a fresh index and swap it in."""
+        started = time.monotonic()
+        rows = await self._load(since=None)
+        fresh = SearchIndex(self.name, self.source)
+        for doc_id, fields, popularity, _active, _watermark in rows:
+            normalized = tuple(normalize(field) for field in fields)
+            fresh._prefixes.extend((word, doc_id) for word in fresh._add(doc_id, normalized))
+            fresh._popularity[doc_id] = popularity or 0.0
+        fresh._prefixes.sort()
+
+        self._fields, self._popularity = fresh._fields, fresh._popularity
+        self._postings, self._prefixes = fresh._postings, fresh._prefixes
+        self._watermark = self._max_watermark(rows, None)
+        self._loaded_at = self._refreshed_at = time.monotonic()
+        search_index_documents.set(len(self._fields), self.name)
+        logger.info("Search index %s built: %s documents in %.2fs", self.name, len(self), time.monotonic() - started)
+
+    async def refresh(self) -> int:
+        """Apply rows changed since the last load. Returns the number of rows read."""
+        rows = await self._load(since=self._watermark)
+        for doc_id, fields, popularity, active, _watermark in rows:
+            if active:
+                self.upsert(doc_id, fields, popularity)
+            else:
+                self.remove(doc_id)
+        self._watermark = self._max_watermark(rows, self._watermark)
+        self._refreshed_at = time.monotonic()
+        return len(rows)
+
+    async def _load(self, since) -> List[tuple]:
+        """(id, fields, popularity, active, watermark) of all active rows, or of every row changed since `since`."""
+        source = self.source
+        optional = [column for column in (source.popularity, source.active) if column is not None]
+        statement = select(source.id_column, source.watermark, *optional, *source.fields)
+        if since is None:
+            if source.active is not None:
+                statement = statement.where(source.active == True)
+        else:
+            # >= so rows sharing the last watermark are not missed (upserts are idempotent)
+            statement = statement.where(source.watermark >= since)
+
+        async with ReadSessionLocal() as session:
+            result = (await session.execute(statement)).all()
+
+        rows = []
+        for row in result:
+            doc_id, watermark, *values = row
+            popularity = values.pop(0) if source.popularity is not None else None
+            active = values.pop(0) if source.active is not None else True
+            rows.append((doc_id, tuple(values), popularity, active is not False, watermark))
+        return rows
+
+    @staticmethod
+    def _max_watermark(rows: List[tuple], current):
+        watermarks = [row[4] for row in rows if row[4] is not None]
+        if current is not None:
+            watermarks.append(current)
+        return max(watermarks) if watermarks else None
+
+
+class SearchService:
+    """The search indexes of the app: cryptos, stocks and users."""
+
+    def __init__(self):
+        self.cryptos = SearchIndex("cryptos", SearchSource(
+            CryptoCurrency, CryptoCurrency.id, (CryptoCurrency.symbol, CryptoCurrency.name),
+            watermark=CryptoCurrency.last_updated, popularity=CryptoCurrency.market_cap,
+            active=CryptoCurrency.is_active
+        ))
+        self.stocks = SearchIndex("stocks", SearchSource(
+            StockMetadata, StockMetadata.ticker, (StockMetadata.ticker, StockMetadata.company_name),
+            watermark=StockMetadata.created_at, active=StockMetadata.is_active
+        ))
+        self.users = SearchIndex("users", SearchSource(
+            User, User.id, (User.username,), watermark=User.created_at
+        ))
+        self._indexes = {index.name: index for index in (self.cryptos, self.stocks, self.users)}
+
+    async def start(self):
+        cluster.subscribe("search_index", self._on_document_changed)
+        if SEARCH_BACKEND == "memory":
+            for index in self._indexes.values():
+                await index.ensure_fresh()
+
+    async def user_renamed(self, user_id: str, username: str):
+        """Reindex a changed username here and on the other workers."""
+        message = {"index": "users", "id": user_id, "fields": [username]}
+        await self._on_document_changed(message)
+        await cluster.publish("search_index", message)
+
+    async def _on_document_changed(self, message: Dict[str, Any]):
+        index = self._indexes.get(message["index"])
+        if index is not None and index._loaded_at is not None:
+            index.upsert(message["id"], message["fields"], message.get("popularity"))
+
+
+# Global instance
+search_service = SearchService()
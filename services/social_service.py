@@ -2,17 +2,25 @@
 Social Service
 
 Handles messaging, activity feeds, and user profiles.
+
+Every private message also updates both participants' rows in
+conversations (last message, unread count) in the same transaction, so
+unread counts and the recent-conversations list never scan message history.
 """
 
 import json
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from sqlalchemy import select, and_, or_, desc
+from sqlalchemy import select, and_, or_, desc, case, delete, func, insert, literal, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import (
-    User, PrivateMessage, ActivityFeed, UserProfile, Friendship
+    User, PrivateMessage, Conversation, ActivityFeed, UserProfile, Friendship, Wallet
 )
+from services.presence import presence
+from services.timeline_service import TimelineService
 
 
 class MessagingService:
@@ -50,12 +58,14 @@ class MessagingService:
             sender_id=sender_id,
             receiver_id=receiver.id,
             message=message,
-            read=False
+            read=False,
+            created_at=datetime.utcnow()
         )
 
         db.add(private_message)
+        await db.flush()  # Assigns the id the conversation rows point at
+        await MessagingService._record_in_conversations(private_message, db)
         await db.commit()
-        await db.refresh(private_message)
 
         return {
             "success": True,
@@ -64,6 +74,30 @@ class MessagingService:
             "created_at": private_message.created_at.isoformat()
         }
 
+    @staticmethod
+    async def _record_in_conversations(message: PrivateMessage, db: AsyncSession):
+        """Upsert both participants' conversation rows: new last message, +1 unread for the receiver."""
+        dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        last = {
+            "last_message_id": message.id,
+            "last_message": message.message,
+            "last_sender_id": message.sender_id,
+            "last_at": message.created_at
+        }
+        stmt = dialect_insert(Conversation).values([
+            {"user_id": message.sender_id, "other_user_id": message.receiver_id, "unread_count": 0, **last},
+            {"user_id": message.receiver_id, "other_user_id": message.sender_id, "unread_count": 1, **last}
+        ])
+        # Concurrent sends may commit out of order; keep whichever message is newest
+        newer = stmt.excluded.last_message_id > Conversation.last_message_id
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "other_user_id"],
+            set_={
+                **{column: case((newer, stmt.excluded[column]), else_=getattr(Conversation, column)) for column in last},
+                "unread_count": Conversation.unread_count + stmt.excluded.unread_count
+            }
+        ))
+
     @staticmethod
     async def get_conversation(
         user_id: str,
@@ -105,72 +139,106 @@ class MessagingService:
     @staticmethod
     async def mark_messages_read(user_id: str, other_user_id: str, db: AsyncSession):
         """Mark all messages from another user as read."""
+        # Conversation row first: its row lock makes a concurrent send either
+        # land before the message update below or count as unread after it
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.user_id == user_id, Conversation.other_user_id == other_user_id)
+            .values(unread_count=0)
+        )
         result = await db.execute(
-            select(PrivateMessage).where(
-                and_(
-                    PrivateMessage.sender_id == other_user_id,
-                    PrivateMessage.receiver_id == user_id,
-                    PrivateMessage.read == False
-                )
+            update(PrivateMessage)
+            .where(
+                PrivateMessage.receiver_id == user_id,
+                PrivateMessage.read == False,
+                PrivateMessage.sender_id == other_user_id
             )
+            .values(read=True, read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
         )
-
-        messages = result.scalars().all()
-        for msg in messages:
-            msg.read = True
-            msg.read_at = datetime.utcnow()
-
         await db.commit()
 
-        return {"success": True, "marked_read": len(messages)}
+        return {"success": True, "marked_read": result.rowcount}
 
     @staticmethod
     async def get_unread_count(user_id: str, db: AsyncSession) -> int:
         """Get count of unread messages."""
-        result = await db.execute(
-            select(PrivateMessage).where(
-                and_(
-                    PrivateMessage.receiver_id == user_id,
-                    PrivateMessage.read == False
-                )
-            )
+        return await db.scalar(
+            select(func.coalesce(func.sum(Conversation.unread_count), 0))
+            .where(Conversation.user_id == user_id)
         )
-        return len(result.scalars().all())
 
     @staticmethod
     async def get_recent_conversations(user_id: str, db: AsyncSession, limit: int = 10) -> List[Dict[str, Any]]:
         """Get list of recent conversations with message previews."""
-        # Get all messages involving the user
         result = await db.execute(
-            select(PrivateMessage, User)
-            .join(
-                User,
-                or_(
-                    and_(PrivateMessage.sender_id == user_id, User.id == PrivateMessage.receiver_id),
-                    and_(PrivateMessage.receiver_id == user_id, User.id == PrivateMessage.sender_id)
-                )
-            )
-            .order_by(PrivateMessage.created_at.desc())
+            select(Conversation, User.username)
+            .join(User, User.id == Conversation.other_user_id)
+            .where(Conversation.user_id == user_id)
+            .order_by(Conversation.last_at.desc())
+            .limit(limit)
         )
 
-        # Group by conversation partner
-        conversations = {}
-        for msg, other_user in result.all():
-            other_user_id = other_user.id
-            if other_user_id not in conversations:
-                conversations[other_user_id] = {
-                    "user_id": other_user.id,
-                    "username": other_user.username,
-                    "last_message": msg.message,
-                    "last_message_at": msg.created_at.isoformat(),
-                    "unread_count": 0
-                }
+        return [
+            {
+                "user_id": conversation.other_user_id,
+                "username": username,
+                "last_message": conversation.last_message,
+                "last_message_at": conversation.last_at.isoformat(),
+                "unread_count": conversation.unread_count
+            }
+            for conversation, username in result.all()
+        ]
 
-            # Count unread
-            if msg.receiver_id == user_id and not msg.read:
-                conversations[other_user_id]["unread_count"] += 1
+    @staticmethod
+    async def rebuild_conversations(conn) -> int:
+        """
+        Rebuild conversations from private_messages with one INSERT ... SELECT.
+        Takes an AsyncSession or AsyncConnection; the caller commits. Returns
+        the number of rows written.
+        """
+        sides = union_all(
+            select(
+                PrivateMessage.sender_id.label("user_id"),
+                PrivateMessage.receiver_id.label("other_user_id"),
+                PrivateMessage.id.label("message_id"),
+                literal(0).label("unread")
+            ),
+            select(
+                PrivateMessage.receiver_id,
+                PrivateMessage.sender_id,
+                PrivateMessage.id,
+                case((PrivateMessage.read == False, 1), else_=0)
+            )
+        ).subquery()
+        pairs = (
+            select(
+                sides.c.user_id,
+                sides.c.other_user_id,
+                func.max(sides.c.message_id).label("last_id"),
+                func.sum(sides.c.unread).label("unread")
+            )
+            .group_by(sides.c.user_id, sides.c.other_user_id)
+            .subquery()
+        )
+        rows = (
+            select(
+                pairs.c.user_id, pairs.c.other_user_id, PrivateMessage.id, PrivateMessage.message,
+                PrivateMessage.sender_id, PrivateMessage.created_at, pairs.c.unread
+            )
+            .select_from(pairs)
+            .join(PrivateMessage, PrivateMessage.id == pairs.c.last_id)
+        )
 
-        return list(conversations.values())[:limit]
+        await conn.execute(delete(Conversation))
+        result = await conn.execute(
+            insert(Conversation).from_select(
+                ['user_id', 'other_user_id', 'last_message_id', 'last_message',
+                 'last_sender_id', 'last_at', 'unread_count'],
+                rows
+            )
+        )
+        return result.rowcount
 
 
 class ActivityService:
@@ -186,17 +254,20 @@ class ActivityService:
         is_public: bool = True,
         db: AsyncSession = None
     ):
-        """Create an activity feed event."""
+        """Create an activity feed event and deliver it to friends' timelines."""
         activity = ActivityFeed(
             user_id=user_id,
             activity_type=activity_type,
             title=title,
             description=description,
             data=json.dumps(data) if data else None,
-            is_public=is_public
+            is_public=is_public,
+            created_at=datetime.utcnow()
         )
 
         db.add(activity)
+        await db.flush()  # Assigns the id timelines point at
+        await TimelineService.fan_out(activity, db)
         await db.commit()
 
     @staticmethod
@@ -224,45 +295,14 @@ class ActivityService:
         return activities
 
     @staticmethod
-    async def get_friends_activity(user_id: str, db: AsyncSession, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get activity feed of user's friends."""
-        # Get friend IDs
-        result = await db.execute(
-            select(Friendship.friend_id).where(Friendship.user_id == user_id)
-        )
-        friend_ids = [row[0] for row in result.all()]
-
-        if not friend_ids:
-            return []
-
-        # Get public activities from friends
-        result = await db.execute(
-            select(ActivityFeed, User)
-            .join(User, User.id == ActivityFeed.user_id)
-            .where(
-                and_(
-                    ActivityFeed.user_id.in_(friend_ids),
-                    ActivityFeed.is_public == True
-                )
-            )
-            .order_by(ActivityFeed.created_at.desc())
-            .limit(limit)
-        )
-
-        activities = []
-        for activity, user in result.all():
-            activities.append({
-                "id": activity.id,
-                "user_id": user.id,
-                "username": user.username,
-                "activity_type": activity.activity_type,
-                "title": activity.title,
-                "description": activity.description,
-                "data": json.loads(activity.data) if activity.data else None,
-                "created_at": activity.created_at.isoformat()
-            })
-
-        return activities
+    async def get_friends_activity(
+        user_id: str,
+        db: AsyncSession,
+        limit: int = 50,
+        before: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get activity feed of user's friends, newest first (see TimelineService.read)."""
+        return await TimelineService.read(user_id, db, limit=limit, before=before)
 
 
 class ProfileService:
@@ -337,15 +377,15 @@ class ProfileService:
         return {"success": True}
 
     @staticmethod
-    async def update_online_status(user_id: str, is_online: bool, db: AsyncSession):
-        """Update user online status."""
-        profile = await ProfileService.get_or_create_profile(user_id, db)
-
-        profile.is_online = is_online
-        if not is_online:
-            profile.last_seen = datetime.utcnow()
-
-        await db.commit()
+    async def update_online_status(user_id: str, is_online: bool, db: AsyncSession = None):
+        """
+        Update user online status. Presence lives in memory (services/presence.py);
+        last_seen reaches the database with its next batch flush.
+        """
+        if is_online:
+            presence.heartbeat(user_id)
+        else:
+            presence.leave(user_id)
 
     @staticmethod
     async def get_public_profile(username: str, db: AsyncSession) -> Dict[str, Any]:
@@ -367,16 +407,19 @@ class ProfileService:
         if profile and not profile.profile_public:
             raise ValueError("Profile is private")
 
+        last_seen = presence.last_seen(user.id, profile.last_seen if profile else None)
+        gem_balance = await db.scalar(select(Wallet.gem_balance).where(Wallet.user_id == user.id))
+
         return {
             "id": user.id,
             "username": user.username,
-            "gem_balance": user.gem_balance if (not profile or profile.show_stats) else None,
+            "gem_balance": (gem_balance or 0.0) if (not profile or profile.show_stats) else None,
             "bio": profile.bio if profile else None,
             "avatar_url": profile.avatar_url if profile else None,
             "location": profile.location if profile else None,
             "website": profile.website if profile else None,
-            "is_online": profile.is_online if profile else False,
-            "last_seen": profile.last_seen.isoformat() if profile and profile.last_seen else None,
+            "is_online": presence.is_online(user.id),
+            "last_seen": last_seen.isoformat() if last_seen else None,
             "show_stats": profile.show_stats if profile else True,
             "show_activity": profile.show_activity if profile else True,
             "created_at": user.created_at.isoformat()
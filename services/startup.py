@@ -0,0 +1,174 @@
+"""
+Startup Orchestrator - concurrent, dependency-ordered subsystem initialization.
+
+Each subsystem registers a phase with the names of the phases it needs.
+Critical phases run before the app accepts traffic, concurrently wherever
+their dependencies allow. Deferred phases (bot population, price warmup, data
+lifecycle) start in the background once startup has returned, so they never
+delay time-to-first-request.
+
+Every phase is timed. The breakdown is logged when startup completes and
+exported as the startup_phase_seconds gauge.
+
+Environment:
+- STARTUP_DEFER_SECONDS: delay before deferred phases start (default 1.0)
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+STARTUP_DEFER_SECONDS = float(os.getenv("STARTUP_DEFER_SECONDS", "1.0"))
+
+startup_phase_seconds = registry.gauge(
+    "startup_phase_seconds", "Duration of each startup phase in the last start.", ("phase",)
+)
+
+
+@dataclass
+class StartupPhase:
+    """One initializer and what it waits for."""
+    name: str
+    start: Callable[[], Awaitable]
+    stop: Optional[Callable[[], Awaitable]] = None
+    depends_on: Sequence[str] = ()
+    deferred: bool = False
+
+
+@dataclass
+class PhaseTiming:
+    name: str
+    started_at: float  # Seconds since the orchestrator began
+    duration: float
+    deferred: bool
+    error: Optional[str] = None
+
+
+class StartupOrchestrator:
+    """Runs registered phases in dependency order and stops them in reverse."""
+
+    def __init__(self, defer_seconds: float = STARTUP_DEFER_SECONDS):
+        self.defer_seconds = defer_seconds
+        self.phases: Dict[str, StartupPhase] = {}
+        self.timings: Dict[str, PhaseTiming] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._deferred_task: Optional[asyncio.Task] = None
+        self._started: List[str] = []
+        self._origin = 0.0
+
+    def add(
+        self,
+        name: str,
+        start: Callable[[], Awaitable],
+        stop: Callable[[], Awaitable] = None,
+        depends_on: Sequence[str] = (),
+        deferred: bool = False
+    ):
+        self.phases[name] = StartupPhase(name, start, stop, tuple(depends_on), deferred)
+
+    def record(self, name: str, duration: float, started_at: float = 0.0):
+        """Record a phase that ran outside the orchestrator, e.g. module imports."""
+        self.timings[name] = PhaseTiming(name, started_at, duration, deferred=False)
+        startup_phase_seconds.set(duration, name)
+
+    async def startup(self):
+        """Run all critical phases; schedule deferred ones. Raises if a critical phase fails."""
+        self._origin = time.perf_counter()
+        for phase in self.phases.values():
+            for dependency in phase.depends_on:
+                if dependency not in self.phases:
+                    raise ValueError(f"Startup phase {phase.name!r} depends on unknown phase {dependency!r}")
+                if self.phases[dependency].deferred and not phase.deferred:
+                    raise ValueError(f"Critical phase {phase.name!r} cannot wait for deferred phase {dependency!r}")
+
+        critical = [p for p in self.phases.values() if not p.deferred]
+        await asyncio.gather(*(self._schedule(p) for p in critical))
+
+        total = time.perf_counter() - self._origin
+        self.record("startup_total", total)
+        logger.info(
+            "Startup complete in %.3fs: %s", total,
+            self._format([t.name for t in self.timings.values() if not t.deferred and t.name != "startup_total"])
+        )
+
+        deferred = [p for p in self.phases.values() if p.deferred]
+        if deferred:
+            self._deferred_task = asyncio.create_task(self._run_deferred(deferred))
+
+    async def shutdown(self):
+        if self._deferred_task and not self._deferred_task.done():
+            self._deferred_task.cancel()
+            try:
+                await self._deferred_task
+            except asyncio.CancelledError:
+                pass
+
+        for name in reversed(self._started):
+            phase = self.phases[name]
+            if phase.stop is None:
+                continue
+            try:
+                await phase.stop()
+            except Exception as e:
+                logger.error("Error stopping %s: %s", name, e)
+        self._started.clear()
+        self._tasks.clear()
+
+    def report(self) -> List[dict]:
+        """Phase timings, in start order."""
+        return [
+            {
+                "phase": t.name,
+                "started_at_ms": round(t.started_at * 1000, 1),
+                "duration_ms": round(t.duration * 1000, 1),
+                "deferred": t.deferred,
+                "error": t.error,
+            }
+            for t in sorted(self.timings.values(), key=lambda t: t.started_at)
+        ]
+
+    def _schedule(self, phase: StartupPhase) -> asyncio.Task:
+        task = self._tasks.get(phase.name)
+        if task is None:
+            task = self._tasks[phase.name] = asyncio.ensure_future(self._run_phase(phase))
+        return task
+
+    async def _run_phase(self, phase: StartupPhase):
+        if phase.depends_on:
+            await asyncio.gather(*(self._schedule(self.phases[d]) for d in phase.depends_on))
+
+        started = time.perf_counter()
+        error = None
+        try:
+            await phase.start()
+            self._started.append(phase.name)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            self.timings[phase.name] = PhaseTiming(
+                phase.name, started - self._origin, duration, phase.deferred, error
+            )
+            startup_phase_seconds.set(duration, phase.name)
+
+    async def _run_deferred(self, phases: List[StartupPhase]):
+        await asyncio.sleep(self.defer_seconds)
+        results = await asyncio.gather(*(self._schedule(p) for p in phases), return_exceptions=True)
+        for phase, result in zip(phases, results):
+            if isinstance(result, Exception):
+                logger.error("Deferred startup phase %s failed: %s", phase.name, result)
+        logger.info("Deferred startup finished: %s", self._format([p.name for p in phases]))
+
+    def _format(self, names: Sequence[str]) -> str:
+        return ", ".join(
+            f"{name}={self.timings[name].duration * 1000:.0f}ms"
+            for name in names if name in self.timings
+        )
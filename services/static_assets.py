@@ -0,0 +1,401 @@
+"""
+Static Assets - build step and precompressed, fingerprinted static file serving.
+
+build_assets() minifies every CSS/JS file under web/static, writes it under a
+content-hashed name (js/roulette.3f2a1b9c.js), adds .gz (and .br when the
+brotli package is installed) variants where they are smaller, and records
+everything in manifest.json. Other files (images) are copied with a
+fingerprint only.
+
+At runtime:
+- asset_url("js/roulette.js") returns the fingerprinted URL when a fresh build
+  exists, else the /static URL versioned by modification time, so development
+  works without a build
+- PrecompressedStaticFiles serves fingerprinted files with
+  "Cache-Control: immutable" and picks the .br/.gz variant from
+  Accept-Encoding. Unhashed URLs get the minified copy with revalidation, and
+  anything not in the build falls back to web/static.
+
+A build entry whose source file changed after the build is ignored, so editing
+a file never serves stale content.
+
+Environment:
+- STATIC_BUILD_DIR: build output directory (default web/dist)
+
+Build with: python scripts/build_assets.py
+"""
+
+import os
+import io
+import re
+import gzip
+import json
+import stat
+import shutil
+import hashlib
+import logging
+import mimetypes
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STATIC_SOURCE_DIR = PROJECT_ROOT / "web" / "static"
+STATIC_BUILD_DIR = Path(os.getenv("STATIC_BUILD_DIR", str(PROJECT_ROOT / "web" / "dist")))
+MANIFEST_NAME = "manifest.json"
+
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".html", ".txt"}
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+# ==================== MINIFICATION ====================
+
+_CSS_TIGHT = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(source: str) -> str:
+    """Drop comments, collapse whitespace and trim it around punctuation; strings are kept as is."""
+    parts = []
+    for chunk in re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', re.sub(r"/\*.*?\*/", "", source, flags=re.S)):
+        if chunk[:1] in ('"', "'"):
+            parts.append(chunk)
+        else:
+            chunk = re.sub(r"\s+", " ", chunk)
+            parts.append(_CSS_TIGHT.sub(r"\1", chunk))
+    return "".join(parts).replace(";}", "}").strip()
+
+
+# A "/" after these (or at the start) begins a regex literal rather than a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw"}
+
+
+def minify_js(source: str) -> str:
+    """
+    Conservative JavaScript minifier: removes comments and indentation and
+    collapses blank lines, but keeps every newline that separates statements
+    so automatic semicolon insertion is unaffected. Strings, template
+    literals and regex literals are copied verbatim.
+    """
+    out = []
+    i, n = 0, len(source)
+    braces = 0  # Open `{` in code, counting each `${`
+    template_depth = []  # Value of `braces` at each open `${`
+    last = ""  # Last significant code character
+    word = ""  # Last identifier, to recognise `return /re/`
+
+    def emit_space(has_newline: bool):
+        if not out:
+            return
+        if has_newline:
+            while out and out[-1] in (" ", "\t"):
+                out.pop()
+            if out and out[-1] != "\n":
+                out.append("\n")
+        elif out[-1] not in (" ", "\n"):
+            out.append(" ")
+
+    def copy_template(start: int) -> Tuple[int, bool]:
+        # Copy from just after a backtick (or the `}` closing a `${`) through the
+        # closing backtick or the next `${`; reports whether a `${` was opened
+        j = start
+        while j < n:
+            c = source[j]
+            if c == "\\":
+                j += 2
+                continue
+            if c == "`":
+                out.append(source[start:j + 1])
+                return j + 1, False
+            if c == "$" and j + 1 < n and source[j + 1] == "{":
+                out.append(source[start:j + 2])
+                return j + 2, True
+            j += 1
+        out.append(source[start:])
+        return n, False
+
+    while i < n:
+        c = source[i]
+        nxt = source[i + 1] if i + 1 < n else ""
+
+        if c in " \t\r\n":
+            j = i
+            while j < n and source[j] in " \t\r\n":
+                j += 1
+            emit_space("\n" in source[i:j])
+            i = j
+            continue
+
+        if c == "/" and nxt == "/":
+            j = source.find("\n", i)
+            i = n if j < 0 else j
+            continue
+        if c == "/" and nxt == "*":
+            j = source.find("*/", i + 2)
+            comment = source[i:n if j < 0 else j + 2]
+            i = n if j < 0 else j + 2
+            emit_space("\n" in comment)
+            continue
+
+        if c in ("'", '"'):
+            j = i + 1
+            while j < n and source[j] != c and source[j] != "\n":
+                j += 2 if source[j] == "\\" else 1
+            out.append(source[i:j + 1])
+            i, last, word = j + 1, c, ""
+            continue
+
+        if c == "`" or (c == "}" and template_depth and template_depth[-1] == braces):
+            if c == "}":
+                template_depth.pop()
+                braces -= 1
+            out.append(c)
+            i, opened = copy_template(i + 1)
+            if opened:
+                braces += 1
+                template_depth.append(braces)
+            last, word = "`", ""
+            continue
+
+        if c == "/" and (not last or last in _REGEX_PRECEDERS or word in _REGEX_KEYWORDS):
+            j, in_class = i + 1, False
+            while j < n and source[j] != "\n":
+                ch = source[j]
+                if ch == "\\":
+                    j += 2
+                    continue
+                if ch == "[":
+                    in_class = True
+                elif ch == "]":
+                    in_class = False
+                elif ch == "/" and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and (source[j].isalnum() or source[j] == "_"):
+                j += 1  # Flags
+            out.append(source[i:j])
+            i, last, word = j, "/", ""
+            continue
+
+        if c == "{":
+            braces += 1
+        elif c == "}":
+            braces -= 1
+
+        if c.isalnum() or c in "_$":
+            j = i
+            while j < n and (source[j].isalnum() or source[j] in "_$"):
+                j += 1
+            word = source[i:j]
+            out.append(word)
+            i, last = j, word[-1]
+            continue
+
+        out.append(c)
+        i, last, word = i + 1, c, ""
+
+    return "".join(out).strip() + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+# ==================== BUILD ====================
+
+def _compress(data: bytes) -> Dict[str, bytes]:
+    variants = {}
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9, mtime=0) as f:
+        f.write(data)
+    variants["gzip"] = buffer.getvalue()
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    # Only keep variants that actually save bytes
+    return {name: body for name, body in variants.items() if len(body) < len(data)}
+
+
+def build_assets(source: Path = STATIC_SOURCE_DIR, output: Path = STATIC_BUILD_DIR) -> dict:
+    """Minify, fingerprint and precompress every file under `source` into `output`. Returns the manifest."""
+    source, output = Path(source), Path(output)
+    if output.exists():
+        shutil.rmtree(output)
+    output.mkdir(parents=True)
+
+    assets = {}
+    for path in sorted(p for p in source.rglob("*") if p.is_file()):
+        logical = path.relative_to(source).as_posix()
+        raw = path.read_bytes()
+        minify = MINIFIERS.get(path.suffix)
+        data = minify(raw.decode("utf-8")).encode("utf-8") if minify else raw
+
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        hashed = f"{Path(logical).with_suffix('').as_posix()}.{digest}{path.suffix}"
+        target = output / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+
+        entry = {
+            "path": hashed,
+            "source_size": len(raw),
+            "size": len(data),
+            "source_mtime": path.stat().st_mtime,
+            "encodings": {},
+        }
+        if path.suffix in COMPRESSIBLE:
+            for encoding, body in _compress(data).items():
+                suffix = ".br" if encoding == "br" else ".gz"
+                (output / (hashed + suffix)).write_bytes(body)
+                entry["encodings"][encoding] = len(body)
+        assets[logical] = entry
+
+    version = hashlib.sha256(
+        "".join(f"{k}:{v['path']}" for k, v in sorted(assets.items())).encode()
+    ).hexdigest()[:12]
+    manifest = {"version": version, "assets": assets}
+    (output / MANIFEST_NAME).write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    return manifest
+
+
+# ==================== RUNTIME ====================
+
+@dataclass
+class BuiltAsset:
+    file: Path  # Minified file in the build directory
+    media_type: str
+    encodings: Dict[str, Path]  # "br" / "gzip" -> precompressed variant
+    immutable: bool
+
+
+class AssetManifest:
+    """The build manifest, restricted to entries whose source has not changed since the build."""
+
+    def __init__(self, source: Path = STATIC_SOURCE_DIR, build: Path = STATIC_BUILD_DIR):
+        self.source = Path(source)
+        self.build = Path(build)
+        self.version = "dev"
+        self.urls: Dict[str, str] = {}  # logical path -> hashed path
+        self.files: Dict[str, BuiltAsset] = {}  # request path (logical or hashed) -> built file
+        self.load()
+
+    def load(self):
+        self.urls.clear()
+        self.files.clear()
+        manifest_path = self.build / MANIFEST_NAME
+        if not manifest_path.exists():
+            logger.info("No static asset build at %s; serving web/static as is", self.build)
+            return
+
+        manifest = json.loads(manifest_path.read_text())
+        self.version = manifest["version"]
+        stale = 0
+        for logical, entry in manifest["assets"].items():
+            hashed = entry["path"]
+            file = self.build / hashed
+            if not file.exists():
+                continue
+            media_type = mimetypes.guess_type(logical)[0] or "application/octet-stream"
+            encodings = {
+                encoding: self.build / (hashed + (".br" if encoding == "br" else ".gz"))
+                for encoding in entry["encodings"]
+            }
+            # Content-addressed, so the hashed URL stays valid even if the source moved on
+            self.files[hashed] = BuiltAsset(file, media_type, encodings, immutable=True)
+
+            try:
+                changed = (self.source / logical).stat().st_mtime > entry["source_mtime"]
+            except FileNotFoundError:
+                changed = True
+            if changed:
+                stale += 1
+                continue
+            self.urls[logical] = hashed
+            self.files[logical] = BuiltAsset(file, media_type, encodings, immutable=False)
+
+        logger.info("Loaded static asset build %s (%s assets, %s stale)", self.version, len(self.urls), stale)
+
+    def url(self, path: str) -> str:
+        """Public URL for a file under web/static, e.g. asset_url("js/roulette.js")."""
+        path = path.lstrip("/")
+        hashed = self.urls.get(path)
+        if hashed:
+            return "/static/" + hashed
+        # Unbuilt or edited since the build: bust browser caches by modification time
+        try:
+            return f"/static/{path}?v={int((self.source / path).stat().st_mtime)}"
+        except FileNotFoundError:
+            return "/static/" + path
+
+
+def _pick_encoding(accept_encoding: str, available: Dict[str, Path]) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, 0) > 0:
+            return encoding
+    return None
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves the asset build first: precompressed, with long-lived caching for hashed names."""
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        asset = self.manifest.files.get(Path(path).as_posix())
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding = _pick_encoding(request_headers.get("accept-encoding", ""), asset.encodings)
+        file = asset.encodings[encoding] if encoding else asset.file
+        try:
+            stat_result = os.stat(file)
+        except FileNotFoundError:
+            # Build directory changed under us (rebuilt or removed): serve the source file
+            return await super().get_response(path, scope)
+        if not stat.S_ISREG(stat_result.st_mode):
+            return await super().get_response(path, scope)
+
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE if asset.immutable else REVALIDATE_CACHE,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        response = FileResponse(
+            file, stat_result=stat_result, method=scope["method"],
+            media_type=asset.media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+# Global manifest, loaded once at import
+asset_manifest = AssetManifest()
+asset_url = asset_manifest.url
@@ -0,0 +1,218 @@
+"""
+Stock Candles - persistent OHLC history behind the stock charts.
+
+Daily bars live in stock_candles, keyed by (ticker, interval, ts). A
+ticker's series is downloaded once (five years, the longest chart period)
+and afterwards only topped up from its last stored bar, at most every
+STOCK_CANDLE_REFRESH_SECONDS per ticker and worker. Every chart period is
+a slice of that one series.
+
+Serialized chart responses are kept in an in-memory LRU bounded by
+STOCK_CHART_CACHE_BYTES (a 5y chart is about 150 KB) and dropped for a ticker whenever its
+series is topped up. Bars come from the configured quote provider
+(services/stock_quote_refresher.py), so STOCK_QUOTE_PROVIDER=fake works
+offline here too.
+"""
+
+import os
+import json
+import time
+import asyncio
+import calendar
+import logging
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.database import AsyncSessionLocal
+from database.models import StockCandle, StockMetadata
+from services.metrics import registry
+from services.stock_quote_refresher import MARKET_TZ, stock_quote_refresher
+
+logger = logging.getLogger(__name__)
+
+STOCK_CANDLE_REFRESH_SECONDS = float(os.getenv("STOCK_CANDLE_REFRESH_SECONDS", "900"))
+STOCK_CHART_CACHE_BYTES = int(os.getenv("STOCK_CHART_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+INTERVAL = "1d"
+HISTORY_MONTHS = 60  # Longest chart period (5y)
+UPSERT_CHUNK = 500
+
+# Chart periods: a number of trailing bars, or a number of calendar months
+PERIOD_BARS = {"1d": 1, "5d": 5}
+PERIOD_MONTHS = {"1mo": 1, "3mo": 3, "1y": 12, "5y": 60}
+PERIODS = tuple(PERIOD_BARS) + tuple(PERIOD_MONTHS)
+
+stock_chart_cache_total = registry.counter(
+    "stock_chart_cache_total", "Stock chart requests by cache result.", ("result",)
+)
+stock_candles_fetched_total = registry.counter(
+    "stock_candles_fetched_total", "Candles downloaded from the quote provider, by kind of fetch.",
+    ("kind",)
+)
+
+
+def months_before(day: date, months: int) -> date:
+    """Same day of the month `months` earlier (clamped to the month's last day)."""
+    index = day.year * 12 + day.month - 1 - months
+    year, month = index // 12, index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+class CandleStore:
+    """Stored daily bars with incremental top-up and an LRU of serialized charts."""
+
+    def __init__(self, cache_bytes: int = STOCK_CHART_CACHE_BYTES, refresh_seconds: float = STOCK_CANDLE_REFRESH_SECONDS):
+        self.cache_bytes = cache_bytes
+        self.refresh_seconds = refresh_seconds
+        self._charts: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._charts_size = 0
+        self._topped_up: Dict[str, float] = {}  # ticker -> monotonic time of the last top-up attempt
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def chart_payload(self, ticker: str, period: str) -> Optional[bytes]:
+        """Serialized chart response for GET /api/stocks/{ticker}/chart, or None without history."""
+        ticker = ticker.upper()
+        key = (ticker, period)
+        if not self._is_stale(ticker) and key in self._charts:
+            self._charts.move_to_end(key)
+            stock_chart_cache_total.inc(1, "hit")
+            return self._charts[key]
+
+        stock_chart_cache_total.inc(1, "miss")
+        history = await self.history(ticker, period)
+        if not history:
+            return None
+
+        payload = json.dumps({
+            "success": True,
+            "ticker": ticker,
+            "period": period,
+            "data": history
+        }).encode()
+        self._evict(key)
+        self._charts[key] = payload
+        self._charts_size += len(payload)
+        while self._charts_size > self.cache_bytes and len(self._charts) > 1:
+            self._evict(next(iter(self._charts)))
+        return payload
+
+    async def history(self, ticker: str, period: str) -> List[Dict[str, Any]]:
+        """Bars for a chart period (1d, 5d, 1mo, 3mo, 1y, 5y), oldest first; empty for unknown tickers."""
+        ticker = ticker.upper()
+        if self._is_stale(ticker):
+            await self.top_up(ticker)
+
+        query = select(StockCandle).where(StockCandle.ticker == ticker, StockCandle.interval == INTERVAL)
+        if period in PERIOD_BARS:
+            query = query.order_by(StockCandle.ts.desc()).limit(PERIOD_BARS[period])
+        else:
+            start = months_before(self._today(), PERIOD_MONTHS[period])
+            query = query.where(StockCandle.ts >= self._bar_ts(start)).order_by(StockCandle.ts)
+
+        async with AsyncSessionLocal() as session:
+            candles = list((await session.execute(query)).scalars().all())
+        if period in PERIOD_BARS:
+            candles.reverse()
+        return [self._chart_point(candle) for candle in candles]
+
+    async def top_up(self, ticker: str) -> int:
+        """
+        Download the bars after the last stored one (the whole history the
+        first time) and upsert them. The last stored bar is fetched again
+        because it may have been partial. Returns the number of bars stored.
+        """
+        async with AsyncSessionLocal() as session:
+            known = await session.scalar(
+                select(StockMetadata.ticker).where(StockMetadata.ticker == ticker)
+            )
+        if known is None:
+            return 0  # Only listed stocks are downloaded (and tracked below)
+
+        lock = self._locks.setdefault(ticker, asyncio.Lock())
+        async with lock:
+            if not self._is_stale(ticker):
+                return 0  # Another request topped it up while this one waited
+            self._topped_up[ticker] = time.monotonic()
+
+            async with AsyncSessionLocal() as session:
+                last = await session.scalar(
+                    select(func.max(StockCandle.ts))
+                    .where(StockCandle.ticker == ticker, StockCandle.interval == INTERVAL)
+                )
+
+            if last is None:
+                kind, start = "full", months_before(self._today(), HISTORY_MONTHS)
+            else:
+                kind, start = "tail", last.replace(tzinfo=timezone.utc).astimezone(MARKET_TZ).date()
+
+            try:
+                bars = await stock_quote_refresher.provider.candles(ticker, start)
+            except Exception as e:
+                logger.warning("Could not fetch %s candles for %s: %s", kind, ticker, e)
+                return 0
+            stock_candles_fetched_total.inc(len(bars), kind)
+            if not bars:
+                return 0
+
+            await self._store(ticker, bars)
+            for period in PERIODS:
+                self._evict((ticker, period))
+            return len(bars)
+
+    async def _store(self, ticker: str, bars: List[Dict[str, Any]]):
+        rows = [{"ticker": ticker, "interval": INTERVAL, **bar} for bar in bars]
+        async with AsyncSessionLocal() as session:
+            dialect_insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+            for start in range(0, len(rows), UPSERT_CHUNK):
+                stmt = dialect_insert(StockCandle).values(rows[start:start + UPSERT_CHUNK])
+                await session.execute(stmt.on_conflict_do_update(
+                    index_elements=["ticker", "interval", "ts"],
+                    set_={column: stmt.excluded[column] for column in ("open", "high", "low", "close", "volume")}
+                ))
+            await session.commit()
+
+    def _evict(self, key: Tuple[str, str]):
+        payload = self._charts.pop(key, None)
+        if payload is not None:
+            self._charts_size -= len(payload)
+
+    def _is_stale(self, ticker: str) -> bool:
+        topped_up = self._topped_up.get(ticker)
+        return topped_up is None or time.monotonic() - topped_up >= self.refresh_seconds
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(timezone.utc).astimezone(MARKET_TZ).date()
+
+    @staticmethod
+    def _bar_ts(day: date) -> datetime:
+        """Stored ts of the daily bar for a session date."""
+        return datetime.combine(day, datetime.min.time(), tzinfo=MARKET_TZ).astimezone(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def _chart_point(candle: StockCandle) -> Dict[str, Any]:
+        """Chart.js point, as the chart endpoint has always returned it."""
+        ts = candle.ts.replace(tzinfo=timezone.utc)
+        return {
+            "date": ts.astimezone(MARKET_TZ).strftime("%Y-%m-%d"),
+            "timestamp": int(ts.timestamp() * 1000),  # JS timestamp
+            "open": candle.open,
+            "high": candle.high,
+            "low": candle.low,
+            "close": candle.close,
+            "volume": candle.volume
+        }
+
+    def clear(self):
+        self._charts.clear()
+        self._charts_size = 0
+        self._topped_up.clear()
+
+
+# Global instance
+candle_store = CandleStore()
@@ -2,138 +2,106 @@
 Stock Data Service
 Fetches and caches stock price data from external APIs (Yahoo Finance, Alpha Vantage).
 Handles price lookups, historical data, and stock information.
+
+Current prices are read from stock_price_cache, which the background
+refresher (services/stock_quote_refresher.py) keeps up to date; requests
+never wait on a quote fetch. Extended stock info is fetched by the same
+refresher when a request finds it missing or stale.
 """
 
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import yfinance as yf
 
 from database.models import StockMetadata, StockPriceCache
+from services.cache import AsyncCache
+from services.search_index import search_service
 
 logger = logging.getLogger(__name__)
 
 
+def _yfinance():
+    """Import yfinance (and pandas) on first quote fetch rather than at app startup."""
+    import yfinance
+    return yfinance
+
+
 class StockDataService:
     """Service for fetching and caching stock market data."""
 
     def __init__(self):
         """Initialize stock data service with caching."""
-        self.cache_duration_minutes = 5  # Stock prices cache for 5 minutes
-        self.history_cache_duration_minutes = 60  # Historical data cache for 1 hour
+        self.cache_duration_minutes = 5  # Re-read stored prices from the database after 5 minutes
         self.info_cache_duration_hours = 24  # Stock info cache for 24 hours
 
-        # In-memory cache for quick lookups (Redis alternative)
-        self._memory_cache = {}
-
-    def _is_cache_valid(self, last_updated: datetime, duration_minutes: int) -> bool:
-        """Check if cached data is still valid."""
-        if not last_updated:
-            return False
-        age = datetime.utcnow() - last_updated
-        return age < timedelta(minutes=duration_minutes)
+        self._prices = AsyncCache("stock_prices", max_size=5000, ttl=self.cache_duration_minutes * 60)
+        # Extended info published by the refresher; a day-old copy is served until the next one arrives
+        self._info = AsyncCache(
+            "stock_info", max_size=1000,
+            ttl=self.info_cache_duration_hours * 3600, stale_ttl=self.info_cache_duration_hours * 3600
+        )
 
     async def get_stock_price(self, ticker: str, db: AsyncSession) -> Optional[Dict]:
         """
-        Get current stock price with caching.
+        Get the latest stored stock price.
+
+        Quotes are kept current by the background refresher
+        (services/stock_quote_refresher.py); this never calls Yahoo Finance.
 
         Args:
             ticker: Stock ticker symbol (e.g., 'AAPL')
             db: Database session
 
         Returns:
-            Dict with price data or None if not found
+            Dict with price data or None if no quote has been stored yet
         """
-        try:
-            # Check memory cache first
-            cache_key = f"price_{ticker}"
-            if cache_key in self._memory_cache:
-                cached_data, cached_time = self._memory_cache[cache_key]
-                if self._is_cache_valid(cached_time, self.cache_duration_minutes):
-                    logger.debug(f"Memory cache hit for {ticker}")
-                    return cached_data
-
-            # Check database cache
-            result = await db.execute(
-                select(StockPriceCache).where(StockPriceCache.ticker == ticker.upper())
-            )
-            db_cache = result.scalar_one_or_none()
-
-            if db_cache and self._is_cache_valid(db_cache.last_updated, self.cache_duration_minutes):
-                logger.debug(f"DB cache hit for {ticker}")
-                price_data = db_cache.to_dict()
-                self._memory_cache[cache_key] = (price_data, db_cache.last_updated)
-                return price_data
-
-            # Fetch fresh data from Yahoo Finance
-            logger.info(f"Fetching fresh price data for {ticker}")
-            stock = yf.Ticker(ticker)
-            info = stock.info
-
-            if not info or 'currentPrice' not in info:
-                # Try alternative price field
-                current_price = info.get('regularMarketPrice') or info.get('previousClose')
-                if not current_price:
-                    logger.warning(f"No price data available for {ticker}")
-                    return None
-            else:
-                current_price = info['currentPrice']
-
-            # Build price data
-            price_data = {
-                "ticker": ticker.upper(),
-                "current_price_usd": float(current_price),
-                "price_change_pct": float(info.get('regularMarketChangePercent', 0) or 0),
-                "volume": int(info.get('volume', 0) or 0),
-                "market_cap": int(info.get('marketCap', 0) or 0),
-                "day_high": float(info.get('dayHigh', 0) or current_price),
-                "day_low": float(info.get('dayLow', 0) or current_price),
-                "open_price": float(info.get('open', 0) or current_price),
-                "prev_close": float(info.get('previousClose', 0) or current_price),
-                "last_updated": datetime.utcnow().isoformat(),
-                "data_source": "yahoo_finance"
-            }
+        prices = await self.get_stock_prices([ticker], db)
+        return prices.get(ticker.upper())
 
-            # Update database cache
-            if db_cache:
-                db_cache.current_price_usd = price_data["current_price_usd"]
-                db_cache.price_change_pct = price_data["price_change_pct"]
-                db_cache.volume = price_data["volume"]
-                db_cache.market_cap = price_data["market_cap"]
-                db_cache.day_high = price_data["day_high"]
-                db_cache.day_low = price_data["day_low"]
-                db_cache.open_price = price_data["open_price"]
-                db_cache.prev_close = price_data["prev_close"]
-                db_cache.last_updated = datetime.utcnow()
-                db_cache.data_source = "yahoo_finance"
+    async def get_stock_prices(self, tickers: List[str], db: AsyncSession) -> Dict[str, Dict]:
+        """
+        Get the latest stored prices for several tickers: memory cache first,
+        then one query for the rest. Tickers without a stored quote are left
+        out and queued for the refresher's next pass.
+        """
+        prices = {}
+        missing = []
+        for ticker in {ticker.upper() for ticker in tickers}:
+            cached = self._prices.get(ticker)
+            if cached is not None:
+                prices[ticker] = cached
             else:
-                db_cache = StockPriceCache(
-                    ticker=ticker.upper(),
-                    current_price_usd=price_data["current_price_usd"],
-                    price_change_pct=price_data["price_change_pct"],
-                    volume=price_data["volume"],
-                    market_cap=price_data["market_cap"],
-                    day_high=price_data["day_high"],
-                    day_low=price_data["day_low"],
-                    open_price=price_data["open_price"],
-                    prev_close=price_data["prev_close"],
-                    data_source="yahoo_finance"
-                )
-                db.add(db_cache)
-
-            await db.commit()
-
-            # Update memory cache
-            self._memory_cache[cache_key] = (price_data, datetime.utcnow())
-
-            return price_data
+                missing.append(ticker)
 
-        except Exception as e:
-            logger.error(f"Error fetching price for {ticker}: {e}")
-            return None
+        if missing:
+            result = await db.execute(
+                select(StockPriceCache).where(StockPriceCache.ticker.in_(missing))
+            )
+            for row in result.scalars().all():
+                price_data = row.to_dict()
+                prices[row.ticker] = price_data
+                self._prices.set(row.ticker, price_data)
+
+            unknown = [ticker for ticker in missing if ticker not in prices]
+            if unknown:
+                # Late import: the refresher imports this module
+                from services.stock_quote_refresher import stock_quote_refresher
+                for ticker in unknown:
+                    await stock_quote_refresher.request(ticker)
+
+        return prices
+
+    def store_quotes(self, quotes: Dict[str, Dict]):
+        """Replace cached prices with quotes published by the refresher."""
+        for ticker, price_data in quotes.items():
+            previous = self._prices.get(ticker, allow_stale=True) if price_data.get("market_cap") is None else None
+            if previous is not None:
+                # Providers without market cap keep the last known value (as in the table)
+                price_data = {**price_data, "market_cap": previous.get("market_cap")}
+            self._prices.set(ticker, price_data)
 
     async def get_stock_history(
         self,
@@ -141,7 +109,8 @@ class StockDataService:
         period: str = "1mo"
     ) -> Optional[List[Dict]]:
         """
-        Get historical price data for charts.
+        Get historical price data for charts from the candle store
+        (services/stock_candles.py).
 
         Args:
             ticker: Stock ticker symbol
@@ -150,43 +119,11 @@ class StockDataService:
         Returns:
             List of price data points or None
         """
-        try:
-            # Check memory cache
-            cache_key = f"history_{ticker}_{period}"
-            if cache_key in self._memory_cache:
-                cached_data, cached_time = self._memory_cache[cache_key]
-                if self._is_cache_valid(cached_time, self.history_cache_duration_minutes):
-                    logger.debug(f"Memory cache hit for {ticker} history")
-                    return cached_data
-
-            logger.info(f"Fetching historical data for {ticker} ({period})")
-            stock = yf.Ticker(ticker)
-
-            # Fetch historical data
-            hist = stock.history(period=period)
-
-            if hist.empty:
-                logger.warning(f"No historical data for {ticker}")
-                return None
-
-            # Format for Chart.js
-            history_data = []
-            for index, row in hist.iterrows():
-                history_data.append({
-                    "date": index.strftime("%Y-%m-%d"),
-                    "timestamp": int(index.timestamp() * 1000),  # JS timestamp
-                    "open": float(row['Open']),
-                    "high": float(row['High']),
-                    "low": float(row['Low']),
-                    "close": float(row['Close']),
-                    "volume": int(row['Volume'])
-                })
-
-            # Cache the result
-            self._memory_cache[cache_key] = (history_data, datetime.utcnow())
-
-            return history_data
+        # Late import: the candle store uses the refresher, which imports this module
+        from services.stock_candles import candle_store
 
+        try:
+            return await candle_store.history(ticker, period) or None
         except Exception as e:
             logger.error(f"Error fetching history for {ticker}: {e}")
             return None
@@ -195,6 +132,10 @@ class StockDataService:
         """
         Get detailed stock information.
 
+        Extended figures (PE ratio etc.) come from the info cache the
+        refresher fills; a missing or day-old entry is requested from the
+        leader and the metadata with the stored quote is returned meanwhile.
+
         Args:
             ticker: Stock ticker symbol
             db: Database session
@@ -213,49 +154,45 @@ class StockDataService:
                 logger.warning(f"Stock {ticker} not found in database")
                 return None
 
-            # Check memory cache for extended info
-            cache_key = f"info_{ticker}"
-            if cache_key in self._memory_cache:
-                cached_data, cached_time = self._memory_cache[cache_key]
-                age_hours = (datetime.utcnow() - cached_time).total_seconds() / 3600
-                if age_hours < self.info_cache_duration_hours:
-                    logger.debug(f"Memory cache hit for {ticker} info")
-                    return cached_data
-
-            # Fetch extended info from Yahoo Finance
-            logger.info(f"Fetching stock info for {ticker}")
-            stock = yf.Ticker(ticker)
-            info = stock.info
-
-            # Combine metadata with live data
+            ticker = metadata.ticker
+            if ticker not in self._info:
+                # Late import: the refresher imports this module
+                from services.stock_quote_refresher import stock_quote_refresher
+                await stock_quote_refresher.request_info(ticker)
+            info = self._info.get(ticker, allow_stale=True) or {}
+            quote = await self.get_stock_price(ticker, db) or {}
+
+            # Combine metadata with the stored quote and extended info
             stock_info = {
-                "ticker": ticker.upper(),
+                "ticker": ticker,
                 "company_name": metadata.company_name,
                 "sector": metadata.sector,
                 "industry": metadata.industry,
-                "website": metadata.website or info.get('website', ''),
-                "description": metadata.description or info.get('longBusinessSummary', ''),
+                "website": metadata.website or info.get('website') or '',
+                "description": metadata.description or info.get('description') or '',
                 "logo_url": metadata.logo_url,
-                "current_price": info.get('currentPrice') or info.get('regularMarketPrice'),
-                "market_cap": info.get('marketCap'),
-                "pe_ratio": info.get('trailingPE'),
-                "dividend_yield": info.get('dividendYield'),
-                "52_week_high": info.get('fiftyTwoWeekHigh'),
-                "52_week_low": info.get('fiftyTwoWeekLow'),
-                "avg_volume": info.get('averageVolume'),
+                "current_price": quote.get('current_price_usd'),
+                "market_cap": quote.get('market_cap') or info.get('market_cap'),
+                "pe_ratio": info.get('pe_ratio'),
+                "dividend_yield": info.get('dividend_yield'),
+                "52_week_high": info.get('52_week_high'),
+                "52_week_low": info.get('52_week_low'),
+                "avg_volume": info.get('avg_volume'),
                 "beta": info.get('beta'),
                 "is_active": metadata.is_active
             }
 
-            # Cache the result
-            self._memory_cache[cache_key] = (stock_info, datetime.utcnow())
-
             return stock_info
 
         except Exception as e:
             logger.error(f"Error fetching info for {ticker}: {e}")
             return None
 
+    def store_info(self, infos: Dict[str, Dict]):
+        """Replace cached extended info with what the refresher published."""
+        for ticker, info in infos.items():
+            self._info.set(ticker, info)
+
     async def search_stocks(self, query: str, db: AsyncSession) -> List[Dict]:
         """
         Search stocks by ticker or company name.
@@ -268,20 +205,17 @@ class StockDataService:
             List of matching stocks
         """
         try:
-            query_upper = query.upper()
-
-            # Search in database metadata
+            tickers = await search_service.stocks.search(query, limit=20)
+            if not tickers:
+                return []
             result = await db.execute(
-                select(StockMetadata).where(
-                    (StockMetadata.ticker.like(f"%{query_upper}%")) |
-                    (StockMetadata.company_name.ilike(f"%{query}%"))
-                ).filter(StockMetadata.is_active == True).limit(20)
+                select(StockMetadata).where(StockMetadata.ticker.in_(tickers))
             )
-            stocks = result.scalars().all()
+            by_ticker = {stock.ticker: stock for stock in result.scalars().all()}
 
-            # Format results
+            # Format results, best match first
             results = []
-            for stock in stocks:
+            for stock in (by_ticker[ticker] for ticker in tickers if ticker in by_ticker):
                 results.append({
                     "ticker": stock.ticker,
                     "company_name": stock.company_name,
@@ -303,24 +237,26 @@ class StockDataService:
             Dict with market overview data
         """
         try:
-            # Get all active stocks from metadata
+            # Every active stock with its stored price in one query
             result = await db.execute(
-                select(StockMetadata).where(StockMetadata.is_active == True)
+                select(StockMetadata, StockPriceCache)
+                .outerjoin(StockPriceCache, StockPriceCache.ticker == StockMetadata.ticker)
+                .where(StockMetadata.is_active == True)
             )
-            all_stocks = result.scalars().all()
-
-            # Get prices for all stocks (this may be slow, consider optimizing)
-            stock_prices = []
-            for stock in all_stocks[:50]:  # Limit to first 50 for performance
-                price_data = await self.get_stock_price(stock.ticker, db)
-                if price_data:
-                    stock_prices.append({
-                        "ticker": stock.ticker,
-                        "company_name": stock.company_name,
-                        "current_price_usd": price_data["current_price_usd"],
-                        "price_change_pct": price_data["price_change_pct"],
-                        "volume": price_data["volume"]
-                    })
+            rows = result.all()
+            all_stocks = [stock for stock, _ in rows]
+
+            stock_prices = [
+                {
+                    "ticker": stock.ticker,
+                    "company_name": stock.company_name,
+                    "current_price_usd": price.current_price_usd,
+                    "price_change_pct": price.price_change_pct or 0,
+                    "volume": price.volume or 0
+                }
+                for stock, price in rows
+                if price is not None
+            ]
 
             # Sort by different criteria
             gainers = sorted(stock_prices, key=lambda x: x["price_change_pct"], reverse=True)[:10]
@@ -347,7 +283,8 @@ class StockDataService:
 
     def clear_cache(self):
         """Clear all cached data."""
-        self._memory_cache.clear()
+        self._prices.clear()
+        self._info.clear()
         logger.info("Stock data cache cleared")
 
 
@@ -46,11 +46,13 @@ class StockPortfolioService:
             if not holdings:
                 return []
 
+            # Current prices for every holding in one lookup
+            prices = await stock_data_service.get_stock_prices([holding.ticker for holding in holdings], db)
+
             # Process each holding
             holdings_data = []
             for holding in holdings:
-                # Get current price
-                price_data = await stock_data_service.get_stock_price(holding.ticker, db)
+                price_data = prices.get(holding.ticker.upper())
 
                 if price_data:
                     current_price_gem = price_data["current_price_usd"] / 0.01  # USD to GEM
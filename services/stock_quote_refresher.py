@@ -0,0 +1,513 @@
+"""
+Stock Quote Refresher - keeps stock_price_cache current in the background.
+
+Request handlers read quotes from stock_price_cache (StockDataService) and
+never call the quote provider. The cluster leader refreshes every active
+StockMetadata ticker in batches:
+
+- cadence follows the US market session (09:30-16:00 America/New_York,
+  Monday-Friday; exchange holidays count as trading days): every
+  STOCK_REFRESH_OPEN_INTERVAL seconds while open, every
+  STOCK_REFRESH_CLOSED_INTERVAL otherwise, plus a pass right after each
+  open and close
+- popular tickers first: tickers a request found without a quote, then by
+  number of holders
+- each batch is written with one INSERT ... ON CONFLICT DO UPDATE and
+  published on the "stock_quotes" channel so every worker's memory cache
+  follows
+- extended info (PE ratio, 52-week range etc.) is fetched per ticker when a
+  worker finds it missing or a day old in its cache, and published on the
+  "stock_info" channel to every worker's info cache
+
+Providers: "yahoo" (one yfinance download per batch) or "fake" (a
+deterministic price path per ticker, no network) for offline development.
+They also supply the daily bars for the chart candle store
+(services/stock_candles.py).
+
+Environment:
+- STOCK_REFRESH_ENABLED: run the refresher (default true)
+- STOCK_QUOTE_PROVIDER: "yahoo" (default) or "fake"
+- STOCK_REFRESH_OPEN_INTERVAL: seconds between passes while the market is open (default 60)
+- STOCK_REFRESH_CLOSED_INTERVAL: seconds between passes while it is closed (default 3600)
+- STOCK_REFRESH_BATCH_SIZE: tickers per provider call and upsert (default 50)
+"""
+
+import os
+import math
+import time
+import zlib
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.database import AsyncSessionLocal
+from database.models import StockHolding, StockMetadata, StockPriceCache
+from services.cluster import cluster
+from services.metrics import registry
+from services.stock_data_service import _yfinance, stock_data_service
+
+logger = logging.getLogger(__name__)
+
+STOCK_REFRESH_ENABLED = os.getenv("STOCK_REFRESH_ENABLED", "true").lower() == "true"
+STOCK_QUOTE_PROVIDER = os.getenv("STOCK_QUOTE_PROVIDER", "yahoo").lower()
+STOCK_REFRESH_OPEN_INTERVAL = float(os.getenv("STOCK_REFRESH_OPEN_INTERVAL", "60"))
+STOCK_REFRESH_CLOSED_INTERVAL = float(os.getenv("STOCK_REFRESH_CLOSED_INTERVAL", "3600"))
+STOCK_REFRESH_BATCH_SIZE = int(os.getenv("STOCK_REFRESH_BATCH_SIZE", "50"))
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dt_time(9, 30)
+MARKET_CLOSE = dt_time(16, 0)
+TRANSITION_GRACE_SECONDS = 120  # Wait after the close for the final daily bar
+ERROR_BACKOFF_SECONDS = 30
+
+QUOTE_FIELDS = (
+    "current_price_usd", "price_change_pct", "volume", "market_cap",
+    "day_high", "day_low", "open_price", "prev_close"
+)
+INFO_FIELDS = (
+    "website", "description", "market_cap", "pe_ratio", "dividend_yield",
+    "52_week_high", "52_week_low", "avg_volume", "beta"
+)
+
+stock_quotes_refreshed_total = registry.counter(
+    "stock_quotes_refreshed_total", "Tickers requested from the quote provider, by result.",
+    ("provider", "result")
+)
+stock_refresh_duration_seconds = registry.histogram(
+    "stock_refresh_duration_seconds", "Duration of a full stock quote refresh pass.",
+    ("market",)
+)
+
+
+# ==================== MARKET HOURS ====================
+
+def market_is_open(now: datetime) -> bool:
+    """True during the regular US session (`now` must be timezone-aware)."""
+    local = now.astimezone(MARKET_TZ)
+    return local.weekday() < 5 and MARKET_OPEN <= local.time() < MARKET_CLOSE
+
+
+def next_market_transition(now: datetime) -> datetime:
+    """The next session open or close after `now`."""
+    local = now.astimezone(MARKET_TZ)
+    for days in range(8):
+        day = local.date() + timedelta(days=days)
+        if day.weekday() >= 5:
+            continue
+        for moment in (MARKET_OPEN, MARKET_CLOSE):
+            transition = datetime.combine(day, moment, tzinfo=MARKET_TZ)
+            if transition > local:
+                return transition
+    raise AssertionError("no weekday within eight days")
+
+
+# ==================== PROVIDERS ====================
+
+class QuoteProvider(ABC):
+    """Fetches current quotes for a batch of tickers."""
+
+    name: str
+
+    @abstractmethod
+    async def fetch(self, tickers: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """{ticker: {QUOTE_FIELDS...}} for the tickers the provider knows; others are left out."""
+
+    @abstractmethod
+    async def info(self, ticker: str) -> Dict[str, Any]:
+        """{INFO_FIELDS...} for one ticker; fields the provider lacks are None."""
+
+    @abstractmethod
+    async def candles(self, ticker: str, start: date) -> List[Dict[str, Any]]:
+        """
+        Daily bars from `start` through today, oldest first: ts (session date
+        at midnight America/New_York, as naive UTC), open, high, low, close,
+        volume. Today's bar is partial while the market is open.
+        """
+
+
+class YahooQuoteProvider(QuoteProvider):
+    """Daily bars for the whole batch from one yfinance download (no market cap)."""
+
+    name = "yahoo_finance"
+
+    async def fetch(self, tickers: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        return await asyncio.to_thread(self._download, list(tickers))
+
+    @staticmethod
+    def _download(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        import pandas
+
+        frame = _yfinance().download(
+            tickers, period="5d", interval="1d", group_by="ticker",
+            auto_adjust=False, progress=False, threads=True
+        )
+        quotes = {}
+        for ticker in tickers:
+            if isinstance(frame.columns, pandas.MultiIndex):
+                if ticker not in frame.columns.get_level_values(0):
+                    continue
+                bars = frame[ticker]
+            else:
+                bars = frame
+            bars = bars.dropna(subset=["Close"])
+            if bars.empty:
+                continue
+
+            today = bars.iloc[-1]
+            close = float(today["Close"])
+            prev_close = float(bars.iloc[-2]["Close"]) if len(bars) > 1 else float(today["Open"])
+            quotes[ticker] = {
+                "current_price_usd": close,
+                "price_change_pct": (close / prev_close - 1) * 100 if prev_close else 0.0,
+                "volume": int(today["Volume"] or 0),
+                "market_cap": None,
+                "day_high": float(today["High"]),
+                "day_low": float(today["Low"]),
+                "open_price": float(today["Open"]),
+                "prev_close": prev_close,
+            }
+        return quotes
+
+    async def info(self, ticker: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._info, ticker)
+
+    @staticmethod
+    def _info(ticker: str) -> Dict[str, Any]:
+        info = _yfinance().Ticker(ticker).info or {}
+        return {
+            "website": info.get("website"),
+            "description": info.get("longBusinessSummary"),
+            "market_cap": info.get("marketCap"),
+            "pe_ratio": info.get("trailingPE"),
+            "dividend_yield": info.get("dividendYield"),
+            "52_week_high": info.get("fiftyTwoWeekHigh"),
+            "52_week_low": info.get("fiftyTwoWeekLow"),
+            "avg_volume": info.get("averageVolume"),
+            "beta": info.get("beta"),
+        }
+
+    async def candles(self, ticker: str, start: date) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._history, ticker, start)
+
+    @staticmethod
+    def _history(ticker: str, start: date) -> List[Dict[str, Any]]:
+        frame = _yfinance().Ticker(ticker).history(start=start.isoformat(), interval="1d")
+        bars = []
+        for index, row in frame.dropna(subset=["Close"]).iterrows():
+            if index.tzinfo is not None:
+                index = index.tz_convert("UTC").tz_localize(None)
+            bars.append({
+                "ts": index.to_pydatetime(),
+                "open": float(row["Open"]),
+                "high": float(row["High"]),
+                "low": float(row["Low"]),
+                "close": float(row["Close"]),
+                "volume": int(row["Volume"] or 0),
+            })
+        return bars
+
+
+class FakeQuoteProvider(QuoteProvider):
+    """
+    Offline quotes: each ticker gets a fixed base price, share count and
+    phase from its name, and its price follows a slow sine of wall-clock
+    time, so repeated passes move prices without any stored state.
+    """
+
+    name = "fake"
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
+    async def fetch(self, tickers: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        now = self.clock()
+        return {ticker: self.quote(ticker, now) for ticker in tickers}
+
+    @staticmethod
+    def price_at(ticker: str, t: float) -> float:
+        seed = zlib.crc32(ticker.encode())
+        base = 20 + seed % 480
+        phase = (seed >> 9) % 1000 / 1000 * 2 * math.pi
+        return round(base * (1 + 0.03 * math.sin(t / 43200 + phase)), 2)
+
+    @staticmethod
+    def quote(ticker: str, now: float) -> Dict[str, Any]:
+        seed = zlib.crc32(ticker.encode())
+        day_start = now - now % 86400
+        price = FakeQuoteProvider.price_at(ticker, now)
+        prev_close = FakeQuoteProvider.price_at(ticker, day_start - 1)
+        open_price = FakeQuoteProvider.price_at(ticker, day_start)
+        return {
+            "current_price_usd": price,
+            "price_change_pct": (price / prev_close - 1) * 100,
+            "volume": 100000 + seed % 5000000,
+            "market_cap": int(price * (10_000_000 + seed % 990_000_000)),
+            "day_high": max(price, open_price),
+            "day_low": min(price, open_price),
+            "open_price": open_price,
+            "prev_close": prev_close,
+        }
+
+    async def info(self, ticker: str) -> Dict[str, Any]:
+        seed = zlib.crc32(ticker.encode())
+        base = 20 + seed % 480
+        return {
+            "website": None,
+            "description": None,
+            "market_cap": self.quote(ticker, self.clock())["market_cap"],
+            "pe_ratio": round(5 + seed % 4500 / 100, 2),
+            "dividend_yield": round(seed % 500 / 10000, 4),
+            "52_week_high": round(base * 1.03, 2),
+            "52_week_low": round(base * 0.97, 2),
+            "avg_volume": 100000 + seed % 5000000,
+            "beta": round(0.4 + (seed >> 5) % 160 / 100, 2),
+        }
+
+    async def candles(self, ticker: str, start: date) -> List[Dict[str, Any]]:
+        now = self.clock()
+        today = datetime.fromtimestamp(now, timezone.utc).astimezone(MARKET_TZ).date()
+        seed = zlib.crc32(ticker.encode())
+        bars = []
+        day = start
+        while day <= today:
+            opens = datetime.combine(day, MARKET_OPEN, tzinfo=MARKET_TZ).timestamp()
+            if day.weekday() < 5 and opens <= now:
+                closes = min(datetime.combine(day, MARKET_CLOSE, tzinfo=MARKET_TZ).timestamp(), now)
+                prices = [self.price_at(ticker, t) for t in (opens, (opens + closes) / 2, closes)]
+                midnight = datetime.combine(day, dt_time(0), tzinfo=MARKET_TZ)
+                bars.append({
+                    "ts": midnight.astimezone(timezone.utc).replace(tzinfo=None),
+                    "open": prices[0],
+                    "high": max(prices),
+                    "low": min(prices),
+                    "close": prices[-1],
+                    "volume": 100000 + (seed + day.toordinal() * 7919) % 5000000,
+                })
+            day += timedelta(days=1)
+        return bars
+
+
+PROVIDERS = {"yahoo": YahooQuoteProvider, "fake": FakeQuoteProvider}
+
+
+# ==================== REFRESHER ====================
+
+class StockQuoteRefresher:
+    """Leader-only background refresh of stock_price_cache; see the module docstring."""
+
+    def __init__(self, provider: Optional[QuoteProvider] = None, batch_size: int = STOCK_REFRESH_BATCH_SIZE):
+        if provider is None:
+            if STOCK_QUOTE_PROVIDER not in PROVIDERS:
+                raise ValueError(f"Unknown STOCK_QUOTE_PROVIDER {STOCK_QUOTE_PROVIDER!r}")
+            provider = PROVIDERS[STOCK_QUOTE_PROVIDER]()
+        self.provider = provider
+        self.batch_size = batch_size
+        self.is_running = False
+        self.last_refresh: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._wanted: set = set()  # Tickers a request found without a quote
+        self._wanted_info: set = set()  # Tickers a request found without fresh info
+        self._requested: Dict[tuple, float] = {}  # (channel, ticker) -> monotonic time last asked for
+
+    async def start(self):
+        if not STOCK_REFRESH_ENABLED or self.is_running:
+            return
+        self.is_running = True
+        cluster.subscribe("stock_quotes", self._on_quotes_published)
+        cluster.handle_requests("stock_quotes", self._on_quote_request)
+        cluster.subscribe("stock_info", self._on_info_published)
+        cluster.handle_requests("stock_info", self._on_info_request)
+        await cluster.election.on_change(self._start_loop, self._stop_loop)
+        logger.info("Stock quote refresher started (provider %s)", self.provider.name)
+
+    async def stop(self):
+        self.is_running = False
+        await self._stop_loop()
+
+    async def _start_loop(self):
+        if not self.is_running or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def _stop_loop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def request(self, ticker: str):
+        """Ask for a ticker that has no cached quote yet to be fetched soon (any worker)."""
+        await self._ask_leader("stock_quotes", ticker)
+
+    async def request_info(self, ticker: str):
+        """Ask for a ticker's extended info (missing or stale in the cache) to be fetched soon (any worker)."""
+        await self._ask_leader("stock_info", ticker)
+
+    async def _ask_leader(self, channel: str, ticker: str):
+        now = time.monotonic()
+        if now - self._requested.get((channel, ticker), -math.inf) < STOCK_REFRESH_OPEN_INTERVAL:
+            return
+        self._requested[(channel, ticker)] = now
+        if len(self._requested) > 10000:
+            self._requested.clear()
+        await cluster.notify_leader(channel, {"tickers": [ticker]})
+
+    async def _on_quotes_published(self, message: Dict[str, Any]):
+        stock_data_service.store_quotes(message["quotes"])
+
+    async def _on_quote_request(self, payload: Dict[str, Any]):
+        self._wanted.update(payload["tickers"])
+        self._wake.set()
+
+    async def _on_info_published(self, message: Dict[str, Any]):
+        stock_data_service.store_info(message["info"])
+
+    async def _on_info_request(self, payload: Dict[str, Any]):
+        self._wanted_info.update(payload["tickers"])
+        self._wake.set()
+
+    @staticmethod
+    def next_delay(now: datetime, elapsed: float = 0.0) -> float:
+        """Seconds until the next full pass: the session's interval, or sooner at an open/close."""
+        interval = STOCK_REFRESH_OPEN_INTERVAL if market_is_open(now) else STOCK_REFRESH_CLOSED_INTERVAL
+        until_transition = (next_market_transition(now) - now).total_seconds() + TRANSITION_GRACE_SECONDS
+        return max(1.0, min(interval - elapsed, until_transition))
+
+    async def _loop(self):
+        next_full = time.monotonic()
+        while True:
+            try:
+                self._wake.clear()
+                wanted, self._wanted = self._wanted, set()
+                wanted_info, self._wanted_info = self._wanted_info, set()
+                if time.monotonic() >= next_full:
+                    started = time.monotonic()
+                    await self.refresh_all(first=wanted)
+                    next_full = started + self.next_delay(datetime.now(timezone.utc))
+                elif wanted:
+                    active = set(await self.tickers_by_popularity())
+                    await self.refresh(sorted(wanted & active))
+                if wanted_info:
+                    await self.refresh_info(sorted(wanted_info))
+
+                timeout = next_full - time.monotonic()
+                if timeout > 0:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Error in stock quote refresh loop: %s", e)
+                await asyncio.sleep(ERROR_BACKOFF_SECONDS)
+
+    async def tickers_by_popularity(self) -> List[str]:
+        """Active tickers, most held first."""
+        holders = (
+            select(StockHolding.ticker, func.count().label("holders"))
+            .where(StockHolding.quantity > 0)
+            .group_by(StockHolding.ticker)
+            .subquery()
+        )
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(StockMetadata.ticker)
+                .outerjoin(holders, holders.c.ticker == StockMetadata.ticker)
+                .where(StockMetadata.is_active == True)
+                .order_by(func.coalesce(holders.c.holders, 0).desc(), StockMetadata.ticker)
+            )
+            return list(result.scalars().all())
+
+    async def refresh_all(self, first: Sequence[str] = ()) -> int:
+        """One pass over every active ticker (`first` ahead of the rest). Returns quotes stored."""
+        started = time.perf_counter()
+        tickers = await self.tickers_by_popularity()
+        active = set(tickers)
+        first = [ticker for ticker in first if ticker in active]
+        promoted = set(first)
+        ordered = first + [ticker for ticker in tickers if ticker not in promoted]
+
+        stored = await self.refresh(ordered)
+        self.last_refresh = datetime.utcnow()
+        market = "open" if market_is_open(datetime.now(timezone.utc)) else "closed"
+        stock_refresh_duration_seconds.observe(time.perf_counter() - started, market)
+        logger.info("Refreshed %s/%s stock quotes (market %s)", stored, len(ordered), market)
+        return stored
+
+    async def refresh(self, tickers: Sequence[str]) -> int:
+        """Fetch and store quotes batch by batch; a failed batch is logged and skipped."""
+        stored = 0
+        for start in range(0, len(tickers), self.batch_size):
+            batch = list(tickers[start:start + self.batch_size])
+            try:
+                quotes = await self.provider.fetch(batch)
+            except Exception as e:
+                stock_quotes_refreshed_total.inc(len(batch), self.provider.name, "error")
+                logger.warning("Quote batch %s..%s failed: %s", batch[0], batch[-1], e)
+                continue
+
+            stock_quotes_refreshed_total.inc(len(quotes), self.provider.name, "ok")
+            stock_quotes_refreshed_total.inc(len(batch) - len(quotes), self.provider.name, "missing")
+            if quotes:
+                await self.store(quotes)
+                stored += len(quotes)
+        return stored
+
+    async def refresh_info(self, tickers: Sequence[str]) -> int:
+        """Fetch extended info ticker by ticker and publish it to every worker's info cache."""
+        infos = {}
+        for ticker in tickers:
+            try:
+                info = await self.provider.info(ticker)
+            except Exception as e:
+                logger.warning("Stock info for %s failed: %s", ticker, e)
+                continue
+            infos[ticker] = {field: info.get(field) for field in INFO_FIELDS}
+
+        if infos:
+            await cluster.publish("stock_info", {"info": infos})
+        return len(infos)
+
+    async def store(self, quotes: Dict[str, Dict[str, Any]]):
+        """Upsert a batch into stock_price_cache and publish it to every worker's memory cache."""
+        now = datetime.utcnow()
+        rows = [
+            {"ticker": ticker, **{field: quote.get(field) for field in QUOTE_FIELDS},
+             "last_updated": now, "data_source": self.provider.name}
+            for ticker, quote in quotes.items()
+        ]
+
+        async with AsyncSessionLocal() as session:
+            dialect_insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+            stmt = dialect_insert(StockPriceCache).values(rows)
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=["ticker"],
+                set_={
+                    **{field: stmt.excluded[field] for field in QUOTE_FIELDS if field != "market_cap"},
+                    # Providers without market cap keep the last known value
+                    "market_cap": func.coalesce(stmt.excluded.market_cap, StockPriceCache.market_cap),
+                    "last_updated": stmt.excluded.last_updated,
+                    "data_source": stmt.excluded.data_source,
+                }
+            ))
+            await session.commit()
+
+        await cluster.publish("stock_quotes", {"quotes": {
+            row["ticker"]: {**row, "last_updated": now.isoformat()} for row in rows
+        }})
+
+
+# Global instance
+stock_quote_refresher = StockQuoteRefresher()
@@ -0,0 +1,252 @@
+"""
+Timeline Service - fan-out-on-write friends' activity feeds.
+
+When a public activity is created, its id and time are pushed into the
+timeline of every friend of the author. Each timeline is a ring buffer
+of TIMELINE_MAX_ENTRIES slots in timeline_entries, so timelines stay bounded
+without a trim job. A page of the friends feed is then one keyset-paginated
+query over the reader's own entries.
+
+Hybrid mode: authors with more than TIMELINE_FANOUT_LIMIT friends are
+marked in timeline_pull_authors and not fanned out. Their followers' reads
+pull those authors' recent activities into the same query.
+
+Becoming friends copies the last TIMELINE_BACKFILL activities of each side
+into the other's timeline; removing a friend drops them.
+"""
+
+import os
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, literal, select, delete, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import (
+    ActivityFeed, Friendship, TimelineEntry, TimelineHead, TimelinePullAuthor, User
+)
+from services.metrics import registry
+
+TIMELINE_MAX_ENTRIES = int(os.getenv("TIMELINE_MAX_ENTRIES", "500"))
+TIMELINE_FANOUT_LIMIT = int(os.getenv("TIMELINE_FANOUT_LIMIT", "1000"))
+TIMELINE_BACKFILL = int(os.getenv("TIMELINE_BACKFILL", "20"))
+
+timeline_fanout_total = registry.counter(
+    "timeline_fanout_total", "Activities delivered to timelines, by mode (push, pull).", ("mode",)
+)
+
+
+class TimelineService:
+    """Per-user timelines of friends' public activities."""
+
+    # ==================== WRITES ====================
+
+    @staticmethod
+    async def fan_out(activity: ActivityFeed, db: AsyncSession):
+        """
+        Deliver a new public activity to the author's friends (flushed, not
+        committed: it belongs to the caller's transaction).
+        """
+        if not activity.is_public:
+            return
+        author_id = activity.user_id
+        dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+        pulled = await db.scalar(
+            select(TimelinePullAuthor.user_id).where(TimelinePullAuthor.user_id == author_id)
+        )
+        if pulled is None:
+            followers = await db.scalar(
+                select(func.count()).select_from(Friendship).where(Friendship.friend_id == author_id)
+            )
+            if followers > TIMELINE_FANOUT_LIMIT:
+                await db.execute(
+                    dialect_insert(TimelinePullAuthor)
+                    .values(user_id=author_id, follower_count=followers, marked_at=datetime.utcnow())
+                    .on_conflict_do_nothing(index_elements=["user_id"])
+                )
+                pulled = author_id
+        if pulled is not None:
+            timeline_fanout_total.inc(1, "pull")
+            return
+
+        owners = select(Friendship.user_id).where(Friendship.friend_id == author_id)
+        await TimelineService._push(owners, activity, db)
+        timeline_fanout_total.inc(1, "push")
+
+    @staticmethod
+    async def follow(follower_id: str, author_id: str, db: AsyncSession):
+        """Backfill a new friend's recent public activities into the follower's timeline."""
+        result = await db.execute(
+            select(ActivityFeed)
+            .where(ActivityFeed.user_id == author_id, ActivityFeed.is_public == True)
+            .order_by(ActivityFeed.id.desc())
+            .limit(TIMELINE_BACKFILL)
+        )
+        owner = select(User.id).where(User.id == follower_id)
+        for activity in reversed(result.scalars().all()):
+            await TimelineService._push(owner, activity, db)
+
+    @staticmethod
+    async def unfollow(follower_id: str, author_id: str, db: AsyncSession):
+        """Drop a former friend's activities from the follower's timeline."""
+        await db.execute(
+            delete(TimelineEntry)
+            .where(TimelineEntry.owner_id == follower_id, TimelineEntry.author_id == author_id)
+        )
+
+    @staticmethod
+    async def _push(owners, activity: ActivityFeed, db: AsyncSession):
+        """
+        Append one activity to the timelines of `owners` (a one-column SELECT
+        of user ids) with two set-based statements: advance each ring's head,
+        then write the slot it points at.
+        """
+        dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+        heads = dialect_insert(TimelineHead).from_select(["owner_id", "seq"], owners.add_columns(literal(0)))
+        await db.execute(heads.on_conflict_do_update(
+            index_elements=["owner_id"],
+            set_={"seq": TimelineHead.seq + 1}
+        ))
+
+        slots = select(
+            TimelineHead.owner_id,
+            TimelineHead.seq % TIMELINE_MAX_ENTRIES,
+            literal(activity.id),
+            literal(activity.user_id),
+            literal(activity.created_at)
+        ).where(TimelineHead.owner_id.in_(owners))
+        entries = dialect_insert(TimelineEntry).from_select(
+            ["owner_id", "slot", "activity_id", "author_id", "created_at"], slots
+        )
+        await db.execute(entries.on_conflict_do_update(
+            index_elements=["owner_id", "slot"],
+            set_={column: entries.excluded[column] for column in ("activity_id", "author_id", "created_at")}
+        ))
+
+    # ==================== READS ====================
+
+    @staticmethod
+    async def read(user_id: str, db: AsyncSession, limit: int = 50, before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        A page of friends' public activities, newest first. Pass the id of the
+        last activity of a page as `before` to get the next one.
+        """
+        pushed = select(TimelineEntry.activity_id.label("activity_id")).where(TimelineEntry.owner_id == user_id)
+        pulled = (
+            select(ActivityFeed.id.label("activity_id"))
+            .where(
+                ActivityFeed.user_id.in_(
+                    select(Friendship.friend_id)
+                    .join(TimelinePullAuthor, TimelinePullAuthor.user_id == Friendship.friend_id)
+                    .where(Friendship.user_id == user_id)
+                ),
+                ActivityFeed.is_public == True
+            )
+        )
+        if before is not None:
+            pushed = pushed.where(TimelineEntry.activity_id < before)
+            pulled = pulled.where(ActivityFeed.id < before)
+        pushed = select(pushed.order_by(TimelineEntry.activity_id.desc()).limit(limit).subquery())
+        pulled = select(pulled.order_by(ActivityFeed.id.desc()).limit(limit).subquery())
+        # UNION de-duplicates activities pushed before their author switched to pull
+        page = union(pushed, pulled).subquery()
+
+        result = await db.execute(
+            select(ActivityFeed, User.username)
+            .join(page, page.c.activity_id == ActivityFeed.id)
+            .join(User, User.id == ActivityFeed.user_id)
+            .order_by(ActivityFeed.id.desc())
+            .limit(limit)
+        )
+        return [
+            TimelineService._entry(activity, username)
+            for activity, username in result.all()
+        ]
+
+    @staticmethod
+    def _entry(activity: ActivityFeed, username: str) -> Dict[str, Any]:
+        return {
+            "id": activity.id,
+            "user_id": activity.user_id,
+            "username": username,
+            "activity_type": activity.activity_type,
+            "title": activity.title,
+            "description": activity.description,
+            "data": json.loads(activity.data) if activity.data else None,
+            "created_at": activity.created_at.isoformat()
+        }
+
+    # ==================== REBUILD ====================
+
+    @staticmethod
+    async def rebuild(conn) -> int:
+        """
+        Rebuild all timelines from friendships and activity_feed: the newest
+        TIMELINE_MAX_ENTRIES public activities per user, oldest in slot 0, and
+        the pull list from current friend counts. Takes an AsyncSession or
+        AsyncConnection; the caller commits. Returns the entries written.
+        """
+        now = datetime.utcnow()
+        follower_counts = (
+            select(Friendship.friend_id.label("user_id"), func.count().label("followers"))
+            .group_by(Friendship.friend_id)
+            .subquery()
+        )
+        await conn.execute(delete(TimelineEntry))
+        await conn.execute(delete(TimelineHead))
+        await conn.execute(delete(TimelinePullAuthor))
+        await conn.execute(
+            TimelinePullAuthor.__table__.insert().from_select(
+                ["user_id", "follower_count", "marked_at"],
+                select(follower_counts.c.user_id, follower_counts.c.followers, literal(now))
+                .where(follower_counts.c.followers > TIMELINE_FANOUT_LIMIT)
+            )
+        )
+
+        ranked = (
+            select(
+                Friendship.user_id.label("owner_id"),
+                ActivityFeed.id.label("activity_id"),
+                ActivityFeed.user_id.label("author_id"),
+                ActivityFeed.created_at.label("created_at"),
+                func.row_number().over(
+                    partition_by=Friendship.user_id, order_by=ActivityFeed.id.desc()
+                ).label("newest_first")
+            )
+            .join(ActivityFeed, ActivityFeed.user_id == Friendship.friend_id)
+            .where(
+                ActivityFeed.is_public == True,
+                Friendship.friend_id.not_in(select(TimelinePullAuthor.user_id))
+            )
+            .subquery()
+        )
+        kept = (
+            select(ranked, func.count().over(partition_by=ranked.c.owner_id).label("kept"))
+            .where(ranked.c.newest_first <= TIMELINE_MAX_ENTRIES)
+            .subquery()
+        )
+        result = await conn.execute(
+            TimelineEntry.__table__.insert().from_select(
+                ["owner_id", "slot", "activity_id", "author_id", "created_at"],
+                select(
+                    kept.c.owner_id,
+                    kept.c.kept - kept.c.newest_first,
+                    kept.c.activity_id,
+                    kept.c.author_id,
+                    kept.c.created_at
+                )
+            )
+        )
+        # The next push goes to slot kept % max: the oldest entry once the ring is full
+        await conn.execute(
+            TimelineHead.__table__.insert().from_select(
+                ["owner_id", "seq"],
+                select(TimelineEntry.owner_id, func.max(TimelineEntry.slot)).group_by(TimelineEntry.owner_id)
+            )
+        )
+        return result.rowcount
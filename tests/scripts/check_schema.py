@@ -47,7 +47,7 @@ async def check_schema():
             print("\n[SUCCESS] round_id column EXISTS in game_bets table")
         else:
             print("\n[ERROR] round_id column MISSING from game_bets table")
-            print("\n[FIX] To fix, run: python database/migrations/run_migration_002.py")
+            print("\n[FIX] To fix, run: python -m database.migrations upgrade")
 
         # Check if roulette_rounds table exists
         result = await conn.execute(text("""
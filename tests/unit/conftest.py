@@ -0,0 +1,57 @@
+"""
+Shared fixtures. The environment is set before any application module is
+imported: settings are read at import time, and every test session gets
+its own SQLite database under a temporary directory.
+"""
+
+import os
+import shutil
+import asyncio
+import tempfile
+
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix="cryptochecker-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{TEST_DIR}/test.db"
+os.environ["FAIRNESS_CHAIN_DIR"] = os.path.join(TEST_DIR, "fairness")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-" + "x" * 40)
+os.environ.setdefault("FAIRNESS_CHAIN_LENGTH", "2000")
+os.environ.setdefault("STOCK_QUOTE_PROVIDER", "fake")
+os.environ.setdefault("STOCK_REFRESH_ENABLED", "false")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # One loop for the session: pooled database connections are bound to it
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def database():
+    """The migrated test database."""
+    from database.database import init_database
+
+    await init_database()
+
+
+@pytest.fixture
+async def make_user(database):
+    """Factory for users with a 1000 GEM wallet; returns the user id."""
+    import uuid
+
+    from database.database import AsyncSessionLocal, create_user_with_wallet
+
+    async def make(prefix: str = "user") -> str:
+        name = f"{prefix}_{uuid.uuid4().hex[:8]}"
+        async with AsyncSessionLocal() as session:
+            user = await create_user_with_wallet(session, name, f"{name}@example.com", "Passw0rd!123")
+            return user.id
+
+    return make
@@ -0,0 +1,42 @@
+"""Access tokens: per-user revocation cuts off at the revocation, not at the second."""
+
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from api.auth_api import ProfileUpdateRequest, update_profile
+from database.database import AsyncSessionLocal
+from database.models import User
+from services.auth_tokens import RevocationList, TokenVerifier, create_user_token, token_verifier
+
+
+async def test_revoke_user_only_revokes_tokens_issued_before_it(make_user):
+    user = SimpleNamespace(id=await make_user("revoked"), username="revoked", role="PLAYER", is_bot=False)
+    revocations = RevocationList()
+    verifier = TokenVerifier(revocations)
+
+    before = create_user_token(user)
+    assert verifier.verify(before) is not None
+
+    await revocations.revoke_user(user.id)
+    after = create_user_token(user)  # Same second as the revocation
+
+    assert verifier.verify(before) is None
+    claims = verifier.verify(after)
+    assert claims is not None
+    assert claims.issued_at > revocations.users[user.id]
+
+
+async def test_rename_replaces_tokens_carrying_the_old_name(make_user):
+    user_id = await make_user("renamed")
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        old = create_user_token(user)
+        request = Request({"type": "http", "session": {"user_id": user_id, "auth_token": old}})
+
+        response = await update_profile(request, ProfileUpdateRequest(username=f"new_{user_id[:8]}"), user, db)
+
+    assert token_verifier.verify(old, allow_expired=True) is None
+    claims = token_verifier.verify(response["access_token"])
+    assert claims.username == f"new_{user_id[:8]}"
+    assert request.session["auth_token"] == response["access_token"]
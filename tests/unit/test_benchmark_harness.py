@@ -0,0 +1,19 @@
+"""Benchmark harness: a run whose requests mostly fail is not a measurement."""
+
+from benchmarks.harness import LatencyRecorder, error_rate_violations
+
+
+def results(samples):
+    recorder = LatencyRecorder()
+    for label, ok in samples:
+        recorder.record(label, 0.01, ok)
+    return {"endpoints": recorder.summary()}
+
+
+def test_endpoints_above_the_error_rate_make_the_run_invalid():
+    run = results([("clicker.click", True)] * 95 + [("clicker.click", False)] * 5 + [("crypto.prices", True)] * 10)
+
+    assert error_rate_violations(run, max_error_rate=0.01) == [
+        "clicker.click: 5 of 100 requests failed (5.0%)"
+    ]
+    assert error_rate_violations(run, max_error_rate=0.05) == []
@@ -0,0 +1,126 @@
+"""Bot round settlement: in-memory state only follows committed settlements."""
+
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import select, update
+
+from database.database import AsyncSessionLocal
+from database.models import GameBet, GameSession, GameStatus, User, Wallet
+from gaming.bot_engine import BotEngine
+
+BOTS = 30
+
+
+@pytest.fixture
+async def engine(database):
+    engine = BotEngine(seed=7, round_betting=True)
+    await engine.ensure_population(BOTS)
+    await engine.load()
+    return engine
+
+
+async def place(engine: BotEngine) -> str:
+    round_id = str(uuid.uuid4())
+    assert await engine.place_round_bets(round_id)
+    return round_id
+
+
+async def settle(engine: BotEngine, round_id: str, commit: bool):
+    async with AsyncSessionLocal() as session:
+        settlement = await engine.settle_round(session, round_id, 7, "red", "layer1")
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+    return settlement
+
+
+async def wallet_balances(engine: BotEngine) -> np.ndarray:
+    async with AsyncSessionLocal() as session:
+        rows = dict((await session.execute(
+            select(Wallet.user_id, Wallet.gem_balance)
+            .join(User, User.id == Wallet.user_id)
+            .where(User.is_bot == True)
+        )).all())
+    return np.array([rows[user_id] for user_id in engine.user_ids])
+
+
+async def unsettled(round_id: str) -> int:
+    async with AsyncSessionLocal() as session:
+        return len((await session.execute(
+            select(GameBet.id).where(GameBet.round_id == round_id, GameBet.is_winner.is_(None))
+        )).all())
+
+
+async def test_rolled_back_settlement_can_be_settled_again(engine):
+    round_id = await place(engine)
+    balances, streaks = engine.balances.copy(), engine.lose_streak.copy()
+
+    await settle(engine, round_id, commit=False)
+
+    assert round_id in engine._pending
+    np.testing.assert_array_equal(engine.balances, balances)
+    np.testing.assert_array_equal(engine.lose_streak, streaks)
+    assert await unsettled(round_id) == len(engine._pending[round_id])
+
+    settlement = await settle(engine, round_id, commit=True)
+    assert round_id in engine._pending  # Until the caller applies it
+    settlement.apply()
+
+    assert round_id not in engine._pending
+    assert await unsettled(round_id) == 0
+    np.testing.assert_allclose(engine.balances, await wallet_balances(engine))
+
+
+async def test_cold_start_recovers_pending_bets_from_the_database(engine):
+    round_id = await place(engine)
+    placed = len(engine._pending[round_id])
+
+    restarted = BotEngine(seed=8, round_betting=True)
+    await restarted.load()
+    assert not restarted._pending
+
+    settlement = await settle(restarted, round_id, commit=True)
+    settlement.apply()
+
+    assert settlement.count == placed
+    assert await unsettled(round_id) == 0
+    np.testing.assert_allclose(restarted.balances, await wallet_balances(restarted))
+
+    # Settled rows are not picked up again
+    assert (await settle(BotEngine(), round_id, commit=True)).count == 0
+
+
+async def test_failed_placement_forgets_the_game_sessions_it_rolled_back(engine, monkeypatch):
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(GameSession).where(GameSession.user_id.in_(engine.user_ids))
+            .values(status=GameStatus.COMPLETED.value)
+        )
+        await session.commit()
+    engine.session_ids = [None] * engine.size
+
+    draw = engine.draw_round_bets
+
+    def colliding_bets():
+        bets = draw()
+        while len(bets) < 2:
+            bets = draw()
+        bets.bet_ids[1] = bets.bet_ids[0]
+        return bets
+
+    monkeypatch.setattr(engine, "draw_round_bets", colliding_bets)
+    assert await engine.place_round_bets(str(uuid.uuid4())) == []
+    assert not any(engine.session_ids)
+
+    monkeypatch.undo()
+    round_id = await place(engine)
+    async with AsyncSessionLocal() as session:
+        orphaned = (await session.execute(
+            select(GameBet.id)
+            .outerjoin(GameSession, GameSession.id == GameBet.game_session_id)
+            .where(GameBet.round_id == round_id, GameSession.id.is_(None))
+        )).all()
+    assert not orphaned
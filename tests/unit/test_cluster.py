@@ -0,0 +1,77 @@
+"""Cluster primitives against the database: lease handover and the sliding counter."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.cluster import DatabaseStateStore, InMemoryStateStore, LeaderElection
+
+TTL = 0.6
+
+
+async def test_lease_passes_to_another_worker_once_the_holder_stops_renewing(database):
+    name = f"lease_{uuid.uuid4().hex[:8]}"
+    first = LeaderElection(name, worker_id="worker-a", ttl=TTL)
+    second = LeaderElection(name, worker_id="worker-b", ttl=TTL)
+    events = []
+    await first.on_change(lambda: _record(events, "a elected"), lambda: _record(events, "a demoted"))
+    await second.on_change(lambda: _record(events, "b elected"), lambda: _record(events, "b demoted"))
+
+    await first._renew()
+    await second._renew()
+    assert (first.is_leader, second.is_leader) == (True, False)
+
+    # Renewing keeps the lease past its original expiry
+    await asyncio.sleep(TTL / 2)
+    await first._renew()
+    await asyncio.sleep(TTL / 2 + 0.1)
+    await second._renew()
+    assert not second.is_leader
+
+    # The holder goes silent; once its lease expires the other worker takes over
+    await asyncio.sleep(TTL + 0.1)
+    await second._renew()
+    await first._renew()
+    assert (first.is_leader, second.is_leader) == (False, True)
+    assert events == ["a elected", "b elected", "a demoted"]
+
+
+async def _record(events, event):
+    events.append(event)
+
+
+async def test_a_fast_clock_does_not_take_a_live_lease(database, monkeypatch):
+    name = f"lease_{uuid.uuid4().hex[:8]}"
+    holder = LeaderElection(name, worker_id="worker-a", ttl=15)
+    assert await holder.try_acquire()
+
+    class FastClock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(hours=1)
+
+    # The other worker's host clock runs an hour ahead; expiry is the database's call
+    monkeypatch.setattr("services.cluster.datetime", FastClock)
+    assert not await LeaderElection(name, worker_id="worker-b", ttl=15).try_acquire()
+    assert await holder.try_acquire()
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request, database):
+    return InMemoryStateStore() if request.param == "memory" else DatabaseStateStore()
+
+
+async def test_counter_slides_with_each_increment_and_restarts_once_expired(store):
+    key = f"streak_{uuid.uuid4().hex[:8]}"
+
+    counts = []
+    for _ in range(4):
+        counts.append(await store.incr(key, ttl=TTL))
+        await asyncio.sleep(TTL / 2)
+    # The last increment came TTL * 1.5 after the first: each one pushed the expiry out
+    assert counts == [1, 2, 3, 4]
+
+    await asyncio.sleep(TTL)
+    assert await store.incr(key, ttl=TTL) == 1
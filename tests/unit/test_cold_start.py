@@ -0,0 +1,14 @@
+"""Cold start: a fresh server answers its first request within the target."""
+
+import os
+
+from benchmarks.cold_start import measure_once
+
+COLD_START_TARGET_MS = float(os.getenv("COLD_START_TARGET_MS", "5000"))
+
+
+def test_time_to_first_request_is_under_target(tmp_path):
+    run = measure_once(timeout=60, database_url=f"sqlite+aiosqlite:///{tmp_path / 'cold_start.db'}")
+
+    assert {"imports", "database"} <= set(run["phases_ms"])
+    assert run["time_to_first_request_ms"] <= COLD_START_TARGET_MS, run
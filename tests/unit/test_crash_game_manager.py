@@ -0,0 +1,57 @@
+"""Crash game manager: a new game loop settles the round its predecessor left open."""
+
+import hashlib
+
+from sqlalchemy import select
+
+from database.database import AsyncSessionLocal
+from database.models import CrashBet, CrashGame, Transaction, Wallet
+from services.crash_game_manager import CrashGameManager
+from services.crash_service import CrashGameService
+
+
+async def balance(user_id: str) -> float:
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(Wallet.gem_balance).where(Wallet.user_id == user_id))).scalar_one()
+
+
+async def test_taking_over_the_loop_refunds_the_interrupted_round(make_user):
+    stayed, cashed = await make_user("stayed"), await make_user("cashed")
+    seed = "ab" * 32
+    async with AsyncSessionLocal() as session:
+        game = CrashGame(status="waiting", server_seed=seed, server_seed_hash=hashlib.sha256(seed.encode()).hexdigest())
+        session.add(game)
+        await session.commit()
+        game_id = game.id
+
+    async with AsyncSessionLocal() as session:
+        await CrashGameService.place_bet(stayed, 200, game_id, session)
+    async with AsyncSessionLocal() as session:
+        await CrashGameService.place_bet(cashed, 100, game_id, session)
+    async with AsyncSessionLocal() as session:
+        await session.execute(CrashGame.__table__.update().where(CrashGame.id == game_id).values(status="playing"))
+        await session.commit()
+        await CrashGameService.cashout(cashed, game_id, 1.5, session)
+    assert await balance(stayed) == 800
+
+    # The previous leader died mid-round; this worker is elected
+    manager = CrashGameManager()
+    await manager._start_loop()
+    await manager._stop_loop()
+
+    assert await balance(stayed) == 1000
+    assert await balance(cashed) == 1050
+    async with AsyncSessionLocal() as session:
+        assert (await session.get(CrashGame, game_id)).status == "cancelled"
+        bets = dict((await session.execute(
+            select(CrashBet.user_id, CrashBet.status).where(CrashBet.game_id == game_id)
+        )).all())
+        refunds = (await session.execute(
+            select(Transaction.amount).where(Transaction.user_id == stayed, Transaction.transaction_type == "CRASH_REFUND")
+        )).scalars().all()
+    assert bets == {stayed: "refunded", cashed: "cashed_out"}
+    assert refunds == [200]
+
+    # Nothing left to settle the next time
+    async with AsyncSessionLocal() as session:
+        assert await CrashGameService.refund_unfinished_games(session) == {}
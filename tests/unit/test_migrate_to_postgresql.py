@@ -0,0 +1,53 @@
+"""SQLite → PostgreSQL migrator: derived tables a source predates are rebuilt after the load."""
+
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.migrations import upgrade
+from scripts.migrate_to_postgresql import DERIVED_TABLES, DatabaseMigrator
+
+
+async def add_history(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO users (id, username, email, password_hash, is_bot) "
+            "VALUES ('alice', 'alice', 'alice@example.com', 'x', 0), ('bob', 'bob', 'bob@example.com', 'x', 0)"
+        ))
+        await conn.execute(text(
+            "INSERT INTO mini_games (user_id, game_type, bet_amount, won, payout, profit, played_at) "
+            "VALUES ('alice', 'COIN_FLIP', 10, 1, 20, 10, :now)"
+        ), {"now": datetime.utcnow()})
+        await conn.execute(text(
+            "INSERT INTO private_messages (sender_id, receiver_id, message, read, created_at) "
+            "VALUES ('alice', 'bob', 'hi', 0, :now)"
+        ), {"now": datetime.utcnow()})
+
+
+async def test_derived_tables_missing_from_the_source_are_rebuilt(tmp_path):
+    # A source from before the derived tables existed, and a target the load has filled
+    source_url = f"sqlite+aiosqlite:///{tmp_path / 'source.db'}"
+    target_url = f"sqlite+aiosqlite:///{tmp_path / 'target.db'}"
+    source, target = create_async_engine(source_url), create_async_engine(target_url)
+    await upgrade(source, target=10)
+    await upgrade(target)
+    await add_history(target)
+    await source.dispose()
+    await target.dispose()
+
+    migrator = DatabaseMigrator(source_url, target_url)
+    try:
+        plans = await migrator.plan()
+        assert not {plan.name for plan in plans} & set(DERIVED_TABLES)
+        assert sorted(migrator.missing_derived) == sorted(DERIVED_TABLES)
+
+        assert sorted(await migrator.rebuild_derived()) == [
+            "MessagingService.rebuild_conversations", "MiniGamesService.rebuild_daily_stats", "TimelineService.rebuild"
+        ]
+        async with migrator.target_engine.connect() as conn:
+            assert (await conn.execute(text("SELECT games FROM mini_game_daily_stats"))).scalar() == 1
+            assert (await conn.execute(text("SELECT COUNT(*) FROM conversations"))).scalar() == 2
+    finally:
+        await migrator.source_engine.dispose()
+        await migrator.target_engine.dispose()
@@ -0,0 +1,92 @@
+"""Migrations: a fresh database matches the models, and derived tables are backfilled."""
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.migrations import latest_version, upgrade
+from database.models import Base
+
+
+def scratch_engine(path):
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+
+def describe(sync_conn):
+    inspector = inspect(sync_conn)
+    return {
+        table: (
+            sorted((col["name"], str(col["type"]), col["nullable"]) for col in inspector.get_columns(table)),
+            sorted((index["name"], tuple(index["column_names"]), bool(index["unique"]))
+                   for index in inspector.get_indexes(table)),
+            sorted(inspector.get_pk_constraint(table)["constrained_columns"])
+        )
+        for table in inspector.get_table_names() if table != "schema_migrations"
+    }
+
+
+async def test_migrated_schema_matches_the_models(tmp_path):
+    migrated, reference = scratch_engine(tmp_path / "migrated.db"), scratch_engine(tmp_path / "reference.db")
+    try:
+        await upgrade(migrated)
+        async with reference.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with migrated.connect() as conn:
+            actual = await conn.run_sync(describe)
+        async with reference.connect() as conn:
+            expected = await conn.run_sync(describe)
+        assert actual == expected
+    finally:
+        await migrated.dispose()
+        await reference.dispose()
+
+
+async def test_derived_tables_are_backfilled_from_history(tmp_path):
+    engine = scratch_engine(tmp_path / "upgraded.db")
+    now = datetime.utcnow()
+    try:
+        await upgrade(engine, target=10)
+        async with engine.begin() as conn:
+            for user_id in ("alice", "bob"):
+                await conn.execute(text(
+                    "INSERT INTO users (id, username, email, password_hash, is_bot) VALUES (:id, :id, :email, 'x', 0)"
+                ), {"id": user_id, "email": f"{user_id}@example.com"})
+            await conn.execute(text(
+                "INSERT INTO mini_games (id, user_id, game_type, bet_amount, won, payout, profit, played_at) "
+                "VALUES (1, 'alice', 'COIN_FLIP', 10, 1, 20, 10, :now), "
+                "(2, 'alice', 'COIN_FLIP', 10, 0, 0, -10, :now)"
+            ), {"now": now})
+            await conn.execute(text(
+                "INSERT INTO private_messages (sender_id, receiver_id, message, read, created_at) "
+                "VALUES ('alice', 'bob', 'hi', 0, :now), ('bob', 'alice', 'hey', 1, :now)"
+            ), {"now": now})
+            await conn.execute(text(
+                "INSERT INTO friendships (user_id, friend_id, created_at) "
+                "VALUES ('alice', 'bob', :now), ('bob', 'alice', :now)"
+            ), {"now": now})
+            await conn.execute(text(
+                "INSERT INTO activity_feed (user_id, activity_type, title, is_public, created_at) "
+                "VALUES ('bob', 'GAME_WIN', 'won', 1, :now), ('bob', 'GAME_WIN', 'private', 0, :now)"
+            ), {"now": now})
+
+        assert await upgrade(engine) == list(range(11, latest_version() + 1))
+
+        async with engine.connect() as conn:
+            stats = (await conn.execute(text(
+                "SELECT games, wins, wagered, won, profit, biggest_win, biggest_loss FROM mini_game_daily_stats"
+            ))).all()
+            unread = dict((await conn.execute(text(
+                "SELECT user_id, unread_count FROM conversations"
+            ))).all())
+            timelines = (await conn.execute(text(
+                "SELECT owner_id, slot, author_id FROM timeline_entries"
+            ))).all()
+            heads = (await conn.execute(text("SELECT owner_id, seq FROM timeline_heads"))).all()
+        assert stats == [(2, 1, 20, 20, 0, 10, 10)]
+        assert unread == {"alice": 0, "bob": 1}
+        assert timelines == [("alice", 0, "bob")]
+        assert heads == [("alice", 0)]
+    finally:
+        await engine.dispose()
@@ -0,0 +1,141 @@
+"""Mini-game auto-play: stop conditions and streaks, on fixed seeds."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy import select, update
+
+from database.database import AsyncSessionLocal
+from database.models import MiniGame, MiniGameStats, Transaction, Wallet
+from services.fairness import FairSeed
+from services.minigames_service import MiniGamesService
+
+
+def seed(byte: int) -> FairSeed:
+    # Coin flips (W = heads) for the seeds used below:
+    #   0: WLLWWWWWWW   1: LWWLLLWLLW   5: LWLLLLWWLW   7: WWWWLLLLLW   30: LLLLLLLLLL
+    return FairSeed(chain_id="test", index=1, seed=bytes([byte]) * 32)
+
+
+async def play(user_id: str, fair: FairSeed, rounds: int, bet_amount: int = 100, **stops) -> dict:
+    async with AsyncSessionLocal() as session:
+        return await MiniGamesService.play_auto(
+            user_id, "coinflip", bet_amount, rounds, session, choice="heads", fair=fair, **stops
+        )
+
+
+async def stored(user_id: str):
+    async with AsyncSessionLocal() as session:
+        balance = (await session.execute(select(Wallet.gem_balance).where(Wallet.user_id == user_id))).scalar_one()
+        games = (await session.execute(select(MiniGame.profit).where(MiniGame.user_id == user_id))).scalars().all()
+        stats = (await session.execute(select(MiniGameStats).where(MiniGameStats.user_id == user_id))).scalar_one()
+    return balance, games, stats
+
+
+def test_seeds_draw_the_documented_flips():
+    for byte, flips in ((0, "WLLWWWWWWW"), (1, "LWWLLLWLLW"), (5, "LWLLLLWWLW"), (7, "WWWWLLLLLW"), (30, "LLLLLLLLLL")):
+        drawn = MiniGamesService.draw("coinflip", seed(byte).seed, len(flips))
+        assert "".join("W" if side == 0 else "L" for side in drawn.tolist()) == flips
+
+
+@pytest.mark.parametrize("fair, stops, played, stopped_by, profit", [
+    # Net -100, 0, -100, -200, -300: stops on the game that reaches the loss limit
+    (seed(5), {"stop_loss": 300}, 5, "stop_loss", -300),
+    # Net +100, 0, -100, 0, +100, +200, +300
+    (seed(0), {"take_profit": 300}, 7, "take_profit", 300),
+    # Both set: whichever is reached first
+    (seed(0), {"stop_loss": 100, "take_profit": 300}, 3, "stop_loss", -100),
+    # The first game already hits the limit
+    (seed(1), {"stop_loss": 100}, 1, "stop_loss", -100),
+    (seed(7), {"take_profit": 100}, 1, "take_profit", 100),
+    (seed(7), {}, 10, "completed", 0),
+])
+async def test_batch_stops_at_the_first_limit(make_user, fair, stops, played, stopped_by, profit):
+    user_id = await make_user("auto")
+
+    result = await play(user_id, fair, rounds=10, **stops)
+
+    assert (result["rounds_played"], result["stopped_by"], result["profit"]) == (played, stopped_by, profit)
+    balance, games, stats = await stored(user_id)
+    assert balance == result["new_balance"] == 1000 + profit
+    assert len(games) == stats.total_games_played == played
+    assert sum(games) == stats.net_profit == profit
+
+
+async def test_batch_stops_before_a_game_the_balance_cannot_cover(make_user):
+    user_id = await make_user("broke")
+
+    # 1000 GEM covers four 250 GEM bets; the fifth is never played
+    result = await play(user_id, seed(30), rounds=10, bet_amount=250)
+
+    assert (result["rounds_played"], result["stopped_by"], result["new_balance"]) == (4, "balance", 0)
+    async with AsyncSessionLocal() as session:
+        ledger = (await session.execute(
+            select(Transaction.balance_before, Transaction.balance_after)
+            .where(Transaction.user_id == user_id, Transaction.transaction_type == "MINIGAME_BET")
+            .order_by(Transaction.balance_before.desc())
+        )).all()
+    assert ledger == [(1000, 750), (750, 500), (500, 250), (250, 0)]
+
+
+async def test_concurrent_batches_both_reach_the_wallet(make_user):
+    user_id = await make_user("concurrent")
+
+    first, second = await asyncio.gather(play(user_id, seed(0), rounds=7), play(user_id, seed(5), rounds=5))
+
+    balance, _, _ = await stored(user_id)
+    assert (first["profit"], second["profit"]) == (300, -300)
+    assert balance == 1000 + first["profit"] + second["profit"]
+
+
+async def test_batch_is_refused_when_the_balance_is_spent_meanwhile(make_user, monkeypatch):
+    user_id = await make_user("spent")
+
+    async def spend_then_seed(chain):
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Wallet).where(Wallet.user_id == user_id).values(gem_balance=150))
+            await session.commit()
+        return seed(30)
+
+    monkeypatch.setattr("services.minigames_service.fairness.next_seed", spend_then_seed)
+
+    # Ten losing games were planned on 1000 GEM; 150 GEM no longer covers them
+    with pytest.raises(ValueError, match="Insufficient"):
+        await play(user_id, None, rounds=10)
+
+    async with AsyncSessionLocal() as session:
+        balance = (await session.execute(select(Wallet.gem_balance).where(Wallet.user_id == user_id))).scalar_one()
+        games = (await session.execute(select(MiniGame.id).where(MiniGame.user_id == user_id))).scalars().all()
+    assert (balance, games) == (150, [])
+
+
+async def test_streaks_continue_the_ones_carried_in(make_user):
+    user_id = await make_user("streak")
+    async with AsyncSessionLocal() as session:
+        session.add(MiniGameStats(
+            user_id=user_id, current_win_streak=3, longest_win_streak=3, longest_loss_streak=2
+        ))
+        await session.commit()
+
+    # WWWW continues the carried 3-win streak, then LLLLL
+    await play(user_id, seed(7), rounds=9)
+    _, _, stats = await stored(user_id)
+    assert (stats.longest_win_streak, stats.current_win_streak) == (7, 0)
+    assert (stats.longest_loss_streak, stats.current_loss_streak) == (5, 5)
+
+    # One win ends the loss streak: LLLLL + W
+    await play(user_id, seed(7), rounds=1)
+    _, _, stats = await stored(user_id)
+    assert (stats.current_win_streak, stats.current_loss_streak) == (1, 0)
+    assert (stats.longest_win_streak, stats.longest_loss_streak) == (7, 5)
+
+
+@pytest.mark.parametrize("mask, carried, expected", [
+    ([True, True, False, True], 3, [5, 1]),
+    ([False, True, True], 3, [2]),  # Carry only extends a run at the start
+    ([False, False], 4, []),
+    ([True], 0, [1]),
+])
+def test_run_lengths(mask, carried, expected):
+    assert MiniGamesService._run_lengths(np.array(mask), carried).tolist() == expected
@@ -0,0 +1,52 @@
+"""Presence: connections, the TTL and logout."""
+
+from services.presence import PresenceTracker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def tracker():
+    clock = Clock()
+    return PresenceTracker(ttl=90, clock=clock), clock
+
+
+def test_user_stays_online_for_the_ttl_after_the_last_connection_closes():
+    presence, clock = tracker()
+    presence.connect("alice")
+    presence.connect("alice")
+
+    presence.disconnect("alice")
+    clock.now += 120
+    assert presence.is_online("alice")  # Still one connection open
+
+    presence.disconnect("alice")
+    clock.now += 60
+    assert presence.is_online("alice")
+    clock.now += 31
+    assert not presence.is_online("alice")
+
+
+def test_stream_closing_after_logout_does_not_bring_the_user_back():
+    presence, clock = tracker()
+    presence.connect("alice")
+
+    presence.leave("alice")
+    presence.disconnect("alice")  # The SSE/WebSocket handler's cleanup runs after the logout
+
+    assert not presence.is_online("alice")
+    assert presence.online(["alice"]) == set()
+    assert "alice" in presence._left and "alice" not in presence._reported
+
+
+def test_stray_disconnect_is_not_a_heartbeat():
+    presence, clock = tracker()
+    presence.disconnect("bob")
+
+    assert not presence.is_online("bob")
+    assert presence.online_count() == 0
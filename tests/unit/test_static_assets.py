@@ -0,0 +1,67 @@
+"""Static assets: built files that vanish, and cached pages that embed asset URLs."""
+
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.templating import Jinja2Templates
+from fastapi.testclient import TestClient
+
+from services.page_cache import PageCache
+from services.static_assets import AssetManifest, PrecompressedStaticFiles, build_assets
+
+
+@pytest.fixture
+def static(tmp_path):
+    source = tmp_path / "static"
+    (source / "js").mkdir(parents=True)
+    (source / "js" / "app.js").write_text("function hello() {\n    return 1;\n}\n")
+    return source
+
+
+def test_built_file_removed_after_load_falls_back_to_the_source(static, tmp_path):
+    build_assets(static, tmp_path / "dist")
+    manifest = AssetManifest(static, tmp_path / "dist")
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=static, manifest=manifest))
+    client = TestClient(app)
+    assert client.get("/static/js/app.js").text != (static / "js" / "app.js").read_text()  # Minified build
+
+    for built in (tmp_path / "dist" / "js").iterdir():
+        built.unlink()
+
+    response = client.get("/static/js/app.js", headers={"accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.text == (static / "js" / "app.js").read_text()
+
+
+def test_cached_page_is_rendered_again_when_an_embedded_asset_changes(static, tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "page.html").write_text("<script src=\"{{ asset_url('js/app.js') }}\"></script>")
+    templates = Jinja2Templates(directory=str(templates_dir))
+    manifest = AssetManifest(static, tmp_path / "dist")
+    templates.env.globals["asset_url"] = manifest.url
+    cache = PageCache(templates, enabled=True)
+
+    app = FastAPI()
+
+    @app.get("/page")
+    async def page(request: Request):
+        return cache.response(request, "page.html")
+
+    client = TestClient(app)
+    first = client.get("/page")
+    assert client.get("/page").text == first.text
+
+    # Development mode: the URL carries the file's modification time
+    stat = os.stat(static / "js" / "app.js")
+    os.utime(static / "js" / "app.js", (stat.st_atime, stat.st_mtime + 10))
+    assert client.get("/page").text != first.text
+
+    # A new build switches the page to the fingerprinted URL
+    build_assets(static, tmp_path / "dist")
+    manifest.load()
+    built = client.get("/page")
+    assert manifest.urls["js/app.js"] in built.text
+    assert built.headers["etag"] != first.headers["etag"]
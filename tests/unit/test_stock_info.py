@@ -0,0 +1,45 @@
+"""Stock detail info: served from stored data, extended info fetched by the refresher."""
+
+from database.database import AsyncSessionLocal
+from database.models import StockMetadata
+from services.cluster import cluster
+from services.stock_data_service import stock_data_service
+from services.stock_quote_refresher import FakeQuoteProvider, StockQuoteRefresher, stock_quote_refresher
+
+
+def offline():
+    raise AssertionError("Yahoo Finance called on the request path")
+
+
+async def test_detail_uses_the_stored_quote_until_the_refresher_publishes_info(database, monkeypatch):
+    monkeypatch.setattr("services.stock_data_service._yfinance", offline)
+    monkeypatch.setattr("services.stock_quote_refresher._yfinance", offline)
+    requested = []
+
+    async def request_info(ticker):
+        requested.append(ticker)
+
+    monkeypatch.setattr(stock_quote_refresher, "request_info", request_info)
+    refresher = StockQuoteRefresher(FakeQuoteProvider(clock=lambda: 1_700_000_000.0))
+    monkeypatch.setitem(cluster.pubsub._handlers, "stock_info", [refresher._on_info_published])
+
+    async with AsyncSessionLocal() as session:
+        session.add(StockMetadata(ticker="INFO", company_name="Info Test Corp"))
+        await session.commit()
+    quotes = await refresher.provider.fetch(["INFO"])
+    await refresher.store(quotes)
+
+    async with AsyncSessionLocal() as session:
+        cold = await stock_data_service.get_stock_info("info", session)
+    assert cold["company_name"] == "Info Test Corp"
+    assert cold["current_price"] == quotes["INFO"]["current_price_usd"]
+    assert cold["pe_ratio"] is None
+    assert requested == ["INFO"]
+
+    assert await refresher.refresh_info(requested) == 1
+    async with AsyncSessionLocal() as session:
+        warm = await stock_data_service.get_stock_info("INFO", session)
+    info = await refresher.provider.info("INFO")
+    assert warm["pe_ratio"] == info["pe_ratio"]
+    assert (warm["52_week_low"], warm["52_week_high"]) == (info["52_week_low"], info["52_week_high"])
+    assert requested == ["INFO"]
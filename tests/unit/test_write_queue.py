@@ -0,0 +1,107 @@
+"""Write queue: no deadlock when the submitting task already holds the write lock."""
+
+import asyncio
+
+from sqlalchemy import select, text
+
+from crypto.portfolio import portfolio_manager
+from database.database import SQLITE_PRODUCTION_MODE, AsyncSessionLocal, sqlite_write_lock
+from database.models import GameBet, User, Wallet
+from database.write_queue import WriteQueue, write_queue
+from gaming.roulette import roulette_engine
+
+
+async def balance(user_id: str) -> float:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(Wallet.gem_balance).where(Wallet.user_id == user_id))
+
+
+def test_production_mode_is_on():
+    # The tests below only exercise the lock with SQLite production mode
+    assert SQLITE_PRODUCTION_MODE and write_queue.enabled
+
+
+async def test_wallet_write_from_a_session_holding_the_lock(make_user):
+    """spin_wheel: dirty the session, autoflush on a select, then process_win."""
+    user_id = await make_user()
+
+    async with AsyncSessionLocal() as session:
+        wallet = (await session.execute(select(Wallet).where(Wallet.user_id == user_id))).scalar_one()
+        wallet.total_wagered = (wallet.total_wagered or 0) + 10
+        await session.execute(select(User.id).where(User.id == user_id))  # Autoflush takes the lock
+        assert session._holds_write_lock
+
+        assert await asyncio.wait_for(portfolio_manager.process_win(user_id, 50, "test win"), timeout=5)
+        assert await asyncio.wait_for(
+            portfolio_manager.add_gems(user_id, 25, "test deposit"), timeout=5
+        )
+        await session.commit()
+
+    assert await balance(user_id) == 1075
+    # The queue is still usable afterwards
+    assert await asyncio.wait_for(portfolio_manager.add_gems(user_id, 5), timeout=5)
+    assert await balance(user_id) == 1080
+
+
+async def test_textual_writes_take_the_lock(make_user):
+    user_id = await make_user()
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("SELECT gem_balance FROM wallets WHERE user_id = :u"), {"u": user_id})
+        assert not session._holds_write_lock
+        await session.execute(text("UPDATE wallets SET total_won = 0 WHERE user_id = :u"), {"u": user_id})
+        assert session._holds_write_lock and sqlite_write_lock.locked()
+        await session.commit()
+    assert not sqlite_write_lock.locked()
+
+
+async def test_inline_job_rolls_back_with_its_session(make_user):
+    user_id = await make_user()
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(Wallet.__table__.update().where(Wallet.user_id == user_id).values(total_won=0))
+        assert await asyncio.wait_for(portfolio_manager.add_gems(user_id, 25), timeout=5)
+        await session.rollback()
+
+    assert await balance(user_id) == 1000
+
+
+async def test_writer_stops_waiting_for_a_lock_held_elsewhere(make_user):
+    user_id = await make_user()
+    queue = WriteQueue(enabled=True, lock_timeout=0.2)
+
+    async def job(session):
+        await session.execute(
+            Wallet.__table__.update().where(Wallet.user_id == user_id).values(gem_balance=Wallet.gem_balance + 1)
+        )
+        return True
+
+    # A lock held by a task that never writes to SQLite
+    await sqlite_write_lock.acquire()
+    try:
+        assert await asyncio.wait_for(queue.submit(job), timeout=5)
+    finally:
+        sqlite_write_lock.release()
+        await queue.stop()
+
+    assert await balance(user_id) == 1001
+
+
+async def test_spin_wheel_settles_through_the_queue(make_user):
+    user_id = await make_user()
+    game_session_id = await roulette_engine.create_game_session(user_id)
+    async with AsyncSessionLocal() as session:
+        session.add_all([
+            GameBet(game_session_id=game_session_id, user_id=user_id, bet_type="RED_BLACK", bet_value=color, amount=10)
+            for color in ("red", "black")
+        ])
+        await session.commit()
+
+    result = await asyncio.wait_for(roulette_engine.spin_wheel(game_session_id), timeout=10)
+
+    assert result["success"], result
+    async with AsyncSessionLocal() as session:
+        unsettled = (await session.execute(
+            select(GameBet.id).where(GameBet.game_session_id == game_session_id, GameBet.is_winner.is_(None))
+        )).all()
+    assert not unsettled